@@ -0,0 +1,198 @@
+# backend/bench_partitions.py
+# Before/after numbers for the monthly partitioning of the fact tables (backend/partitions.py).
+#
+#   python -m backend.bench_partitions                          # 50M rows, 36 months, 20 workspaces
+#   python -m backend.bench_partitions --rows 5000000 --keep    # smaller; keep the tables
+#   python -m backend.bench_partitions --reuse                  # re-time tables kept by --keep
+#
+# Builds two synthetic copies of the sales_raw layout in the schema bench_partitions:
+#   "before": flat         one heap, unique order_line_id, (workspace_id, order_date) index
+#   "after":  partitioned  same rows / indexes, PARTITION BY RANGE (order_date) per month
+# and times, on each:
+#   - window_ws:     12-month KPI window of one workspace (the /db/kpi/* shape)
+#   - window_house:  12-month window over all workspaces (house monthly)
+#   - archive_month: removing the oldest month (DELETE vs DETACH, rolled back)
+# Needs ~10 GB of free disk for 50M rows. Nothing outside the bench schema is touched.
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import text
+
+from backend.db import engine
+
+SCHEMA = "bench_partitions"
+_BATCH = 5_000_000
+
+_COLUMNS = (
+    "id BIGINT NOT NULL, workspace_id UUID NOT NULL, order_line_id TEXT NOT NULL, "
+    "order_date TIMESTAMP, style_key TEXT, units INTEGER NOT NULL, gmv DOUBLE PRECISION"
+)
+
+QUERIES = {
+    "window_ws": (
+        "SELECT date_trunc('month', order_date) AS m, sum(units), sum(gmv) FROM {T} "
+        "WHERE workspace_id = :ws AND order_date >= :start AND order_date < :end GROUP BY 1"
+    ),
+    "window_house": (
+        "SELECT date_trunc('month', order_date) AS m, sum(units), sum(gmv) FROM {T} "
+        "WHERE order_date >= :start AND order_date < :end GROUP BY 1"
+    ),
+}
+
+
+def _build(conn, rows: int, months: int, workspaces: int, first: date) -> None:
+    conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    conn.execute(text(f"CREATE TABLE {SCHEMA}.workspaces AS SELECT gen_random_uuid() AS id FROM generate_series(1, :n)"), {"n": workspaces})
+    conn.execute(text(f"CREATE TABLE {SCHEMA}.flat ({_COLUMNS})"))
+    conn.execute(text(f"CREATE TABLE {SCHEMA}.partitioned ({_COLUMNS}) PARTITION BY RANGE (order_date)"))
+    conn.execute(text(f"CREATE TABLE {SCHEMA}.partitioned_default PARTITION OF {SCHEMA}.partitioned DEFAULT"))
+    for i in range(months):
+        m = first + relativedelta(months=i)
+        conn.execute(
+            text(
+                f"CREATE TABLE {SCHEMA}.partitioned_p{m:%Y%m} PARTITION OF {SCHEMA}.partitioned "
+                f"FOR VALUES FROM ('{m}') TO ('{m + relativedelta(months=1)}')"
+            )
+        )
+    conn.commit()
+
+    span_days = (first + relativedelta(months=months) - first).days
+    for lo in range(0, rows, _BATCH):
+        hi = min(rows, lo + _BATCH)
+        conn.execute(
+            text(
+                f"INSERT INTO {SCHEMA}.flat "
+                "SELECT g, w.id, 'bench:' || g, "
+                "CAST(:first AS timestamp) + (random() * :days) * interval '1 day', "
+                "'style' || (g % 20000), 1 + (g % 3), round((random() * 2000)::numeric, 2) "
+                f"FROM generate_series(:lo, :hi) g "
+                f"JOIN (SELECT id, row_number() OVER () - 1 AS n FROM {SCHEMA}.workspaces) w ON w.n = g % :ws"
+            ),
+            {"first": first, "days": span_days, "lo": lo + 1, "hi": hi, "ws": workspaces},
+        )
+        conn.commit()
+        print(json.dumps({"loaded": hi}), flush=True)
+
+    conn.execute(text(f"INSERT INTO {SCHEMA}.partitioned SELECT * FROM {SCHEMA}.flat"))
+    for t in ("flat", "partitioned"):
+        conn.execute(text(f"CREATE INDEX ON {SCHEMA}.{t} (workspace_id, order_date)"))
+    # sales_raw before: a global unique key; after: a plain index (copy_frame keeps it unique)
+    conn.execute(text(f"CREATE UNIQUE INDEX ON {SCHEMA}.flat (order_line_id)"))
+    conn.execute(text(f"CREATE INDEX ON {SCHEMA}.partitioned (order_line_id)"))
+    conn.commit()
+    # VACUUM cannot run inside a transaction
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as ac:
+        for t in ("flat", "partitioned"):
+            ac.execute(text(f"VACUUM ANALYZE {SCHEMA}.{t}"))
+
+
+def _plan_stats(conn, sql: str, params: dict) -> dict:
+    plan = conn.execute(text("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql), params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    root = plan[0]["Plan"]
+
+    relations = set()
+
+    def walk(node):
+        if node.get("Relation Name"):
+            relations.add(node["Relation Name"])
+        for child in node.get("Plans", []) or []:
+            walk(child)
+
+    walk(root)
+    return {
+        "buffers": int(root.get("Shared Hit Blocks", 0)) + int(root.get("Shared Read Blocks", 0)),
+        "relations_scanned": len(relations),
+    }
+
+
+def _time_query(conn, sql: str, params: dict, runs: int) -> dict:
+    secs = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        conn.execute(text(sql), params).all()
+        secs.append(time.perf_counter() - t0)
+    return {
+        "median_ms": round(statistics.median(secs) * 1000, 2),
+        "min_ms": round(min(secs) * 1000, 2),
+        **_plan_stats(conn, sql, params),
+    }
+
+
+def _time_archive(conn, first: date) -> dict:
+    """Drop the oldest month from each layout inside a rolled-back transaction."""
+    out = {}
+    nxt = first + relativedelta(months=1)
+    t0 = time.perf_counter()
+    conn.execute(text(f"DELETE FROM {SCHEMA}.flat WHERE order_date < :nxt"), {"nxt": nxt})
+    out["flat_delete_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+    conn.rollback()
+
+    t0 = time.perf_counter()
+    conn.execute(text(f"ALTER TABLE {SCHEMA}.partitioned DETACH PARTITION {SCHEMA}.partitioned_p{first:%Y%m}"))
+    out["partitioned_detach_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+    conn.rollback()
+    return out
+
+
+def bench(rows: int, months: int, workspaces: int, runs: int, reuse: bool, keep: bool) -> dict:
+    first = date.today().replace(day=1) - relativedelta(months=months)
+    with engine.connect() as conn:
+        if not reuse:
+            _build(conn, rows, months, workspaces, first)
+        else:
+            first = conn.execute(text(f"SELECT CAST(date_trunc('month', min(order_date)) AS date) FROM {SCHEMA}.flat")).scalar()
+            months = len(
+                conn.execute(
+                    text(f"SELECT DISTINCT date_trunc('month', order_date) FROM {SCHEMA}.flat")
+                ).all()
+            )
+
+        ws = conn.execute(text(f"SELECT id FROM {SCHEMA}.workspaces LIMIT 1")).scalar()
+        end = first + relativedelta(months=months)
+        params = {"ws": ws, "start": end - relativedelta(months=12), "end": end}
+        n_rows = conn.execute(text(f"SELECT count(*) FROM {SCHEMA}.flat")).scalar()
+
+        out: dict = {"rows": int(n_rows), "months": months, "window": [str(params["start"]), str(params["end"])]}
+        for name, sql in QUERIES.items():
+            b = _time_query(conn, sql.format(T=f"{SCHEMA}.flat"), params, runs)
+            a = _time_query(conn, sql.format(T=f"{SCHEMA}.partitioned"), params, runs)
+            out[name] = {
+                "before": b,
+                "after": a,
+                "speedup": round(b["median_ms"] / a["median_ms"], 2) if a["median_ms"] else None,
+            }
+        conn.rollback()
+        out["archive_month"] = _time_archive(conn, first)
+
+        if not keep:
+            conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+            conn.commit()
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Flat vs monthly-partitioned sales_raw benchmark")
+    ap.add_argument("--rows", type=int, default=50_000_000)
+    ap.add_argument("--months", type=int, default=36)
+    ap.add_argument("--workspaces", type=int, default=20)
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--reuse", action="store_true", help="time the tables left by an earlier --keep run")
+    ap.add_argument("--keep", action="store_true", help="keep the bench schema afterwards")
+    args = ap.parse_args()
+
+    result = bench(args.rows, args.months, args.workspaces, args.runs, args.reuse, args.keep)
+    print(json.dumps(result, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# backend/bench_raw_json.py
+# Before/after numbers for the raw_json JSONB migration (backend/migrations/v0007_raw_json.py).
+#
+#   python -m backend.bench_raw_json --workspace-slug acme --start 2025-01-01 --end 2025-12-31
+#   python -m backend.bench_raw_json ... --base-url http://localhost:8000   # + endpoint timings
+#
+# "before": a TEXT copy of the workspace's rows (temp table, same (workspace_id, date) index),
+#           queried with CAST(raw_json AS JSONB) like the API did
+# "after":  the real JSONB tables with the expression indexes
+# Run it after the migration; the queries are the ones behind /db/brands and the
+# size-forecast brand filter, plus the raw_json reason grouping /db/returns/reasons did
+# before reason_bucket.
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+import urllib.parse
+import urllib.request
+
+from sqlalchemy import text
+
+from backend.db import SessionLocal, engine, resolve_workspace_id
+
+# {J} = raw_json expression, {T} = table
+QUERIES = {
+    "returns_reasons": (
+        "returns_raw",
+        "SELECT lower(trim(coalesce({J} ->> 'return_reason', ''))) AS reason, "
+        "sum(coalesce(units, 1)) AS units "
+        "FROM {T} WHERE workspace_id = :ws AND return_date >= :start AND return_date < :end "
+        "GROUP BY 1 ORDER BY 2 DESC LIMIT 20",
+    ),
+    "brands_distinct": (
+        "sales_raw",
+        "SELECT DISTINCT coalesce(nullif(trim({J} ->> 'brand'), ''), nullif(trim({J} ->> 'Brand'), ''), "
+        "nullif(trim({J} ->> 'BRAND'), '')) FROM {T} WHERE workspace_id = :ws",
+    ),
+    "sales_brand_filter": (
+        "sales_raw",
+        "SELECT count(*) FROM {T} WHERE workspace_id = :ws AND lower(trim({J} ->> 'brand')) = :brand",
+    ),
+}
+
+_DATE_COL = {"returns_raw": "return_date", "sales_raw": "order_date"}
+
+
+def _time_query(conn, sql: str, params: dict, runs: int) -> dict:
+    secs = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        conn.execute(text(sql), params).all()
+        secs.append(time.perf_counter() - t0)
+    plan = conn.execute(text("EXPLAIN " + sql), params).scalars().all()
+    return {
+        "median_ms": round(statistics.median(secs) * 1000, 2),
+        "min_ms": round(min(secs) * 1000, 2),
+        "uses_index": [ln.strip() for ln in plan if "Index" in ln],
+    }
+
+
+def _sample_params(conn, ws_id) -> dict:
+    def one(sql: str):
+        return conn.execute(text(sql), {"ws": ws_id}).scalar()
+
+    return {
+        "brand": (
+            one("SELECT lower(trim(raw_json ->> 'brand')) FROM sales_raw WHERE workspace_id = :ws AND raw_json ? 'brand' LIMIT 1")
+            or ""
+        ),
+    }
+
+
+def bench_sql(ws_id, start: str, end: str, runs: int) -> dict:
+    out: dict = {}
+    with engine.connect() as conn:
+        for table in ("sales_raw", "returns_raw"):
+            kind = conn.execute(
+                text(
+                    "SELECT data_type FROM information_schema.columns "
+                    "WHERE table_schema = current_schema() AND table_name = :t AND column_name = 'raw_json'"
+                ),
+                {"t": table},
+            ).scalar()
+            if kind != "jsonb":
+                raise SystemExit(f"{table}.raw_json is {kind}: run python -m backend.migrations first")
+
+        # the pre-migration layout, for this workspace only
+        for table, date_col in _DATE_COL.items():
+            conn.execute(
+                text(
+                    f"CREATE TEMP TABLE bench_{table} AS "
+                    f"SELECT id, workspace_id, {date_col}, units, raw_json::text AS raw_json "
+                    f"FROM {table} WHERE workspace_id = :ws"
+                ),
+                {"ws": ws_id},
+            )
+            conn.execute(text(f"CREATE INDEX ON bench_{table} (workspace_id, {date_col})"))
+            conn.execute(text(f"ANALYZE bench_{table}"))
+
+        params = {"ws": ws_id, "start": start, "end": end, **_sample_params(conn, ws_id)}
+        for name, (table, sql) in QUERIES.items():
+            before = sql.format(J="CAST(raw_json AS JSONB)", T=f"bench_{table}")
+            after = sql.format(J="raw_json", T=table)
+            b = _time_query(conn, before, params, runs)
+            a = _time_query(conn, after, params, runs)
+            out[name] = {
+                "before": b,
+                "after": a,
+                "speedup": round(b["median_ms"] / a["median_ms"], 2) if a["median_ms"] else None,
+            }
+        conn.rollback()
+    return out
+
+
+def bench_http(base_url: str, slug: str, start: str, end: str, runs: int) -> dict:
+    """Wall time of the real endpoints (run once before and once after the migration)."""
+    endpoints = {
+        "/db/brands": {"workspace_slug": slug},
+        "/db/returns/reasons": {"workspace_slug": slug, "start": start, "end": end},
+        "/db/returns/reasons?portal=flipkart": {"workspace_slug": slug, "start": start, "end": end},
+    }
+    out = {}
+    for path, params in endpoints.items():
+        sep = "&" if "?" in path else "?"
+        url = base_url.rstrip("/") + path + sep + urllib.parse.urlencode(params)
+        secs = []
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            with urllib.request.urlopen(url) as resp:
+                resp.read()
+            secs.append(time.perf_counter() - t0)
+        out[path] = {"median_ms": round(statistics.median(secs) * 1000, 2), "min_ms": round(min(secs) * 1000, 2)}
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="raw_json TEXT vs JSONB benchmark")
+    ap.add_argument("--workspace-slug", default="default")
+    ap.add_argument("--start", required=True, help="YYYY-MM-DD")
+    ap.add_argument("--end", required=True, help="YYYY-MM-DD (exclusive in the SQL queries)")
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--base-url", default=None, help="also time the HTTP endpoints of a running API")
+    args = ap.parse_args()
+
+    db = SessionLocal()
+    try:
+        ws_id = str(resolve_workspace_id(db, args.workspace_slug))
+    finally:
+        db.close()
+
+    result = {"sql": bench_sql(ws_id, args.start, args.end, args.runs)}
+    if args.base_url:
+        result["http"] = bench_http(args.base_url, args.workspace_slug, args.start, args.end, args.runs)
+    print(json.dumps(result, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,437 @@
+# backend/copy_loader.py
+# Bulk loader: DataFrame -> COPY FROM STDIN into a temp staging table -> one INSERT ... SELECT
+# replace=true: ReplaceLoad stages the whole file first, then swaps the scope's rows in one go
+
+from __future__ import annotations
+
+import io
+import time
+import uuid
+
+import pandas as pd
+import psycopg2
+from sqlalchemy.orm import Session
+
+from backend.partitions import PARTITIONED, UNIQUE_KEYS, ensure_partitions, frame_months
+
+# NULL marker in the CSV stream (empty strings stay empty strings)
+COPY_NULL = r"\N"
+
+# rows per COPY round-trip; keeps the CSV buffer small for big files
+COPY_CHUNK_ROWS = 50_000
+
+
+def _q(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+# what to do with rows whose key already exists in the target table
+#   error  => plain INSERT (unique violation aborts the load)
+#   skip   => ON CONFLICT DO NOTHING
+#   update => ON CONFLICT (conflict_cols) DO UPDATE, only where something changed
+ON_CONFLICT_MODES = ("error", "skip", "update")
+
+# bookkeeping columns: written along with a real change, but never a change on their own
+# (an overlapping re-upload keeps the first upload_id on unchanged rows)
+LINEAGE_COLS = ("upload_id",)
+
+# partitioned tables: their unique key (workspace_id, order_line_id, <partition column>) is
+# the conflict target, whatever conflict_cols says. An order line is still one row whatever
+# its date: every mode matches it on (workspace_id, order_line_id) across partitions
+PARTITION_KEYS = {table: cols for table, (_, cols) in UNIQUE_KEYS.items()}
+
+
+def copy_frame(
+    db: Session,
+    table: str,
+    frame: pd.DataFrame,
+    on_conflict: str = "error",
+    conflict_cols: tuple[str, ...] | list[str] | None = None,
+    previous: tuple[str, ...] | list[str] | None = None,
+) -> dict:
+    """
+    Load `frame` into `table` using COPY.
+
+    - frame columns must be target column names; values already cleaned/typed
+      (integer columns that can be missing should be pandas "Int64", not float)
+    - rows go into a temp staging table (no indexes/constraints), then a single
+      INSERT ... SELECT moves them into the real table
+    - runs inside the session's transaction: caller commits / rolls back
+    - on_conflict: see ON_CONFLICT_MODES; "update" needs conflict_cols and keeps
+      the last occurrence of a key within the frame. If the frame has a
+      workspace_id column, rows owned by another workspace are never overwritten.
+    - partitioned targets (backend/partitions.py): the month partitions the frame
+      needs are created first; PARTITION_KEYS tables match an order line whatever its
+      date: "update" moves it (see _move_keyed), "skip" / "error" see it as stored
+      (see _insert_keyed)
+    - previous: with "update", also return the stored values of these columns for the
+      rows the load changes, taken before the update (e.g. the old date / style, so the
+      caller can refresh what those rows were counted in)
+
+    Returns {"rows", "inserted", "updated", "skipped", "seconds", "rows_per_sec"}
+    ("rows" = inserted + updated), plus "previous" (distinct value tuples) when asked.
+    """
+    if on_conflict not in ON_CONFLICT_MODES:
+        raise ValueError(f"on_conflict must be one of {list(ON_CONFLICT_MODES)}")
+    if on_conflict == "update" and not conflict_cols:
+        raise ValueError("on_conflict='update' needs conflict_cols")
+
+    t0 = time.perf_counter()
+    n = int(len(frame))
+    if n == 0:
+        out = {"rows": 0, "inserted": 0, "updated": 0, "skipped": 0, "seconds": 0.0, "rows_per_sec": 0.0}
+        if previous:
+            out["previous"] = []
+        return out
+
+    part_col = PARTITIONED.get(table)
+    if part_col and part_col in frame.columns:
+        ensure_partitions(db, table, frame_months(frame[part_col]))
+
+    cols = ", ".join(_q(c) for c in frame.columns)
+    staging = f"_stg_{table}_{uuid.uuid4().hex[:8]}"
+
+    raw_conn = db.connection().connection
+    cur = raw_conn.cursor()
+    try:
+        # column types copied from the target, but no NOT NULL / defaults / indexes
+        cur.execute(
+            f"CREATE TEMP TABLE {_q(staging)} ON COMMIT DROP AS "
+            f"SELECT {cols} FROM {_q(table)} WITH NO DATA"
+        )
+
+        copy_sql = f"COPY {_q(staging)} ({cols}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')"
+        for start_i in range(0, n, COPY_CHUNK_ROWS):
+            buf = io.StringIO()
+            frame.iloc[start_i : start_i + COPY_CHUNK_ROWS].to_csv(
+                buf, index=False, header=False, na_rep=COPY_NULL
+            )
+            buf.seek(0)
+            cur.copy_expert(copy_sql, buf)
+
+        prev_rows = None
+        if previous:
+            prev_rows = []
+            if on_conflict == "update":
+                prev_rows = _previous_values(cur, table, staging, list(frame.columns), conflict_cols, previous)
+        inserted, updated = _insert_staged(cur, table, staging, list(frame.columns), on_conflict, conflict_cols, n)
+        cur.execute(f"DROP TABLE IF EXISTS {_q(staging)}")
+    finally:
+        cur.close()
+
+    secs = time.perf_counter() - t0
+    rows = inserted + updated
+    out = {
+        "rows": rows,
+        "inserted": inserted,
+        "updated": updated,
+        "skipped": max(0, n - rows),
+        "seconds": round(secs, 3),
+        "rows_per_sec": round(n / secs, 1) if secs > 0 else float(n),
+    }
+    if prev_rows is not None:
+        out["previous"] = prev_rows
+    return out
+
+
+def _insert_staged(
+    cur, table: str, staging: str, columns: list[str], on_conflict: str, conflict_cols, n: int
+) -> tuple[int, int]:
+    """INSERT ... SELECT from a staging table into `table` per on_conflict. Returns (inserted, updated)."""
+    conflict_cols = PARTITION_KEYS.get(table, conflict_cols)
+    cols = ", ".join(_q(c) for c in columns)
+    target = ", ".join(_q(c) for c in conflict_cols or ())
+    updated = 0
+    if on_conflict == "update":
+        if table in PARTITION_KEYS:
+            updated = _move_keyed(cur, table, staging, columns)
+        set_cols = [c for c in columns if c not in set(conflict_cols)]
+        cmp_cols = [c for c in set_cols if c not in LINEAGE_COLS] or set_cols
+        changed = (
+            "ROW(" + ", ".join(f"t.{_q(c)}" for c in cmp_cols) + ") IS DISTINCT FROM "
+            "ROW(" + ", ".join(f"EXCLUDED.{_q(c)}" for c in cmp_cols) + ")"
+        )
+        if "workspace_id" in set_cols:
+            changed = f't."workspace_id" = EXCLUDED."workspace_id" AND {changed}'
+
+        # DISTINCT ON: a key may appear twice in one file, DO UPDATE can only touch a row once
+        # xmax = 0 on the returned row <=> it was inserted, not updated
+        cur.execute(
+            f"WITH {_latest_rows(table, staging, columns, conflict_cols)}, ins AS ("
+            f"  INSERT INTO {_q(table)} AS t ({cols}) SELECT {cols} FROM src"
+            f"  ON CONFLICT ({target}) DO UPDATE SET "
+            + ", ".join(f"{_q(c)} = EXCLUDED.{_q(c)}" for c in set_cols)
+            + f"  WHERE {changed}"
+            f"  RETURNING (xmax = 0) AS is_insert"
+            f") SELECT count(*) FILTER (WHERE is_insert), count(*) FILTER (WHERE NOT is_insert) FROM ins"
+        )
+        ins_n, upd_n = cur.fetchone()
+        inserted, updated = int(ins_n or 0), updated + int(upd_n or 0)
+    elif table in PARTITION_KEYS:
+        inserted = _insert_keyed(cur, table, staging, columns, on_conflict)
+    else:
+        insert_sql = f"INSERT INTO {_q(table)} ({cols}) SELECT {cols} FROM {_q(staging)}"
+        if on_conflict == "skip":
+            insert_sql += f" ON CONFLICT ({target}) DO NOTHING" if target else " ON CONFLICT DO NOTHING"
+        cur.execute(insert_sql)
+        inserted = int(cur.rowcount if cur.rowcount is not None and cur.rowcount >= 0 else n)
+
+    return inserted, updated
+
+
+def _latest_rows(table: str, staging: str, columns: list[str], conflict_cols, first: bool = False) -> str:
+    """
+    CTE "src": the last (first=True: the first) staged row of each key. PARTITION_KEYS tables
+    dedupe on the key without the partition column: an order line listed twice with two
+    dates is one row.
+    """
+    key_cols = PARTITION_KEYS[table][:-1] if table in PARTITION_KEYS else conflict_cols
+    key = ", ".join(_q(c) for c in key_cols)
+    cols = ", ".join(_q(c) for c in columns)
+    order = "ctid" if first else "ctid DESC"
+    return f"src AS (SELECT DISTINCT ON ({key}) {cols} FROM {_q(staging)} ORDER BY {key}, {order})"
+
+
+def _insert_keyed(cur, table: str, staging: str, columns: list[str], on_conflict: str) -> int:
+    """
+    on_conflict="skip" / "error" on a PARTITION_KEYS table. The unique key includes the date,
+    so an order line stored under another date is found with an anti-join on
+    (workspace_id, order_line_id) instead:
+      skip  => the first staged row of each order line, unless it is stored already
+      error => IntegrityError when an order line is stored already or listed twice in the file
+    Returns the rows inserted.
+    """
+    *line_cols, _ = PARTITION_KEYS[table]
+    line = ", ".join(_q(c) for c in line_cols)
+    stored = (
+        f"EXISTS (SELECT 1 FROM {_q(table)} AS t WHERE "
+        + " AND ".join(f"t.{_q(c)} = src.{_q(c)}" for c in line_cols)
+        + ")"
+    )
+    cols = ", ".join(_q(c) for c in columns)
+
+    if on_conflict == "error":
+        cur.execute(
+            f"SELECT {line} FROM {_q(staging)} GROUP BY {line} HAVING count(*) > 1 LIMIT 1"
+        )
+        dup = cur.fetchone()
+        if dup is None:
+            cur.execute(f"SELECT {line} FROM {_q(staging)} AS src WHERE {stored} LIMIT 1")
+            dup = cur.fetchone()
+        if dup is not None:
+            raise psycopg2.IntegrityError(
+                f"duplicate key value: {table} ({', '.join(line_cols)})=({', '.join(map(str, dup))}) already exists"
+            )
+        cur.execute(f"INSERT INTO {_q(table)} ({cols}) SELECT {cols} FROM {_q(staging)}")
+    else:
+        cur.execute(
+            f"WITH {_latest_rows(table, staging, columns, None, first=True)} "
+            f"INSERT INTO {_q(table)} ({cols}) SELECT {cols} FROM src WHERE NOT {stored} "
+            f"ON CONFLICT ({', '.join(_q(c) for c in PARTITION_KEYS[table])}) DO NOTHING"
+        )
+    return int(cur.rowcount or 0)
+
+
+def _previous_values(cur, table: str, staging: str, columns: list[str], conflict_cols, previous) -> list[tuple]:
+    """
+    Distinct stored values of `previous` for the rows the update that follows will change
+    (moved or updated: same key, some non-lineage column differs). The rows are locked
+    FOR UPDATE, so nothing changes them between this read and the update.
+    """
+    key_cols = PARTITION_KEYS[table][:-1] if table in PARTITION_KEYS else list(conflict_cols)
+    cmp_cols = [c for c in columns if c not in set(key_cols)]
+    cmp_cols = [c for c in cmp_cols if c not in LINEAGE_COLS] or cmp_cols
+    match = " AND ".join(f"t.{_q(c)} = src.{_q(c)}" for c in key_cols)
+    if "workspace_id" in columns and "workspace_id" not in key_cols:
+        match += ' AND t."workspace_id" = src."workspace_id"'
+    changed = (
+        "ROW(" + ", ".join(f"t.{_q(c)}" for c in cmp_cols) + ") IS DISTINCT FROM "
+        "ROW(" + ", ".join(f"src.{_q(c)}" for c in cmp_cols) + ")"
+    )
+    prev = ", ".join(_q(c) for c in previous)
+    cur.execute(
+        f"WITH {_latest_rows(table, staging, columns, conflict_cols)} "
+        f"SELECT DISTINCT {prev} FROM ("
+        f"  SELECT " + ", ".join(f"t.{_q(c)}" for c in previous)
+        + f"  FROM {_q(table)} AS t JOIN src ON {match} WHERE {changed} FOR UPDATE OF t"
+        f") old"
+    )
+    return [tuple(r) for r in cur.fetchall()]
+
+
+def _move_keyed(cur, table: str, staging: str, columns: list[str]) -> int:
+    """
+    on_conflict="update" on a PARTITION_KEYS table: stored order lines the file lists with
+    another date get the file's values (the row moves to its new month partition), so the
+    upsert that follows finds them on the full key. Returns the rows moved.
+    """
+    *line_cols, part_col = PARTITION_KEYS[table]
+    match = " AND ".join(f"t.{_q(c)} = src.{_q(c)}" for c in line_cols)
+    set_cols = [c for c in columns if c not in set(line_cols)]
+    cur.execute(
+        f"WITH {_latest_rows(table, staging, columns, None)} "
+        f"UPDATE {_q(table)} AS t SET " + ", ".join(f"{_q(c)} = src.{_q(c)}" for c in set_cols)
+        + f" FROM src WHERE {match} AND t.{_q(part_col)} IS DISTINCT FROM src.{_q(part_col)}"
+    )
+    return int(cur.rowcount or 0)
+
+
+def add_load_stats(total: dict | None, load: dict) -> dict:
+    """Accumulate copy_frame() stats across chunks."""
+    total = total or {}
+    out = {
+        k: int(total.get(k, 0)) + int(load.get(k, 0))
+        for k in ("rows", "inserted", "updated", "skipped")
+    }
+    secs = float(total.get("seconds", 0.0)) + float(load.get("seconds", 0.0))
+    staged = out["rows"] + out["skipped"]
+    out["seconds"] = round(secs, 3)
+    out["rows_per_sec"] = round(staged / secs, 1) if secs > 0 else float(staged)
+    if "previous" in total or "previous" in load:
+        out["previous"] = list(dict.fromkeys([*total.get("previous", []), *load.get("previous", [])]))
+    return out
+
+
+# -----------------------------------------------------------------------------
+# Replace mode: stage -> validate -> swap
+# -----------------------------------------------------------------------------
+class ReplaceLoad:
+    """
+    replace=true without a window in which the scope is empty or half loaded:
+
+        rl = ReplaceLoad(db, "sales_raw", {"workspace_id": ws_id})
+        for frame in chunks:
+            rl.add(frame)                                # COPY into a temp staging table only
+        load = rl.swap(on_conflict, conflict_cols)       # validate, DELETE scope + INSERT ... SELECT
+        db.commit()                                      # readers go from old rows to new in one step
+
+    Nothing touches `table` before swap(): a file that fails to parse or to validate leaves
+    the existing rows as they were. No commit between add() and swap() (the staging table is
+    ON COMMIT DROP); several ReplaceLoads swapped before one commit replace together.
+
+    scope: column -> value; the rows to replace are those equal on every column.
+    Validation: at least one staged row (unless allow_empty), and no NULL staged into a
+    NOT NULL column without a default.
+    """
+
+    def __init__(self, db: Session, table: str, scope: dict):
+        if not scope:
+            raise ValueError("ReplaceLoad needs a scope (replacing a whole table is not supported)")
+        self.db = db
+        self.table = table
+        self.scope = dict(scope)
+        self.columns: list[str] | None = None
+        self.staged = 0
+        self.seconds = 0.0
+        self._staging = f"_rpl_{table}_{uuid.uuid4().hex[:8]}"
+
+    def add(self, frame: pd.DataFrame) -> int:
+        """COPY `frame` into the staging table; returns the rows staged so far."""
+        if frame is None or frame.empty:
+            return self.staged
+        t0 = time.perf_counter()
+        cur = self.db.connection().connection.cursor()
+        try:
+            if self.columns is None:
+                self.columns = list(frame.columns)
+                # column types copied from the target, but no NOT NULL / defaults / indexes
+                cur.execute(
+                    f"CREATE TEMP TABLE {_q(self._staging)} ON COMMIT DROP AS "
+                    f"SELECT {', '.join(_q(c) for c in self.columns)} FROM {_q(self.table)} WITH NO DATA"
+                )
+            else:
+                extra = [c for c in frame.columns if c not in self.columns]
+                if extra:
+                    raise ValueError(f"{self.table}: columns {extra} were not in the first chunk")
+                frame = frame.reindex(columns=self.columns)
+
+            cols = ", ".join(_q(c) for c in self.columns)
+            copy_sql = f"COPY {_q(self._staging)} ({cols}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')"
+            for start_i in range(0, len(frame), COPY_CHUNK_ROWS):
+                buf = io.StringIO()
+                frame.iloc[start_i : start_i + COPY_CHUNK_ROWS].to_csv(
+                    buf, index=False, header=False, na_rep=COPY_NULL
+                )
+                buf.seek(0)
+                cur.copy_expert(copy_sql, buf)
+        finally:
+            cur.close()
+        self.staged += int(len(frame))
+        self.seconds += time.perf_counter() - t0
+        return self.staged
+
+    def swap(
+        self,
+        on_conflict: str = "error",
+        conflict_cols: tuple[str, ...] | list[str] | None = None,
+        allow_empty: bool = False,
+    ) -> dict:
+        """
+        Validate the staged rows, then DELETE the scope and INSERT ... SELECT the staged rows
+        (same on_conflict rules as copy_frame) in the caller's transaction.
+
+        Returns copy_frame()'s stats plus "deleted".
+        """
+        if on_conflict not in ON_CONFLICT_MODES:
+            raise ValueError(f"on_conflict must be one of {list(ON_CONFLICT_MODES)}")
+        if on_conflict == "update" and not conflict_cols:
+            raise ValueError("on_conflict='update' needs conflict_cols")
+        if not self.staged and not allow_empty:
+            raise ValueError(f"{self.table}: the upload has no rows to replace with; existing rows kept")
+
+        t0 = time.perf_counter()
+        cur = self.db.connection().connection.cursor()
+        try:
+            if self.staged:
+                self._validate(cur)
+                part_col = PARTITIONED.get(self.table)
+                if part_col and part_col in self.columns:
+                    cur.execute(
+                        f"SELECT DISTINCT CAST(date_trunc('month', {_q(part_col)}) AS date) "
+                        f"FROM {_q(self._staging)} WHERE {_q(part_col)} IS NOT NULL"
+                    )
+                    ensure_partitions(self.db, self.table, sorted(r[0] for r in cur.fetchall()))
+
+            where = " AND ".join(f"{_q(c)} = %s" for c in self.scope)
+            params = [str(v) if isinstance(v, uuid.UUID) else v for v in self.scope.values()]
+            cur.execute(f"DELETE FROM {_q(self.table)} WHERE {where}", params)
+            deleted = int(cur.rowcount or 0)
+
+            inserted = updated = 0
+            if self.staged:
+                inserted, updated = _insert_staged(
+                    cur, self.table, self._staging, self.columns, on_conflict, conflict_cols, self.staged
+                )
+                cur.execute(f"DROP TABLE IF EXISTS {_q(self._staging)}")
+        finally:
+            cur.close()
+
+        secs = self.seconds + (time.perf_counter() - t0)
+        rows = inserted + updated
+        return {
+            "rows": rows,
+            "inserted": inserted,
+            "updated": updated,
+            "skipped": max(0, self.staged - rows),
+            "deleted": deleted,
+            "seconds": round(secs, 3),
+            "rows_per_sec": round(self.staged / secs, 1) if secs > 0 else float(self.staged),
+        }
+
+    def _validate(self, cur) -> None:
+        cur.execute(
+            "SELECT a.attname FROM pg_attribute a "
+            "WHERE a.attrelid = to_regclass(%s) AND a.attnum > 0 AND NOT a.attisdropped "
+            "AND a.attnotnull AND NOT a.atthasdef",
+            (self.table,),
+        )
+        required = [r[0] for r in cur.fetchall() if r[0] in self.columns]
+        if not required:
+            return
+        cur.execute(
+            "SELECT " + ", ".join(f"count(*) FILTER (WHERE {_q(c)} IS NULL)" for c in required)
+            + f" FROM {_q(self._staging)}"
+        )
+        nulls = {c: int(n) for c, n in zip(required, cur.fetchone()) if n}
+        if nulls:
+            raise ValueError(f"{self.table}: missing values in required columns {nulls}; existing rows kept")
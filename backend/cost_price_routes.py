@@ -15,6 +15,7 @@ from sqlalchemy import func
 
 from backend.db import SessionLocal, resolve_workspace_id
 from backend.cost_price_models import SkuCostPrice
+from backend.data_version import bump_data_version
 
 router = APIRouter(prefix="/db/recon/cost-price", tags=["cost-price"])
 
@@ -97,6 +98,8 @@ def download_cost_template(
             media_type="text/csv",
             headers={"Content-Disposition": f"attachment; filename=cost_price_template_{workspace_slug}.csv"},
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(500, f"Template download failed: {e}")
     finally:
@@ -116,7 +119,7 @@ def upload_cost_prices(
     """Upload filled cost price CSV/Excel. Expects columns: seller_sku_code, cost_price."""
     db = SessionLocal()
     try:
-        ws_id = resolve_workspace_id(db, workspace_slug)
+        ws_id = resolve_workspace_id(db, workspace_slug, create=True)
         content = file.file.read()
         if not content:
             raise HTTPException(400, "Empty file")
@@ -203,6 +206,7 @@ def upload_cost_prices(
                 db.add(obj)
                 inserted += 1
 
+        bump_data_version(db, ws_id)
         db.commit()
         return {"ok": True, "inserted": inserted + updated, "workspace_slug": workspace_slug}
 
@@ -457,8 +461,12 @@ def clear_cost_prices(
         if platform != "all":
             q = q.filter(SkuCostPrice.platform == platform)
         c = q.delete(synchronize_session=False)
+        bump_data_version(db, ws_id)
         db.commit()
         return {"ok": True, "deleted": c, "platform": platform, "workspace_slug": workspace_slug}
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(500, f"Clear failed: {e}")
@@ -467,21 +475,17 @@ def clear_cost_prices(
 
 
 # ---------------------------------------------------------------------------
-# MIGRATION: Add platform column to sku_cost_price table
+# MIGRATION: the platform column is now part of backend/migrations (v0001_baseline)
 # ---------------------------------------------------------------------------
 
 @router.post("/migrate")
 def migrate_cost_price_table():
-    """Add platform column to sku_cost_price if it doesn't exist."""
-    db = SessionLocal()
-    try:
-        from sqlalchemy import text
-        db.execute(text("ALTER TABLE sku_cost_price ADD COLUMN IF NOT EXISTS platform VARCHAR"))
-        db.execute(text("CREATE INDEX IF NOT EXISTS ix_sku_cost_price_platform ON sku_cost_price (platform)"))
-        db.commit()
-        return {"ok": True, "message": "platform column added"}
-    except Exception as e:
-        db.rollback()
-        return {"ok": False, "error": str(e)}
-    finally:
-        db.close()
\ No newline at end of file
+    """Kept for old clients: reports schema status, DDL runs via python -m backend.migrations."""
+    from backend.db import engine
+    from backend.migrations import pending
+
+    todo = pending(engine)
+    if todo:
+        names = ", ".join(f"v{m.version:04d}_{m.name}" for m in todo)
+        return {"ok": False, "error": f"pending migrations ({names}); run: python -m backend.migrations"}
+    return {"ok": True, "message": "schema is up to date"}
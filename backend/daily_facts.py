@@ -0,0 +1,280 @@
+# backend/daily_facts.py
+# daily_sku_facts: sales_raw / returns_raw rolled up per workspace x portal x day x style x SKU
+# (orders, units, GMV, all / customer / RTO return units, return amount), so range KPIs
+# scan days x SKUs instead of every order line in the window.
+#
+#   - ingest:       refresh_daily_facts() for the days the file touched, in the ingest's
+#                   transaction (replace => the whole workspace)
+#   - upload delete: upload_fact_range() before the rows go, refresh afterwards
+#   - catalog:      brand_norm is re-resolved with the facts (fact_brands.refresh_fact_brands)
+#   - migrations:   sync_daily_facts() builds every workspace once (python -m backend.migrations)
+#   - KPIs:         facts_window() = the workspace's facts in [start, end] (+ portal / brand)
+#
+# Return amount follows the dashboards' definition: the seller price of the returned order
+# line (its sales_raw row) x returned units. A sales load therefore also refreshes the return
+# days of returns linked to the loaded orders (linked_returns=True).
+#
+# Same-month return views need the sale behind each return and stay on the raw tables.
+#
+#   python -m backend.daily_facts                          # rebuild every workspace
+#   python -m backend.daily_facts --workspace-slug acme    # rebuild one workspace
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+from sqlalchemy import text
+
+from backend.data_version import bump_data_version
+from backend.models import DailySkuFact
+from backend.portals import filter_portal
+
+_BACKFILL_KEY = "daily_sku_facts_backfill"
+
+_RTYPE = "upper(btrim(coalesce(r.return_type, '')))"
+
+# sales and returns aggregated separately, stacked, then folded onto one row per group
+# (UNION ALL + GROUP BY rather than a FULL JOIN: the keys are nullable)
+_REFRESH_SQL = f"""
+WITH s AS (
+    SELECT CAST(order_date AS date) AS day, portal, style_key, seller_sku_code,
+           max(brand_norm) AS brand_norm,
+           count(*) AS orders,
+           sum(units) AS units,
+           sum(coalesce(gmv, 0)) AS gmv,
+           max(order_date) AS last_order_date,
+           0 AS returns_units,
+           0 AS customer_return_units,
+           0 AS return_units,
+           0 AS rto_units,
+           0 AS null_unit_returns,
+           CAST(0 AS double precision) AS return_amount
+    FROM sales_raw
+    WHERE workspace_id = CAST(:ws AS uuid)
+      AND order_date IS NOT NULL
+      {{sales_scope}}
+    GROUP BY 1, 2, 3, 4
+),
+r AS (
+    SELECT CAST(r.return_date AS date) AS day, r.portal, r.style_key, r.seller_sku_code,
+           max(r.brand_norm) AS brand_norm,
+           0 AS orders,
+           0 AS units,
+           CAST(0 AS double precision) AS gmv,
+           CAST(NULL AS timestamp) AS last_order_date,
+           sum(coalesce(r.units, 1)) AS returns_units,
+           sum(CASE WHEN {_RTYPE} IN ('RETURN', 'CUSTOMER_RETURN') THEN coalesce(r.units, 1) ELSE 0 END) AS customer_return_units,
+           sum(CASE WHEN {_RTYPE} = 'RETURN' THEN coalesce(r.units, 1) ELSE 0 END) AS return_units,
+           sum(CASE WHEN {_RTYPE} = 'RTO' THEN coalesce(r.units, 1) ELSE 0 END) AS rto_units,
+           count(*) FILTER (WHERE r.units IS NULL) AS null_unit_returns,
+           sum(coalesce(s.seller_price, 0) * coalesce(r.units, 1)) AS return_amount
+    FROM returns_raw r
+    LEFT JOIN sales_raw s
+      ON s.workspace_id = r.workspace_id AND s.order_line_id = r.order_line_id
+    WHERE r.workspace_id = CAST(:ws AS uuid)
+      AND r.return_date IS NOT NULL
+      {{returns_scope}}
+    GROUP BY 1, 2, 3, 4
+)
+INSERT INTO daily_sku_facts
+    (workspace_id, portal, day, style_key, seller_sku_code, brand_norm,
+     orders, units, gmv, last_order_date,
+     returns_units, customer_return_units, return_units, rto_units, null_unit_returns, return_amount, updated_at)
+SELECT CAST(:ws AS uuid), u.portal, u.day, u.style_key, u.seller_sku_code, max(u.brand_norm),
+       sum(u.orders), sum(u.units), sum(u.gmv), max(u.last_order_date),
+       sum(u.returns_units), sum(u.customer_return_units), sum(u.return_units), sum(u.rto_units),
+       sum(u.null_unit_returns), sum(u.return_amount),
+       now()
+FROM (SELECT * FROM s UNION ALL SELECT * FROM r) u
+GROUP BY u.portal, u.day, u.style_key, u.seller_sku_code
+"""
+
+# return days of the returns whose order line was sold in [lo, hi)
+_LINKED_RETURNS_SQL = """
+SELECT CAST(min(r.return_date) AS date), CAST(max(r.return_date) AS date)
+FROM sales_raw s
+JOIN returns_raw r ON r.workspace_id = s.workspace_id AND r.order_line_id = s.order_line_id
+WHERE s.workspace_id = CAST(:ws AS uuid)
+  AND s.order_date >= :lo AND s.order_date < :hi
+  {upload_scope}
+"""
+
+
+def _as_day(v) -> date | None:
+    """date of a date / datetime / Timestamp / ISO string (None / NaT => None)."""
+    if v is None:
+        return None
+    ts = pd.to_datetime(v, errors="coerce")
+    return None if pd.isna(ts) else ts.date()
+
+
+def _widen(lo: date | None, hi: date | None, row) -> tuple[date | None, date | None]:
+    r_lo, r_hi = row
+    if r_lo is not None:
+        lo = r_lo if lo is None else min(lo, r_lo)
+    if r_hi is not None:
+        hi = r_hi if hi is None else max(hi, r_hi)
+    return lo, hi
+
+
+def refresh_daily_facts(
+    db,
+    ws_id,
+    date_min=None,
+    date_max=None,
+    full_refresh: bool = False,
+    linked_returns: bool = False,
+) -> dict:
+    """
+    Rebuild the workspace's facts for the days date_min..date_max (inclusive; any date-like),
+    or all of them (full_refresh). linked_returns: the load changed sales, so the return days
+    of their returns are rebuilt too (return amount). Runs in the caller's transaction;
+    the caller commits; two refreshes of one workspace run one after the other (the lock is
+    held until then), so overlapping ranges are never inserted twice.
+    """
+    params: dict = {"ws": str(ws_id)}
+    lo, hi = _as_day(date_min), _as_day(date_max)
+
+    if not full_refresh:
+        if lo is None and hi is None:
+            return {"from": None, "to": None, "deleted": 0, "inserted": 0}
+        lo, hi = lo or hi, hi or lo
+        if linked_returns:
+            row = db.execute(
+                text(_LINKED_RETURNS_SQL.format(upload_scope="")),
+                {**params, "lo": lo, "hi": hi + timedelta(days=1)},
+            ).one()
+            lo, hi = _widen(lo, hi, row)
+        params["lo"], params["hi"] = lo, hi + timedelta(days=1)
+
+    db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:n))"), {"n": f"daily_sku_facts:{ws_id}"})
+    deleted = db.execute(
+        text(
+            "DELETE FROM daily_sku_facts WHERE workspace_id = CAST(:ws AS uuid)"
+            + ("" if full_refresh else " AND day >= :lo AND day < :hi")
+        ),
+        params,
+    ).rowcount
+    inserted = db.execute(
+        text(
+            _REFRESH_SQL.format(
+                sales_scope="" if full_refresh else "AND order_date >= :lo AND order_date < :hi",
+                returns_scope="" if full_refresh else "AND r.return_date >= :lo AND r.return_date < :hi",
+            )
+        ),
+        params,
+    ).rowcount
+    return {
+        "from": None if full_refresh else str(lo),
+        "to": None if full_refresh else str(hi),
+        "deleted": int(deleted or 0),
+        "inserted": int(inserted or 0),
+    }
+
+
+def upload_fact_range(db, upload_id) -> tuple[date | None, date | None]:
+    """
+    Days whose facts change when the upload's rows are deleted: its sales / return days and
+    the return days of returns linked to its sales. Call before deleting the rows.
+    """
+    params = {"u": str(upload_id)}
+    sales = db.execute(
+        text("SELECT CAST(min(order_date) AS date), CAST(max(order_date) AS date) FROM sales_raw WHERE upload_id = :u"),
+        params,
+    ).one()
+    returns = db.execute(
+        text("SELECT CAST(min(return_date) AS date), CAST(max(return_date) AS date) FROM returns_raw WHERE upload_id = :u"),
+        params,
+    ).one()
+
+    lo, hi = _widen(None, None, sales)
+    lo, hi = _widen(lo, hi, returns)
+    if sales[0] is not None:
+        ws_id = db.execute(text("SELECT workspace_id FROM uploads WHERE id = :u"), params).scalar()
+        linked = db.execute(
+            text(_LINKED_RETURNS_SQL.format(upload_scope="AND s.upload_id = CAST(:u AS uuid)")),
+            {**params, "ws": str(ws_id), "lo": sales[0], "hi": sales[1] + timedelta(days=1)},
+        ).one()
+        lo, hi = _widen(lo, hi, linked)
+    return lo, hi
+
+
+# -----------------------------------------------------------------------------
+# KPI reads
+# -----------------------------------------------------------------------------
+def facts_window(db, ws_id, start: date, end: date, *columns, portal: str | None = None, brand_norm=None):
+    """
+    db.query(*columns) over the workspace's facts with start <= day <= end; callers add
+    their group_by. portal: 'myntra' / 'flipkart' filter (anything else: all portals).
+    brand_norm: one value or a list of values.
+    """
+    q = db.query(*columns).filter(
+        DailySkuFact.workspace_id == ws_id,
+        DailySkuFact.day >= start,
+        DailySkuFact.day <= end,
+    )
+    q = filter_portal(q, DailySkuFact.portal, portal)
+    if isinstance(brand_norm, (list, tuple, set)):
+        q = q.filter(DailySkuFact.brand_norm.in_(list(brand_norm)))
+    elif brand_norm is not None:
+        q = q.filter(DailySkuFact.brand_norm == brand_norm)
+    return q
+
+
+# -----------------------------------------------------------------------------
+# Backfill
+# -----------------------------------------------------------------------------
+def sync_daily_facts(engine, force: bool = False) -> dict | None:
+    """Build the facts of every workspace once (tracked in app_meta); one transaction each."""
+    with engine.connect() as conn:
+        done = conn.execute(text("SELECT value FROM app_meta WHERE key = :k"), {"k": _BACKFILL_KEY}).scalar()
+        if done and not force:
+            return None
+        ws_ids = conn.execute(text("SELECT id FROM workspaces")).scalars().all()
+
+    t0 = time.perf_counter()
+    rows = 0
+    for ws_id in ws_ids:
+        with engine.begin() as conn:
+            rows += refresh_daily_facts(conn, ws_id, full_refresh=True)["inserted"]
+            bump_data_version(conn, ws_id)
+
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO app_meta (key, value, updated_at) VALUES (:k, 'done', now()) "
+                "ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value, updated_at = now()"
+            ),
+            {"k": _BACKFILL_KEY},
+        )
+    return {"workspaces": len(ws_ids), "rows": rows, "seconds": round(time.perf_counter() - t0, 3)}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Rebuild daily_sku_facts from sales_raw / returns_raw")
+    ap.add_argument("--workspace-slug", default=None)
+    args = ap.parse_args()
+
+    from backend.db import SessionLocal, engine, resolve_workspace_id
+
+    if args.workspace_slug is None:
+        print(json.dumps(sync_daily_facts(engine, force=True)), flush=True)
+        return
+
+    db = SessionLocal()
+    try:
+        ws_id = resolve_workspace_id(db, args.workspace_slug)
+        out = refresh_daily_facts(db, ws_id, full_refresh=True)
+        bump_data_version(db, ws_id)
+        db.commit()
+        print(json.dumps(out), flush=True)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
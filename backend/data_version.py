@@ -0,0 +1,225 @@
+# backend/data_version.py
+# Per-workspace data version + the KPI response cache keyed on it.
+#
+# workspaces.data_version goes up by one whenever the workspace's data changes (ingests,
+# clears, upload deletes, cost-price uploads). A cached response is keyed on
+# (endpoint, normalized params, workspace id, data_version): after a bump every older entry
+# is unreachable and the LRU end of the cache reclaims it. The version lives in Postgres, so
+# loads done by the ingest worker process invalidate the API's cache too.
+#
+# The same versions drive the ETags of GET /db/* (etag_for): a revisit with a matching
+# If-None-Match gets a 304 after one indexed lookup, without touching the fact tables.
+#
+#   KPI_CACHE_MAX_ENTRIES   responses kept per API process (default 512, 0 = cache off)
+#   APP_BUILD_ID            salt of the ETags (default: this file's mtime, i.e. the deploy)
+#   GET /db/cache/stats     hits / misses / evictions / size
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime
+
+from sqlalchemy import text
+
+from backend.db import engine
+
+KPI_CACHE_MAX_ENTRIES = int(os.getenv("KPI_CACHE_MAX_ENTRIES", "512"))
+
+
+# app_meta key of the house-wide version (+1 with every workspace bump): cross-workspace views
+GLOBAL_VERSION_KEY = "data_version"
+
+
+# -----------------------------------------------------------------------------
+# Versions
+# -----------------------------------------------------------------------------
+def bump_data_version(db, ws_id) -> None:
+    """
+    +1 on the workspace's data version (ws_id None: every workspace) and on the house-wide
+    version, in the caller's transaction: call it right before the commit of the data change
+    (the house-wide row stays locked until then).
+    """
+    if ws_id is None:
+        db.execute(text("UPDATE workspaces SET data_version = data_version + 1"))
+    else:
+        db.execute(
+            text("UPDATE workspaces SET data_version = data_version + 1 WHERE id = :ws"),
+            {"ws": str(ws_id)},
+        )
+    db.execute(
+        text(
+            "INSERT INTO app_meta (key, value, updated_at) VALUES (:k, '1', now()) "
+            "ON CONFLICT (key) DO UPDATE SET value = CAST(CAST(app_meta.value AS BIGINT) + 1 AS TEXT), updated_at = now()"
+        ),
+        {"k": GLOBAL_VERSION_KEY},
+    )
+
+
+def bump_data_version_now(ws_id) -> None:
+    """bump_data_version() in its own transaction (after an ingest that commits in steps)."""
+    with engine.begin() as conn:
+        bump_data_version(conn, ws_id)
+
+
+def workspace_version(slug_or_id: str | None) -> tuple[uuid.UUID, int] | None:
+    """(workspace id, data_version) for a slug or UUID string; None if it does not exist."""
+    s = (slug_or_id or "default").strip()
+    try:
+        sql, params = "SELECT id, data_version FROM workspaces WHERE id = :v", {"v": str(uuid.UUID(s))}
+    except ValueError:
+        sql, params = "SELECT id, data_version FROM workspaces WHERE slug = :v", {"v": s.lower()}
+    with engine.connect() as conn:
+        row = conn.execute(text(sql), params).first()
+    return (row[0], int(row[1])) if row else None
+
+
+def global_version() -> int:
+    with engine.connect() as conn:
+        v = conn.execute(text("SELECT value FROM app_meta WHERE key = :k"), {"k": GLOBAL_VERSION_KEY}).scalar()
+    return int(v or 0)
+
+
+# -----------------------------------------------------------------------------
+# ETags
+# -----------------------------------------------------------------------------
+# GET /db/* responses that are not derived from the data versions (job / upload progress,
+# cache counters, the workspace list): no ETag
+ETAG_SKIP_PREFIXES = ("/db/jobs", "/db/uploads", "/db/cache", "/db/workspaces")
+
+# a deploy can change any response: new code => new tags (same value in every worker)
+_ETAG_SALT = os.getenv("APP_BUILD_ID") or str(int(os.path.getmtime(__file__)))
+
+
+def etag_for(path: str, query: list[tuple[str, str]]) -> str | None:
+    """
+    Strong ETag of a GET /db/* response: path + sorted params + the data version it reads
+    (the workspace's for workspace_slug / workspace, else house-wide) + today's date
+    (relative windows like "last 30 days" move at midnight). None => do not tag.
+    """
+    if not path.startswith("/db/") or path.startswith(ETAG_SKIP_PREFIXES):
+        return None
+    params = sorted((k, v.strip()) for k, v in query)
+    ws = next((v for k, v in params if k == "workspace_slug" and v), None) or next(
+        (v for k, v in params if k == "workspace" and v), None
+    )
+    if ws is not None:
+        found = workspace_version(ws)
+        if found is None:
+            return None
+        version = f"{found[0]}:{found[1]}"
+    else:
+        version = f"house:{global_version()}"
+    raw = json.dumps([_ETAG_SALT, date.today().isoformat(), path, params, version])
+    return '"' + hashlib.sha1(raw.encode("utf-8")).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str | None, tag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return tag in {t.strip() for t in if_none_match.split(",")}
+
+
+# -----------------------------------------------------------------------------
+# Response cache
+# -----------------------------------------------------------------------------
+class ResponseCache:
+    """Size-bounded LRU of JSON responses with hit / miss / eviction counters (thread-safe)."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max(0, int(max_entries))
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return True, self._data[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value) -> None:
+        if not self.max_entries:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+KPI_CACHE = ResponseCache(KPI_CACHE_MAX_ENTRIES)
+
+# params that only pick the workspace (the key carries its id instead)
+_WORKSPACE_PARAMS = ("workspace_slug", "workspace")
+
+
+def _norm_param(v):
+    if isinstance(v, str):
+        return v.strip() or None
+    if isinstance(v, (date, datetime)):
+        return v.isoformat()
+    if isinstance(v, (list, tuple, set)):
+        return tuple(_norm_param(x) for x in v)
+    return v
+
+
+def cached_by_data_version(endpoint: str):
+    """
+    Decorator for a GET endpoint whose response depends only on its query params and the
+    data of one workspace (workspace_slug, falling back to the legacy `workspace` param).
+    Put it under @app.get(...); errors and non-JSON responses are never cached.
+    """
+
+    def wrap(fn):
+        @functools.wraps(fn)
+        def run(**kwargs):
+            if not KPI_CACHE.max_entries:
+                return fn(**kwargs)
+            ws = _norm_param(kwargs.get("workspace_slug")) or _norm_param(kwargs.get("workspace")) or "default"
+            found = workspace_version(ws)
+            if found is None:
+                return fn(**kwargs)
+
+            params = tuple(sorted((k, _norm_param(v)) for k, v in kwargs.items() if k not in _WORKSPACE_PARAMS))
+            key = (endpoint, found[0], found[1], params)
+            hit, value = KPI_CACHE.get(key)
+            if hit:
+                return value
+            value = fn(**kwargs)
+            if isinstance(value, (dict, list)):
+                KPI_CACHE.put(key, value)
+            return value
+
+        return run
+
+    return wrap
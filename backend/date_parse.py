@@ -0,0 +1,224 @@
+# backend/date_parse.py
+# Column date parsing for the ingestors:
+#   - infer ONE format per column from a sample of distinct values
+#   - cache it per (report type, header), so later chunks / uploads skip inference
+#   - parse the whole column with a single pd.to_datetime(format=...) call
+#   - cells that still don't parse are collected in a DateErrors report (not silently None)
+
+from __future__ import annotations
+
+import re
+import threading
+from datetime import date, datetime
+
+import pandas as pd
+
+# tried in order; on equal hit rates the earlier one wins (day-first before month-first,
+# like the dayfirst=True parsing this replaces)
+DATE_FORMATS = (
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S.%f",
+    "%Y-%m-%d %H:%M",
+    "%Y/%m/%d",
+    "%Y/%m/%d %H:%M:%S",
+    "%d-%m-%Y",
+    "%d/%m/%Y",
+    "%d-%m-%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M:%S",
+    "%d-%m-%Y %H:%M",
+    "%d/%m/%Y %H:%M",
+    "%d-%b-%Y",
+    "%d %b %Y",
+    "%d-%b-%y",
+    "%b %d, %Y",
+    "%m/%d/%Y",
+    "%m/%d/%Y %H:%M:%S",
+)
+
+# distinct values looked at when inferring a format
+DATE_SAMPLE_SIZE = 200
+
+# share of the sample a format must parse to be used for the column
+DATE_MIN_HIT_RATE = 0.8
+
+# "...T10:00:00+05:30" / "...Z": the wall-clock time is kept, the offset dropped
+_TZ_SUFFIX = re.compile(r"(?<=\d)(?:Z|[+-]\d{2}:\d{2})$")
+
+_BLANKS = ("", "nan", "NaN", "NaT", "None", "null", "NULL")
+
+# (report_type, header) -> format
+_FORMAT_CACHE: dict[tuple[str, str], str] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def _cache_key(report_type: str, header: str) -> tuple[str, str]:
+    return (str(report_type or "").strip().lower(), str(header or "").strip().lower())
+
+
+def cached_date_format(report_type: str, header: str) -> str | None:
+    with _CACHE_LOCK:
+        return _FORMAT_CACHE.get(_cache_key(report_type, header))
+
+
+def forget_date_format(report_type: str, header: str) -> None:
+    with _CACHE_LOCK:
+        _FORMAT_CACHE.pop(_cache_key(report_type, header), None)
+
+
+def date_format_cache() -> dict[str, str]:
+    """Current cache as {"report_type/header": format}."""
+    with _CACHE_LOCK:
+        return {f"{r}/{h}": fmt for (r, h), fmt in _FORMAT_CACHE.items()}
+
+
+class DateErrors:
+    """Unparseable date cells, per column: count + a few samples (row = frame index)."""
+
+    MAX_SAMPLES = 20
+
+    def __init__(self):
+        self.columns: dict[str, dict] = {}
+
+    def add(self, column: str, fmt: str | None, bad: pd.Series) -> None:
+        if len(bad) == 0:
+            return
+        entry = self.columns.setdefault(str(column), {"format": fmt, "unparsed": 0, "samples": []})
+        entry["format"] = fmt
+        entry["unparsed"] += int(len(bad))
+        room = self.MAX_SAMPLES - len(entry["samples"])
+        if room > 0:
+            entry["samples"].extend(
+                {"row": int(i) if pd.api.types.is_integer(i) else str(i), "value": str(v)}
+                for i, v in bad.head(room).items()
+            )
+
+    @property
+    def total(self) -> int:
+        return sum(e["unparsed"] for e in self.columns.values())
+
+    def __bool__(self) -> bool:
+        return bool(self.columns)
+
+    def to_dict(self) -> dict:
+        return {"unparsed": self.total, "columns": self.columns}
+
+
+def infer_date_format(values: pd.Series) -> str | None:
+    """Best DATE_FORMATS entry for a (cleaned, non-blank) string column, or None."""
+    sample = pd.Series(values.drop_duplicates().head(DATE_SAMPLE_SIZE).to_numpy(), dtype=object)
+    if sample.empty:
+        return None
+
+    best, best_hits = None, 0
+    for fmt in DATE_FORMATS:
+        hits = int(pd.to_datetime(sample, format=fmt, errors="coerce").notna().sum())
+        if hits > best_hits:
+            best, best_hits = fmt, hits
+            if hits == len(sample):
+                break
+    if best is None or best_hits < DATE_MIN_HIT_RATE * len(sample):
+        return None
+    return best
+
+
+_ISO_PREFIX = re.compile(r"^\s*\d{4}-")
+
+
+def _parse_loose(values: pd.Series) -> pd.Series:
+    """
+    Values no single format covered: each distinct value parsed once the old way
+    (dayfirst, then the first 10 chars). ISO values (yyyy-...) are never dayfirst:
+    pandas would read 2024-01-05 as 1 May.
+    """
+    uniq = pd.Series(values.unique(), dtype=object)
+
+    def _one(v: str):
+        dayfirst = _ISO_PREFIX.match(v) is None
+        dt = pd.to_datetime(v, errors="coerce", dayfirst=dayfirst)
+        if pd.isna(dt):
+            dt = pd.to_datetime(v[:10], errors="coerce", dayfirst=dayfirst)
+        if pd.isna(dt):
+            return pd.NaT
+        return dt.tz_localize(None) if getattr(dt, "tzinfo", None) is not None else dt
+
+    lookup = dict(zip(uniq, uniq.map(_one)))
+    return pd.to_datetime(values.map(lookup), errors="coerce")
+
+
+def parse_date_column(
+    s: pd.Series,
+    report_type: str,
+    header: str | None = None,
+    errors: DateErrors | None = None,
+) -> pd.Series:
+    """
+    Parse a date column -> naive datetime64 Series (NaT for blanks and bad cells).
+
+    report_type + header key the format cache (header defaults to s.name).
+    Cells that are not blank but can't be parsed are added to `errors`.
+    """
+    header = str(header if header is not None else s.name)
+
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s.dt.tz_localize(None) if getattr(s.dt, "tz", None) is not None else s
+
+    out = pd.Series(pd.NaT, index=s.index, dtype="datetime64[ns]")
+    if len(s) == 0:
+        return out
+
+    # Excel cells already come as datetime / date objects
+    kind = pd.api.types.infer_dtype(s, skipna=True)
+    if kind in ("datetime", "date", "datetime64"):
+        return pd.to_datetime(s, errors="coerce")
+    if kind not in ("string", "empty"):
+        is_dt = s.map(lambda v: isinstance(v, (datetime, date)))
+        if is_dt.any():
+            out.loc[is_dt] = pd.to_datetime(s[is_dt], errors="coerce")
+            s = s[~is_dt]
+
+    txt = s.where(s.notna(), "").astype(str).str.strip()
+    txt = txt[~txt.isin(_BLANKS)]
+    if txt.empty:
+        return out
+    if txt.str.contains(r"[Z+-]\d{2}:\d{2}$|Z$", regex=True).any():
+        txt = txt.str.replace(_TZ_SUFFIX, "", regex=True)
+
+    fmt = cached_date_format(report_type, header)
+    if fmt is None:
+        fmt = infer_date_format(txt)
+        if fmt is not None:
+            with _CACHE_LOCK:
+                _FORMAT_CACHE[_cache_key(report_type, header)] = fmt
+
+    parsed = (
+        pd.to_datetime(txt, format=fmt, errors="coerce")
+        if fmt is not None
+        else pd.Series(pd.NaT, index=txt.index, dtype="datetime64[ns]")
+    )
+    left = parsed.isna()
+    if left.any():
+        # the cached format stopped fitting this report (export layout changed): infer again next time
+        if fmt is not None and left.sum() > (1 - DATE_MIN_HIT_RATE) * len(txt):
+            forget_date_format(report_type, header)
+        parsed[left] = _parse_loose(txt[left])
+        left = parsed.isna()
+
+    out.loc[parsed.index] = parsed
+    if errors is not None and left.any():
+        errors.add(header, fmt, s.loc[left[left].index])
+    return out
+
+
+def parse_date_value(v) -> datetime | None:
+    """Single value (forms, one-off cells); column data should use parse_date_column."""
+    if v is None:
+        return None
+    if isinstance(v, datetime):
+        return v.replace(tzinfo=None) if v.tzinfo else v
+    if isinstance(v, date):
+        return datetime(v.year, v.month, v.day)
+    dt = parse_date_column(pd.Series([v], dtype=object), "_scalar", "_value").iloc[0]
+    return None if pd.isna(dt) else dt.to_pydatetime()
@@ -1,9 +1,17 @@
 # backend/db.py
 
+import json
 import os
+import threading
+import time
 import uuid
+from collections import OrderedDict
+
+from fastapi import HTTPException
 from sqlalchemy import create_engine, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import sessionmaker, declarative_base, Session
+from sqlalchemy.types import TypeDecorator
 
 # IMPORTANT:
 # In docker-compose, backend container should use host "db"
@@ -20,44 +28,119 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+class RawJSON(TypeDecorator):
+    """
+    raw_json columns of the *_raw tables: JSONB in Postgres (migration v0007_raw_json).
+    Accepts the JSON text ingest code already has; reads return the parsed value (dict).
+    Tables not migrated yet still hand back TEXT: use parse_raw_json() on reads.
+    """
+
+    impl = JSONB
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if isinstance(value, (str, bytes)):
+            return json.loads(value)
+        return value
+
+
 def db_ping() -> int:
     """Quick connectivity test."""
     with engine.connect() as conn:
         return conn.execute(text("SELECT 1")).scalar_one()
 
 
-# Workspace helpers (UUID DB)
+# -----------------------------------------------------------------------------
+# Workspace resolution (slug -> UUID)
+#  - one resolver for every router; slug -> id lookups are cached per process
+#    (TTL + LRU): most requests never reach the workspaces table
+#  - read-only by default: an unknown slug is a 404, not a new workspace.
+#    Only ingest / upload paths pass create=True; "default" is created once at API startup
+#  - db_create_workspace / db_delete_workspace call invalidate_workspace_cache(); the TTL
+#    covers changes made by another process
+# -----------------------------------------------------------------------------
+WORKSPACE_CACHE_TTL_SECONDS = float(os.getenv("WORKSPACE_CACHE_TTL_SECONDS", "300"))
+WORKSPACE_CACHE_MAX = 1024
+
+_ws_cache: "OrderedDict[str, tuple[uuid.UUID, float]]" = OrderedDict()
+_ws_cache_lock = threading.Lock()
+
+
+def _cache_get(slug: str):
+    with _ws_cache_lock:
+        hit = _ws_cache.get(slug)
+        if hit is None:
+            return None
+        if hit[1] < time.monotonic():
+            del _ws_cache[slug]
+            return None
+        _ws_cache.move_to_end(slug)
+        return hit[0]
+
+
+def _cache_put(slug: str, ws_id) -> None:
+    with _ws_cache_lock:
+        _ws_cache[slug] = (ws_id, time.monotonic() + WORKSPACE_CACHE_TTL_SECONDS)
+        _ws_cache.move_to_end(slug)
+        while len(_ws_cache) > WORKSPACE_CACHE_MAX:
+            _ws_cache.popitem(last=False)
+
+
+def invalidate_workspace_cache(slug: str | None = None) -> None:
+    """Forget one slug (or all of them) after a workspace is created / deleted."""
+    with _ws_cache_lock:
+        if slug is None:
+            _ws_cache.clear()
+        else:
+            _ws_cache.pop(slug.strip().lower(), None)
+
+
 def ensure_workspace(db: Session, slug: str = "default"):
+    """Returns the workspace's UUID, creating (and committing) it if it does not exist."""
+    s = (slug or "default").strip().lower()
+    db.execute(
+        text(
+            "INSERT INTO workspaces (id, slug, name, created_at) "
+            "VALUES (gen_random_uuid(), :slug, :name, now()) ON CONFLICT (slug) DO NOTHING"
+        ),
+        {"slug": s, "name": ("Default Workspace" if s == "default" else s.title())},
+    )
+    db.commit()
+    ws_id = db.execute(text("SELECT id FROM workspaces WHERE slug = :slug"), {"slug": s}).scalar_one()
+    _cache_put(s, ws_id)
+    return ws_id  # uuid.UUID
+
+
+def lookup_workspace_id(db: Session, slug_or_id: str | None):
     """
-    Ensures workspace exists. Returns UUID (as uuid.UUID object if models use UUID(as_uuid=True)).
+    Read-only: None / "" -> default workspace, UUID string -> that UUID, slug -> its id.
+    Returns None for an unknown slug.
     """
-    # local import to avoid circular imports at import time
-    from backend.models import Workspace
+    s = (str(slug_or_id).strip() if slug_or_id else "") or "default"
+    try:
+        return uuid.UUID(s)
+    except ValueError:
+        pass
 
-    s = (slug or "default").strip().lower()
-    ws = db.query(Workspace).filter(Workspace.slug == s).first()
-    if not ws:
-        ws = Workspace(slug=s, name=("Default Workspace" if s == "default" else s.title()))
-        db.add(ws)
-        db.commit()
-        db.refresh(ws)
-    return ws.id  # uuid.UUID
+    slug = s.lower()
+    ws_id = _cache_get(slug)
+    if ws_id is None:
+        ws_id = db.execute(text("SELECT id FROM workspaces WHERE slug = :slug"), {"slug": slug}).scalar()
+        if ws_id is not None:
+            _cache_put(slug, ws_id)
+    return ws_id
 
 
-def resolve_workspace_id(db: Session, slug_or_id: str | None):
+def resolve_workspace_id(db: Session, slug_or_id: str | None, create: bool = False):
     """
-    Accepts:
-      - None -> default workspace id
-      - UUID string -> that UUID (uuid.UUID)
-      - slug -> ensure & return workspace id
+    lookup_workspace_id(), but an unknown slug raises 404, or with create=True (ingest paths)
+    is created. Never writes otherwise: the "default" workspace is created at API startup.
     """
-    if not slug_or_id:
-        return ensure_workspace(db, "default")
+    ws_id = lookup_workspace_id(db, slug_or_id)
+    if ws_id is not None:
+        return ws_id
 
-    s = str(slug_or_id).strip()
-
-    # if already UUID -> return uuid.UUID
-    try:
-        return uuid.UUID(s)
-    except Exception:
-        return ensure_workspace(db, s)
+    slug = str(slug_or_id or "default").strip().lower() or "default"
+    if create:
+        return ensure_workspace(db, slug)
+    raise HTTPException(status_code=404, detail=f"Workspace not found: {slug}")
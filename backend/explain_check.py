@@ -0,0 +1,252 @@
+# backend/explain_check.py
+# EXPLAIN regression check for the hot key lookups: fails (exit 1) when one of them can only
+# be answered with a sequential scan, or stops using the index it is there for, e.g. after
+# a query builder starts wrapping a key in a new expression that no index in
+# backend/key_indexes.py (or the models) matches. Every KEY_INDEXES entry needs a query.
+#
+#   python -m backend.explain_check
+#   python -m backend.explain_check --verbose      # print the plans
+#
+# Runs with enable_seqscan = off: on a small / empty database the planner would pick seq
+# scans anyway, so the check is "an index path exists", not "the planner prefers it today".
+# No data needed.
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from backend.daily_facts import facts_window
+from backend.db import engine
+from backend.key_indexes import KEY_INDEXES, norm_key
+from backend.models import CatalogRaw, DailySkuFact, FlipkartTrafficRaw, ReturnsRaw, SalesRaw, SkuMonthly, StockRaw, StyleMonthly
+from backend.partitions import PARTITIONED, default_partition
+from backend.portals import filter_portal
+
+
+class _Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, stmt):
+        self.statement = stmt
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def hot_queries(db, ws_id) -> dict:
+    """
+    name -> (table that must not be seq-scanned, indexes (one of them must be used), select).
+    Built with the endpoints' own helpers (norm_key, filter_portal, facts_window), so a
+    change to those is what gets checked.
+    """
+    start = datetime(2025, 1, 1)
+    end = start + timedelta(days=365)
+
+    return {
+        "sales_by_style": (
+            "sales_raw",
+            ("ix_sales_raw_ws_style_norm",),
+            select(func.count()).where(SalesRaw.workspace_id == ws_id, norm_key(SalesRaw.style_key) == "x"),
+        ),
+        "sales_by_sku": (
+            "sales_raw",
+            ("ix_sales_raw_ws_sku_norm",),
+            select(func.count()).where(SalesRaw.workspace_id == ws_id, norm_key(SalesRaw.seller_sku_code) == "x"),
+        ),
+        "sales_by_brand_window": (
+            "sales_raw",
+            ("ix_sales_raw_ws_brand_date",),
+            select(func.count()).where(
+                SalesRaw.workspace_id == ws_id,
+                SalesRaw.brand_norm == "x",
+                SalesRaw.order_date >= start,
+                SalesRaw.order_date < end,
+            ),
+        ),
+        "sales_myntra_window": (
+            "sales_raw",
+            ("ix_sales_raw_myntra_ws_date", "ix_sales_raw_ws_order_date"),
+            filter_portal(
+                select(func.count()).where(
+                    SalesRaw.workspace_id == ws_id, SalesRaw.order_date >= start, SalesRaw.order_date < end
+                ),
+                SalesRaw.portal,
+                "myntra",
+            ),
+        ),
+        "returns_flipkart_window": (
+            "returns_raw",
+            ("ix_returns_raw_flipkart_ws_date", "ix_returns_raw_ws_return_date"),
+            filter_portal(
+                select(func.count()).where(
+                    ReturnsRaw.workspace_id == ws_id, ReturnsRaw.return_date >= start, ReturnsRaw.return_date < end
+                ),
+                ReturnsRaw.portal,
+                "flipkart",
+            ),
+        ),
+        "returns_by_style": (
+            "returns_raw",
+            ("ix_returns_raw_ws_style_norm",),
+            select(func.count()).where(ReturnsRaw.workspace_id == ws_id, norm_key(ReturnsRaw.style_key) == "x"),
+        ),
+        "returns_by_sku": (
+            "returns_raw",
+            ("ix_returns_raw_ws_sku_norm",),
+            select(func.count()).where(ReturnsRaw.workspace_id == ws_id, norm_key(ReturnsRaw.seller_sku_code) == "x"),
+        ),
+        "returns_reason_heatmap": (
+            "returns_raw",
+            ("ix_returns_raw_ws_date_bucket", "ix_returns_raw_ws_return_date"),
+            select(ReturnsRaw.reason_bucket, func.sum(ReturnsRaw.units))
+            .where(ReturnsRaw.workspace_id == ws_id, ReturnsRaw.return_date >= start, ReturnsRaw.return_date < end)
+            .group_by(ReturnsRaw.reason_bucket),
+        ),
+        "catalog_styles_of_brand": (
+            "catalog_raw",
+            ("ix_catalog_raw_ws_brand_norm",),
+            select(norm_key(CatalogRaw.style_key)).where(CatalogRaw.workspace_id == ws_id, norm_key(CatalogRaw.brand) == "x"),
+        ),
+        "catalog_by_style": (
+            "catalog_raw",
+            ("ix_catalog_raw_ws_style_norm",),
+            select(CatalogRaw.brand).where(CatalogRaw.workspace_id == ws_id, norm_key(CatalogRaw.style_key) == "x"),
+        ),
+        "catalog_by_sku": (
+            "catalog_raw",
+            ("ix_catalog_raw_ws_sku_norm",),
+            select(CatalogRaw.brand).where(CatalogRaw.workspace_id == ws_id, norm_key(CatalogRaw.seller_sku_code) == "x"),
+        ),
+        "style_monthly_by_style": (
+            "style_monthly",
+            ("ix_style_monthly_ws_style_norm",),
+            select(StyleMonthly.orders).where(StyleMonthly.workspace_id == ws_id, norm_key(StyleMonthly.style_key) == "x"),
+        ),
+        "daily_facts_window": (
+            "daily_sku_facts",
+            ("ix_daily_sku_facts_ws_day", "uq_daily_sku_facts_ws_day_sku"),
+            facts_window(db, ws_id, start.date(), end.date(), func.sum(DailySkuFact.units)).statement,
+        ),
+        "daily_facts_brand_window": (
+            "daily_sku_facts",
+            ("ix_daily_sku_facts_ws_brand_day",),
+            facts_window(db, ws_id, start.date(), end.date(), func.sum(DailySkuFact.gmv), brand_norm="x").statement,
+        ),
+        "sku_monthly_month": (
+            "sku_monthly",
+            ("ix_sku_monthly_ws_month", "uq_sku_monthly_ws_month_sku"),
+            select(func.sum(SkuMonthly.orders)).where(
+                SkuMonthly.workspace_id == ws_id, SkuMonthly.month_start == start.date()
+            ),
+        ),
+        "stock_by_sku": (
+            "stock_raw",
+            ("ix_stock_raw_ws_sku_norm",),
+            select(StockRaw.qty).where(StockRaw.workspace_id == ws_id, norm_key(StockRaw.seller_sku_code) == "x"),
+        ),
+        "traffic_by_sku": (
+            "flipkart_traffic_raw",
+            ("ix_flipkart_traffic_raw_ws_sku_norm",),
+            select(FlipkartTrafficRaw.sales_qty).where(
+                FlipkartTrafficRaw.workspace_id == ws_id, norm_key(FlipkartTrafficRaw.seller_sku_code) == "x"
+            ),
+        ),
+    }
+
+
+def _index_lineage(conn, names) -> set[str]:
+    """The plan's index names plus the parent indexes they are attached to (partitions)."""
+    if not names:
+        return set()
+    rows = conn.execute(
+        text(
+            "WITH RECURSIVE up(oid, relname) AS ("
+            "  SELECT c.oid, c.relname FROM pg_class c"
+            "  WHERE c.relname = ANY(:names) AND c.relnamespace = to_regnamespace(current_schema())"
+            "  UNION"
+            "  SELECT p.oid, p.relname FROM up"
+            "  JOIN pg_inherits i ON i.inhrelid = up.oid JOIN pg_class p ON p.oid = i.inhparent"
+            ") SELECT relname FROM up"
+        ),
+        {"names": list(names)},
+    ).scalars().all()
+    return set(names) | set(rows)
+
+
+def _is_table(relation: str | None, table: str) -> bool:
+    """The table itself or one of its partitions (backend/partitions.py)."""
+    if not relation:
+        return False
+    if relation == table:
+        return True
+    return table in PARTITIONED and (relation == default_partition(table) or relation.startswith(f"{table}_p"))
+
+
+def _walk(node: dict):
+    yield node
+    for child in node.get("Plans", []) or []:
+        yield from _walk(child)
+
+
+def check(ws_id=None) -> dict:
+    """
+    EXPLAIN every hot query. ok: no seq scan on its table and one of its expected indexes
+    (or a partition index attached to it) in the plan.
+    """
+    ws_id = ws_id or uuid.uuid4()
+    out = {}
+    with engine.begin() as conn:
+        conn.execute(text("SET LOCAL enable_seqscan = off"))
+        queries = hot_queries(Session(bind=conn), ws_id)
+        uncovered = set(KEY_INDEXES) - {ix for _, expected, _ in queries.values() for ix in expected}
+        if uncovered:
+            raise RuntimeError(f"KEY_INDEXES without a hot query: {sorted(uncovered)}")
+
+        for name, (table, expected, stmt) in queries.items():
+            plan = conn.execute(_Explain(stmt)).scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            nodes = list(_walk(plan[0]["Plan"]))
+            seq = [n for n in nodes if n.get("Node Type") == "Seq Scan" and _is_table(n.get("Relation Name"), table)]
+            used = {n["Index Name"] for n in nodes if n.get("Index Name")}
+            out[name] = {
+                "ok": not seq and bool(_index_lineage(conn, used) & set(expected)),
+                "table": table,
+                "expected": list(expected),
+                "indexes": sorted(used),
+                "plan": plan,
+            }
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Fail when a hot query falls back to a seq scan or misses its index")
+    ap.add_argument("--verbose", action="store_true")
+    args = ap.parse_args()
+
+    results = check()
+    failed = [name for name, r in results.items() if not r["ok"]]
+    for name, r in results.items():
+        line = {"query": name, "ok": r["ok"], "table": r["table"], "expected": r["expected"], "indexes": r["indexes"]}
+        if args.verbose or not r["ok"]:
+            line["plan"] = r["plan"]
+        print(json.dumps(line), flush=True)
+
+    if failed:
+        print(f"seq scan / unexpected index: {', '.join(failed)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
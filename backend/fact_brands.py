@@ -0,0 +1,189 @@
+# backend/fact_brands.py
+# brand_norm on sales_raw / returns_raw: lower(trim(catalog_raw.brand)) of the row's style
+# (fallback: its seller SKU), so brand filters are one indexed equality instead of
+# "load every style_key of the brand, then style_key IN (...)".
+#
+#   - ingest:         resolve_brand_norm() with a CatalogBrands lookup loaded once per file
+#   - catalog upload: refresh_fact_brands() re-resolves the workspace's facts in SQL
+#                     (and the copies on daily_sku_facts / sku_monthly)
+#   - migrations:     sync_fact_brands() backfills all workspaces once (python -m backend.migrations)
+#
+#   python -m backend.fact_brands                          # re-resolve every workspace
+#   python -m backend.fact_brands --workspace-slug acme
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+import pandas as pd
+from sqlalchemy import text
+
+from backend.key_indexes import norm_key
+from backend.models import CatalogRaw
+
+_BACKFILL_KEY = "fact_brand_norm_backfill"
+
+FACT_TABLES = {
+    # table -> date column (leading column of the (workspace_id, brand_norm, date) index)
+    "sales_raw": "order_date",
+    "returns_raw": "return_date",
+}
+
+# rollups that carry a copy of brand_norm, re-resolved together with the facts
+BRAND_COPIES = ("daily_sku_facts", "sku_monthly")
+
+
+def normalize_brand(brand: str | None) -> str | None:
+    """Value stored in / compared against brand_norm."""
+    b = (brand or "").strip().lower()
+    return b or None
+
+
+class CatalogBrands:
+    """style_key -> brand_norm and seller_sku_code -> brand_norm for one workspace."""
+
+    def __init__(self, by_style: dict[str, str], by_sku: dict[str, str]):
+        self.by_style = by_style
+        self.by_sku = by_sku
+
+    @classmethod
+    def load(cls, db, ws_id) -> "CatalogBrands":
+        rows = (
+            db.query(CatalogRaw.style_key, CatalogRaw.seller_sku_code, CatalogRaw.brand)
+            .filter(CatalogRaw.workspace_id == ws_id)
+            .filter(CatalogRaw.brand.isnot(None))
+            .all()
+        )
+        by_style: dict[str, str] = {}
+        by_sku: dict[str, str] = {}
+        for sk, sku, br in rows:
+            b = normalize_brand(br)
+            if not b:
+                continue
+            k = (sk or "").strip().lower()
+            if k:
+                by_style[k] = b
+            k = (sku or "").strip().lower()
+            if k:
+                by_sku[k] = b
+        return cls(by_style, by_sku)
+
+
+def resolve_brand_norm(brands: CatalogBrands, style_key: pd.Series, seller_sku: pd.Series | None = None) -> pd.Series:
+    """brand_norm column for an ingest frame (style match first, then SKU)."""
+    out = style_key.astype(str).str.strip().str.lower().map(brands.by_style)
+    if seller_sku is not None and brands.by_sku:
+        missing = out.isna()
+        if missing.any():
+            out[missing] = seller_sku[missing].astype(str).str.strip().str.lower().map(brands.by_sku)
+    return out.astype(object).where(out.notna(), None)
+
+
+# same rule as resolve_brand_norm, for rows already in the table
+_REFRESH_SQL = """
+WITH by_style AS (
+    SELECT lower(btrim(style_key)) AS k, max(lower(btrim(brand))) AS b
+    FROM catalog_raw
+    WHERE workspace_id = :ws AND nullif(btrim(brand), '') IS NOT NULL
+    GROUP BY 1
+),
+by_sku AS (
+    SELECT lower(btrim(seller_sku_code)) AS k, max(lower(btrim(brand))) AS b
+    FROM catalog_raw
+    WHERE workspace_id = :ws AND seller_sku_code IS NOT NULL AND nullif(btrim(brand), '') IS NOT NULL
+    GROUP BY 1
+),
+resolved AS (
+    SELECT t.id, coalesce(s.b, k.b) AS b
+    FROM {table} t
+    LEFT JOIN by_style s ON s.k = lower(btrim(t.style_key))
+    LEFT JOIN by_sku k ON k.k = lower(btrim(t.seller_sku_code))
+    WHERE t.workspace_id = :ws
+)
+UPDATE {table} t
+SET brand_norm = r.b
+FROM resolved r
+WHERE t.id = r.id AND t.brand_norm IS DISTINCT FROM r.b
+"""
+
+
+def refresh_fact_brands(db, ws_id) -> dict:
+    """
+    Re-resolve brand_norm of the workspace's sales/returns (and BRAND_COPIES) from the
+    current catalog. Only rows whose brand changed are written. Caller commits.
+    """
+    out = {}
+    for table in (*FACT_TABLES, *BRAND_COPIES):
+        res = db.execute(text(_REFRESH_SQL.format(table=table)), {"ws": str(ws_id)})
+        out[table] = int(res.rowcount or 0)
+    return out
+
+
+def sync_fact_brands(engine, force: bool = False) -> dict | None:
+    """One-time backfill of brand_norm for every workspace (tracked in app_meta)."""
+    with engine.begin() as conn:
+        done = conn.execute(
+            text("SELECT value FROM app_meta WHERE key = :k"), {"k": _BACKFILL_KEY}
+        ).scalar()
+        if done and not force:
+            return None
+
+        t0 = time.perf_counter()
+        ws_ids = conn.execute(text("SELECT DISTINCT workspace_id FROM catalog_raw")).scalars().all()
+        updated = {table: 0 for table in (*FACT_TABLES, *BRAND_COPIES)}
+        for ws_id in ws_ids:
+            for table, n in refresh_fact_brands(conn, ws_id).items():
+                updated[table] += n
+
+        conn.execute(
+            text(
+                "INSERT INTO app_meta (key, value, updated_at) VALUES (:k, 'done', now()) "
+                "ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value, updated_at = now()"
+            ),
+            {"k": _BACKFILL_KEY},
+        )
+    return {"workspaces": len(ws_ids), "updated": updated, "seconds": round(time.perf_counter() - t0, 3)}
+
+
+def brand_norms_matching(db, ws_id, brand: str, match=None) -> list[str]:
+    """
+    Distinct catalog brand_norm values equal to `brand` under `match` (a normalizer,
+    default normalize_brand). A handful of brands, not a style list.
+    """
+    match = match or normalize_brand
+    want = match(brand)
+    rows = (
+        db.query(norm_key(CatalogRaw.brand))
+        .filter(CatalogRaw.workspace_id == ws_id)
+        .filter(CatalogRaw.brand.isnot(None))
+        .distinct()
+        .all()
+    )
+    return [b for (b,) in rows if b and match(b) == want]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Re-resolve brand_norm on sales_raw / returns_raw")
+    ap.add_argument("--workspace-slug", default=None)
+    args = ap.parse_args()
+
+    from backend.db import SessionLocal, engine, resolve_workspace_id
+
+    if args.workspace_slug is None:
+        print(json.dumps(sync_fact_brands(engine, force=True)), flush=True)
+        return
+
+    db = SessionLocal()
+    try:
+        ws_id = resolve_workspace_id(db, args.workspace_slug)
+        out = refresh_fact_brands(db, ws_id)
+        db.commit()
+        print(json.dumps(out), flush=True)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
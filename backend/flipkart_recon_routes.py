@@ -8,17 +8,22 @@ import json
 from datetime import datetime
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 from fastapi import APIRouter, File, HTTPException, Query, UploadFile
 from fastapi.responses import StreamingResponse
 from sqlalchemy import func
 
+from backend.copy_loader import ReplaceLoad, add_load_stats, copy_frame
+from backend.data_version import bump_data_version
+from backend.date_parse import DateErrors, parse_date_column
 from backend.db import SessionLocal, resolve_workspace_id
 from backend.flipkart_recon_models import (
     FlipkartSkuPnl,
     FlipkartOrderPnl,
     FlipkartPaymentReport,
 )
+from backend.xlsx_stream import iter_xlsx_chunks
 
 router = APIRouter(prefix="/db/recon/flipkart", tags=["flipkart-reconciliation"])
 
@@ -46,26 +51,158 @@ def _ts(v):
     s = str(v).strip().strip('"').strip("'")
     return s if s and s != "nan" else None
 
-def _td(v):
-    if v is None or (isinstance(v, float) and pd.isna(v)):
-        return None
+
+def _col_s(s: pd.Series) -> pd.Series:
+    """Column-wise _ts."""
+    txt = s.dropna().astype(str).str.strip().str.strip('"').str.strip("'")
+    return txt.where(~txt.isin(("", "nan")), None).reindex(s.index)
+
+
+def _col_f(s: pd.Series) -> pd.Series:
+    """Column-wise _tf."""
+    return pd.to_numeric(s, errors="coerce").astype(float)
+
+
+def _col_i(s: pd.Series) -> pd.Series:
+    """Column-wise _ti (truncates like int(float(v)))."""
+    return np.trunc(_col_f(s)).astype("Int64")
+
+
+class _SheetSpec:
+    """One workbook sheet: data start row, positional column names, typed target columns."""
+
+    def __init__(
+        self,
+        model,
+        sheet_name: str,
+        skip_rows: int,
+        col_names: list[str],
+        key: str,
+        str_cols: list[str] = (),
+        int_cols: list[str] = (),
+        float_cols: list[str] = (),
+        dt_cols: list[str] = (),
+    ):
+        self.model = model
+        self.sheet_name = sheet_name
+        self.skip_rows = skip_rows
+        self.col_names = col_names
+        self.key = key
+        self.fields = (
+            [(c, _col_s) for c in str_cols]
+            + [(c, _col_i) for c in int_cols]
+            + [(c, _col_f) for c in float_cols]
+        )
+        self.dt_cols = list(dt_cols)
+
+    def build(self, chunk: pd.DataFrame, constants: dict, date_errors: DateErrors | None = None) -> pd.DataFrame:
+        """xlsx chunk -> insert-ready frame (rows without the key column dropped)."""
+        chunk = chunk[chunk[self.key].notna()]
+        out = {col: conv(chunk[col]) for col, conv in self.fields}
+        for col in self.dt_cols:
+            out[col] = parse_date_column(chunk[col], self.model.__tablename__, col, date_errors)
+        out.update(constants)
+        return pd.DataFrame(out, index=chunk.index)
+
+
+def _ingest_sheet(spec: _SheetSpec, file: UploadFile, workspace_slug: str, replace: bool, label: str, constants: dict | None = None) -> dict:
+    """
+    Stream spec's sheet out of the upload (iter_xlsx_chunks) and COPY it chunk by chunk.
+    replace: the chunks are staged and the workspace's rows swapped out at the end (ReplaceLoad).
+    """
+    db = SessionLocal()
     try:
-        return pd.to_datetime(v, errors="coerce").to_pydatetime().replace(tzinfo=None)
-    except:
-        return None
+        ws_id = resolve_workspace_id(db, workspace_slug, create=True)
+        f = file.file
+        f.seek(0, 2)
+        if f.tell() == 0:
+            raise HTTPException(400, "Empty file")
 
+        row_constants = {"workspace_id": str(ws_id), **(constants or {}), "ingested_at": datetime.utcnow()}
+        table = spec.model.__tablename__
+        load = None
+        staged = 0
+        replacing = ReplaceLoad(db, table, {"workspace_id": ws_id}) if replace else None
+        date_errors = DateErrors()
+        for chunk in iter_xlsx_chunks(f, spec.sheet_name, skip_rows=spec.skip_rows, columns=spec.col_names):
+            frame = spec.build(chunk, row_constants, date_errors)
+            if replacing:
+                staged = replacing.add(frame)
+            else:
+                load = add_load_stats(load, copy_frame(db, table, frame))
+
+        if replacing and staged:
+            load = replacing.swap()
+        if load is None:
+            return {"ok": True, "inserted": 0}
+
+        bump_data_version(db, ws_id)
+        db.commit()
+        return {
+            "ok": True,
+            "inserted": load["rows"],
+            "workspace_slug": workspace_slug,
+            "load": load,
+            "date_errors": date_errors.to_dict(),
+        }
 
-def _read_excel_sheet(content: bytes, sheet_name: str, skip_rows: int = 2):
-    """Read Excel sheet, skip header rows, return DataFrame."""
-    buf = io.BytesIO(content)
-    df = pd.read_excel(buf, sheet_name=sheet_name, header=None, skiprows=skip_rows)
-    return df
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(500, f"{label} ingest failed: {e}")
+    finally:
+        db.close()
 
 
 # ---------------------------------------------------------------------------
 # Ingest: PNL Report - SKU-level P&L
 # ---------------------------------------------------------------------------
 
+_SKU_PNL_SHEET = _SheetSpec(
+    FlipkartSkuPnl,
+    "SKU-level P&L",
+    skip_rows=2,
+    col_names=[
+        "sku_id", "sku_name", "gross_units", "returned_cancelled_units",
+        "rto_units", "rvp_units", "cancelled_units", "net_units", "_net_units2",
+        "estimated_net_sales", "_est2", "accounted_net_sales",
+        "total_expenses", "commission_fee", "collection_fee", "fixed_fee",
+        "pick_and_pack_fee", "forward_shipping_fee", "offer_adjustments",
+        "reverse_shipping_fee", "storage_fee", "recall_fee",
+        "no_cost_emi_fee", "installation_fee", "tech_visit_fee",
+        "uninstallation_fee", "customer_addons_recovery", "franchise_fee",
+        "shopsy_marketing_fee", "product_cancellation_fee",
+        "taxes_gst", "taxes_tcs", "taxes_tds",
+        "rewards_other_benefits", "rewards", "order_spf", "non_order_spf",
+        "bank_settlement_projected", "input_tax_credits",
+        "input_tax_gst_tcs", "input_tax_tds",
+        "net_earnings", "earnings_per_unit", "net_margins_pct", "_net_margins2",
+        "_bank_settlement2", "amount_settled", "amount_pending",
+    ],
+    key="sku_id",
+    str_cols=["sku_id", "sku_name"],
+    int_cols=[
+        "gross_units", "returned_cancelled_units", "rto_units", "rvp_units",
+        "cancelled_units", "net_units",
+    ],
+    float_cols=[
+        "estimated_net_sales", "accounted_net_sales", "total_expenses",
+        "commission_fee", "collection_fee", "fixed_fee", "pick_and_pack_fee",
+        "forward_shipping_fee", "offer_adjustments", "reverse_shipping_fee",
+        "storage_fee", "recall_fee", "no_cost_emi_fee", "installation_fee",
+        "tech_visit_fee", "uninstallation_fee", "customer_addons_recovery",
+        "franchise_fee", "shopsy_marketing_fee", "product_cancellation_fee",
+        "taxes_gst", "taxes_tcs", "taxes_tds",
+        "rewards_other_benefits", "rewards", "order_spf", "non_order_spf",
+        "bank_settlement_projected", "input_tax_credits",
+        "input_tax_gst_tcs", "input_tax_tds",
+        "net_earnings", "earnings_per_unit", "net_margins_pct",
+        "amount_settled", "amount_pending",
+    ],
+)
+
+
 @router.post("/ingest/sku-pnl")
 def ingest_fk_sku_pnl(
     workspace_slug: str = Query("default"),
@@ -74,114 +211,66 @@ def ingest_fk_sku_pnl(
     file: UploadFile = File(...),
 ):
     """Ingest Flipkart PNL Report (SKU-level P&L sheet)."""
-    db = SessionLocal()
-    try:
-        ws_id = resolve_workspace_id(db, workspace_slug)
-        content = file.file.read()
-        if not content:
-            raise HTTPException(400, "Empty file")
-
-        df = _read_excel_sheet(content, "SKU-level P&L", skip_rows=2)
-        if df.empty:
-            return {"ok": True, "inserted": 0}
-
-        # Assign column names based on known structure
-        col_names = [
-            "sku_id", "sku_name", "gross_units", "returned_cancelled_units",
-            "rto_units", "rvp_units", "cancelled_units", "net_units", "_net_units2",
-            "estimated_net_sales", "_est2", "accounted_net_sales",
-            "total_expenses", "commission_fee", "collection_fee", "fixed_fee",
-            "pick_and_pack_fee", "forward_shipping_fee", "offer_adjustments",
-            "reverse_shipping_fee", "storage_fee", "recall_fee",
-            "no_cost_emi_fee", "installation_fee", "tech_visit_fee",
-            "uninstallation_fee", "customer_addons_recovery", "franchise_fee",
-            "shopsy_marketing_fee", "product_cancellation_fee",
-            "taxes_gst", "taxes_tcs", "taxes_tds",
-            "rewards_other_benefits", "rewards", "order_spf", "non_order_spf",
-            "bank_settlement_projected", "input_tax_credits",
-            "input_tax_gst_tcs", "input_tax_tds",
-            "net_earnings", "earnings_per_unit", "net_margins_pct", "_net_margins2",
-            "_bank_settlement2", "amount_settled", "amount_pending",
-        ]
-        df.columns = col_names[:len(df.columns)]
-
-        # Filter out empty rows
-        df = df.dropna(subset=["sku_id"])
-
-        if replace:
-            db.query(FlipkartSkuPnl).filter(FlipkartSkuPnl.workspace_id == ws_id).delete(synchronize_session=False)
-            db.commit()
-
-        objs = []
-        for _, r in df.iterrows():
-            obj = FlipkartSkuPnl(
-                workspace_id=ws_id,
-                sku_id=_ts(r.get("sku_id")),
-                sku_name=_ts(r.get("sku_name")),
-                gross_units=_ti(r.get("gross_units")),
-                returned_cancelled_units=_ti(r.get("returned_cancelled_units")),
-                rto_units=_ti(r.get("rto_units")),
-                rvp_units=_ti(r.get("rvp_units")),
-                cancelled_units=_ti(r.get("cancelled_units")),
-                net_units=_ti(r.get("net_units")),
-                estimated_net_sales=_tf(r.get("estimated_net_sales")),
-                accounted_net_sales=_tf(r.get("accounted_net_sales")),
-                total_expenses=_tf(r.get("total_expenses")),
-                commission_fee=_tf(r.get("commission_fee")),
-                collection_fee=_tf(r.get("collection_fee")),
-                fixed_fee=_tf(r.get("fixed_fee")),
-                pick_and_pack_fee=_tf(r.get("pick_and_pack_fee")),
-                forward_shipping_fee=_tf(r.get("forward_shipping_fee")),
-                offer_adjustments=_tf(r.get("offer_adjustments")),
-                reverse_shipping_fee=_tf(r.get("reverse_shipping_fee")),
-                storage_fee=_tf(r.get("storage_fee")),
-                recall_fee=_tf(r.get("recall_fee")),
-                no_cost_emi_fee=_tf(r.get("no_cost_emi_fee")),
-                installation_fee=_tf(r.get("installation_fee")),
-                tech_visit_fee=_tf(r.get("tech_visit_fee")),
-                uninstallation_fee=_tf(r.get("uninstallation_fee")),
-                customer_addons_recovery=_tf(r.get("customer_addons_recovery")),
-                franchise_fee=_tf(r.get("franchise_fee")),
-                shopsy_marketing_fee=_tf(r.get("shopsy_marketing_fee")),
-                product_cancellation_fee=_tf(r.get("product_cancellation_fee")),
-                taxes_gst=_tf(r.get("taxes_gst")),
-                taxes_tcs=_tf(r.get("taxes_tcs")),
-                taxes_tds=_tf(r.get("taxes_tds")),
-                rewards_other_benefits=_tf(r.get("rewards_other_benefits")),
-                rewards=_tf(r.get("rewards")),
-                order_spf=_tf(r.get("order_spf")),
-                non_order_spf=_tf(r.get("non_order_spf")),
-                bank_settlement_projected=_tf(r.get("bank_settlement_projected")),
-                input_tax_credits=_tf(r.get("input_tax_credits")),
-                input_tax_gst_tcs=_tf(r.get("input_tax_gst_tcs")),
-                input_tax_tds=_tf(r.get("input_tax_tds")),
-                net_earnings=_tf(r.get("net_earnings")),
-                earnings_per_unit=_tf(r.get("earnings_per_unit")),
-                net_margins_pct=_tf(r.get("net_margins_pct")),
-                amount_settled=_tf(r.get("amount_settled")),
-                amount_pending=_tf(r.get("amount_pending")),
-                report_month=report_month,
-                ingested_at=datetime.utcnow(),
-            )
-            objs.append(obj)
-
-        db.bulk_save_objects(objs)
-        db.commit()
-        return {"ok": True, "inserted": len(objs), "workspace_slug": workspace_slug}
-
-    except HTTPException:
-        raise
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(500, f"FK SKU PNL ingest failed: {e}")
-    finally:
-        db.close()
+    return _ingest_sheet(
+        _SKU_PNL_SHEET, file, workspace_slug, replace, "FK SKU PNL",
+        constants={"report_month": report_month},
+    )
 
 
 # ---------------------------------------------------------------------------
 # Ingest: PNL Report - Orders P&L
 # ---------------------------------------------------------------------------
 
+_ORDER_PNL_SHEET = _SheetSpec(
+    FlipkartOrderPnl,
+    "Orders P&L",
+    skip_rows=2,
+    col_names=[
+        "order_date", "order_id", "order_item_id", "sku_id", "fulfilment_type",
+        "channel_of_sale", "mode_of_payment", "shipping_zone", "order_status", "_blank1",
+        "gross_units", "returned_cancelled_units", "rto_units", "rvp_units", "cancelled_units",
+        "net_units", "_blank2",
+        "sale_amount", "seller_burn_offer", "customer_addons_amount",
+        "estimated_net_sales", "_est2", "accounted_net_sales",
+        "total_expenses",
+        "commission_fee", "collection_fee", "fixed_fee", "pick_and_pack_fee",
+        "forward_shipping_fee", "offer_adjustments", "reverse_shipping_fee",
+        "no_cost_emi_fee", "installation_fee", "tech_visit_fee",
+        "uninstallation_fee", "customer_addons_recovery", "franchise_fee",
+        "shopsy_marketing_fee", "product_cancellation_fee",
+        "storage_fee", "recall_fee",
+        "taxes_gst", "taxes_tcs", "taxes_tds",
+        "rewards_other_benefits", "rewards", "order_spf", "non_order_spf",
+        "bank_settlement_projected", "input_tax_credits",
+        "input_tax_gst_tcs", "input_tax_tds",
+        "net_earnings", "earnings_per_unit", "net_margins_pct", "_net_margins2",
+        "_bank_settlement2", "amount_settled", "amount_pending",
+    ],
+    key="order_id",
+    str_cols=[
+        "order_id", "order_item_id", "sku_id", "fulfilment_type", "channel_of_sale",
+        "mode_of_payment", "shipping_zone", "order_status",
+    ],
+    int_cols=[
+        "gross_units", "returned_cancelled_units", "rto_units", "rvp_units",
+        "cancelled_units", "net_units",
+    ],
+    float_cols=[
+        "sale_amount", "seller_burn_offer", "customer_addons_amount",
+        "estimated_net_sales", "accounted_net_sales", "total_expenses",
+        "commission_fee", "collection_fee", "fixed_fee", "pick_and_pack_fee",
+        "forward_shipping_fee", "offer_adjustments", "reverse_shipping_fee",
+        "storage_fee", "recall_fee", "no_cost_emi_fee", "product_cancellation_fee",
+        "taxes_gst", "taxes_tcs", "taxes_tds",
+        "rewards_other_benefits", "rewards", "order_spf", "non_order_spf",
+        "bank_settlement_projected", "input_tax_credits",
+        "net_earnings", "earnings_per_unit", "net_margins_pct",
+        "amount_settled", "amount_pending",
+    ],
+    dt_cols=["order_date"],
+)
+
+
 @router.post("/ingest/order-pnl")
 def ingest_fk_order_pnl(
     workspace_slug: str = Query("default"),
@@ -189,116 +278,57 @@ def ingest_fk_order_pnl(
     file: UploadFile = File(...),
 ):
     """Ingest Flipkart PNL Report (Orders P&L sheet)."""
-    db = SessionLocal()
-    try:
-        ws_id = resolve_workspace_id(db, workspace_slug)
-        content = file.file.read()
-        if not content:
-            raise HTTPException(400, "Empty file")
-
-        df = _read_excel_sheet(content, "Orders P&L", skip_rows=2)
-        if df.empty:
-            return {"ok": True, "inserted": 0}
-
-        col_names = [
-            "order_date", "order_id", "order_item_id", "sku_id", "fulfilment_type",
-            "channel_of_sale", "mode_of_payment", "shipping_zone", "order_status", "_blank1",
-            "gross_units", "returned_cancelled_units", "rto_units", "rvp_units", "cancelled_units",
-            "net_units", "_blank2",
-            "sale_amount", "seller_burn_offer", "customer_addons_amount",
-            "estimated_net_sales", "_est2", "accounted_net_sales",
-            "total_expenses",
-            "commission_fee", "collection_fee", "fixed_fee", "pick_and_pack_fee",
-            "forward_shipping_fee", "offer_adjustments", "reverse_shipping_fee",
-            "no_cost_emi_fee", "installation_fee", "tech_visit_fee",
-            "uninstallation_fee", "customer_addons_recovery", "franchise_fee",
-            "shopsy_marketing_fee", "product_cancellation_fee",
-            "storage_fee", "recall_fee",
-            "taxes_gst", "taxes_tcs", "taxes_tds",
-            "rewards_other_benefits", "rewards", "order_spf", "non_order_spf",
-            "bank_settlement_projected", "input_tax_credits",
-            "input_tax_gst_tcs", "input_tax_tds",
-            "net_earnings", "earnings_per_unit", "net_margins_pct", "_net_margins2",
-            "_bank_settlement2", "amount_settled", "amount_pending",
-        ]
-        df.columns = col_names[:len(df.columns)]
-        df = df.dropna(subset=["order_id"])
-
-        if replace:
-            db.query(FlipkartOrderPnl).filter(FlipkartOrderPnl.workspace_id == ws_id).delete(synchronize_session=False)
-            db.commit()
-
-        objs = []
-        for _, r in df.iterrows():
-            obj = FlipkartOrderPnl(
-                workspace_id=ws_id,
-                order_date=_td(r.get("order_date")),
-                order_id=_ts(r.get("order_id")),
-                order_item_id=_ts(r.get("order_item_id")),
-                sku_id=_ts(r.get("sku_id")),
-                fulfilment_type=_ts(r.get("fulfilment_type")),
-                channel_of_sale=_ts(r.get("channel_of_sale")),
-                mode_of_payment=_ts(r.get("mode_of_payment")),
-                shipping_zone=_ts(r.get("shipping_zone")),
-                order_status=_ts(r.get("order_status")),
-                gross_units=_ti(r.get("gross_units")),
-                returned_cancelled_units=_ti(r.get("returned_cancelled_units")),
-                rto_units=_ti(r.get("rto_units")),
-                rvp_units=_ti(r.get("rvp_units")),
-                cancelled_units=_ti(r.get("cancelled_units")),
-                net_units=_ti(r.get("net_units")),
-                sale_amount=_tf(r.get("sale_amount")),
-                seller_burn_offer=_tf(r.get("seller_burn_offer")),
-                customer_addons_amount=_tf(r.get("customer_addons_amount")),
-                estimated_net_sales=_tf(r.get("estimated_net_sales")),
-                accounted_net_sales=_tf(r.get("accounted_net_sales")),
-                total_expenses=_tf(r.get("total_expenses")),
-                commission_fee=_tf(r.get("commission_fee")),
-                collection_fee=_tf(r.get("collection_fee")),
-                fixed_fee=_tf(r.get("fixed_fee")),
-                pick_and_pack_fee=_tf(r.get("pick_and_pack_fee")),
-                forward_shipping_fee=_tf(r.get("forward_shipping_fee")),
-                offer_adjustments=_tf(r.get("offer_adjustments")),
-                reverse_shipping_fee=_tf(r.get("reverse_shipping_fee")),
-                storage_fee=_tf(r.get("storage_fee")),
-                recall_fee=_tf(r.get("recall_fee")),
-                no_cost_emi_fee=_tf(r.get("no_cost_emi_fee")),
-                product_cancellation_fee=_tf(r.get("product_cancellation_fee")),
-                taxes_gst=_tf(r.get("taxes_gst")),
-                taxes_tcs=_tf(r.get("taxes_tcs")),
-                taxes_tds=_tf(r.get("taxes_tds")),
-                rewards_other_benefits=_tf(r.get("rewards_other_benefits")),
-                rewards=_tf(r.get("rewards")),
-                order_spf=_tf(r.get("order_spf")),
-                non_order_spf=_tf(r.get("non_order_spf")),
-                bank_settlement_projected=_tf(r.get("bank_settlement_projected")),
-                input_tax_credits=_tf(r.get("input_tax_credits")),
-                net_earnings=_tf(r.get("net_earnings")),
-                earnings_per_unit=_tf(r.get("earnings_per_unit")),
-                net_margins_pct=_tf(r.get("net_margins_pct")),
-                amount_settled=_tf(r.get("amount_settled")),
-                amount_pending=_tf(r.get("amount_pending")),
-                ingested_at=datetime.utcnow(),
-            )
-            objs.append(obj)
-
-        db.bulk_save_objects(objs)
-        db.commit()
-        return {"ok": True, "inserted": len(objs), "workspace_slug": workspace_slug}
-
-    except HTTPException:
-        raise
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(500, f"FK Order PNL ingest failed: {e}")
-    finally:
-        db.close()
+    return _ingest_sheet(_ORDER_PNL_SHEET, file, workspace_slug, replace, "FK Order PNL")
 
 
 # ---------------------------------------------------------------------------
 # Ingest: Payment Report
 # ---------------------------------------------------------------------------
 
+_PAYMENT_REPORT_SHEET = _SheetSpec(
+    FlipkartPaymentReport,
+    "Orders",
+    skip_rows=3,
+    col_names=[
+        "neft_id", "neft_type", "payment_date", "bank_settlement_value",
+        "input_gst_tcs_credits", "income_tax_tds_credits", "_b1",
+        "order_id", "order_item_id", "sale_amount", "total_offer_amount",
+        "my_share", "customer_addons_amount", "marketplace_fee", "taxes",
+        "offer_adjustments", "protection_fund", "refund", "_b2",
+        "tier", "commission_rate_pct", "commission", "fixed_fee", "collection_fee",
+        "pick_and_pack_fee", "shipping_fee", "reverse_shipping_fee",
+        "no_cost_emi_fee", "installation_fee", "tech_visit_fee",
+        "uninstallation_fee", "customer_addons_recovery", "franchise_fee",
+        "shopsy_marketing_fee", "product_cancellation_fee", "_b3",
+        "tcs", "tds", "gst_on_mp_fees", "_b4",
+        "offer_discount_settled", "item_gst_rate_pct", "discount_in_mp_fees",
+        "gst_on_discount", "total_discount_mp_fee", "offer_adjustment_2", "_b5",
+        "dead_weight", "lbh", "volumetric_weight", "chargeable_weight_source",
+        "chargeable_weight_type", "chargeable_wt_slab", "shipping_zone", "_b6",
+        "order_date", "dispatch_date", "fulfilment_type", "seller_sku",
+        "quantity", "product_sub_category", "additional_info",
+        "return_type", "shopsy_order", "item_return_status",
+    ],
+    key="order_id",
+    str_cols=[
+        "neft_id", "neft_type", "order_id", "order_item_id", "tier",
+        "shipping_zone", "chargeable_wt_slab", "fulfilment_type", "seller_sku",
+        "product_sub_category", "return_type", "item_return_status",
+    ],
+    int_cols=["quantity"],
+    float_cols=[
+        "bank_settlement_value", "input_gst_tcs_credits", "income_tax_tds_credits",
+        "sale_amount", "total_offer_amount", "my_share", "customer_addons_amount",
+        "marketplace_fee", "taxes", "offer_adjustments", "protection_fund", "refund",
+        "commission_rate_pct", "commission", "fixed_fee", "collection_fee",
+        "pick_and_pack_fee", "shipping_fee", "reverse_shipping_fee",
+        "no_cost_emi_fee", "product_cancellation_fee",
+        "tcs", "tds", "gst_on_mp_fees",
+    ],
+    dt_cols=["payment_date", "order_date", "dispatch_date"],
+)
+
+
 @router.post("/ingest/payment-report")
 def ingest_fk_payment_report(
     workspace_slug: str = Query("default"),
@@ -306,103 +336,7 @@ def ingest_fk_payment_report(
     file: UploadFile = File(...),
 ):
     """Ingest Flipkart Payment Report (Orders sheet)."""
-    db = SessionLocal()
-    try:
-        ws_id = resolve_workspace_id(db, workspace_slug)
-        content = file.file.read()
-        if not content:
-            raise HTTPException(400, "Empty file")
-
-        df = _read_excel_sheet(content, "Orders", skip_rows=3)
-        if df.empty:
-            return {"ok": True, "inserted": 0}
-
-        col_names = [
-            "neft_id", "neft_type", "payment_date", "bank_settlement_value",
-            "input_gst_tcs_credits", "income_tax_tds_credits", "_b1",
-            "order_id", "order_item_id", "sale_amount", "total_offer_amount",
-            "my_share", "customer_addons_amount", "marketplace_fee", "taxes",
-            "offer_adjustments", "protection_fund", "refund", "_b2",
-            "tier", "commission_rate_pct", "commission", "fixed_fee", "collection_fee",
-            "pick_and_pack_fee", "shipping_fee", "reverse_shipping_fee",
-            "no_cost_emi_fee", "installation_fee", "tech_visit_fee",
-            "uninstallation_fee", "customer_addons_recovery", "franchise_fee",
-            "shopsy_marketing_fee", "product_cancellation_fee", "_b3",
-            "tcs", "tds", "gst_on_mp_fees", "_b4",
-            "offer_discount_settled", "item_gst_rate_pct", "discount_in_mp_fees",
-            "gst_on_discount", "total_discount_mp_fee", "offer_adjustment_2", "_b5",
-            "dead_weight", "lbh", "volumetric_weight", "chargeable_weight_source",
-            "chargeable_weight_type", "chargeable_wt_slab", "shipping_zone", "_b6",
-            "order_date", "dispatch_date", "fulfilment_type", "seller_sku",
-            "quantity", "product_sub_category", "additional_info",
-            "return_type", "shopsy_order", "item_return_status",
-        ]
-        df.columns = col_names[:len(df.columns)]
-        df = df.dropna(subset=["order_id"])
-
-        if replace:
-            db.query(FlipkartPaymentReport).filter(FlipkartPaymentReport.workspace_id == ws_id).delete(synchronize_session=False)
-            db.commit()
-
-        objs = []
-        for _, r in df.iterrows():
-            obj = FlipkartPaymentReport(
-                workspace_id=ws_id,
-                neft_id=_ts(r.get("neft_id")),
-                neft_type=_ts(r.get("neft_type")),
-                payment_date=_td(r.get("payment_date")),
-                bank_settlement_value=_tf(r.get("bank_settlement_value")),
-                input_gst_tcs_credits=_tf(r.get("input_gst_tcs_credits")),
-                income_tax_tds_credits=_tf(r.get("income_tax_tds_credits")),
-                order_id=_ts(r.get("order_id")),
-                order_item_id=_ts(r.get("order_item_id")),
-                sale_amount=_tf(r.get("sale_amount")),
-                total_offer_amount=_tf(r.get("total_offer_amount")),
-                my_share=_tf(r.get("my_share")),
-                customer_addons_amount=_tf(r.get("customer_addons_amount")),
-                marketplace_fee=_tf(r.get("marketplace_fee")),
-                taxes=_tf(r.get("taxes")),
-                offer_adjustments=_tf(r.get("offer_adjustments")),
-                protection_fund=_tf(r.get("protection_fund")),
-                refund=_tf(r.get("refund")),
-                tier=_ts(r.get("tier")),
-                commission_rate_pct=_tf(r.get("commission_rate_pct")),
-                commission=_tf(r.get("commission")),
-                fixed_fee=_tf(r.get("fixed_fee")),
-                collection_fee=_tf(r.get("collection_fee")),
-                pick_and_pack_fee=_tf(r.get("pick_and_pack_fee")),
-                shipping_fee=_tf(r.get("shipping_fee")),
-                reverse_shipping_fee=_tf(r.get("reverse_shipping_fee")),
-                no_cost_emi_fee=_tf(r.get("no_cost_emi_fee")),
-                product_cancellation_fee=_tf(r.get("product_cancellation_fee")),
-                tcs=_tf(r.get("tcs")),
-                tds=_tf(r.get("tds")),
-                gst_on_mp_fees=_tf(r.get("gst_on_mp_fees")),
-                shipping_zone=_ts(r.get("shipping_zone")),
-                chargeable_wt_slab=_ts(r.get("chargeable_wt_slab")),
-                order_date=_td(r.get("order_date")),
-                dispatch_date=_td(r.get("dispatch_date")),
-                fulfilment_type=_ts(r.get("fulfilment_type")),
-                seller_sku=_ts(r.get("seller_sku")),
-                quantity=_ti(r.get("quantity")),
-                product_sub_category=_ts(r.get("product_sub_category")),
-                return_type=_ts(r.get("return_type")),
-                item_return_status=_ts(r.get("item_return_status")),
-                ingested_at=datetime.utcnow(),
-            )
-            objs.append(obj)
-
-        db.bulk_save_objects(objs)
-        db.commit()
-        return {"ok": True, "inserted": len(objs), "workspace_slug": workspace_slug}
-
-    except HTTPException:
-        raise
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(500, f"FK Payment report ingest failed: {e}")
-    finally:
-        db.close()
+    return _ingest_sheet(_PAYMENT_REPORT_SHEET, file, workspace_slug, replace, "FK Payment report")
 
 
 # ===========================================================================
@@ -627,8 +561,12 @@ def clear_fk_recon(workspace_slug: str = Query("default")):
         ]:
             c = db.query(model).filter(model.workspace_id == ws_id).delete(synchronize_session=False)
             counts[name] = c
+        bump_data_version(db, ws_id)
         db.commit()
         return {"ok": True, "deleted": counts, "workspace_slug": workspace_slug}
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(500, f"Clear failed: {e}")
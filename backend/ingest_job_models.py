@@ -0,0 +1,52 @@
+# backend/ingest_job_models.py
+# Background ingest jobs — uploads are saved to disk, queued here, drained by backend.ingest_worker
+
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Index
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+import uuid
+
+from backend.db import Base
+
+
+class IngestJob(Base):
+    """One queued upload. Workers claim rows with SELECT ... FOR UPDATE SKIP LOCKED."""
+    __tablename__ = "ingest_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    # "sales", "returns", "catalog", "stock", "myntra-weekly-perf", "flipkart-events", ...
+    kind = Column(String, nullable=False, index=True)
+    workspace_slug = Column(String, nullable=False, index=True)
+
+    # queued | running | done | failed
+    status = Column(String, nullable=False, default="queued", index=True)
+
+    # upload saved under INGEST_UPLOAD_DIR (removed once the job finishes)
+    filename = Column(String, nullable=True)
+    file_path = Column(String, nullable=True)
+    file_bytes = Column(Integer, nullable=True)
+
+    # handler kwargs (replace, stream, ...) as JSON
+    params_json = Column(Text, nullable=True)
+
+    # progress
+    rows_done = Column(Integer, nullable=False, default=0)
+    chunks_done = Column(Integer, nullable=False, default=0)
+
+    # handler return value (JSON) / error message
+    result_json = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+
+    attempts = Column(Integer, nullable=False, default=0)
+    worker_id = Column(String, nullable=True)
+
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    seconds = Column(Float, nullable=True)
+
+    __table_args__ = (
+        Index("ix_ingest_jobs_status_created", "status", "created_at"),
+    )
@@ -0,0 +1,56 @@
+# backend/ingest_job_routes.py
+# Status of queued uploads (see backend/ingest_jobs.py)
+
+from __future__ import annotations
+
+import uuid
+
+from fastapi import APIRouter, HTTPException, Query
+
+from backend.db import SessionLocal
+from backend.ingest_job_models import IngestJob
+from backend.ingest_jobs import JOB_STATUSES, job_to_dict
+
+router = APIRouter(prefix="/db/jobs", tags=["ingest-jobs"])
+
+
+@router.get("")
+def list_ingest_jobs(
+    workspace_slug: str | None = Query(None),
+    status: str | None = Query(None, description="queued, running, done or failed"),
+    kind: str | None = Query(None),
+    limit: int = Query(50, ge=1, le=500),
+):
+    if status and status not in JOB_STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be one of {list(JOB_STATUSES)}")
+
+    db = SessionLocal()
+    try:
+        q = db.query(IngestJob)
+        if workspace_slug:
+            q = q.filter(IngestJob.workspace_slug == workspace_slug.strip().lower())
+        if status:
+            q = q.filter(IngestJob.status == status)
+        if kind:
+            q = q.filter(IngestJob.kind == kind)
+        jobs = q.order_by(IngestJob.created_at.desc()).limit(limit).all()
+        return {"jobs": [job_to_dict(j) for j in jobs]}
+    finally:
+        db.close()
+
+
+@router.get("/{job_id}")
+def get_ingest_job(job_id: str):
+    try:
+        jid = uuid.UUID(job_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail=f"Invalid job id: {job_id}")
+
+    db = SessionLocal()
+    try:
+        job = db.get(IngestJob, jid)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+        return job_to_dict(job)
+    finally:
+        db.close()
@@ -0,0 +1,252 @@
+# backend/ingest_jobs.py
+# Postgres-backed ingest queue:
+#   - API: save the upload under INGEST_UPLOAD_DIR, insert an ingest_jobs row, return its id
+#   - worker (python -m backend.ingest_worker): claim with FOR UPDATE SKIP LOCKED, run the handler
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable
+
+from fastapi import HTTPException
+
+from backend.db import SessionLocal
+from backend.ingest_job_models import IngestJob
+
+# must be shared by the API and the workers (same container / volume)
+INGEST_UPLOAD_DIR = os.getenv("INGEST_UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "projectm-ingest"))
+
+INGEST_JOB_MAX_ATTEMPTS = int(os.getenv("INGEST_JOB_MAX_ATTEMPTS", "3"))
+
+# running job with no heartbeat for this long => its worker died, job can be claimed again
+INGEST_JOB_STALE_SECONDS = int(os.getenv("INGEST_JOB_STALE_SECONDS", "300"))
+INGEST_JOB_HEARTBEAT_SECONDS = 20
+
+JOB_STATUSES = ("queued", "running", "done", "failed")
+
+# kind -> fn(f, filename, *, workspace_slug, progress, **params) -> dict
+# handlers are registered by backend.main next to the ingest functions
+INGEST_HANDLERS: dict[str, Callable[..., dict]] = {}
+
+
+def register_ingest_handler(kind: str, fn: Callable[..., dict]) -> Callable[..., dict]:
+    INGEST_HANDLERS[kind] = fn
+    return fn
+
+
+def job_to_dict(job: IngestJob) -> dict:
+    def _iso(v):
+        return v.isoformat() if v else None
+
+    return {
+        "id": str(job.id),
+        "kind": job.kind,
+        "workspace_slug": job.workspace_slug,
+        "status": job.status,
+        "filename": job.filename,
+        "file_bytes": job.file_bytes,
+        "params": json.loads(job.params_json) if job.params_json else {},
+        "rows_done": int(job.rows_done or 0),
+        "chunks_done": int(job.chunks_done or 0),
+        "attempts": int(job.attempts or 0),
+        "worker_id": job.worker_id,
+        "result": json.loads(job.result_json) if job.result_json else None,
+        "error": job.error,
+        "created_at": _iso(job.created_at),
+        "started_at": _iso(job.started_at),
+        "heartbeat_at": _iso(job.heartbeat_at),
+        "finished_at": _iso(job.finished_at),
+        "seconds": job.seconds,
+    }
+
+
+# -----------------------------------------------------------------------------
+# API side
+# -----------------------------------------------------------------------------
+def enqueue_upload(kind: str, f, filename: str | None, workspace_slug: str, **params) -> dict:
+    """
+    Copy the (spooled) upload to INGEST_UPLOAD_DIR and queue it.
+    Blocking file IO: call from a threadpool in async endpoints.
+    """
+    if kind not in INGEST_HANDLERS:
+        raise HTTPException(status_code=400, detail=f"Unknown ingest job kind: {kind}")
+
+    workspace_slug = (workspace_slug or "default").strip().lower() or "default"
+    job_id = uuid.uuid4()
+    os.makedirs(INGEST_UPLOAD_DIR, exist_ok=True)
+    ext = os.path.splitext(filename or "")[1].lower()
+    path = os.path.join(INGEST_UPLOAD_DIR, f"{job_id.hex}{ext}")
+
+    f.seek(0)
+    with open(path, "wb") as out:
+        shutil.copyfileobj(f, out, 1024 * 1024)
+
+    db = SessionLocal()
+    try:
+        job = IngestJob(
+            id=job_id,
+            kind=kind,
+            workspace_slug=workspace_slug,
+            status="queued",
+            filename=filename,
+            file_path=path,
+            file_bytes=os.path.getsize(path),
+            params_json=json.dumps(params),
+            rows_done=0,
+            chunks_done=0,
+            attempts=0,
+            created_at=datetime.utcnow(),
+        )
+        db.add(job)
+        db.commit()
+        return {"job_id": str(job_id), "status": "queued", "kind": kind, "workspace_slug": workspace_slug}
+    except Exception as e:
+        db.rollback()
+        _remove_file(path)
+        raise HTTPException(status_code=500, detail=f"Could not queue ingest job: {e}")
+    finally:
+        db.close()
+
+
+# -----------------------------------------------------------------------------
+# Worker side
+# -----------------------------------------------------------------------------
+def claim_next_job(worker_id: str) -> uuid.UUID | None:
+    """
+    Take the oldest queued job (or a running one whose worker stopped heartbeating).
+    SKIP LOCKED lets any number of workers poll the same table without blocking each other.
+    """
+    db = SessionLocal()
+    try:
+        while True:
+            stale_before = datetime.utcnow() - timedelta(seconds=INGEST_JOB_STALE_SECONDS)
+            job = (
+                db.query(IngestJob)
+                .filter(
+                    (IngestJob.status == "queued")
+                    | ((IngestJob.status == "running") & (IngestJob.heartbeat_at < stale_before))
+                )
+                .order_by(IngestJob.created_at.asc())
+                .with_for_update(skip_locked=True)
+                .first()
+            )
+            if job is None:
+                db.commit()
+                return None
+
+            now = datetime.utcnow()
+            if int(job.attempts or 0) >= INGEST_JOB_MAX_ATTEMPTS:
+                job.status = "failed"
+                job.error = job.error or f"Gave up after {job.attempts} attempts (worker stopped)"
+                job.finished_at = now
+                _remove_file(job.file_path)
+                db.commit()
+                continue
+
+            job.status = "running"
+            job.attempts = int(job.attempts or 0) + 1
+            job.worker_id = worker_id
+            job.started_at = now
+            job.heartbeat_at = now
+            job.error = None
+            job_id = job.id
+            db.commit()
+            return job_id
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _update_job(job_id, **values) -> None:
+    db = SessionLocal()
+    try:
+        db.query(IngestJob).filter(IngestJob.id == job_id).update(values, synchronize_session=False)
+        db.commit()
+    except Exception:
+        db.rollback()
+    finally:
+        db.close()
+
+
+def _remove_file(path: str | None) -> None:
+    if not path:
+        return
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def run_job(job_id: uuid.UUID) -> str:
+    """Run a claimed job to completion. Returns the final status."""
+    db = SessionLocal()
+    try:
+        job = db.get(IngestJob, job_id)
+        if job is None:
+            return "missing"
+        kind = job.kind
+        filename = job.filename
+        file_path = job.file_path
+        ws_slug = job.workspace_slug
+        params = json.loads(job.params_json) if job.params_json else {}
+    finally:
+        db.close()
+
+    # heartbeat on its own thread: handlers can spend minutes inside one COPY
+    stop = threading.Event()
+
+    def _beat():
+        while not stop.wait(INGEST_JOB_HEARTBEAT_SECONDS):
+            _update_job(job_id, heartbeat_at=datetime.utcnow())
+
+    beat = threading.Thread(target=_beat, daemon=True)
+    beat.start()
+
+    def _progress(rows_done: int, chunks_done: int) -> None:
+        _update_job(
+            job_id,
+            rows_done=int(rows_done),
+            chunks_done=int(chunks_done),
+            heartbeat_at=datetime.utcnow(),
+        )
+
+    t0 = time.perf_counter()
+    status, result, error = "failed", None, None
+    try:
+        handler = INGEST_HANDLERS.get(kind)
+        if handler is None:
+            raise HTTPException(status_code=400, detail=f"Unknown ingest job kind: {kind}")
+        with open(file_path, "rb") as f:
+            result = handler(f, filename, workspace_slug=ws_slug, progress=_progress, **params)
+        status = "done"
+    except HTTPException as e:
+        error = str(e.detail)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        stop.set()
+        beat.join(timeout=5)
+
+    values = {
+        "status": status,
+        "error": error,
+        "finished_at": datetime.utcnow(),
+        "seconds": round(time.perf_counter() - t0, 3),
+        "file_path": None,
+    }
+    if result is not None:
+        values["result_json"] = json.dumps(result, default=str)
+        if isinstance(result, dict) and result.get("rows_in_file") is not None:
+            values["rows_done"] = int(result["rows_in_file"])
+    _update_job(job_id, **values)
+    _remove_file(file_path)
+    return status
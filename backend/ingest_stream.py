@@ -0,0 +1,73 @@
+# backend/ingest_stream.py
+# Bounded-memory CSV parsing for uploads: read the spooled upload file in row chunks
+
+from __future__ import annotations
+
+import os
+from typing import BinaryIO, Iterator
+
+import pandas as pd
+
+# Peak memory budget for one ingest (parsed chunk + raw_json + insert frame + COPY buffer)
+INGEST_MAX_MEMORY_MB = int(os.getenv("INGEST_MAX_MEMORY_MB", "256"))
+
+INGEST_MIN_CHUNK_ROWS = 1_000
+INGEST_MAX_CHUNK_ROWS = 200_000
+
+# rough multiplier: DataFrame row size -> everything alive while the chunk is processed
+_MEMORY_FACTOR = 6
+
+_SAMPLE_ROWS = 2_000
+
+
+def _read_csv(f, **kw) -> pd.DataFrame:
+    return pd.read_csv(f, dtype=str, keep_default_na=False, **kw)
+
+
+def csv_header(f: BinaryIO) -> pd.DataFrame:
+    """Empty frame with the file's columns (for require_col checks before any DB work)."""
+    f.seek(0)
+    try:
+        return _read_csv(f, nrows=0)
+    finally:
+        f.seek(0)
+
+
+def chunk_rows_for(f: BinaryIO, max_memory_mb: int | None = None) -> int:
+    """Rows per chunk so that one chunk's working set stays under max_memory_mb."""
+    budget = int(max_memory_mb or INGEST_MAX_MEMORY_MB) * 1024 * 1024
+
+    f.seek(0)
+    try:
+        sample = _read_csv(f, nrows=_SAMPLE_ROWS)
+    finally:
+        f.seek(0)
+
+    if len(sample) == 0:
+        return INGEST_MIN_CHUNK_ROWS
+
+    per_row = float(sample.memory_usage(deep=True, index=False).sum()) / len(sample)
+    rows = int(budget / max(1.0, per_row * _MEMORY_FACTOR))
+    return max(INGEST_MIN_CHUNK_ROWS, min(INGEST_MAX_CHUNK_ROWS, rows))
+
+
+def iter_csv_chunks(
+    f: BinaryIO,
+    stream: bool = True,
+    max_memory_mb: int | None = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield a CSV file (e.g. UploadFile.file, already spooled to disk) as dtype=str DataFrames.
+    - stream=True  => fixed-size chunks (read_csv chunksize on the spooled file)
+    - stream=False => one frame with the whole file (old behaviour)
+    Chunk index continues across chunks (RangeIndex offsets), like a full read.
+    """
+    if not stream:
+        f.seek(0)
+        yield _read_csv(f)
+        return
+
+    chunk_rows = chunk_rows_for(f, max_memory_mb)
+    f.seek(0)
+    for chunk in _read_csv(f, chunksize=chunk_rows):
+        yield chunk
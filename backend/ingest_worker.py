@@ -0,0 +1,109 @@
+# backend/ingest_worker.py
+# Drains the ingest_jobs queue.
+#
+#   python -m backend.ingest_worker                 # one process
+#   python -m backend.ingest_worker --processes 4   # more processes = more files ingested in parallel
+#
+# Needs the same DATABASE_URL and INGEST_UPLOAD_DIR as the API. Run it as its own service
+# (Procfile "worker", docker-compose worker) so the platform restarts it when it exits;
+# with --processes N it exits non-zero as soon as one of its processes dies.
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import multiprocessing.connection
+import os
+import signal
+import socket
+import sys
+import time
+
+INGEST_WORKER_POLL_SECONDS = float(os.getenv("INGEST_WORKER_POLL_SECONDS", "2"))
+
+
+def work_loop(poll_seconds: float = INGEST_WORKER_POLL_SECONDS, once: bool = False) -> None:
+    # importing main registers the ingest handlers (and checks the schema is migrated)
+    import backend.main  # noqa: F401
+    from backend.ingest_jobs import claim_next_job, run_job
+
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    stopping = {"flag": False}
+
+    def _stop(signum, frame):
+        # finish the current job, then exit
+        stopping["flag"] = True
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+    print(f"[ingest-worker {worker_id}] started", flush=True)
+    while not stopping["flag"]:
+        try:
+            job_id = claim_next_job(worker_id)
+        except Exception as e:
+            print(f"[ingest-worker {worker_id}] claim failed: {e}", flush=True)
+            time.sleep(poll_seconds)
+            continue
+
+        if job_id is None:
+            if once:
+                break
+            time.sleep(poll_seconds)
+            continue
+
+        t0 = time.perf_counter()
+        status = run_job(job_id)
+        print(
+            f"[ingest-worker {worker_id}] job {job_id} {status} in {time.perf_counter() - t0:.1f}s",
+            flush=True,
+        )
+
+    print(f"[ingest-worker {worker_id}] stopped", flush=True)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Run background ingest workers")
+    ap.add_argument("--processes", type=int, default=int(os.getenv("INGEST_WORKERS", "1")))
+    ap.add_argument("--poll", type=float, default=INGEST_WORKER_POLL_SECONDS)
+    ap.add_argument("--once", action="store_true", help="exit when the queue is empty")
+    args = ap.parse_args()
+
+    n = max(1, int(args.processes))
+    if n == 1:
+        work_loop(args.poll, args.once)
+        return
+
+    procs = [
+        multiprocessing.Process(target=work_loop, args=(args.poll, args.once), daemon=False)
+        for _ in range(n)
+    ]
+    for p in procs:
+        p.start()
+
+    def _forward(signum, frame):
+        for p in procs:
+            if p.is_alive():
+                os.kill(p.pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, _forward)
+    signal.signal(signal.SIGINT, _forward)
+
+    # one process dying takes the others down: exit non-zero so the supervisor restarts us
+    # instead of running with fewer workers than configured
+    crashed = False
+    alive = list(procs)
+    while alive:
+        multiprocessing.connection.wait([p.sentinel for p in alive])
+        for p in [p for p in alive if not p.is_alive()]:
+            alive.remove(p)
+            if p.exitcode and not crashed:
+                crashed = True
+                print(f"[ingest-worker] process {p.pid} exited with {p.exitcode}; stopping", flush=True)
+                _forward(None, None)
+    if crashed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
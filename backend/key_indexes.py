@@ -0,0 +1,36 @@
+# backend/key_indexes.py
+# Expression indexes for the normalized key comparisons the query builders use:
+#
+#   norm_key(SalesRaw.style_key) == ...   ->  lower(btrim(style_key))
+#
+# Query builders compare keys through norm_key(); Postgres parses trim(x) as btrim(x), so
+# the indexes match the expression it renders.
+# Keys are NOT rewritten in place: Myntra keys are already lowercased at ingest but Flipkart
+# SKUs keep their case (shown in the UI), so the index follows the queries instead.
+#
+# Built concurrently by backend/migrations/v0004_key_indexes.py, which keeps its own copy
+# (a new entry needs a new migration). Keep the expressions in sync with norm_key();
+# backend/explain_check.py fails when a hot query stops using them.
+
+from __future__ import annotations
+
+from sqlalchemy import func
+
+# name -> (table, index columns)
+KEY_INDEXES = {
+    "ix_sales_raw_ws_style_norm": ("sales_raw", "workspace_id, lower(btrim(style_key))"),
+    "ix_sales_raw_ws_sku_norm": ("sales_raw", "workspace_id, lower(btrim(seller_sku_code))"),
+    "ix_returns_raw_ws_style_norm": ("returns_raw", "workspace_id, lower(btrim(style_key))"),
+    "ix_returns_raw_ws_sku_norm": ("returns_raw", "workspace_id, lower(btrim(seller_sku_code))"),
+    "ix_catalog_raw_ws_style_norm": ("catalog_raw", "workspace_id, lower(btrim(style_key))"),
+    "ix_catalog_raw_ws_sku_norm": ("catalog_raw", "workspace_id, lower(btrim(seller_sku_code))"),
+    "ix_catalog_raw_ws_brand_norm": ("catalog_raw", "workspace_id, lower(btrim(brand))"),
+    "ix_style_monthly_ws_style_norm": ("style_monthly", "workspace_id, lower(btrim(style_key))"),
+    "ix_stock_raw_ws_sku_norm": ("stock_raw", "workspace_id, lower(btrim(seller_sku_code))"),
+    "ix_flipkart_traffic_raw_ws_sku_norm": ("flipkart_traffic_raw", "workspace_id, lower(btrim(seller_sku_code))"),
+}
+
+
+def norm_key(col):
+    """lower(trim(col)): the key comparison the KEY_INDEXES are built for."""
+    return func.lower(func.trim(col))
@@ -21,28 +21,52 @@ from sqlalchemy import exists, and_
 from sqlalchemy import cast, String
 from sqlalchemy import select
 
+import psycopg2
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy import case, text, and_
 from sqlalchemy.sql import select
 
+import numpy as np
 import pandas as pd
-from fastapi import FastAPI, File, HTTPException, Query, UploadFile
+from fastapi import FastAPI, File, HTTPException, Query, Request, Response, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import case, func, text, cast
 from sqlalchemy.dialects.postgresql import JSONB
 
-from sqlalchemy import and_, or_, Float
+from sqlalchemy import and_, or_, Float, Integer
 from sqlalchemy import cast, Numeric
 from sqlalchemy.dialects.postgresql import JSONB
 
-from backend.db import SessionLocal, Base, engine
-from backend.models import CatalogRaw, ReturnsRaw, SalesRaw, Workspace, MyntraWeeklyPerfRaw, StockRaw, FlipkartGstrSalesRaw
-
-# ensure tables exist (simple dev-mode migration)
+from backend.db import SessionLocal, Base, engine, ensure_workspace, invalidate_workspace_cache, resolve_workspace_id
+from backend.copy_loader import copy_frame, add_load_stats, ON_CONFLICT_MODES, ReplaceLoad
+from backend.daily_facts import facts_window, refresh_daily_facts, upload_fact_range
+from backend.data_version import KPI_CACHE, bump_data_version, bump_data_version_now, cached_by_data_version, etag_for, etag_matches
+from backend.ingest_stream import csv_header, iter_csv_chunks
+from backend.xlsx_stream import iter_xlsx_chunks
+from backend.date_parse import DateErrors, parse_date_column, parse_date_value
+from backend.return_reasons import clean_return_reason_series, heatmap_reason_key, reason_columns
+from backend.key_indexes import norm_key
+from backend.fact_brands import CatalogBrands, brand_norms_matching, normalize_brand, refresh_fact_brands, resolve_brand_norm
+from backend.migrations import require_current_schema
+from backend.monthly_snapshots import refresh_style_monthly
+from backend.portals import PORTALS, filter_portal, normalize_portal, portal_from_style_key
+from backend.ingest_jobs import INGEST_HANDLERS, enqueue_upload, register_ingest_handler
+from backend.uploads import check_duplicate, tracked_ingest, upload_to_dict
+from fastapi.concurrency import run_in_threadpool
+from backend.models import CatalogRaw, DailySkuFact, ReturnsRaw, SalesRaw, SkuMonthly, Workspace, MyntraWeeklyPerfRaw, StockRaw, FlipkartGstrSalesRaw, Upload
+
+# models of the other routers (mapped on Base before any query runs)
 from backend.reconciliation_models import MyntraPgForward, MyntraPgReverse, MyntraNonOrderSettlement, MyntraOrderFlow, MyntraSkuMap
 from backend.flipkart_recon_models import FlipkartSkuPnl, FlipkartOrderPnl, FlipkartPaymentReport
 from backend.cost_price_models import SkuCostPrice
-Base.metadata.create_all(bind=engine)
+from backend.ingest_job_models import IngestJob
+
+# schema changes run before deploy (python -m backend.migrations), never in request workers
+require_current_schema(engine)
+
+# the workspace reads fall back to without a slug; created here once, never by a GET
+with SessionLocal() as _db:
+    ensure_workspace(_db, "default")
 
 from datetime import datetime, timedelta
 from sqlalchemy import and_
@@ -66,6 +90,7 @@ from sqlalchemy.dialects.postgresql import JSONB
 from backend.reconciliation_routes import router as recon_router
 from backend.flipkart_recon_routes import router as fk_recon_router
 from backend.cost_price_routes import router as cost_price_router
+from backend.ingest_job_routes import router as ingest_jobs_router
 
 
 app = FastAPI(title="Project M API")
@@ -73,6 +98,29 @@ app = FastAPI(title="Project M API")
 app.include_router(recon_router)
 app.include_router(fk_recon_router)
 app.include_router(cost_price_router)
+app.include_router(ingest_jobs_router)
+
+# -----------------------------------------------------------------------------
+# ETag / If-None-Match on GET /db/* (backend/data_version.py)
+#  - the tag is computed before the handler runs: a load committing meanwhile can only make
+#    the body newer than its tag, and the next request then gets a new tag
+#  - registered before CORS so 304s carry the CORS headers too
+# -----------------------------------------------------------------------------
+@app.middleware("http")
+async def etag_middleware(request: Request, call_next):
+    if request.method != "GET":
+        return await call_next(request)
+    tag = await run_in_threadpool(etag_for, request.url.path, list(request.query_params.multi_items()))
+    if tag is None:
+        return await call_next(request)
+    headers = {"ETag": tag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), tag):
+        return Response(status_code=304, headers=headers)
+    response = await call_next(request)
+    if response.status_code == 200:
+        response.headers.update(headers)
+    return response
+
 
 app.add_middleware(
     CORSMiddleware,
@@ -81,116 +129,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
-# =========================
-# Return Reason Normalizer
-# =========================
-
-RETURN_REASON_MAP = {
-    "SIZE_TOO_BIG": [
-        "size too big",
-        "size is too large",
-    ],
-    "SIZE_TOO_SMALL": [
-        "size too small",
-        "size is too small",
-    ],
-    "SIZE_DIFFERENT": [
-        "size is different",
-    ],
-    "FIT_NOT_LIKED": [
-        "i did not like the fit",
-    ],
-    "QUALITY_DEFECT_DAMAGE": [
-        "product was defective",
-        "defective product was delivered",
-        "product was damaged",
-        "received a poor quality product",
-        "product looked old",
-        "product was dirty and had stains",
-    ],
-    "WRONG_PRODUCT_DELIVERED": [
-        "received a completely different product",
-        "received a different product",
-        "different product was delivered",
-    ],
-    "NOT_AS_EXPECTED_COLOR_IMAGE": [
-        "color is different",
-        "product image was better than the actual product",
-    ],
-    "FOUND_BETTER_PRICE": [
-        "found a better price elsewhere",
-        "found a better price on myntra",
-    ],
-    "DELIVERY_DELAYED": [
-        "delivery was delayed",
-    ],
-    "CUSTOMER_CHANGED_MIND": [
-    "i do not need it anymore",
-    "it did not look good on me",
-    ],
-    "GENERIC_OTHER": [
-        "generic return reason",
-    ],
-}
-
-# build reverse lookup once
-_REASON_LOOKUP = {}
-for clean, arr in RETURN_REASON_MAP.items():
-    for raw in arr:
-        _REASON_LOOKUP[raw.strip().lower()] = clean
-
-
-def clean_return_reason(raw_reason: str | None, return_type: str | None = None) -> str:
-    s = (raw_reason or "").strip().lower()
-    rt = (return_type or "").strip().upper()
-
-    if not s:
-        # Myntra RTO often has no reason in file
-        if rt == "RTO":
-            return "RTO_NO_REASON"
-        return "UNKNOWN"
-
-    return _REASON_LOOKUP.get(s, "OTHER")
-
-
-def heatmap_reason_key(raw_reason: str | None, return_type: str | None = None, portal: str | None = None) -> str:
-    """Heatmap reason label depends on portal.
-
-    - Myntra: use existing clean_return_reason bucketing.
-    - Flipkart: use return_sub_reason/return_reason codes as-is (normalized).
-    """
-    p = _portal_norm(portal)
-    rt = (return_type or "").strip().upper()
-    s = (raw_reason or "").strip()
-
-    if p == "flipkart":
-        if not s:
-            return "RTO_NO_REASON" if rt == "RTO" else "UNKNOWN"
-        return re.sub(r"[^A-Za-z0-9]+", "_", s).strip("_").upper()
-
-    return clean_return_reason(raw_reason, return_type)
-
 import sqlalchemy  # add near imports if not already
 
-def _reason_bucket_expr(reason_text_expr):
-    whens = []
-    for bucket, phrases in RETURN_REASON_MAP.items():
-        for p in phrases:
-            whens.append((reason_text_expr == p, bucket))
-
-    if not whens:
-        return "GENERIC_OTHER"
-
-    major = int(sqlalchemy.__version__.split(".")[0])
-    if major >= 2:
-        # SQLAlchemy 2.x expects positional whens
-        return case(*whens, else_="GENERIC_OTHER")
-    else:
-        # SQLAlchemy 1.4 accepts list-of-tuples
-        return case(whens, else_="GENERIC_OTHER")
-
 
 # -----------------------------------------------------------------------------
 # Helpers
@@ -216,46 +159,116 @@ def optional_col(df: pd.DataFrame, name: str) -> Optional[str]:
     return None
 
 
-def parse_dt_series(s: pd.Series) -> pd.Series:
-    """Parse date/datetime. Handles dd-mm, yyyy-mm, timestamps etc."""
-    raw = s.astype(str)
-    d1 = pd.to_datetime(raw, errors="coerce", dayfirst=True)
-    d10 = pd.to_datetime(raw.str.slice(0, 10), errors="coerce", dayfirst=True)
-    return d1.fillna(d10)
-
-def parse_date_any(x) -> Optional[datetime]:
+def parse_dt_series(
+    s: pd.Series,
+    report_type: str = "generic",
+    header: str | None = None,
+    errors: DateErrors | None = None,
+) -> pd.Series:
     """
-    Parse a single date/datetime value coming from CSV/Excel.
-    Returns a Python datetime (naive) or None.
+    Parse a date/datetime column (dd-mm, yyyy-mm, timestamps etc.).
+    The format is inferred once per (report_type, header) and cached; unparseable
+    non-blank cells go to `errors` (see backend.date_parse).
     """
-    if x is None:
-        return None
+    return parse_date_column(s, report_type, header, errors)
 
-    # already date/datetime
-    if isinstance(x, datetime):
-        return x.replace(tzinfo=None) if x.tzinfo else x
-    if isinstance(x, date):
-        return datetime.combine(x, time.min)
 
-    s = str(x).strip()
-    if not s:
-        return None
+# Normalized raw key of the per-unit seller price GMV is computed from (gmv column: the house
+# GMV endpoints never fell back to another price column)
+SELLER_PRICE_KEYS = ("sellerprice",)
+# seller_price column only (ASP optimizer, return amount): fallbacks when there is no seller price
+PRICE_FALLBACK_KEYS = ("sellingprice", "unitprice", "price")
+
 
+def to_price(x) -> Optional[float]:
     try:
-        dt = pd.to_datetime(s, errors="coerce", dayfirst=True)
-        if pd.isna(dt):
-            dt = pd.to_datetime(s[:10], errors="coerce", dayfirst=True)
-        if pd.isna(dt):
+        s = str(x).replace(",", "").strip()
+        if not s or s.lower() == "nan":
             return None
-
-        py_dt = dt.to_pydatetime() if hasattr(dt, "to_pydatetime") else dt
-        if isinstance(py_dt, datetime) and py_dt.tzinfo is not None:
-            py_dt = py_dt.replace(tzinfo=None)
-        return py_dt
+        return float(s)
     except Exception:
         return None
 
 
+def parse_raw_json(v) -> dict:
+    """Parse a stored raw_json value (JSON, or legacy python-repr dict)."""
+    if isinstance(v, dict):
+        return v
+    if isinstance(v, str) and v.strip():
+        try:
+            obj = json.loads(v)
+        except Exception:
+            try:
+                obj = ast.literal_eval(v) if v.strip().startswith("{") else {}
+            except Exception:
+                obj = {}
+        return obj if isinstance(obj, dict) else {}
+    return {}
+
+
+def seller_price_from_raw(raw: dict, keys: tuple[str, ...] = SELLER_PRICE_KEYS + PRICE_FALLBACK_KEYS) -> Optional[float]:
+    """Per-unit price from a raw row dict: the first of `keys` present (keys matched via _norm)."""
+    by_norm: dict = {}
+    for k, v in (raw or {}).items():
+        by_norm.setdefault(_norm(k), v)
+    for key in keys:
+        price = to_price(by_norm.get(key))
+        if price is not None:
+            return price
+    return None
+
+
+def seller_price_series(df: pd.DataFrame, keys: tuple[str, ...] = SELLER_PRICE_KEYS + PRICE_FALLBACK_KEYS) -> pd.Series:
+    """Vectorized seller_price_from_raw over a dtype=str frame (NaN when missing)."""
+    out = pd.Series(float("nan"), index=df.index, dtype="float64")
+    for key in keys:
+        col = optional_col(df, key)
+        if col is None:
+            continue
+        vals = pd.to_numeric(
+            df[col].astype(str).str.replace(",", "", regex=False).str.strip(),
+            errors="coerce",
+        )
+        out = out.fillna(vals)
+    return out
+
+
+# -----------------------------------------------------------------------------
+# Columnar ingest transform
+# Shared by the CSV ingests: build raw_json + typed columns for the whole frame
+# at once, then hand the insert-ready frame to copy_frame().
+# -----------------------------------------------------------------------------
+def raw_json_series(df: pd.DataFrame, extra: dict | None = None) -> pd.Series:
+    """
+    One JSON object per row (records-oriented), built in bulk by pandas.
+    `extra` adds/overrides keys (name -> Series/scalar), e.g. cleaned reasons.
+    """
+    src = df.assign(**extra) if extra else df
+    if len(src) == 0:
+        return pd.Series([], index=df.index, dtype=object)
+    lines = src.to_json(orient="records", lines=True, force_ascii=False).splitlines()
+    return pd.Series(lines, index=df.index, dtype=object)
+
+
+def blank_to_null(s: pd.Series) -> pd.Series:
+    return s.mask(s.astype(str).str.strip() == "")
+
+
+def insert_frame(df: pd.DataFrame, columns: dict) -> pd.DataFrame:
+    """
+    Insert-ready frame aligned to df's rows.
+    columns: target column -> Series (same index) | scalar | None
+    """
+    return pd.DataFrame(columns, index=df.index)
+
+def parse_date_any(x) -> Optional[datetime]:
+    """
+    Parse a single date/datetime value coming from CSV/Excel.
+    Returns a Python datetime (naive) or None. For whole columns use parse_dt_series.
+    """
+    return parse_date_value(x)
+
+
 def normalize_return_type(x: str) -> str:
     t = str(x).strip().lower()
     if "rto" in t:
@@ -267,45 +280,6 @@ def normalize_return_type(x: str) -> str:
     return t
 
 
-def resolve_workspace_id(db, slug_or_id: Optional[str]) -> uuid.UUID:
-    """Accepts workspace_slug, ensures it exists, returns UUID."""
-    s = (slug_or_id or "default").strip()
-    # UUID passed
-    try:
-        return uuid.UUID(s)
-    except Exception:
-        pass
-
-    slug = s.lower()
-
-    row = (
-        db.execute(
-            text("SELECT id FROM workspaces WHERE slug=:slug LIMIT 1"),
-            {"slug": slug},
-        )
-        .mappings()
-        .first()
-    )
-    if row and row.get("id"):
-        return row["id"]
-
-    created = (
-        db.execute(
-            text(
-                """
-                INSERT INTO workspaces (id, slug, name, created_at)
-                VALUES (gen_random_uuid(), :slug, :name, NOW())
-                RETURNING id
-                """
-            ),
-            {"slug": slug, "name": ("Default Workspace" if slug == "default" else slug.title())},
-        )
-        .mappings()
-        .first()
-    )
-    db.commit()
-    return created["id"]
-
 def _portal_norm(portal: str | None) -> str:
     p = (portal or "").strip().lower()
     return p or "myntra"
@@ -314,49 +288,15 @@ def _fk_prefix(ws_slug: str) -> str:
     return f"fk:{ws_slug}:"
 
 def _apply_portal_sales(q, ws_slug: str, portal: str | None):
-    p = _portal_norm(portal)
-
-    fk_match = or_(
-        SalesRaw.order_line_id.like("fk:%"),
-        func.lower(func.trim(func.coalesce(SalesRaw.style_key, ""))).like("fk:%"),
-        func.lower(func.trim(func.coalesce(SalesRaw.seller_sku_code, ""))).like("fk:%"),
-    )
-
-    if p == "flipkart":
-        return q.filter(fk_match)
-
-    if p == "myntra":
-        return q.filter(sqlalchemy.not_(fk_match))
-
-    return q
+    return filter_portal(q, SalesRaw.portal, _portal_norm(portal))
 
 
 def _apply_portal_returns(q, ws_slug: str, portal: str | None):
-    p = _portal_norm(portal)
-
-    fk_match = or_(
-        ReturnsRaw.order_line_id.like("fk:%"),
-        func.lower(func.trim(func.coalesce(ReturnsRaw.style_key, ""))).like("fk:%"),
-        func.lower(func.trim(func.coalesce(ReturnsRaw.seller_sku_code, ""))).like("fk:%"),
-    )
-
-    if p == "flipkart":
-        return q.filter(fk_match)
-
-    if p == "myntra":
-        return q.filter(sqlalchemy.not_(fk_match))
-
-    return q
+    return filter_portal(q, ReturnsRaw.portal, _portal_norm(portal))
 
 
 def _apply_portal_catalog(q, portal: str | None):
-    p = _portal_norm(portal)
-    # Flipkart styles are stored like "fk:<FSN>"
-    if p == "flipkart":
-        return q.filter(func.lower(func.trim(CatalogRaw.style_key)).like("fk:%"))
-    if p == "myntra":
-        return q.filter(sqlalchemy.not_(func.lower(func.trim(CatalogRaw.style_key)).like("fk:%")))
-    return q
+    return filter_portal(q, CatalogRaw.portal, _portal_norm(portal))
 
 
 def sales_orders_expr():
@@ -377,6 +317,12 @@ def health():
     return {"status": "ok"}
 
 
+@app.get("/db/cache/stats")
+def db_cache_stats():
+    """KPI response cache counters (per API process)."""
+    return KPI_CACHE.stats()
+
+
 # -----------------------------------------------------------------------------
 # Workspaces (for dropdown)
 # -----------------------------------------------------------------------------
@@ -443,6 +389,7 @@ def db_create_workspace(payload: WorkspaceCreate):
             raise HTTPException(status_code=409, detail=f"Workspace already exists: {slug}")
 
         db.refresh(ws)
+        invalidate_workspace_cache(slug)
         return {"id": str(ws.id), "slug": ws.slug, "name": ws.name}
 
     finally:
@@ -471,6 +418,8 @@ def db_delete_workspace(
             "stock_raw": int(db.query(func.count(StockRaw.id)).filter(StockRaw.workspace_id == ws_id).scalar() or 0),
             "weekly_perf_raw": int(db.query(func.count(MyntraWeeklyPerfRaw.id)).filter(MyntraWeeklyPerfRaw.workspace_id == ws_id).scalar() or 0),
             "style_monthly": int(db.query(func.count(StyleMonthly.id)).filter(StyleMonthly.workspace_id == ws_id).scalar() or 0),
+            "sku_monthly": int(db.query(func.count(SkuMonthly.id)).filter(SkuMonthly.workspace_id == ws_id).scalar() or 0),
+            "daily_sku_facts": int(db.query(func.count(DailySkuFact.id)).filter(DailySkuFact.workspace_id == ws_id).scalar() or 0),
         }
 
         total = sum(counts.values())
@@ -484,14 +433,21 @@ def db_delete_workspace(
         # Force delete: delete children first (no FK cascade assumed)
         if total > 0:
             db.query(StyleMonthly).filter(StyleMonthly.workspace_id == ws_id).delete(synchronize_session=False)
+            db.query(SkuMonthly).filter(SkuMonthly.workspace_id == ws_id).delete(synchronize_session=False)
+            db.query(DailySkuFact).filter(DailySkuFact.workspace_id == ws_id).delete(synchronize_session=False)
             db.query(MyntraWeeklyPerfRaw).filter(MyntraWeeklyPerfRaw.workspace_id == ws_id).delete(synchronize_session=False)
             db.query(StockRaw).filter(StockRaw.workspace_id == ws_id).delete(synchronize_session=False)
             db.query(CatalogRaw).filter(CatalogRaw.workspace_id == ws_id).delete(synchronize_session=False)
             db.query(ReturnsRaw).filter(ReturnsRaw.workspace_id == ws_id).delete(synchronize_session=False)
             db.query(SalesRaw).filter(SalesRaw.workspace_id == ws_id).delete(synchronize_session=False)
 
+        # upload registry entries are metadata only: never block the delete
+        db.query(Upload).filter(Upload.workspace_id == ws_id).delete(synchronize_session=False)
+
         db.delete(ws)
+        bump_data_version(db, ws_id)  # house-wide views lose this workspace
         db.commit()
+        invalidate_workspace_cache(slug)
 
         return {
             "deleted": True,
@@ -503,6 +459,26 @@ def db_delete_workspace(
         db.close()
 
 
+def _widen_date_range(rng: tuple, dt_series) -> tuple:
+    """(min, max) of the datetimes seen so far, widened by dt_series (NaT ignored)."""
+    lo, hi = rng
+    s_lo, s_hi = dt_series.min(), dt_series.max()
+    if not pd.isna(s_lo):
+        lo = s_lo.to_pydatetime() if lo is None else min(lo, s_lo.to_pydatetime())
+    if not pd.isna(s_hi):
+        hi = s_hi.to_pydatetime() if hi is None else max(hi, s_hi.to_pydatetime())
+    return lo, hi
+
+
+def _previous_dates(load: dict | None) -> pd.Series:
+    """Stored dates of the rows a delta load moved / updated (copy_frame previous=(date, style_key))."""
+    return pd.to_datetime(pd.Series([p[0] for p in (load or {}).get("previous", [])], dtype=object))
+
+
+def _previous_style_keys(load: dict | None) -> set[str]:
+    return {p[1] for p in (load or {}).get("previous", []) if p[1] is not None}
+
+
 def _month_start_dates_from_series(dt_series) -> list[date]:
     months = set()
     for ts in dt_series:
@@ -513,109 +489,228 @@ def _month_start_dates_from_series(dt_series) -> list[date]:
     return sorted(months)
 
 
-def refresh_style_monthly(db, ws_id, months: list[date] | None = None, full_refresh: bool = False) -> None:
-    sales_month = cast(func.date_trunc("month", SalesRaw.order_date), Date)
-    returns_month = cast(func.date_trunc("month", ReturnsRaw.return_date), Date)
+# -----------------------------------------------------------------------------
+# Backfill: sales_raw.seller_price / gmv from raw_json
+# One-time job for rows ingested before the typed columns existed.
+# Only touches rows with gmv IS NULL, so it is safe to re-run.
+# -----------------------------------------------------------------------------
+@app.post("/db/sales/backfill-gmv")
+def db_backfill_sales_gmv(
+    workspace_slug: str | None = Query(None, description="Optional. Default = all workspaces"),
+    batch_size: int = Query(5000, ge=100, le=50000),
+):
+    db = SessionLocal()
+    try:
+        ws_id = resolve_workspace_id(db, workspace_slug) if workspace_slug else None
 
-    if full_refresh:
-        sales_months = (
-            db.query(sales_month.label("m"))
-            .filter(SalesRaw.workspace_id == ws_id, SalesRaw.order_date.isnot(None))
+        last_id = 0
+        updated = 0
+        priced = 0
+        touched_ws = set()
+        while True:
+            q = (
+                db.query(SalesRaw.id, SalesRaw.units, SalesRaw.raw_json, SalesRaw.workspace_id)
+                .filter(SalesRaw.gmv.is_(None))
+                .filter(SalesRaw.id > last_id)
+            )
+            if ws_id is not None:
+                q = q.filter(SalesRaw.workspace_id == ws_id)
+            batch = q.order_by(SalesRaw.id).limit(int(batch_size)).all()
+            if not batch:
+                break
+
+            mappings = []
+            for rid, units, raw_json, row_ws in batch:
+                touched_ws.add(row_ws)
+                raw = parse_raw_json(raw_json)
+                price = seller_price_from_raw(raw)
+                mappings.append(
+                    {
+                        "id": rid,
+                        "seller_price": price,
+                        "gmv": (seller_price_from_raw(raw, SELLER_PRICE_KEYS) or 0.0) * int(units or 1),
+                    }
+                )
+                if price is not None:
+                    priced += 1
+
+            db.bulk_update_mappings(SalesRaw, mappings)
+            db.commit()
+
+            updated += len(mappings)
+            last_id = batch[-1][0]
+
+        if updated:
+            # gmv feeds the daily facts (and, through the seller price, their return amounts)
+            # and the revenue of the monthly snapshots
+            for w in touched_ws:
+                refresh_daily_facts(db, w, full_refresh=True)
+                refresh_style_monthly(db, w, full_refresh=True)  # commits
+            bump_data_version(db, ws_id)
+            db.commit()
+
+        return {
+            "ok": True,
+            "workspace_slug": workspace_slug,
+            "updated": int(updated),
+            "with_price": int(priced),
+            "without_price": int(updated - priced),
+        }
+    except HTTPException:
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"GMV backfill failed: {e}")
+    finally:
+        db.close()
+
+
+# -----------------------------------------------------------------------------
+# Ingest dispatch
+#  - background=False (default) => ingest in this request, but off the event loop; the
+#    response is the ingest result, as it always was
+#  - background=True  => opt in: upload saved + queued, worker ingests it (backend.ingest_worker)
+#  - handlers are wrapped by tracked_ingest (uploads registry): an identical file
+#    already loaded returns the earlier result (checked before queueing too)
+# -----------------------------------------------------------------------------
+async def run_or_enqueue_ingest(kind: str, file: UploadFile, background: bool, workspace_slug: str, **params):
+    if background:
+        if not params.get("replace") and not params.get("force"):
+            dup = await run_in_threadpool(check_duplicate, kind, file.file, workspace_slug)
+            if dup:
+                return dup
+        return await run_in_threadpool(
+            enqueue_upload, kind, file.file, file.filename, workspace_slug, **params
+        )
+    return await run_in_threadpool(
+        INGEST_HANDLERS[kind], file.file, file.filename, workspace_slug=workspace_slug, **params
+    )
+
+
+# -----------------------------------------------------------------------------
+# Uploads registry (backend/uploads.py)
+#  - list / inspect uploaded files
+#  - delete ONE file's rows (indexed on upload_id) instead of replace=true
+# -----------------------------------------------------------------------------
+_UPLOAD_ROW_MODELS = (SalesRaw, ReturnsRaw, CatalogRaw, StockRaw, MyntraWeeklyPerfRaw)
+
+
+def _parse_upload_id(upload_id: str) -> uuid.UUID:
+    try:
+        return uuid.UUID(str(upload_id))
+    except Exception:
+        raise HTTPException(status_code=400, detail=f"Invalid upload id: {upload_id}")
+
+
+@app.get("/db/uploads")
+def db_list_uploads(
+    workspace_slug: str = Query("default"),
+    report_type: str | None = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    db = SessionLocal()
+    try:
+        ws_id = resolve_workspace_id(db, workspace_slug)
+        q = db.query(Upload).filter(Upload.workspace_id == ws_id)
+        if report_type:
+            q = q.filter(Upload.report_type == report_type)
+        rows = q.order_by(Upload.created_at.desc()).limit(limit).all()
+        return {"workspace_slug": workspace_slug, "uploads": [upload_to_dict(u) for u in rows]}
+    finally:
+        db.close()
+
+
+@app.get("/db/uploads/{upload_id}")
+def db_get_upload(upload_id: str):
+    uid = _parse_upload_id(upload_id)
+    db = SessionLocal()
+    try:
+        up = db.get(Upload, uid)
+        if up is None:
+            raise HTTPException(status_code=404, detail=f"Upload not found: {upload_id}")
+        out = upload_to_dict(up)
+        out["result"] = json.loads(up.result_json) if up.result_json else None
+        return out
+    finally:
+        db.close()
+
+
+@app.delete("/db/uploads/{upload_id}")
+def db_delete_upload(upload_id: str):
+    uid = _parse_upload_id(upload_id)
+    db = SessionLocal()
+    try:
+        up = db.get(Upload, uid)
+        if up is None:
+            raise HTTPException(status_code=404, detail=f"Upload not found: {upload_id}")
+
+        # (month, style) pairs this file contributed to StyleMonthly
+        touched = set(
+            db.query(cast(func.date_trunc("month", SalesRaw.order_date), Date), SalesRaw.style_key)
+            .filter(SalesRaw.upload_id == uid, SalesRaw.order_date.isnot(None))
             .distinct()
             .all()
         )
-        returns_months = (
-            db.query(returns_month.label("m"))
-            .filter(ReturnsRaw.workspace_id == ws_id, ReturnsRaw.return_date.isnot(None))
+        touched |= set(
+            db.query(cast(func.date_trunc("month", ReturnsRaw.return_date), Date), ReturnsRaw.style_key)
+            .filter(ReturnsRaw.upload_id == uid, ReturnsRaw.return_date.isnot(None))
             .distinct()
             .all()
         )
-        months = sorted({r[0] for r in (sales_months + returns_months) if r[0] is not None})
 
-    if not months:
-        return
+        # days of the daily facts those rows (and the returns linked to its sales) fed
+        fact_days = upload_fact_range(db, uid)
 
-    # delete snapshot rows for these months
-    db.query(StyleMonthly).filter(
-        StyleMonthly.workspace_id == ws_id,
-        StyleMonthly.month_start.in_(months),
-    ).delete(synchronize_session=False)
-    db.commit()
+        deleted = {}
+        for M in _UPLOAD_ROW_MODELS:
+            deleted[M.__tablename__] = int(
+                db.query(M).filter(M.upload_id == uid).delete(synchronize_session=False) or 0
+            )
 
-    # sales aggregates
-    sales_rows = (
-        db.query(
-            sales_month.label("month_start"),
-            SalesRaw.style_key.label("style_key"),
-            func.sum(SalesRaw.units).label("orders"),
-            func.max(SalesRaw.order_date).label("last_order_date"),
-        )
-        .filter(
-            SalesRaw.workspace_id == ws_id,
-            SalesRaw.order_date.isnot(None),
-            SalesRaw.style_key.isnot(None),
-            sales_month.in_(months),
-        )
-        .group_by(sales_month, SalesRaw.style_key)
-        .all()
-    )
+        up.status = "deleted"
 
-    # returns aggregates
-    returns_rows = (
-        db.query(
-            returns_month.label("month_start"),
-            ReturnsRaw.style_key.label("style_key"),
-            func.sum(ReturnsRaw.units).label("returns"),
-        )
-        .filter(
-            ReturnsRaw.workspace_id == ws_id,
-            ReturnsRaw.return_date.isnot(None),
-            ReturnsRaw.style_key.isnot(None),
-            returns_month.in_(months),
-        )
-        .group_by(returns_month, ReturnsRaw.style_key)
-        .all()
-    )
+        fact_brands = None
+        if deleted.get(CatalogRaw.__tablename__):
+            fact_brands = refresh_fact_brands(db, up.workspace_id)
 
-    merged = {}
-    for r in sales_rows:
-        k = (r.month_start, r.style_key)
-        merged[k] = {
-            "workspace_id": ws_id,
-            "month_start": r.month_start,
-            "style_key": r.style_key,
-            "orders": int(r.orders or 0),
-            "returns": 0,
-            "revenue": None,
-            "last_order_date": r.last_order_date,
-            "return_pct": None,
-        }
+        facts = refresh_daily_facts(db, up.workspace_id, *fact_days)
 
-    for r in returns_rows:
-        k = (r.month_start, r.style_key)
-        if k not in merged:
-            merged[k] = {
-                "workspace_id": ws_id,
-                "month_start": r.month_start,
-                "style_key": r.style_key,
-                "orders": 0,
-                "returns": int(r.returns or 0),
-                "revenue": None,
-                "last_order_date": None,
-                "return_pct": None,
-            }
+        months = sorted({m for m, _ in touched if m is not None})
+        style_keys = sorted({k for _, k in touched if k is not None})
+        sm_stats = None
+        if months:
+            # commits the row deletes together with the StyleMonthly refresh
+            sm_stats = refresh_style_monthly(db, up.workspace_id, months=months, style_keys=style_keys)
         else:
-            merged[k]["returns"] = int(r.returns or 0)
+            db.commit()
+        bump_data_version_now(up.workspace_id)
 
-    for v in merged.values():
-        o = int(v["orders"] or 0)
-        rt = int(v["returns"] or 0)
-        v["return_pct"] = (float(rt) / float(o) * 100.0) if o > 0 else None
+        return {
+            "upload_id": str(uid),
+            "deleted": deleted,
+            "style_monthly": sm_stats,
+            "daily_facts": facts,
+            "fact_brands_updated": fact_brands,
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Upload delete failed: {e}")
+    finally:
+        db.close()
+
+
+ON_CONFLICT_HELP = (
+    "Rows whose order_line_id is already stored: error | skip | update "
+    "(re-uploading an overlapping export only touches the overlapping rows)"
+)
 
-    rows_to_insert = list(merged.values())
-    if rows_to_insert:
-        db.bulk_insert_mappings(StyleMonthly, rows_to_insert)
-        db.commit()
+
+def check_on_conflict(on_conflict: str) -> None:
+    if on_conflict not in ON_CONFLICT_MODES:
+        raise HTTPException(status_code=400, detail=f"on_conflict must be one of {list(ON_CONFLICT_MODES)}")
 
 
 # -----------------------------------------------------------------------------
@@ -626,80 +721,136 @@ def refresh_style_monthly(db, ws_id, months: list[date] | None = None, full_refr
 #  - created on
 # Qty: not present => each row = 1
 # -----------------------------------------------------------------------------
-@app.post("/db/ingest/sales")
-async def db_ingest_sales(
-    file: UploadFile = File(...),
-    replace: bool = False,
-    workspace_slug: str = Query("default"),
-):
-    content = await file.read()
+def ingest_sales_csv(
+    f,
+    filename: str | None,
+    replace: bool,
+    workspace_slug: str,
+    stream: bool = True,
+    progress=None,
+    on_conflict: str = "error",
+    style_monthly_delta: bool = True,
+    upload_id=None,
+) -> dict:
+    check_on_conflict(on_conflict)
+
     try:
-        df = pd.read_csv(io.BytesIO(content), dtype=str, keep_default_na=False)
+        header = csv_header(f)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Could not read CSV: {e}")
 
     try:
-        col_olid = require_col(df, "order line id")
-        col_style = require_col(df, "style id")
-        col_date = require_col(df, "created on")
-        col_sku = optional_col(df, "seller sku code")
+        col_olid = require_col(header, "order line id")
+        col_style = require_col(header, "style id")
+        col_date = require_col(header, "created on")
+        col_sku = optional_col(header, "seller sku code")
     except KeyError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    order_dt = parse_dt_series(df[col_date])
-
-    style_key = (
-        df[col_style].astype(str).str.strip().str.replace(r"\.0$", "", regex=True).str.lower()
-    )
-    order_line_id = (
-        df[col_olid].astype(str).str.strip().str.replace(r"\.0$", "", regex=True)
-    )
-    seller_sku = (
-        df[col_sku].astype(str).str.strip().str.lower() if col_sku else None
-    )
-
     db = SessionLocal()
     try:
         ws_id = resolve_workspace_id(db, workspace_slug)
 
-        if replace:
-            db.query(SalesRaw).filter(SalesRaw.workspace_id == ws_id).delete()
-            db.commit()
+        # replace: the file is staged in full and swapped in just before the commit
+        replacing = ReplaceLoad(db, SalesRaw.__tablename__, {"workspace_id": ws_id}) if replace else None
 
-        rows = []
-        for i in range(len(df)):
-            raw_row = df.iloc[i].to_dict()
-            rows.append(
+        rows_in_file = 0
+        chunks = 0
+        load = None
+        months: set[date] = set()
+        style_keys: set[str] = set()
+        date_range = (None, None)
+        date_errors = DateErrors()
+        brands = CatalogBrands.load(db, ws_id)
+
+        for df in iter_csv_chunks(f, stream=stream):
+            order_dt = parse_dt_series(df[col_date], "sales", col_date, date_errors)
+
+            style_key = (
+                df[col_style].astype(str).str.strip().str.replace(r"\.0$", "", regex=True).str.lower()
+            )
+            order_line_id = (
+                df[col_olid].astype(str).str.strip().str.replace(r"\.0$", "", regex=True)
+            )
+            seller_sku = (
+                df[col_sku].astype(str).str.strip().str.lower() if col_sku else None
+            )
+            seller_price = seller_price_series(df)
+            gmv_price = seller_price_series(df, SELLER_PRICE_KEYS)
+
+            frame = insert_frame(
+                df,
                 {
-                    "workspace_id": ws_id,
-                    "order_line_id": order_line_id.iat[i],
-                    "style_key": style_key.iat[i],
-                    "order_date": None if pd.isna(order_dt.iat[i]) else order_dt.iat[i].to_pydatetime(),
-                    "seller_sku_code": None if seller_sku is None else seller_sku.iat[i],
-                    "raw_json": json.dumps(raw_row, ensure_ascii=False),
+                    "workspace_id": str(ws_id),
+                    "upload_id": str(upload_id) if upload_id else None,
+                    "order_line_id": order_line_id,
+                    "style_key": style_key,
+                    "order_date": order_dt,
+                    "seller_sku_code": seller_sku,
+                    "brand_norm": resolve_brand_norm(brands, style_key, seller_sku),
+                    "portal": "myntra",
+                    "raw_json": raw_json_series(df),
                     "units": 1,  # Myntra: each row = 1 unit
-                }
+                    "seller_price": seller_price,
+                    "gmv": gmv_price.fillna(0.0) * 1,
+                },
             )
-
-        BATCH = 2000
-        inserted = 0
-        for start_i in range(0, len(rows), BATCH):
-            chunk = rows[start_i : start_i + BATCH]
-            db.bulk_insert_mappings(SalesRaw, chunk)
-            inserted += len(chunk)
-
+            if replacing:
+                replacing.add(frame)
+            else:
+                load = add_load_stats(
+                    load,
+                    copy_frame(
+                        db, SalesRaw.__tablename__, frame,
+                        on_conflict=on_conflict, conflict_cols=("order_line_id",),
+                        previous=("order_date", "style_key"),
+                    ),
+                )
+            months.update(_month_start_dates_from_series(order_dt))
+            date_range = _widen_date_range(date_range, order_dt)
+            style_keys.update(style_key.dropna().unique().tolist())
+            rows_in_file += int(len(df))
+            chunks += 1
+            if progress:
+                progress(rows_in_file, chunks)
+
+        if replacing:
+            load = replacing.swap(on_conflict=on_conflict, conflict_cols=("order_line_id",))
+        else:
+            # updated rows also leave the day / month / style they were counted in
+            prev_dt = _previous_dates(load)
+            months.update(_month_start_dates_from_series(prev_dt))
+            date_range = _widen_date_range(date_range, prev_dt)
+            style_keys.update(_previous_style_keys(load))
+        # daily facts of the file's days, committed together with the rows
+        facts = refresh_daily_facts(db, ws_id, *date_range, full_refresh=bool(replace), linked_returns=True)
         db.commit()
-        months = _month_start_dates_from_series(order_dt)
-        refresh_style_monthly(db, ws_id, months=months, full_refresh=bool(replace))
-
-
+        # StyleMonthly once for the whole file, not per chunk
+        # (delta: only the styles in this file, inside the file's months)
+        sm_stats = refresh_style_monthly(
+            db,
+            ws_id,
+            months=sorted(months),
+            full_refresh=bool(replace),
+            style_keys=sorted(style_keys) if (style_monthly_delta and not replace) else None,
+        )
 
         return {
-            "filename": file.filename,
-            "rows_in_file": int(len(df)),
-            "inserted": int(inserted),
+            "filename": filename,
+            "rows_in_file": int(rows_in_file),
+            "inserted": int((load or {}).get("inserted", 0)),
+            "updated": int((load or {}).get("updated", 0)),
+            "skipped": int((load or {}).get("skipped", 0)),
             "replace": bool(replace),
+            "on_conflict": on_conflict,
             "workspace_slug": workspace_slug,
+            "chunks": int(chunks),
+            "load": load,
+            "style_monthly": sm_stats,
+            "daily_facts": facts,
+            "date_min": date_range[0],
+            "date_max": date_range[1],
+            "date_errors": date_errors.to_dict(),
             "detected": {
                 "order_line_id": col_olid,
                 "style_id": col_style,
@@ -714,6 +865,28 @@ async def db_ingest_sales(
         db.close()
 
 
+@app.post("/db/ingest/sales")
+async def db_ingest_sales(
+    file: UploadFile = File(...),
+    replace: bool = False,
+    workspace_slug: str = Query("default"),
+    stream: bool = Query(True, description="Parse the CSV in memory-bounded chunks (INGEST_MAX_MEMORY_MB)"),
+    on_conflict: str = Query("error", description=ON_CONFLICT_HELP),
+    style_monthly_delta: bool = Query(True, description="Refresh StyleMonthly only for the styles in this file"),
+    force: bool = Query(False, description="Ingest even if this exact file was already loaded"),
+    background: bool = Query(False, description="Opt in: queue the file and return a job id (poll /db/jobs/{id}); needs the ingest worker"),
+):
+    check_on_conflict(on_conflict)
+    return await run_or_enqueue_ingest(
+        "sales", file, background, workspace_slug,
+        replace=replace, stream=stream, on_conflict=on_conflict, force=force,
+        style_monthly_delta=style_monthly_delta,
+    )
+
+
+register_ingest_handler("sales", tracked_ingest("sales", ingest_sales_csv))
+
+
 
 # -----------------------------------------------------------------------------
 # Ingest: RETURNS (EXACT headers)
@@ -728,111 +901,162 @@ async def db_ingest_sales(
 #  - If type contains "RTO" => use order_rto_date
 #  - Else => use return_created_date
 # -----------------------------------------------------------------------------
-@app.post("/db/ingest/returns")
-async def db_ingest_returns(
-    file: UploadFile = File(...),
-    replace: bool = False,
-    workspace_slug: str = Query("default"),
-):
-    content = await file.read()
+def ingest_returns_csv(
+    f,
+    filename: str | None,
+    replace: bool,
+    workspace_slug: str,
+    stream: bool = True,
+    progress=None,
+    on_conflict: str = "error",
+    style_monthly_delta: bool = True,
+    upload_id=None,
+) -> dict:
+    check_on_conflict(on_conflict)
+
     try:
-        df = pd.read_csv(io.BytesIO(content), dtype=str, keep_default_na=False)
+        header = csv_header(f)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Could not read CSV: {e}")
 
     try:
-        col_olid = require_col(df, "order_line_id")
-        col_style = require_col(df, "style_id")
-        col_type = require_col(df, "type")
-        col_qty = require_col(df, "quantity")
-        col_return_dt = require_col(df, "return_created_date")
-        col_rto_dt = require_col(df, "order_rto_date")
-        sku_col = optional_col(df, "seller_sku_code")  # optional
-        reason_col = optional_col(df, "return_reason")  # optional (but present in Myntra)
+        col_olid = require_col(header, "order_line_id")
+        col_style = require_col(header, "style_id")
+        col_type = require_col(header, "type")
+        col_qty = require_col(header, "quantity")
+        col_return_dt = require_col(header, "return_created_date")
+        col_rto_dt = require_col(header, "order_rto_date")
+        sku_col = optional_col(header, "seller_sku_code")  # optional
+        reason_col = optional_col(header, "return_reason")  # optional (but present in Myntra)
     except KeyError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    rtype = df[col_type].astype(str).map(normalize_return_type)
-    qty = pd.to_numeric(df[col_qty], errors="coerce").fillna(0).astype(int)
-
-    dt_return = parse_dt_series(df[col_return_dt])
-    dt_rto = parse_dt_series(df[col_rto_dt])
-
-    # choose date based on type
-    is_rto = rtype.astype(str).str.upper().str.strip() == "RTO"
-    chosen_dt = dt_return.where(~is_rto, dt_rto)
-
-    style_key = (
-        df[col_style]
-        .astype(str)
-        .str.strip()
-        .str.replace(r"\.0$", "", regex=True)
-        .str.lower()
-    )
-    order_line_id = (
-        df[col_olid].astype(str).str.strip().str.replace(r"\.0$", "", regex=True)
-    )
-    seller_sku = df[sku_col].astype(str).str.strip().str.lower() if sku_col else None
-
-    # reason series (optional)
-    raw_reason_series = (
-        df[reason_col].astype(str).str.strip() if reason_col else None
-    )
-
     db = SessionLocal()
     try:
         ws_id = resolve_workspace_id(db, workspace_slug)
 
-        if replace:
-            db.query(ReturnsRaw).filter(ReturnsRaw.workspace_id == ws_id).delete()
-            db.commit()
+        # replace: the file is staged in full and swapped in just before the commit
+        replacing = ReplaceLoad(db, ReturnsRaw.__tablename__, {"workspace_id": ws_id}) if replace else None
 
-        rows = []
-        for i in range(len(df)):
-            raw_row = df.iloc[i].to_dict()
+        rows_in_file = 0
+        chunks = 0
+        load = None
+        months: set[date] = set()
+        style_keys: set[str] = set()
+        date_range = (None, None)
+        date_errors = DateErrors()
+        brands = CatalogBrands.load(db, ws_id)
 
-            # enrich raw_json with cleaned reason (no DB migration needed)
-            raw_reason = None if raw_reason_series is None else raw_reason_series.iat[i]
-            clean_reason = clean_return_reason(raw_reason, rtype.iat[i])
+        for df in iter_csv_chunks(f, stream=stream):
+            rtype = df[col_type].astype(str).map(normalize_return_type)
+            qty = pd.to_numeric(df[col_qty], errors="coerce").fillna(0).astype(int)
 
-            # keep both (useful for audits)
-            raw_row["return_reason"] = raw_reason
-            raw_row["clean_return_reason"] = clean_reason
+            dt_return = parse_dt_series(df[col_return_dt], "returns", col_return_dt, date_errors)
+            dt_rto = parse_dt_series(df[col_rto_dt], "returns", col_rto_dt, date_errors)
 
-            rows.append(
-                {
-                    "workspace_id": ws_id,
-                    "order_line_id": order_line_id.iat[i],
-                    "style_key": style_key.iat[i],
-                    "return_date": None
-                    if pd.isna(chosen_dt.iat[i])
-                    else chosen_dt.iat[i].to_pydatetime(),
-                    "return_type": rtype.iat[i],
-                    "units": int(qty.iat[i]),
-                    "seller_sku_code": None if seller_sku is None else seller_sku.iat[i],
-                    "raw_json": json.dumps(raw_row, ensure_ascii=False),
-                }
+            # choose date based on type
+            is_rto = rtype.astype(str).str.upper().str.strip() == "RTO"
+            chosen_dt = dt_return.where(~is_rto, dt_rto)
+
+            style_key = (
+                df[col_style]
+                .astype(str)
+                .str.strip()
+                .str.replace(r"\.0$", "", regex=True)
+                .str.lower()
             )
+            order_line_id = (
+                df[col_olid].astype(str).str.strip().str.replace(r"\.0$", "", regex=True)
+            )
+            seller_sku = df[sku_col].astype(str).str.strip().str.lower() if sku_col else None
 
-        BATCH = 2000
-        inserted = 0
-        for start_i in range(0, len(rows), BATCH):
-            chunk = rows[start_i : start_i + BATCH]
-            db.bulk_insert_mappings(ReturnsRaw, chunk)
-            inserted += len(chunk)
-        db.commit()
-        months = _month_start_dates_from_series(chosen_dt)
-        refresh_style_monthly(db, ws_id, months=months, full_refresh=bool(replace))
+            # reason series (optional)
+            raw_reason_series = (
+                df[reason_col].astype(str).str.strip() if reason_col else None
+            )
 
-    
+            # enrich raw_json with cleaned reason; keep both (useful for audits)
+            clean_reason = clean_return_reason_series(raw_reason_series, rtype)
+            reason_raw, reason_bucket = reason_columns(raw_reason_series, rtype, "myntra")
+            raw_json = raw_json_series(
+                df,
+                extra={"return_reason": raw_reason_series, "clean_return_reason": clean_reason},
+            )
 
+            frame = insert_frame(
+                df,
+                {
+                    "workspace_id": str(ws_id),
+                    "upload_id": str(upload_id) if upload_id else None,
+                    "order_line_id": order_line_id,
+                    "style_key": style_key,
+                    "return_date": chosen_dt,
+                    "return_type": rtype,
+                    "units": qty,
+                    "seller_sku_code": seller_sku,
+                    "brand_norm": resolve_brand_norm(brands, style_key, seller_sku),
+                    "portal": "myntra",
+                    "raw_json": raw_json,
+                    "reason_raw": reason_raw,
+                    "reason_bucket": reason_bucket,
+                },
+            )
+            if replacing:
+                replacing.add(frame)
+            else:
+                load = add_load_stats(
+                    load,
+                    copy_frame(
+                        db, ReturnsRaw.__tablename__, frame,
+                        on_conflict=on_conflict, conflict_cols=("order_line_id",),
+                        previous=("return_date", "style_key"),
+                    ),
+                )
+            months.update(_month_start_dates_from_series(chosen_dt))
+            date_range = _widen_date_range(date_range, chosen_dt)
+            style_keys.update(style_key.dropna().unique().tolist())
+            rows_in_file += int(len(df))
+            chunks += 1
+            if progress:
+                progress(rows_in_file, chunks)
+
+        if replacing:
+            load = replacing.swap(on_conflict=on_conflict, conflict_cols=("order_line_id",))
+        else:
+            # updated rows also leave the day / month / style they were counted in
+            prev_dt = _previous_dates(load)
+            months.update(_month_start_dates_from_series(prev_dt))
+            date_range = _widen_date_range(date_range, prev_dt)
+            style_keys.update(_previous_style_keys(load))
+        # daily facts of the file's days, committed together with the rows
+        facts = refresh_daily_facts(db, ws_id, *date_range, full_refresh=bool(replace))
+        db.commit()
+        # StyleMonthly once for the whole file, not per chunk
+        # (delta: only the styles in this file, inside the file's months)
+        sm_stats = refresh_style_monthly(
+            db,
+            ws_id,
+            months=sorted(months),
+            full_refresh=bool(replace),
+            style_keys=sorted(style_keys) if (style_monthly_delta and not replace) else None,
+        )
 
         return {
-            "filename": file.filename,
-            "rows_in_file": int(len(df)),
-            "inserted": int(inserted),
+            "filename": filename,
+            "rows_in_file": int(rows_in_file),
+            "inserted": int((load or {}).get("inserted", 0)),
+            "updated": int((load or {}).get("updated", 0)),
+            "skipped": int((load or {}).get("skipped", 0)),
             "replace": bool(replace),
+            "on_conflict": on_conflict,
             "workspace_slug": workspace_slug,
+            "chunks": int(chunks),
+            "load": load,
+            "style_monthly": sm_stats,
+            "daily_facts": facts,
+            "date_min": date_range[0],
+            "date_max": date_range[1],
+            "date_errors": date_errors.to_dict(),
             "detected": {
                 "order_line_id": col_olid,
                 "style_id": col_style,
@@ -851,6 +1075,28 @@ async def db_ingest_returns(
         db.close()
 
 
+@app.post("/db/ingest/returns")
+async def db_ingest_returns(
+    file: UploadFile = File(...),
+    replace: bool = False,
+    workspace_slug: str = Query("default"),
+    stream: bool = Query(True, description="Parse the CSV in memory-bounded chunks (INGEST_MAX_MEMORY_MB)"),
+    on_conflict: str = Query("error", description=ON_CONFLICT_HELP),
+    style_monthly_delta: bool = Query(True, description="Refresh StyleMonthly only for the styles in this file"),
+    force: bool = Query(False, description="Ingest even if this exact file was already loaded"),
+    background: bool = Query(False, description="Opt in: queue the file and return a job id (poll /db/jobs/{id}); needs the ingest worker"),
+):
+    check_on_conflict(on_conflict)
+    return await run_or_enqueue_ingest(
+        "returns", file, background, workspace_slug,
+        replace=replace, stream=stream, on_conflict=on_conflict, force=force,
+        style_monthly_delta=style_monthly_delta,
+    )
+
+
+register_ingest_handler("returns", tracked_ingest("returns", ingest_returns_csv))
+
+
 
 # -----------------------------------------------------------------------------
 # Ingest: CATALOG / LISTING (EXACT headers)
@@ -861,70 +1107,87 @@ async def db_ingest_returns(
 #  - style name   -> product_name
 #  - seller sku code -> seller_sku_code
 # -----------------------------------------------------------------------------
-@app.post("/db/ingest/catalog")
-async def db_ingest_catalog(
-    file: UploadFile = File(...),
-    replace: bool = False,
-    workspace_slug: str = Query("default"),
-):
-    content = await file.read()
+def ingest_catalog_csv(
+    f,
+    filename: str | None,
+    replace: bool,
+    workspace_slug: str,
+    stream: bool = True,
+    progress=None,
+    upload_id=None,
+) -> dict:
     try:
-        df = pd.read_csv(io.BytesIO(content), dtype=str, keep_default_na=False)
+        header = csv_header(f)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Could not read CSV: {e}")
 
     try:
-        col_style = require_col(df, "style id")
-        col_live = require_col(df, "style catalogued date")
-        col_brand = require_col(df, "brand")
-        col_name = require_col(df, "style name")
-        col_sku = require_col(df, "seller sku code")
+        col_style = require_col(header, "style id")
+        col_live = require_col(header, "style catalogued date")
+        col_brand = require_col(header, "brand")
+        col_name = require_col(header, "style name")
+        col_sku = require_col(header, "seller sku code")
     except KeyError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    style_key = df[col_style].astype(str).str.strip().str.replace(r"\.0$", "", regex=True).str.lower()
-    live_dt = parse_dt_series(df[col_live])
-    brand = df[col_brand].astype(str).str.strip()
-    pname = df[col_name].astype(str).str.strip()
-    sku = df[col_sku].astype(str).str.strip().str.lower()
-
     db = SessionLocal()
     try:
         ws_id = resolve_workspace_id(db, workspace_slug)
 
-        if replace:
-            db.query(CatalogRaw).filter(CatalogRaw.workspace_id == ws_id).delete()
-            db.commit()
+        # replace: the file is staged in full and swapped in just before the commit
+        replacing = ReplaceLoad(db, CatalogRaw.__tablename__, {"workspace_id": ws_id}) if replace else None
 
-        rows = []
-        for i in range(len(df)):
-            raw_row = df.iloc[i].to_dict()
-            rows.append(
+        rows_in_file = 0
+        chunks = 0
+        load = None
+        date_errors = DateErrors()
+
+        for df in iter_csv_chunks(f, stream=stream):
+            style_key = df[col_style].astype(str).str.strip().str.replace(r"\.0$", "", regex=True).str.lower()
+            live_dt = parse_dt_series(df[col_live], "catalog", col_live, date_errors)
+            brand = df[col_brand].astype(str).str.strip()
+            pname = df[col_name].astype(str).str.strip()
+            sku = df[col_sku].astype(str).str.strip().str.lower()
+
+            frame = insert_frame(
+                df,
                 {
-                    "workspace_id": ws_id,
-                    "style_key": style_key.iat[i],
-                    "seller_sku_code": sku.iat[i] if sku.iat[i] else None,
-                    "brand": brand.iat[i] if brand.iat[i] else None,
-                    "product_name": pname.iat[i] if pname.iat[i] else None,
-                    "style_catalogued_date": None if pd.isna(live_dt.iat[i]) else live_dt.iat[i].to_pydatetime(),
-                    "raw_json": json.dumps(raw_row, ensure_ascii=False),
-                }
+                    "workspace_id": str(ws_id),
+                    "upload_id": str(upload_id) if upload_id else None,
+                    "style_key": style_key,
+                    "seller_sku_code": blank_to_null(sku),
+                    "brand": blank_to_null(brand),
+                    "product_name": blank_to_null(pname),
+                    "style_catalogued_date": live_dt,
+                    "portal": portal_from_style_key(style_key),
+                    "raw_json": raw_json_series(df),
+                },
             )
-
-        BATCH = 2000
-        inserted = 0
-        for start_i in range(0, len(rows), BATCH):
-            chunk = rows[start_i : start_i + BATCH]
-            db.bulk_insert_mappings(CatalogRaw, chunk)
-            inserted += len(chunk)
+            if replacing:
+                replacing.add(frame)
+            else:
+                load = add_load_stats(load, copy_frame(db, CatalogRaw.__tablename__, frame))
+            rows_in_file += int(len(df))
+            chunks += 1
+            if progress:
+                progress(rows_in_file, chunks)
+
+        if replacing:
+            load = replacing.swap()
+        # brands may have moved between styles: re-resolve the workspace's sales/returns
+        fact_brands = refresh_fact_brands(db, ws_id)
         db.commit()
 
         return {
-            "filename": file.filename,
-            "rows_in_file": int(len(df)),
-            "inserted": int(inserted),
+            "filename": filename,
+            "rows_in_file": int(rows_in_file),
+            "inserted": int((load or {}).get("rows", 0)),
             "replace": bool(replace),
             "workspace_slug": workspace_slug,
+            "chunks": int(chunks),
+            "load": load,
+            "fact_brands_updated": fact_brands,
+            "date_errors": date_errors.to_dict(),
             "detected": {
                 "style_id": col_style,
                 "style_catalogued_date": col_live,
@@ -939,6 +1202,24 @@ async def db_ingest_catalog(
     finally:
         db.close()
 
+
+@app.post("/db/ingest/catalog")
+async def db_ingest_catalog(
+    file: UploadFile = File(...),
+    replace: bool = False,
+    workspace_slug: str = Query("default"),
+    stream: bool = Query(True, description="Parse the CSV in memory-bounded chunks (INGEST_MAX_MEMORY_MB)"),
+    force: bool = Query(False, description="Ingest even if this exact file was already loaded"),
+    background: bool = Query(False, description="Opt in: queue the file and return a job id (poll /db/jobs/{id}); needs the ingest worker"),
+):
+    return await run_or_enqueue_ingest(
+        "catalog", file, background, workspace_slug,
+        replace=replace, stream=stream, force=force,
+    )
+
+
+register_ingest_handler("catalog", tracked_ingest("catalog", ingest_catalog_csv))
+
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy import cast
 
@@ -964,7 +1245,7 @@ def db_brands(
 
 
         def json_brand_expr(model_raw_json_col):
-            # raw_json is stored as TEXT in models -> cast to JSONB
+            # raw_json is JSONB (the cast is a no-op; still parses tables not migrated yet)
             j = cast(model_raw_json_col, JSONB)
             # try common keys safely; whichever exists will come through
             b1 = func.nullif(func.trim(j["brand"].astext), "")
@@ -1064,7 +1345,7 @@ def db_kpi_house_gmv(
     House GMV across ALL workspaces.
     - If start/end not provided => all-time
     - If start/end provided => date range on sales_raw.order_date
-    GMV uses Seller Price (sellerprice) from sales_raw.raw_json * units
+    GMV uses Seller Price (sales_raw.gmv = raw sellerprice * units, no fallback price)
     """
     db = SessionLocal()
     try:
@@ -1077,65 +1358,22 @@ def db_kpi_house_gmv(
             start_dt = datetime.combine(start, time.min)
             end_dt_excl = datetime.combine(end + timedelta(days=1), time.min)
 
-        def to_float(x):
-            try:
-                s = str(x).replace(",", "").strip()
-                if not s or s.lower() == "nan":
-                    return None
-                return float(s)
-            except Exception:
-                return None
-
-        def pick_by_norm(d: dict, desired_norm: str):
-            for k, v in d.items():
-                if _norm(k) == desired_norm:
-                    return v
-            return None
-
         # Map workspace_id -> {orders, gmv}
         agg: dict[str, dict] = {}
 
         q = (
-            db.query(SalesRaw.workspace_id, SalesRaw.units, SalesRaw.raw_json, SalesRaw.order_date)
+            db.query(
+                SalesRaw.workspace_id.label("ws_id"),
+                func.coalesce(func.sum(func.coalesce(SalesRaw.units, 1)), 0).label("orders"),
+                func.coalesce(func.sum(SalesRaw.gmv), 0.0).label("gmv"),
+            )
             .filter(SalesRaw.order_date.isnot(None))
         )
         if start_dt and end_dt_excl:
             q = q.filter(SalesRaw.order_date >= start_dt).filter(SalesRaw.order_date < end_dt_excl)
 
-        # stream-ish iteration (no big memory spike)
-        for ws_id, units, raw_json, _od in q.yield_per(5000):
-            ws_key = str(ws_id)
-
-            u = int(units or 1)
-
-            raw = {}
-            v = raw_json
-            if isinstance(v, dict):
-                raw = v
-            elif isinstance(v, str) and v.strip():
-                try:
-                    raw = json.loads(v)
-                except Exception:
-                    try:
-                        raw = ast.literal_eval(v) if v.strip().startswith("{") else {}
-                    except Exception:
-                        raw = {}
-                if not isinstance(raw, dict):
-                    raw = {}
-            else:
-                raw = {}
-
-            price_val = pick_by_norm(raw, "sellerprice")
-            price = to_float(price_val) or 0.0
-            gmv = price * u
-
-            rec = agg.get(ws_key)
-            if not rec:
-                rec = {"orders": 0, "gmv": 0.0}
-                agg[ws_key] = rec
-
-            rec["orders"] += u
-            rec["gmv"] += gmv
+        for r in q.group_by(SalesRaw.workspace_id).all():
+            agg[str(r.ws_id)] = {"orders": int(r.orders or 0), "gmv": float(r.gmv or 0.0)}
 
         # workspace meta
         ws_rows = db.query(Workspace.id, Workspace.slug, Workspace.name).all()
@@ -1182,11 +1420,11 @@ def db_kpi_house_summary(
     - If start/end not provided => all-time
     - If start/end provided => date range (inclusive)
     GMV:
-      - Myntra => sellerprice * units from SalesRaw.raw_json
+      - Myntra => SalesRaw.gmv (sellerprice * units)
       - Flipkart => from FlipkartGstrSalesRaw.buyer_invoice_amount
     Returns units from ReturnsRaw.units (fallback 1)
     Return split: RTO vs CUSTOMER_RETURN (everything not RTO treated as CUSTOMER)
-    Portal filtering is via order_line_id prefix: "fk:%"
+    Portal filtering is via the portal column
     """
     db = SessionLocal()
     try:
@@ -1204,41 +1442,26 @@ def db_kpi_house_summary(
 
         # Portal filter helpers (do NOT rely on closure variables)
         def apply_sales_portal_filter(q, pval: str | None):
-            if pval == "flipkart":
-                return q.filter(SalesRaw.order_line_id.like("fk:%"))
-            if pval == "myntra":
-                return q.filter(~SalesRaw.order_line_id.like("fk:%"))
+            if pval in PORTALS:
+                return q.filter(SalesRaw.portal == pval)
             return q  # all
 
         def apply_returns_portal_filter(q, pval: str | None):
-            if pval == "flipkart":
-                return q.filter(ReturnsRaw.order_line_id.like("fk:%"))
-            if pval == "myntra":
-                return q.filter(~ReturnsRaw.order_line_id.like("fk:%"))
+            if pval in PORTALS:
+                return q.filter(ReturnsRaw.portal == pval)
             return q  # all
 
-        def to_float(x):
-            try:
-                s = str(x).replace(",", "").strip()
-                if not s or s.lower() == "nan":
-                    return None
-                return float(s)
-            except Exception:
-                return None
-
-        def pick_by_norm(d: dict, desired_norm: str):
-            for k, v in d.items():
-                if _norm(k) == desired_norm:
-                    return v
-            return None
-
         # -----------------------
         # SALES aggregation (workspace-wise)
         # -----------------------
         sales_agg: dict[str, dict] = {}
 
         sq = apply_sales_portal_filter(
-            db.query(SalesRaw.workspace_id, SalesRaw.units, SalesRaw.raw_json, SalesRaw.order_date)
+            db.query(
+                SalesRaw.workspace_id.label("ws_id"),
+                func.coalesce(func.sum(func.coalesce(SalesRaw.units, 1)), 0).label("orders"),
+                func.coalesce(func.sum(SalesRaw.gmv), 0.0).label("gmv"),
+            )
             .filter(SalesRaw.order_date.isnot(None)),
             p,
         )
@@ -1246,36 +1469,12 @@ def db_kpi_house_summary(
         if start_dt and end_dt_excl:
             sq = sq.filter(SalesRaw.order_date >= start_dt).filter(SalesRaw.order_date < end_dt_excl)
 
-        for ws_id, units, raw_json, _od in sq.yield_per(5000):
-            ws_key = str(ws_id)
-            u = int(units or 1)
-
-            rec = sales_agg.get(ws_key)
-            if not rec:
-                rec = {"orders": 0, "gmv": 0.0}
-                sales_agg[ws_key] = rec
-
-            rec["orders"] += u
-
-            # Myntra GMV from sellerprice; Flipkart GMV comes from GSTR below
-            if p != "flipkart":
-                raw = {}
-                v = raw_json
-                if isinstance(v, dict):
-                    raw = v
-                elif isinstance(v, str) and v.strip():
-                    try:
-                        raw = json.loads(v)
-                    except Exception:
-                        raw = {}
-                    if not isinstance(raw, dict):
-                        raw = {}
-                else:
-                    raw = {}
-
-                price_val = pick_by_norm(raw, "sellerprice")
-                price = to_float(price_val) or 0.0
-                rec["gmv"] += price * u
+        for r in sq.group_by(SalesRaw.workspace_id).all():
+            sales_agg[str(r.ws_id)] = {
+                "orders": int(r.orders or 0),
+                # Myntra GMV from sellerprice; Flipkart GMV comes from GSTR below
+                "gmv": float(r.gmv or 0.0) if p != "flipkart" else 0.0,
+            }
 
         # -----------------------
         # FLIPKART GMV (GSTR) aggregation (workspace-wise)
@@ -1396,9 +1595,6 @@ def db_kpi_house_monthly(
     try:
         months = int(months)
 
-        def month_key(dt: datetime) -> str:
-            return f"{dt.year:04d}-{dt.month:02d}"
-
         def shift_month(y: int, m: int, delta: int):
             mm = (y * 12 + (m - 1)) + delta
             ny = mm // 12
@@ -1412,67 +1608,34 @@ def db_kpi_house_monthly(
         p = _portal_norm(portal)
         start_date = start_dt.date()
 
-        def to_float(x):
-            try:
-                s = str(x).replace(",", "").strip()
-                if not s or s.lower() == "nan":
-                    return None
-                return float(s)
-            except Exception:
-                return None
-
-        def pick_by_norm(d: dict, desired_norm: str):
-            for k, v in d.items():
-                if _norm(k) == desired_norm:
-                    return v
-            return None
-
         agg: dict[str, dict] = {}
 
-        # SALES (loop, consistent with your GMV logic)
+        # SALES + RETURNS (sku_monthly snapshot: one row per month x SKU, not per order line)
+        s_month = func.to_char(SkuMonthly.month_start, "YYYY-MM")
         sq = (
-            db.query(SalesRaw.units, SalesRaw.raw_json, SalesRaw.order_date, SalesRaw.order_line_id)
-            .filter(SalesRaw.order_date.isnot(None))
-            .filter(SalesRaw.order_date >= start_dt)
+            db.query(
+                s_month.label("month_key"),
+                func.coalesce(func.sum(SkuMonthly.orders), 0).label("orders"),
+                func.coalesce(func.sum(SkuMonthly.revenue), 0.0).label("gmv"),
+                func.coalesce(func.sum(SkuMonthly.returns), 0).label("total_units"),
+                func.coalesce(func.sum(SkuMonthly.rto_returns), 0).label("rto_units"),
+            )
+            .filter(SkuMonthly.month_start >= start_date)
         )
-        if p == "flipkart":
-            sq = sq.filter(SalesRaw.order_line_id.like("fk:%"))
-        elif p == "myntra":
-            sq = sq.filter(~SalesRaw.order_line_id.like("fk:%"))
-
-        for units, raw_json, od, _olid in sq.yield_per(5000):
-            if not od:
-                continue
-            mk = month_key(od)
-
-            rec = agg.get(mk)
-            if not rec:
-                rec = {"orders": 0, "gmv": 0.0, "returns_total": 0, "returns_rto": 0, "returns_customer": 0}
-                agg[mk] = rec
-
-            u = int(units or 1)
-
-            raw = {}
-            v = raw_json
-            if isinstance(v, dict):
-                raw = v
-            elif isinstance(v, str) and v.strip():
-                try:
-                    raw = json.loads(v)
-                except Exception:
-                    raw = {}
-                if not isinstance(raw, dict):
-                    raw = {}
-            else:
-                raw = {}
+        if p in PORTALS:
+            sq = sq.filter(SkuMonthly.portal == p)
 
-            rec["orders"] += u
-
-            # Myntra GMV from sellerprice; Flipkart GMV comes from GSTR (added below)
-            if p != "flipkart":
-                price_val = pick_by_norm(raw, "sellerprice")
-                price = to_float(price_val) or 0.0
-                rec["gmv"] += price * u
+        for r in sq.group_by(s_month).all():
+            total_u = int(r.total_units or 0)
+            rto_u = int(r.rto_units or 0)
+            agg[str(r.month_key)] = {
+                "orders": int(r.orders or 0),
+                # Myntra GMV from sellerprice; Flipkart GMV comes from GSTR (added below)
+                "gmv": float(r.gmv or 0.0) if p != "flipkart" else 0.0,
+                "returns_total": total_u,
+                "returns_rto": rto_u,
+                "returns_customer": max(0, total_u - rto_u),
+            }
 
         # FLIPKART GMV monthly from GSTR
         if p in (None, "flipkart"):
@@ -1496,40 +1659,6 @@ def db_kpi_house_monthly(
                 rec["gmv"] += float(r.gmv or 0.0)
 
 
-        # RETURNS (SQL aggregate)
-        unit_expr = func.coalesce(ReturnsRaw.units, 1)
-        rto_flag = func.upper(func.trim(func.coalesce(ReturnsRaw.return_type, ""))) == "RTO"
-        month_expr = func.to_char(ReturnsRaw.return_date, "YYYY-MM")
-
-        rq = (
-            db.query(
-                month_expr.label("month_key"),
-                func.coalesce(func.sum(unit_expr), 0).label("total_units"),
-                func.coalesce(func.sum(case((rto_flag, unit_expr), else_=0)), 0).label("rto_units"),
-            )
-            .filter(ReturnsRaw.return_date.isnot(None))
-            .filter(ReturnsRaw.return_date >= start_dt)
-        )
-        if p == "flipkart":
-            rq = rq.filter(ReturnsRaw.order_line_id.like("fk:%"))
-        elif p == "myntra":
-            rq = rq.filter(~ReturnsRaw.order_line_id.like("fk:%"))
-
-        rq = rq.group_by(month_expr).all()
-
-
-        for r in rq:
-            mk = str(r.month_key)
-            rec = agg.get(mk)
-            if not rec:
-                rec = {"orders": 0, "gmv": 0.0, "returns_total": 0, "returns_rto": 0, "returns_customer": 0}
-                agg[mk] = rec
-            total_u = int(r.total_units or 0)
-            rto_u = int(r.rto_units or 0)
-            rec["returns_total"] = total_u
-            rec["returns_rto"] = rto_u
-            rec["returns_customer"] = max(0, total_u - rto_u)
-
         # Build ordered list for last N months
         rows_out = []
         y, m = y_start, m_start
@@ -1610,42 +1739,11 @@ def db_kpi_brand_gmv_asp(
             }
 
         # -----------------------------
-        # Myntra / others: keep existing SalesRaw logic
+        # Myntra / others: per-style units / GMV from the daily facts
         # -----------------------------
-        start_dt = datetime.combine(start, time.min)
-        end_dt_excl = datetime.combine(end + timedelta(days=1), time.min)
-
         def _norm(s: str) -> str:
             return "".join(ch for ch in str(s or "").strip().lower() if ch.isalnum())
 
-        def to_float(x):
-            try:
-                s = str(x).replace(",", "").strip()
-                if not s or s.lower() == "nan":
-                    return 0.0
-                return float(s)
-            except Exception:
-                return 0.0
-
-        # seller price from raw_json (try common keys)
-        sellerprice_txt = cast(SalesRaw.raw_json, JSONB).op("->>")("sellerprice")
-        seller_price_txt = cast(SalesRaw.raw_json, JSONB).op("->>")("seller price")
-        sellingprice_txt = cast(SalesRaw.raw_json, JSONB).op("->>")("sellingprice")
-
-        seller_price_num = cast(
-            func.nullif(
-                func.trim(
-                    func.replace(
-                        func.coalesce(sellerprice_txt, seller_price_txt, sellingprice_txt),
-                        ",",
-                        "",
-                    )
-                ),
-                "",
-            ),
-            Numeric,
-        )
-
         # Brand mapping from catalog (style_key -> brand)
         style_to_brand = {}
         cat_q = (
@@ -1659,45 +1757,41 @@ def db_kpi_brand_gmv_asp(
                 continue
             style_to_brand[str(sk)] = (br or "").strip() or "(Unknown)"
 
-        style_key_filter = None
+        # brand filter on SalesRaw.brand_norm (the catalog brands equal to `brand` under _norm)
+        brand_norms = None
         if brand:
-            bnorm = _norm(brand)
-            allowed = [sk for sk, br in style_to_brand.items() if _norm(br) == bnorm]
-            style_key_filter = set(allowed)
-            if len(style_key_filter) == 0:
+            brand_norms = brand_norms_matching(db, ws_id, brand, _norm)
+            if not brand_norms:
                 return {
                     "workspace_slug": ws_slug,
                     "window": {"start": str(start), "end": str(end)},
-                    "total_gmv": 0.0,
-                    "total_orders": 0,
-                    "rows": [],
-                }
-
-        q = (
-            db.query(
-                SalesRaw.style_key,
-                SalesRaw.units,
-                seller_price_num.label("price"),
-            )
-            .filter(SalesRaw.workspace_id == ws_id)
-            .filter(SalesRaw.order_date >= start_dt)
-            .filter(SalesRaw.order_date < end_dt_excl)
-        )
-        q = _apply_portal_sales(q, ws_slug, p)
+                    "total_gmv": 0.0,
+                    "total_orders": 0,
+                    "rows": [],
+                }
 
-        if style_key_filter is not None:
-            q = q.filter(SalesRaw.style_key.in_(list(style_key_filter)))
+        q = (
+            facts_window(
+                db, ws_id, start, end,
+                DailySkuFact.style_key,
+                func.sum(DailySkuFact.units).label("units"),
+                func.sum(DailySkuFact.gmv).label("gmv"),
+                portal=p,
+                brand_norm=brand_norms,
+            )
+            .filter(DailySkuFact.units > 0)
+            .group_by(DailySkuFact.style_key)
+        )
 
         by_brand = {}
         total_units = 0
         total_gmv = 0.0
 
-        for sk, units, price in q.yield_per(5000):
+        for sk, units, gmv in q.all():
             u = int(units or 0)
             if u <= 0:
                 continue
-            pr = float(price or 0.0)
-            gmv = pr * u
+            gmv = float(gmv or 0.0)
 
             bname = style_to_brand.get(str(sk), "(Unknown)")
 
@@ -1738,6 +1832,7 @@ def db_kpi_brand_gmv_asp(
 
 
 @app.get("/db/kpi/style-gmv-asp")
+@cached_by_data_version("/db/kpi/style-gmv-asp")
 def db_kpi_style_gmv_asp(
     start: date = Query(...),
     end: date = Query(...),
@@ -1768,69 +1863,9 @@ def db_kpi_style_gmv_asp(
         is_sku = (dim == "sku") or (p == "flipkart")
 
         # -----------------------
-        # Helpers
-        # -----------------------
-        def _norm(s: str) -> str:
-            return "".join(ch for ch in str(s).strip().lower() if ch.isalnum())
-
-        def pick_by_norm(d: dict, desired_norm: str):
-            for k, v in (d or {}).items():
-                if _norm(k) == desired_norm:
-                    return v
-            return None
-
-        def to_float(x):
-            try:
-                s = str(x).replace(",", "").strip()
-                if not s or s.lower() == "nan":
-                    return None
-                return float(s)
-            except Exception:
-                return None
-
-        def parse_raw_json(v):
-            if isinstance(v, dict):
-                return v
-            if isinstance(v, str) and v.strip():
-                try:
-                    return json.loads(v)
-                except Exception:
-                    try:
-                        obj = ast.literal_eval(v) if v.strip().startswith("{") else {}
-                        return obj if isinstance(obj, dict) else {}
-                    except Exception:
-                        return {}
-            return {}
-
-        # -----------------------
-        # Brand filter list from catalog
+        # Brand filter: brand_norm on the facts (backend/fact_brands.py)
         # -----------------------
-        key_filter = None
-        if brand:
-            if is_sku:
-                key_filter = [
-                    (r[0] or "").strip().lower()
-                    for r in (
-                        db.query(func.lower(func.trim(CatalogRaw.seller_sku_code)))
-                        .filter(CatalogRaw.workspace_id == ws_id)
-                        .filter(CatalogRaw.seller_sku_code.isnot(None))
-                        .filter(func.lower(func.trim(CatalogRaw.brand)) == brand.strip().lower())
-                        .all()
-                    )
-                    if (r[0] or "").strip()
-                ]
-            else:
-                key_filter = [
-                    (r[0] or "").strip().lower()
-                    for r in (
-                        db.query(func.lower(func.trim(CatalogRaw.style_key)))
-                        .filter(CatalogRaw.workspace_id == ws_id)
-                        .filter(CatalogRaw.style_key.isnot(None))
-                        .filter(func.lower(func.trim(CatalogRaw.brand)) == brand.strip().lower())
-                        .all()
-                    )
-                    if (r[0] or "").strip()
-                ]
+        brand_norm = normalize_brand(brand) if brand else None
 
         # -----------------------
         # Brand map for response
@@ -1842,8 +1877,8 @@ def db_kpi_style_gmv_asp(
                 .filter(CatalogRaw.seller_sku_code.isnot(None))
             )
             brand_rows = _apply_portal_catalog(brand_rows, portal)
-            if key_filter is not None:
-                brand_rows = brand_rows.filter(func.lower(func.trim(CatalogRaw.seller_sku_code)).in_(key_filter))
+            if brand_norm is not None:
+                brand_rows = brand_rows.filter(norm_key(CatalogRaw.brand) == brand_norm)
             brand_rows = brand_rows.group_by(CatalogRaw.seller_sku_code, CatalogRaw.brand).all()
 
             brand_map = {
@@ -1860,81 +1895,80 @@ def db_kpi_style_gmv_asp(
                 .filter(CatalogRaw.style_key.isnot(None))
             )
             brand_rows = _apply_portal_catalog(brand_rows, portal)
-            if key_filter is not None:
-                brand_rows = brand_rows.filter(func.lower(func.trim(CatalogRaw.style_key)).in_(key_filter))
+            if brand_norm is not None:
+                brand_rows = brand_rows.filter(norm_key(CatalogRaw.brand) == brand_norm)
             brand_map = {(r.style_key or "").strip().lower(): (r.brand or "(Unknown)") for r in brand_rows.all()}
 
         # -----------------------
-        # Sales rows in window
+        # Sales in window (GMV summed in SQL)
         # -----------------------
-        sales_rows_q = (
-            db.query(
-                SalesRaw.style_key,
-                SalesRaw.seller_sku_code,
-                SalesRaw.order_line_id,
-                SalesRaw.order_date,
-                SalesRaw.raw_json,
-                SalesRaw.units,
-            )
-            .filter(SalesRaw.workspace_id == ws_id)
-            .filter(SalesRaw.order_date >= start_dt)
-            .filter(SalesRaw.order_date < end_dt_excl)
-        )
-        sales_rows_q = _apply_portal_sales(sales_rows_q, ws_slug, portal)
+        sales_key = SalesRaw.seller_sku_code if is_sku else SalesRaw.style_key
+        sales_key_norm = norm_key(sales_key)
 
-        if key_filter is not None:
-            if is_sku:
-                sales_rows_q = sales_rows_q.filter(func.lower(func.trim(SalesRaw.seller_sku_code)).in_(key_filter))
-            else:
-                sales_rows_q = sales_rows_q.filter(func.lower(func.trim(SalesRaw.style_key)).in_(key_filter))
+        def _sales_filters(q):
+            q = (
+                q.filter(SalesRaw.workspace_id == ws_id)
+                .filter(SalesRaw.order_date >= start_dt)
+                .filter(SalesRaw.order_date < end_dt_excl)
+                .filter(func.coalesce(func.trim(sales_key), "") != "")
+            )
+            q = _apply_portal_sales(q, ws_slug, portal)
+            if brand_norm is not None:
+                q = q.filter(SalesRaw.brand_norm == brand_norm)
+            return q
 
-        sales_rows = sales_rows_q.all()
+        sales_rows = (
+            _sales_filters(
+                db.query(
+                    sales_key_norm.label("kkey"),
+                    func.max(func.trim(sales_key)).label("key"),
+                    func.max(func.trim(SalesRaw.style_key)).label("style_key"),
+                    func.max(func.trim(SalesRaw.seller_sku_code)).label("seller_sku_code"),
+                    func.coalesce(func.sum(func.coalesce(SalesRaw.units, 1)), 0).label("orders"),
+                    func.coalesce(func.sum(SalesRaw.gmv), 0.0).label("gmv"),
+                )
+            )
+            .group_by(sales_key_norm)
+            .all()
+        )
 
         agg: dict[str, dict] = {}
-        sales_by_olid: dict[str, dict] = {}
-
         for r in sales_rows:
-            key = (r.seller_sku_code if is_sku else r.style_key) or ""
-            key = key.strip()
-            if not key:
-                continue
+            agg[r.kkey] = {
+                "key": r.key,
+                "style_key": r.style_key or "",
+                "seller_sku_code": r.seller_sku_code or "",
+                "orders": int(r.orders or 0),
+                "gmv": float(r.gmv or 0.0),
+                "returns": 0,
+                "return_units": 0,
+                "rto_units": 0,
+                "return_amount": 0.0,
+            }
 
-            units = int(r.units or 1)
-            raw = parse_raw_json(r.raw_json)
-
-            price_val = pick_by_norm(raw, "sellerprice")
-            if price_val is None:
-                price_val = raw.get("Seller Price") if isinstance(raw, dict) else None
-            price = to_float(price_val) or 0.0
-
-            kkey = key.lower()
-            rec = agg.get(kkey)
-            if not rec:
-                rec = {
-                    "key": key,
-                    "style_key": (r.style_key or "").strip(),
-                    "seller_sku_code": (r.seller_sku_code or "").strip(),
-                    "orders": 0,
-                    "gmv": 0.0,
-                    "returns": 0,
-                    "return_units": 0,
-                    "rto_units": 0,
-                    "return_amount": 0.0,
-                }
-                agg[kkey] = rec
-
-            rec["orders"] += units
-            rec["gmv"] += price * units
-
-            olid = str(r.order_line_id).strip() if r.order_line_id else ""
-            if olid and olid not in sales_by_olid:
-                sales_by_olid[olid] = {
-                    "key": key,
-                    "style_key": (r.style_key or "").strip(),
-                    "seller_sku_code": (r.seller_sku_code or "").strip(),
-                    "order_date": r.order_date,
-                    "seller_price": price,
-                }
+        # same_month needs the sale behind each returned order_line_id
+        sales_by_olid: dict[str, dict] = {}
+        if mode == "same_month":
+            olid_rows = _sales_filters(
+                db.query(
+                    SalesRaw.order_line_id,
+                    sales_key,
+                    SalesRaw.style_key,
+                    SalesRaw.seller_sku_code,
+                    SalesRaw.order_date,
+                    SalesRaw.seller_price,
+                )
+            ).all()
+            for olid_v, key_v, sk_v, sku_v, od_v, price_v in olid_rows:
+                olid = str(olid_v).strip() if olid_v else ""
+                if olid and olid not in sales_by_olid:
+                    sales_by_olid[olid] = {
+                        "key": (key_v or "").strip(),
+                        "style_key": (sk_v or "").strip(),
+                        "seller_sku_code": (sku_v or "").strip(),
+                        "order_date": od_v,
+                        "seller_price": float(price_v or 0.0),
+                    }
 
         unit_expr = func.coalesce(ReturnsRaw.units, 1)
         rtype_norm = func.upper(func.trim(func.coalesce(ReturnsRaw.return_type, "")))
@@ -1979,11 +2013,8 @@ def db_kpi_style_gmv_asp(
 
             returns_q = _apply_portal_returns(returns_q, ws_slug, portal)
 
-            if key_filter is not None:
-                if is_sku:
-                    returns_q = returns_q.filter(func.lower(func.trim(ReturnsRaw.seller_sku_code)).in_(key_filter))
-                else:
-                    returns_q = returns_q.filter(func.lower(func.trim(ReturnsRaw.style_key)).in_(key_filter))
+            if brand_norm is not None:
+                returns_q = returns_q.filter(ReturnsRaw.brand_norm == brand_norm)
 
             if is_sku:
                 returns_rows = returns_q.group_by(ReturnsRaw.seller_sku_code).all()
@@ -2203,10 +2234,8 @@ def db_returns_summary(
 
         # -----------------------------
         # Return Amount = sum(seller_price for returned orders)
-        # seller price is inside SalesRaw.raw_json under key "seller price"
         # -----------------------------
-        seller_price_txt = cast(SalesRaw.raw_json, JSONB)["seller price"].astext
-        seller_price_num = cast(func.nullif(func.replace(seller_price_txt, ",", ""), ""), Float)
+        seller_price_num = SalesRaw.seller_price
 
         units_num = func.coalesce(ReturnsRaw.units, 1)
 
@@ -2261,7 +2290,7 @@ def db_kpi_asp_optimizer(
 ):
     """
     ASP Optimizer / Pricing Insights (MVP)
-    - Myntra: Uses SalesRaw.raw_json['sellerprice'] (fallback: sellingprice/unitprice/price)
+    - Myntra: Uses SalesRaw.seller_price (raw sellerprice; fallback: sellingprice/unitprice/price)
     - Flipkart: Uses FlipkartTrafficRaw (revenue / sales_qty) because orders sheet may not have price
     - Buckets ASP into ranges (bucket_size)
     - Finds which ASP bucket yields best avg units/day, and also considers returns impact (when available)
@@ -2292,43 +2321,9 @@ def db_kpi_asp_optimizer(
         def _norm(s: str) -> str:
             return "".join(ch for ch in str(s or "").strip().lower() if ch.isalnum())
 
-        def parse_raw(raw_json):
-            if raw_json is None:
-                return {}
-            if isinstance(raw_json, dict):
-                return raw_json
-            s = str(raw_json).strip()
-            if not s:
-                return {}
-            try:
-                return json.loads(s)
-            except Exception:
-                try:
-                    return ast.literal_eval(s)
-                except Exception:
-                    return {}
-
-        def pick_by_norm(d: dict, desired_norm: str):
-            for k, v in (d or {}).items():
-                if _norm(k) == desired_norm:
-                    return v
-            return None
-
-        def to_float(x):
-            try:
-                s = str(x).replace(",", "").strip()
-                if not s or s.lower() == "nan":
-                    return None
-                return float(s)
-            except Exception:
-                return None
-
-        def price_from_raw(raw_json) -> float | None:
-            d = parse_raw(raw_json)
-            v = pick_by_norm(d, "sellerprice")
-            if v is None:
-                v = pick_by_norm(d, "sellingprice") or pick_by_norm(d, "unitprice") or pick_by_norm(d, "price")
-            return to_float(v)
+        # price bucket computed in SQL: floor(price / bucket_size) * bucket_size
+        def bucket_expr(price_col):
+            return cast(func.floor(price_col / float(bucket_size)) * int(bucket_size), Integer)
 
         def bucket_start(price: float) -> int:
             b = int(price) // int(bucket_size)
@@ -2346,15 +2341,18 @@ def db_kpi_asp_optimizer(
 
         # -----------------------
         # Brand mapping / filters (CatalogRaw)
-        # Myntra -> style_key -> brand
+        # Myntra -> SalesRaw.brand_norm (resolved from the catalog at ingest)
         # Flipkart -> seller_sku_code -> brand  (if your catalog has it)
         # -----------------------
-        style_key_filter = None
+        brand_norm_filter = None
         sku_filter = None
         style_to_brand = None
         sku_to_brand = None
 
-        need_catalog_map = (lvl == "brand") or bool(brand) or (key is not None and lvl == "brand")
+        # deep-dive brand key wins over the brand filter
+        filter_brand = key if (lvl == "brand" and key) else brand
+
+        need_catalog_map = (lvl == "brand") or (bool(filter_brand) and p == "flipkart")
         if need_catalog_map:
             cat_q = (
                 db.query(CatalogRaw.style_key, CatalogRaw.seller_sku_code, CatalogRaw.brand)
@@ -2367,27 +2365,16 @@ def db_kpi_asp_optimizer(
             style_to_brand = {str(sk): (br or "").strip() for (sk, _, br) in cat_rows if sk is not None}
             sku_to_brand = {str(ss): (br or "").strip() for (_, ss, br) in cat_rows if ss is not None}
 
-            if brand:
-                bnorm = _norm(brand)
-                if p == "flipkart":
-                    allowed = [ss for ss, br in sku_to_brand.items() if _norm(br) == bnorm]
-                    sku_filter = set(allowed)
-                else:
-                    allowed = [sk for sk, br in style_to_brand.items() if _norm(br) == bnorm]
-                    style_key_filter = set(allowed)
-
-            if lvl == "brand" and key:
-                knorm = _norm(key)
-                if p == "flipkart":
-                    allowed = [ss for ss, br in sku_to_brand.items() if _norm(br) == knorm]
-                    sku_filter = set(allowed)
-                else:
-                    allowed = [sk for sk, br in style_to_brand.items() if _norm(br) == knorm]
-                    style_key_filter = set(allowed)
+            if filter_brand and p == "flipkart":
+                bnorm = _norm(filter_brand)
+                sku_filter = {ss for ss, br in sku_to_brand.items() if _norm(br) == bnorm}
+
+        if filter_brand and p != "flipkart":
+            brand_norm_filter = brand_norms_matching(db, ws_id, filter_brand, _norm)
 
         # -----------------------
         # Aggregate sales into (entity_key, bucket)
-        # For Myntra: from SalesRaw using sellerprice from raw_json
+        # For Myntra: from SalesRaw using typed seller_price
         # For Flipkart: from FlipkartTrafficRaw using (revenue / sales_qty)
         # -----------------------
         agg = {}  # (ekey, b0) -> dict
@@ -2487,23 +2474,28 @@ def db_kpi_asp_optimizer(
                     t["units"] += u
                     t["gmv"] += rev
         else:
-            # Myntra (and others): use SalesRaw
+            # Myntra (and others): use SalesRaw, pre-aggregated per (style, sku, bucket, day)
+            s_bucket = bucket_expr(SalesRaw.seller_price)
+            s_day = cast(SalesRaw.order_date, Date)
             sales_q = (
                 db.query(
-                    SalesRaw.order_date,
+                    s_day.label("day"),
                     SalesRaw.style_key,
                     SalesRaw.seller_sku_code,
-                    SalesRaw.units,
-                    SalesRaw.raw_json,
+                    s_bucket.label("b0"),
+                    func.sum(SalesRaw.units).label("units"),
+                    func.sum(SalesRaw.seller_price * SalesRaw.units).label("gmv"),
                 )
                 .filter(SalesRaw.workspace_id == ws_id)
                 .filter(SalesRaw.order_date >= start_dt)
                 .filter(SalesRaw.order_date < end_dt_excl)
+                .filter(SalesRaw.seller_price.isnot(None))
+                .filter(SalesRaw.units > 0)
             )
             sales_q = _apply_portal_sales(sales_q, ws_slug, p)
 
-            if style_key_filter is not None:
-                if len(style_key_filter) == 0:
+            if brand_norm_filter is not None:
+                if len(brand_norm_filter) == 0:
                     return {
                         "portal": p,
                         "level": lvl,
@@ -2514,30 +2506,27 @@ def db_kpi_asp_optimizer(
                         "deep_dive": None,
                         "note": "No styles found for the given brand filter.",
                     }
-                sales_q = sales_q.filter(SalesRaw.style_key.in_(list(style_key_filter)))
+                sales_q = sales_q.filter(SalesRaw.brand_norm.in_(brand_norm_filter))
 
             if key and lvl == "style":
                 sales_q = sales_q.filter(SalesRaw.style_key == key)
             elif key and lvl == "sku":
                 sales_q = sales_q.filter(SalesRaw.seller_sku_code == key)
 
-            for odt, sk, sku, units, rj in sales_q.yield_per(5000):
-                if odt is None:
+            sales_q = sales_q.group_by(s_day, SalesRaw.style_key, SalesRaw.seller_sku_code, s_bucket)
+
+            for day, sk, sku, b0, units, gmv in sales_q.yield_per(5000):
+                if day is None:
                     continue
                 ekey = get_entity_key(sk, sku)
                 if not ekey:
                     continue
 
-                price = price_from_raw(rj)
-                if price is None:
-                    continue
-
                 u = int(units or 0)
                 if u <= 0:
                     continue
-
-                b0 = bucket_start(price)
-                day = odt.date()
+                g = float(gmv or 0.0)
+                b0 = int(b0)
 
                 k = (ekey, b0)
                 rec = agg.get(k)
@@ -2545,7 +2534,7 @@ def db_kpi_asp_optimizer(
                     rec = {"units": 0, "gmv": 0.0, "days": set()}
                     agg[k] = rec
                 rec["units"] += u
-                rec["gmv"] += float(price) * u
+                rec["gmv"] += g
                 rec["days"].add(day)
 
                 o = entity_overall.get(ekey)
@@ -2553,7 +2542,7 @@ def db_kpi_asp_optimizer(
                     o = {"units": 0, "gmv": 0.0, "days": set()}
                     entity_overall[ekey] = o
                 o["units"] += u
-                o["gmv"] += float(price) * u
+                o["gmv"] += g
                 o["days"].add(day)
 
                 if key:
@@ -2562,7 +2551,7 @@ def db_kpi_asp_optimizer(
                         t = {"date": str(day), "units": 0, "gmv": 0.0, "asp": None, "returns_units": 0}
                         ts[day] = t
                     t["units"] += u
-                    t["gmv"] += float(price) * u
+                    t["gmv"] += g
 
         if key:
             for _, t in ts.items():
@@ -2575,25 +2564,31 @@ def db_kpi_asp_optimizer(
         # -----------------------
         returns_by_bucket = {}  # (ekey, b0) -> dict
 
+        r_bucket = bucket_expr(SalesRaw.seller_price)
+        r_day = cast(ReturnsRaw.return_date, Date)
+        r_is_rto = func.upper(func.trim(func.coalesce(ReturnsRaw.return_type, ""))).like("%RTO%")
+        r_units = case((func.coalesce(ReturnsRaw.units, 0) <= 0, 1), else_=ReturnsRaw.units)
+
         rq = (
             db.query(
-                ReturnsRaw.units,
-                ReturnsRaw.return_type,
-                ReturnsRaw.return_date,
+                func.sum(r_units).label("units"),
+                r_is_rto.label("is_rto"),
+                r_day.label("day"),
                 SalesRaw.style_key,
                 SalesRaw.seller_sku_code,
-                SalesRaw.raw_json,
+                r_bucket.label("b0"),
             )
             .join(SalesRaw, SalesRaw.order_line_id == ReturnsRaw.order_line_id)
             .filter(ReturnsRaw.workspace_id == ws_id)
             .filter(SalesRaw.workspace_id == ws_id)
             .filter(ReturnsRaw.return_date >= start_dt)
             .filter(ReturnsRaw.return_date < end_dt_excl)
+            .filter(SalesRaw.seller_price.isnot(None))
         )
         rq = _apply_portal_returns(rq, ws_slug, p)
 
-        if style_key_filter is not None:
-            rq = rq.filter(SalesRaw.style_key.in_(list(style_key_filter)))
+        if brand_norm_filter is not None:
+            rq = rq.filter(SalesRaw.brand_norm.in_(brand_norm_filter))
         if sku_filter is not None:
             rq = rq.filter(SalesRaw.seller_sku_code.in_(list(sku_filter)))
 
@@ -2602,25 +2597,17 @@ def db_kpi_asp_optimizer(
         elif key and lvl == "sku":
             rq = rq.filter(SalesRaw.seller_sku_code == key)
 
-        for runits, rtype, rdt, sk, sku, srj in rq.yield_per(5000):
-            if rdt is None:
+        rq = rq.group_by(r_is_rto, r_day, SalesRaw.style_key, SalesRaw.seller_sku_code, r_bucket)
+
+        for u, is_rto, rday, sk, sku, b0 in rq.yield_per(5000):
+            if rday is None:
                 continue
             ekey = get_entity_key(sk, sku)
             if not ekey:
                 continue
 
-            price = price_from_raw(srj)
-            if price is None:
-                continue
-
-            b0 = bucket_start(price)
-
-            u = int(runits or 0)
-            if u <= 0:
-                u = 1
-
-            rt = (rtype or "").strip().upper()
-            is_rto = ("RTO" in rt)
+            b0 = int(b0)
+            u = int(u or 0)
 
             kk = (ekey, b0)
             rrec = returns_by_bucket.get(kk)
@@ -2634,7 +2621,7 @@ def db_kpi_asp_optimizer(
                 rrec["returns_customer"] += u
 
             if key:
-                day = rdt.date()
+                day = rday
                 t = ts.get(day)
                 if t is None:
                     t = {"date": str(day), "units": 0, "gmv": 0.0, "asp": None, "returns_units": 0}
@@ -2773,49 +2760,42 @@ def db_kpi_asp_optimizer(
 
 
 
-@app.post("/db/ingest/myntra-weekly-perf")
-async def db_ingest_myntra_weekly_perf(
-    file: UploadFile = File(...),
-    replace: bool = False,
-    workspace_slug: str = Query("default"),
-):
-    content = await file.read()
+def ingest_myntra_weekly_perf_csv(
+    f,
+    filename: str | None,
+    replace: bool,
+    workspace_slug: str,
+    stream: bool = True,
+    progress=None,
+    upload_id=None,
+) -> dict:
     try:
-        df = pd.read_csv(io.BytesIO(content), dtype=str, keep_default_na=False)
+        header = csv_header(f)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Could not read CSV: {e}")
 
     # required columns
     try:
-        col_style = require_col(df, "style id")
-        col_impr = require_col(df, "impressions")
-        col_clicks = require_col(df, "clicks")
-        col_atc = require_col(df, "add to carts")
-        col_purch = require_col(df, "purchases")
+        col_style = require_col(header, "style id")
+        col_impr = require_col(header, "impressions")
+        col_clicks = require_col(header, "clicks")
+        col_atc = require_col(header, "add to carts")
+        col_purch = require_col(header, "purchases")
     except KeyError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
     # optional columns (keep flexible)
-    col_seller = optional_col(df, "seller id")
-    col_article = optional_col(df, "article type")
-    col_brand = optional_col(df, "brand")
-    col_gender = optional_col(df, "gender")
-    col_mrp = optional_col(df, "seller mrp")
-    col_age = optional_col(df, "inventory age")
-    col_rplc = optional_col(df, "rplc")
-    col_ret = optional_col(df, "return %")
-    col_cons = optional_col(df, "consideration %")
-    col_conv = optional_col(df, "conversion %")
-    col_rating = optional_col(df, "rating")
-
-    # normalize style_key same as others
-    style_key = (
-        df[col_style]
-        .astype(str)
-        .str.strip()
-        .str.replace(r"\.0$", "", regex=True)
-        .str.lower()
-    )
+    col_seller = optional_col(header, "seller id")
+    col_article = optional_col(header, "article type")
+    col_brand = optional_col(header, "brand")
+    col_gender = optional_col(header, "gender")
+    col_mrp = optional_col(header, "seller mrp")
+    col_age = optional_col(header, "inventory age")
+    col_rplc = optional_col(header, "rplc")
+    col_ret = optional_col(header, "return %")
+    col_cons = optional_col(header, "consideration %")
+    col_conv = optional_col(header, "conversion %")
+    col_rating = optional_col(header, "rating")
 
     def to_int(s):
         return pd.to_numeric(s, errors="coerce").fillna(0).astype(int)
@@ -2828,78 +2808,76 @@ async def db_ingest_myntra_weekly_perf(
         s2 = s.astype(str).str.replace("%", "", regex=False).str.strip()
         return pd.to_numeric(s2, errors="coerce")
 
-    impressions = to_int(df[col_impr])
-    clicks = to_int(df[col_clicks])
-    add_to_carts = to_int(df[col_atc])
-    purchases = to_int(df[col_purch])
-
-    seller_id = to_int(df[col_seller]) if col_seller else None
-    article_type = df[col_article].astype(str).str.strip() if col_article else None
-    brand = df[col_brand].astype(str).str.strip() if col_brand else None
-    gender = df[col_gender].astype(str).str.strip() if col_gender else None
-
-    seller_mrp = to_float(df[col_mrp]) if col_mrp else None
-    inventory_age = to_int(df[col_age]) if col_age else None
-    rplc = to_float(df[col_rplc]) if col_rplc else None
-
-    return_pct = to_pct_float(df[col_ret]) if col_ret else None
-    consideration_pct = to_pct_float(df[col_cons]) if col_cons else None
-    conversion_pct = to_pct_float(df[col_conv]) if col_conv else None
-    rating = to_float(df[col_rating]) if col_rating else None
-
     ingested_at = datetime.utcnow()
 
     db = SessionLocal()
     try:
         ws_id = resolve_workspace_id(db, workspace_slug)
 
-        # optional: allow clearing history if needed
-        if replace:
-            db.query(MyntraWeeklyPerfRaw).filter(MyntraWeeklyPerfRaw.workspace_id == ws_id).delete()
-            db.commit()
+        # replace: the file is staged in full and swapped in just before the commit
+        replacing = ReplaceLoad(db, MyntraWeeklyPerfRaw.__tablename__, {"workspace_id": ws_id}) if replace else None
 
-        rows = []
-        for i in range(len(df)):
-            raw_row = df.iloc[i].to_dict()
-            rows.append(
+        rows_in_file = 0
+        chunks = 0
+        load = None
+
+        for df in iter_csv_chunks(f, stream=stream):
+            # normalize style_key same as others
+            style_key = (
+                df[col_style]
+                .astype(str)
+                .str.strip()
+                .str.replace(r"\.0$", "", regex=True)
+                .str.lower()
+            )
+
+            frame = insert_frame(
+                df,
                 {
-                    "workspace_id": ws_id,
-                    "style_key": style_key.iat[i],
-                    "seller_id": None if seller_id is None else int(seller_id.iat[i]),
-                    "article_type": None if article_type is None else article_type.iat[i],
-                    "brand": None if brand is None else brand.iat[i],
-                    "gender": None if gender is None else gender.iat[i],
-                    "seller_mrp": None if seller_mrp is None or pd.isna(seller_mrp.iat[i]) else float(seller_mrp.iat[i]),
-                    "inventory_age": None if inventory_age is None else int(inventory_age.iat[i]),
-                    "rplc": None if rplc is None or pd.isna(rplc.iat[i]) else float(rplc.iat[i]),
-                    "impressions": int(impressions.iat[i]),
-                    "clicks": int(clicks.iat[i]),
-                    "add_to_carts": int(add_to_carts.iat[i]),
-                    "purchases": int(purchases.iat[i]),
-                    "return_pct": None if return_pct is None or pd.isna(return_pct.iat[i]) else float(return_pct.iat[i]),
-                    "consideration_pct": None if consideration_pct is None or pd.isna(consideration_pct.iat[i]) else float(consideration_pct.iat[i]),
-                    "conversion_pct": None if conversion_pct is None or pd.isna(conversion_pct.iat[i]) else float(conversion_pct.iat[i]),
-                    "rating": None if rating is None or pd.isna(rating.iat[i]) else float(rating.iat[i]),
+                    "workspace_id": str(ws_id),
+                    "upload_id": str(upload_id) if upload_id else None,
+                    "style_key": style_key,
+                    "seller_id": to_int(df[col_seller]) if col_seller else None,
+                    "article_type": df[col_article].astype(str).str.strip() if col_article else None,
+                    "brand": df[col_brand].astype(str).str.strip() if col_brand else None,
+                    "gender": df[col_gender].astype(str).str.strip() if col_gender else None,
+                    "seller_mrp": to_float(df[col_mrp]) if col_mrp else None,
+                    "inventory_age": to_int(df[col_age]) if col_age else None,
+                    "rplc": to_float(df[col_rplc]) if col_rplc else None,
+                    "impressions": to_int(df[col_impr]),
+                    "clicks": to_int(df[col_clicks]),
+                    "add_to_carts": to_int(df[col_atc]),
+                    "purchases": to_int(df[col_purch]),
+                    "return_pct": to_pct_float(df[col_ret]) if col_ret else None,
+                    "consideration_pct": to_pct_float(df[col_cons]) if col_cons else None,
+                    "conversion_pct": to_pct_float(df[col_conv]) if col_conv else None,
+                    "rating": to_float(df[col_rating]) if col_rating else None,
                     "ingested_at": ingested_at,
-                    "raw_json": json.dumps(raw_row, ensure_ascii=False),
-                }
+                    "raw_json": raw_json_series(df),
+                },
             )
-
-        BATCH = 2000
-        inserted = 0
-        for start_i in range(0, len(rows), BATCH):
-            chunk = rows[start_i : start_i + BATCH]
-            db.bulk_insert_mappings(MyntraWeeklyPerfRaw, chunk)
-            inserted += len(chunk)
+            if replacing:
+                replacing.add(frame)
+            else:
+                load = add_load_stats(load, copy_frame(db, MyntraWeeklyPerfRaw.__tablename__, frame))
+            rows_in_file += int(len(df))
+            chunks += 1
+            if progress:
+                progress(rows_in_file, chunks)
+
+        if replacing:
+            load = replacing.swap()
         db.commit()
 
         return {
-            "filename": file.filename,
-            "rows_in_file": int(len(df)),
-            "inserted": int(inserted),
+            "filename": filename,
+            "rows_in_file": int(rows_in_file),
+            "inserted": int((load or {}).get("rows", 0)),
             "replace": bool(replace),
             "workspace_slug": workspace_slug,
             "ingested_at": ingested_at.isoformat() + "Z",
+            "chunks": int(chunks),
+            "load": load,
             "detected": {
                 "style_id": col_style,
                 "impressions": col_impr,
@@ -2908,80 +2886,110 @@ async def db_ingest_myntra_weekly_perf(
                 "purchases": col_purch,
             },
         }
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"DB ingest failed: {e}")
     finally:
         db.close()
 
-@app.post("/db/ingest/stock")
-async def db_ingest_stock(
+
+@app.post("/db/ingest/myntra-weekly-perf")
+async def db_ingest_myntra_weekly_perf(
     file: UploadFile = File(...),
     replace: bool = False,
     workspace_slug: str = Query("default"),
+    stream: bool = Query(True, description="Parse the CSV in memory-bounded chunks (INGEST_MAX_MEMORY_MB)"),
+    force: bool = Query(False, description="Ingest even if this exact file was already loaded"),
+    background: bool = Query(False, description="Opt in: queue the file and return a job id (poll /db/jobs/{id}); needs the ingest worker"),
 ):
-    content = await file.read()
+    return await run_or_enqueue_ingest(
+        "myntra-weekly-perf", file, background, workspace_slug,
+        replace=replace, stream=stream, force=force,
+    )
 
+
+register_ingest_handler("myntra-weekly-perf", tracked_ingest("myntra-weekly-perf", ingest_myntra_weekly_perf_csv))
+
+def ingest_stock_csv(
+    f,
+    filename: str | None,
+    replace: bool,
+    workspace_slug: str,
+    stream: bool = True,
+    progress=None,
+    upload_id=None,
+) -> dict:
     # Stock upload: CSV only (keeps backend lightweight)
     try:
-        df = pd.read_csv(io.BytesIO(content), dtype=str, keep_default_na=False)
+        header = csv_header(f)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Could not read CSV: {e}")
 
-
     try:
-        col_sku = require_col(df, "seller_sku_code")
-        col_qty = require_col(df, "qty")
+        col_sku = require_col(header, "seller_sku_code")
+        col_qty = require_col(header, "qty")
     except KeyError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    sku = (
-        df[col_sku]
-        .astype(str)
-        .str.strip()
-        .str.lower()
-    )
-
-    qty = pd.to_numeric(df[col_qty], errors="coerce").fillna(0).astype(int)
-
     ingested_at = datetime.utcnow()
 
     db = SessionLocal()
     try:
         ws_id = resolve_workspace_id(db, workspace_slug)
 
-        if replace:
-            db.query(StockRaw).filter(StockRaw.workspace_id == ws_id).delete()
-            db.commit()
+        # replace: the file is staged in full and swapped in just before the commit
+        replacing = ReplaceLoad(db, StockRaw.__tablename__, {"workspace_id": ws_id}) if replace else None
 
-        rows = []
-        for i in range(len(df)):
-            raw_row = df.iloc[i].to_dict()
-            rows.append(
+        rows_in_file = 0
+        chunks = 0
+        load = None
+
+        for df in iter_csv_chunks(f, stream=stream):
+            sku = (
+                df[col_sku]
+                .astype(str)
+                .str.strip()
+                .str.lower()
+            )
+
+            qty = pd.to_numeric(df[col_qty], errors="coerce").fillna(0).astype(int)
+
+            frame = insert_frame(
+                df,
                 {
-                    "workspace_id": ws_id,
-                    "seller_sku_code": sku.iat[i],
-                    "qty": int(qty.iat[i]),
+                    "workspace_id": str(ws_id),
+                    "upload_id": str(upload_id) if upload_id else None,
+                    "seller_sku_code": sku,
+                    "qty": qty,
                     "ingested_at": ingested_at,
-                    "raw_json": json.dumps(raw_row, ensure_ascii=False),
-                }
+                    "raw_json": raw_json_series(df),
+                },
             )
-
-        BATCH = 2000
-        inserted = 0
-        for start_i in range(0, len(rows), BATCH):
-            chunk = rows[start_i : start_i + BATCH]
-            db.bulk_insert_mappings(StockRaw, chunk)
-            inserted += len(chunk)
+            if replacing:
+                replacing.add(frame)
+            else:
+                load = add_load_stats(load, copy_frame(db, StockRaw.__tablename__, frame))
+            rows_in_file += int(len(df))
+            chunks += 1
+            if progress:
+                progress(rows_in_file, chunks)
+
+        if replacing:
+            load = replacing.swap()
         db.commit()
 
         return {
-            "filename": file.filename,
-            "rows_in_file": int(len(df)),
-            "inserted": int(inserted),
+            "filename": filename,
+            "rows_in_file": int(rows_in_file),
+            "inserted": int((load or {}).get("rows", 0)),
             "replace": bool(replace),
             "workspace_slug": workspace_slug,
             "ingested_at": ingested_at.isoformat() + "Z",
+            "chunks": int(chunks),
+            "load": load,
             "detected": {"seller_sku_code": col_sku, "qty": col_qty},
         }
     except Exception as e:
@@ -2991,6 +2999,24 @@ async def db_ingest_stock(
         db.close()
 
 
+@app.post("/db/ingest/stock")
+async def db_ingest_stock(
+    file: UploadFile = File(...),
+    replace: bool = False,
+    workspace_slug: str = Query("default"),
+    stream: bool = Query(True, description="Parse the CSV in memory-bounded chunks (INGEST_MAX_MEMORY_MB)"),
+    force: bool = Query(False, description="Ingest even if this exact file was already loaded"),
+    background: bool = Query(False, description="Opt in: queue the file and return a job id (poll /db/jobs/{id}); needs the ingest worker"),
+):
+    return await run_or_enqueue_ingest(
+        "stock", file, background, workspace_slug,
+        replace=replace, stream=stream, force=force,
+    )
+
+
+register_ingest_handler("stock", tracked_ingest("stock", ingest_stock_csv))
+
+
 
 
 # -----------------------------------------------------------------------------
@@ -2999,37 +3025,26 @@ async def db_ingest_stock(
 #   - Listing file: Catalog + Stock in ONE sheet
 # -----------------------------------------------------------------------------
 
-def _fk_norm(s: str | None) -> str:
-    return (s or "").strip()
-
-def _fk_norm_l(s: str | None) -> str:
-    return (s or "").strip().lower()
+def _fk_float_series(s: pd.Series, default=0.0) -> pd.Series:
+    """Numeric column ("1,234.5" -> 1234.5); blanks / junk -> default."""
+    num = pd.to_numeric(s.astype(str).str.replace(",", "", regex=False).str.strip(), errors="coerce")
+    return num.fillna(default).astype(float)
 
-def _fk_to_int(x, default=0) -> int:
-    try:
-        s = str(x).replace(",", "").strip()
-        if not s:
-            return default
-        return int(float(s))
-    except Exception:
-        return default
-
-def _fk_to_float(x, default=0.0) -> float:
-    try:
-        s = str(x).replace(",", "").strip()
-        if not s:
-            return default
-        return float(s)
-    except Exception:
-        return default
+def _fk_int_series(s: pd.Series, default=0) -> pd.Series:
+    """Like _fk_float_series, truncated to int (int(float(x)))."""
+    num = pd.to_numeric(s.astype(str).str.replace(",", "", regex=False).str.strip(), errors="coerce")
+    return np.trunc(num).fillna(default).astype("int64")
 
 
-@app.post("/db/ingest/flipkart/events")
-async def db_ingest_flipkart_events(
-    file: UploadFile = File(...),
-    replace: bool = False,
-    workspace_slug: str = Query("default"),
-):
+def ingest_flipkart_events_file(
+    f,
+    filename: str | None,
+    replace: bool,
+    workspace_slug: str,
+    stream: bool = True,
+    progress=None,
+    upload_id=None,
+) -> dict:
     """
     Flipkart Events Upload (ONE file contains Sale + Return)
     Rules:
@@ -3046,15 +3061,18 @@ async def db_ingest_flipkart_events(
           Return -> CUSTOMER_RETURN
           Cancellation -> RTO
           Return Cancellation -> IGNORE
+    CSV uploads are parsed in chunks (iter_csv_chunks); Excel is read whole.
     """
-    content = await file.read()
-    filename = (file.filename or "").lower()
+    filename = (filename or "").lower()
+    is_csv = filename.endswith(".csv")
 
     try:
-        if filename.endswith(".csv"):
-            df = pd.read_csv(io.BytesIO(content), dtype=str, keep_default_na=False)
+        if is_csv:
+            header = csv_header(f)
         else:
-            df = pd.read_excel(io.BytesIO(content), dtype=str, keep_default_na=False)
+            f.seek(0)
+            sheet = pd.read_excel(io.BytesIO(f.read()), dtype=str, keep_default_na=False)
+            header = sheet.iloc[:0]
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Could not read file: {e}")
 
@@ -3068,7 +3086,7 @@ async def db_ingest_flipkart_events(
         "Item Quantity",
         "Final Invoice Amount (Price after discount+Shipping Charges)",
     ]
-    missing = [c for c in required if c not in df.columns]
+    missing = [c for c in required if c not in header.columns]
     if missing:
         raise HTTPException(status_code=400, detail=f"Missing columns: {missing}")
 
@@ -3077,129 +3095,167 @@ async def db_ingest_flipkart_events(
         ws_slug = (workspace_slug or "default").strip().lower() or "default"
         ws_id = resolve_workspace_id(db, ws_slug)
 
-        # Replace only Flipkart rows for THIS workspace (safe)
         if replace:
-            prefix = f"fk:{ws_slug}:"
-            db.query(ReturnsRaw).filter(
-                ReturnsRaw.workspace_id == ws_id,
-                ReturnsRaw.order_line_id.like(prefix + "%"),
-            ).delete(synchronize_session=False)
-
-            db.query(SalesRaw).filter(
-                SalesRaw.workspace_id == ws_id,
-                SalesRaw.order_line_id.like(prefix + "%"),
-            ).delete(synchronize_session=False)
-
-            db.commit()
-
-        sales_rows = []
-        return_rows = []
-
-        for i in range(len(df)):
-            r = df.iloc[i].to_dict()
-
-            order_item_id = _fk_norm(r.get("Order Item ID"))
-            if not order_item_id:
-                continue
-
-            fsn = _fk_norm_l(r.get("FSN"))
-            sku = _fk_norm_l(r.get("SKU"))
+            # Replace only Flipkart rows for THIS workspace (safe); both tables are staged,
+            # then swapped in the same transaction (an events file may hold only sales or returns)
+            scope = {"workspace_id": ws_id, "portal": "flipkart"}
+            sales_rl = ReplaceLoad(db, SalesRaw.__tablename__, scope)
+            returns_rl = ReplaceLoad(db, ReturnsRaw.__tablename__, scope)
+
+        rows_in_file = 0
+        chunks = 0
+        sales_load = returns_load = None
+        n_sales = n_returns = 0
+        months: set[date] = set()
+        date_range = (None, None)
+        date_errors = DateErrors()
+        brands = CatalogBrands.load(db, ws_id)
+
+        for df in iter_csv_chunks(f, stream=stream) if is_csv else [sheet]:
+            rows_in_file += int(len(df))
+            chunks += 1
+
+            df = df.fillna("")
+            order_item_id = df["Order Item ID"].astype(str).str.strip()
+            df = df[order_item_id.ne("")]
+            order_item_id = order_item_id[df.index]
+
+            fsn = df["FSN"].astype(str).str.strip().str.lower()
+            sku = df["SKU"].astype(str).str.strip().str.lower()
 
             # keep style_key distinct from Myntra keys
-            style_key = f"fk:{fsn}" if fsn else None
-            seller_sku_code = f"fk:{sku}" if sku else None
+            style_key = ("fk:" + fsn).where(fsn.ne(""), None)
+            seller_sku_code = ("fk:" + sku).where(sku.ne(""), None)
 
             # Use Buyer Invoice Date
-            dt = parse_date_any(r.get("Buyer Invoice Date"))
-
-            event_type = _fk_norm_l(r.get("Event Type"))
-            event_sub = _fk_norm_l(r.get("Event Sub Type"))
-
-            qty = _fk_to_int(r.get("Item Quantity"), default=0)
-            qty = max(0, qty)
+            dt = parse_dt_series(df["Buyer Invoice Date"], "flipkart-events", "Buyer Invoice Date", date_errors)
 
-            final_amt = _fk_to_float(r.get("Final Invoice Amount (Price after discount+Shipping Charges)"), default=0.0)
-            final_amt = max(0.0, final_amt)
+            event_type = df["Event Type"].astype(str).str.strip().str.lower()
+            event_sub = df["Event Sub Type"].astype(str).str.strip().str.lower()
 
-            unit_price = (final_amt / float(qty)) if qty > 0 else 0.0
+            qty = _fk_int_series(df["Item Quantity"], default=0).clip(lower=0)
+            final_amt = _fk_float_series(
+                df["Final Invoice Amount (Price after discount+Shipping Charges)"], default=0.0
+            ).clip(lower=0.0)
+            unit_price = (final_amt / qty.where(qty > 0)).fillna(0.0)
+            units = qty.where(qty > 0, 1)
 
             # Global uniqueness safety for SalesRaw.order_line_id
-            order_line_id = f"fk:{ws_slug}:{order_item_id}"
+            order_line_id = f"fk:{ws_slug}:" + order_item_id
+            brand_norm = resolve_brand_norm(brands, style_key, seller_sku_code)
 
             # Store enriched raw_json
-            enriched = dict(r)
-            enriched["portal"] = "flipkart"
-            enriched["sellerprice"] = unit_price  # IMPORTANT: GMV logic expects sellerprice
-            enriched["final_invoice_amount"] = final_amt
-            enriched["unit_price"] = unit_price
-
-            if event_type == "sale":
-                # Insert into sales_raw
-                sales_rows.append(
-                    {
-                        "order_line_id": order_line_id,
-                        "style_key": style_key,
-                        "order_date": dt,
-                        "seller_sku_code": seller_sku_code,
-                        "raw_json": json.dumps(enriched, ensure_ascii=False),
-                        "workspace_id": ws_id,
-                        "units": qty if qty > 0 else 1,
-                    }
-                )
+            enriched = {
+                "portal": "flipkart",
+                "sellerprice": unit_price,  # IMPORTANT: GMV logic expects sellerprice
+                "final_invoice_amount": final_amt,
+                "unit_price": unit_price,
+            }
 
-            elif event_type == "return":
-                # Ignore return cancellation explicitly
-                if event_sub == "return cancellation":
-                    continue
+            # Ignore return cancellation explicitly; other event types are ignored too
+            is_sale = event_type.eq("sale")
+            is_return = event_type.eq("return") & event_sub.ne("return cancellation")
 
-                if event_sub == "return":
-                    rtype = "CUSTOMER_RETURN"
-                elif event_sub == "cancellation":
-                    rtype = "RTO"
-                else:
-                    # unknown subtype -> keep but label it
-                    rtype = (event_sub or "RETURN").upper()
+            # Return -> CUSTOMER_RETURN, Cancellation -> RTO,
+            # unknown subtype -> keep but label it
+            rtype = event_sub.str.upper().where(event_sub.ne(""), "RETURN")
+            rtype = rtype.mask(event_sub.eq("return"), "CUSTOMER_RETURN").mask(event_sub.eq("cancellation"), "RTO")
 
-                enriched["return_amount"] = final_amt  # FK returns have amount
-                enriched["return_type_norm"] = rtype
+            s_idx = is_sale[is_sale].index
+            sales_frame = pd.DataFrame(
+                {
+                    "order_line_id": order_line_id[s_idx],
+                    "style_key": style_key[s_idx],
+                    "order_date": dt[s_idx],
+                    "seller_sku_code": seller_sku_code[s_idx],
+                    "raw_json": raw_json_series(
+                        df.loc[s_idx], extra={k: v[s_idx] if isinstance(v, pd.Series) else v for k, v in enriched.items()}
+                    ),
+                    "workspace_id": str(ws_id),
+                    "upload_id": str(upload_id) if upload_id else None,
+                    "units": units[s_idx],
+                    "seller_price": unit_price[s_idx],
+                    "gmv": unit_price[s_idx] * units[s_idx],
+                },
+                index=s_idx,
+            )
 
-                return_rows.append(
-                    {
-                        "order_line_id": order_line_id,   # must match sales for joins
-                        "style_key": style_key,
-                        "return_date": dt,
-                        "return_type": rtype,
-                        "units": qty if qty > 0 else 1,
-                        "seller_sku_code": seller_sku_code,
-                        "raw_json": json.dumps(enriched, ensure_ascii=False),
-                        "workspace_id": ws_id,
-                    }
-                )
+            r_idx = is_return[is_return].index
+            return_extra = {k: v[r_idx] if isinstance(v, pd.Series) else v for k, v in enriched.items()}
+            return_extra["return_amount"] = final_amt[r_idx]  # FK returns have amount
+            return_extra["return_type_norm"] = rtype[r_idx]
+            returns_frame = pd.DataFrame(
+                {
+                    "order_line_id": order_line_id[r_idx],  # must match sales for joins
+                    "style_key": style_key[r_idx],
+                    "return_date": dt[r_idx],
+                    "return_type": rtype[r_idx],
+                    "units": units[r_idx],
+                    "seller_sku_code": seller_sku_code[r_idx],
+                    "raw_json": raw_json_series(df.loc[r_idx], extra=return_extra),
+                    "workspace_id": str(ws_id),
+                    "upload_id": str(upload_id) if upload_id else None,
+                },
+                index=r_idx,
+            )
+            # the events report carries no return_sub_reason
+            returns_frame["reason_raw"], returns_frame["reason_bucket"] = reason_columns(
+                None, returns_frame["return_type"], "flipkart"
+            )
+            sales_frame["brand_norm"] = brand_norm[s_idx]
+            returns_frame["brand_norm"] = brand_norm[r_idx]
+            sales_frame["portal"] = "flipkart"
+            returns_frame["portal"] = "flipkart"
 
+            if replace:
+                sales_rl.add(sales_frame)
+                returns_rl.add(returns_frame)
             else:
-                # ignore other event types
-                continue
-
-        inserted_sales = 0
-        inserted_returns = 0
-
-        if sales_rows:
-            db.execute(SalesRaw.__table__.insert(), sales_rows)
-            inserted_sales = len(sales_rows)
-
-        if return_rows:
-            db.execute(ReturnsRaw.__table__.insert(), return_rows)
-            inserted_returns = len(return_rows)
+                sales_load = add_load_stats(sales_load, copy_frame(db, SalesRaw.__tablename__, sales_frame))
+                returns_load = add_load_stats(returns_load, copy_frame(db, ReturnsRaw.__tablename__, returns_frame))
+            loaded_dt = pd.concat([dt[s_idx], dt[r_idx]])
+            months.update(_month_start_dates_from_series(loaded_dt))
+            date_range = _widen_date_range(date_range, loaded_dt)
+            n_sales += int(len(s_idx))
+            n_returns += int(len(r_idx))
+            if progress:
+                progress(rows_in_file, chunks)
 
+        if replace:
+            if not n_sales and not n_returns:
+                raise HTTPException(status_code=400, detail="No sale/return events to replace with; existing rows kept.")
+            sales_load = sales_rl.swap(allow_empty=True)
+            returns_load = returns_rl.swap(allow_empty=True)
+        empty_load = {"rows": 0, "inserted": 0, "updated": 0, "skipped": 0}
+        sales_load = sales_load or empty_load
+        returns_load = returns_load or empty_load
+        facts = refresh_daily_facts(
+            db, ws_id, *date_range, full_refresh=bool(replace), linked_returns=bool(n_sales)
+        )
         db.commit()
+        sm_stats = refresh_style_monthly(db, ws_id, months=sorted(months), full_refresh=bool(replace))
 
+        inserted_sales = sales_load["rows"]
+        inserted_returns = returns_load["rows"]
         return {
             "workspace_slug": ws_slug,
+            "rows_in_file": int(rows_in_file),
+            "inserted": inserted_sales + inserted_returns,
             "inserted_sales": inserted_sales,
             "inserted_returns": inserted_returns,
+            "chunks": int(chunks),
+            "load": {"sales": sales_load, "returns": returns_load},
+            "style_monthly": sm_stats,
+            "daily_facts": facts,
+            "date_min": date_range[0],
+            "date_max": date_range[1],
+            "date_errors": date_errors.to_dict(),
         }
 
-    except IntegrityError as e:
+    except HTTPException:
+        db.rollback()
+        raise
+    except (IntegrityError, psycopg2.IntegrityError) as e:
         db.rollback()
         raise HTTPException(
             status_code=409,
@@ -3212,6 +3268,24 @@ async def db_ingest_flipkart_events(
         db.close()
 
 
+@app.post("/db/ingest/flipkart/events")
+async def db_ingest_flipkart_events(
+    file: UploadFile = File(...),
+    replace: bool = False,
+    workspace_slug: str = Query("default"),
+    stream: bool = Query(True, description="Parse a CSV in memory-bounded chunks (INGEST_MAX_MEMORY_MB)"),
+    force: bool = Query(False, description="Ingest even if this exact file was already loaded"),
+    background: bool = Query(False, description="Opt in: queue the file and return a job id (poll /db/jobs/{id}); needs the ingest worker"),
+):
+    return await run_or_enqueue_ingest(
+        "flipkart-events", file, background, workspace_slug,
+        replace=replace, stream=stream, force=force,
+    )
+
+
+register_ingest_handler("flipkart-events", tracked_ingest("flipkart-events", ingest_flipkart_events_file))
+
+
 def _norm_key(s: str) -> str:
     return "".join(ch for ch in str(s or "").strip().lower() if ch.isalnum())
 
@@ -3229,35 +3303,6 @@ def _pick(row: dict, header_map: dict, *wanted_norm_keys: str):
                 return v
     return None
 
-def _parse_dt_any(x) -> datetime | None:
-    s = str(x or "").strip()
-    if not s:
-        return None
-
-    # common formats seen in FK exports
-    fmts = [
-        "%Y-%m-%d",
-        "%Y/%m/%d",
-        "%d-%m-%Y",
-        "%d/%m/%Y",
-        "%Y-%m-%d %H:%M:%S",
-        "%d-%m-%Y %H:%M:%S",
-        "%d/%m/%Y %H:%M:%S",
-    ]
-    for f in fmts:
-        try:
-            return datetime.strptime(s, f)
-        except Exception:
-            pass
-
-    # last resort: try ISO-ish
-    try:
-        # handles "2025-12-31T00:00:00" etc
-        return datetime.fromisoformat(s.replace("Z", ""))
-    except Exception:
-        return None
-
-
 # ----------------------------
 # Flipkart Orders / Returns Ingest (CSV)
 # ----------------------------
@@ -3267,54 +3312,27 @@ import pandas as pd
 from fastapi import UploadFile, File, Query, HTTPException
 from sqlalchemy import and_
 
-def _get_workspace_id_by_slug(db, ws_slug: str):
-    ws = db.query(Workspace).filter(Workspace.slug == ws_slug).first()
-    if not ws:
-        raise HTTPException(status_code=400, detail=f"Workspace not found: {ws_slug}")
-    return ws.id
-
 def _norm_col(c: str) -> str:
     return "".join(ch.lower() if ch.isalnum() else "_" for ch in str(c or "")).strip("_")
 
-def _pick_col(df: pd.DataFrame, wanted: str):
-    # match by normalized column name
-    w = _norm_col(wanted)
-    for c in df.columns:
-        if _norm_col(c) == w:
-            return c
-    return None
-
-def _to_int(x, default=1):
-    try:
-        s = str(x).strip()
-        if not s:
-            return default
-        return int(float(s))
-    except Exception:
-        return default
-
-def _to_dt(val):
-    # returns python datetime or None
-    try:
-        if val is None:
-            return None
-        s = str(val).strip()
-        if not s:
-            return None
-        # handles: "2025-12-14 00:00:00.0", "2025-12-14 10:00:00", "20/12/2025"
-        dt = pd.to_datetime(s, errors="coerce", dayfirst=True)
-        if pd.isna(dt):
-            return None
-        return dt.to_pydatetime()
-    except Exception:
-        return None
+def _pick_col(df: pd.DataFrame, wanted: str):
+    # match by normalized column name
+    w = _norm_col(wanted)
+    for c in df.columns:
+        if _norm_col(c) == w:
+            return c
+    return None
 
-@app.post("/db/ingest/flipkart/orders")
-async def db_ingest_flipkart_orders(
-    file: UploadFile = File(...),
-    workspace_slug: str = Query("default"),
-    replace: bool = Query(False),
-):
+def ingest_flipkart_orders_file(
+    f,
+    filename: str | None,
+    replace: bool,
+    workspace_slug: str,
+    stream: bool = True,
+    progress=None,
+    on_conflict: str = "skip",
+    upload_id=None,
+) -> dict:
     """
     Flipkart Orders CSV -> sales_raw
     - order_line_id: fk:{workspace_slug}:{order_item_id}
@@ -3322,102 +3340,171 @@ async def db_ingest_flipkart_orders(
     - seller_sku_code: sku
     - units: quantity
     - skips CANCELLED rows
-    - replace=true deletes existing flipkart sales for this workspace first
+    - replace=true swaps out the workspace's existing flipkart sales (not on an empty file)
     """
-    db = SessionLocal()
     try:
-        ws_slug = (workspace_slug or "").strip() or "default"
-        ws_id = _get_workspace_id_by_slug(db, ws_slug)
+        header = csv_header(f)
+    except pd.errors.EmptyDataError:
+        raise HTTPException(status_code=400, detail="Empty file")
 
-        content = await file.read()
-        if not content:
-            raise HTTPException(status_code=400, detail="Empty file")
-
-        df = pd.read_csv(io.BytesIO(content), dtype=str, keep_default_na=False)
-
-        c_order_item_id = _pick_col(df, "order_item_id")
-        c_order_date = _pick_col(df, "order_date")
-        c_sku = _pick_col(df, "sku")
-        c_qty = _pick_col(df, "quantity")
-        c_status = _pick_col(df, "order_item_status")
-
-        missing = [x for x in ["order_item_id","order_date","sku"] if _pick_col(df, x) is None]
-        if missing:
-            raise HTTPException(status_code=400, detail=f"Missing required columns: {missing}")
-
-        # DELETE first (replace)
-        if replace:
-            db.query(SalesRaw).filter(
-                SalesRaw.workspace_id == ws_id,
-                SalesRaw.order_line_id.like(f"fk:{ws_slug}:%"),
-            ).delete(synchronize_session=False)
-            db.commit()
+    c_order_item_id = _pick_col(header, "order_item_id")
+    c_order_date = _pick_col(header, "order_date")
+    c_sku = _pick_col(header, "sku")
+    c_qty = _pick_col(header, "quantity")
+    c_status = _pick_col(header, "order_item_status")
 
-        inserted = 0
-        rows = []
+    missing = [x for x in ["order_item_id","order_date","sku"] if _pick_col(header, x) is None]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Missing required columns: {missing}")
 
-        for _, r in df.iterrows():
-            order_item_id = str(r.get(c_order_item_id, "")).strip()
-            if not order_item_id:
-                continue
+    db = SessionLocal()
+    try:
+        ws_slug = (workspace_slug or "").strip() or "default"
+        ws_id = resolve_workspace_id(db, ws_slug)
 
-            status = str(r.get(c_status, "")).strip().upper() if c_status else ""
-            if "CANCEL" in status:
-                continue
+        # replace: the file is staged in full and swapped in just before the commit
+        replacing = (
+            ReplaceLoad(db, SalesRaw.__tablename__, {"workspace_id": ws_id, "portal": "flipkart"}) if replace else None
+        )
 
-            sku = str(r.get(c_sku, "")).strip()
-            if not sku:
+        rows_in_file = 0
+        rows_kept = 0
+        chunks = 0
+        load = None
+        months: set[date] = set()
+        date_range = (None, None)
+        date_errors = DateErrors()
+        brands = CatalogBrands.load(db, ws_id)
+
+        for df in iter_csv_chunks(f, stream=stream):
+            rows_in_file += int(len(df))
+            chunks += 1
+
+            order_item_id = df[c_order_item_id].astype(str).str.strip()
+            sku = df[c_sku].astype(str).str.strip()
+            status = df[c_status].astype(str).str.strip().str.upper() if c_status else None
+
+            keep = order_item_id.ne("") & sku.ne("")
+            if status is not None:
+                keep &= ~status.str.contains("CANCEL", regex=False)
+
+            df = df[keep]
+            order_item_id, sku = order_item_id[keep], sku[keep]
+            if df.empty:
+                if progress:
+                    progress(rows_in_file, chunks)
                 continue
 
-            odt = _to_dt(r.get(c_order_date))
-            qty = _to_int(r.get(c_qty), default=1) if c_qty else 1
+            odt = parse_dt_series(df[c_order_date], "flipkart-orders", c_order_date, date_errors)
+            qty = _fk_int_series(df[c_qty], default=1) if c_qty else pd.Series(1, index=df.index)
+            units = qty.where(qty > 0, 1)
+            # orders export usually has no price column; GMV then stays 0 (GSTR is the FK GMV source)
+            price = seller_price_series(df)
+            gmv_price = seller_price_series(df, SELLER_PRICE_KEYS)
 
-            order_line_id = f"fk:{ws_slug}:{order_item_id}"
-            style_key = f"fk:{sku}"
+            frame = pd.DataFrame(
+                {
+                    "order_line_id": f"fk:{ws_slug}:" + order_item_id,
+                    "style_key": "fk:" + sku,
+                    "order_date": odt,
+                    "seller_sku_code": sku,
+                    "units": units,
+                    "raw_json": raw_json_series(df),
+                    "workspace_id": str(ws_id),
+                    "upload_id": str(upload_id) if upload_id else None,
+                    "seller_price": price,
+                    "gmv": gmv_price.fillna(0.0) * units,
+                    "portal": "flipkart",
+                },
+                index=df.index,
+            )
+            frame["brand_norm"] = resolve_brand_norm(brands, frame["style_key"], sku)
 
-            payload = {
-                "order_line_id": order_line_id,
-                "style_key": style_key,
-                "order_date": odt,
-                "seller_sku_code": sku,
-                "units": qty if qty > 0 else 1,
-                "raw_json": json.dumps({k: str(v) for k, v in r.to_dict().items()}),
-                "workspace_id": ws_id,
-            }
-            rows.append(payload)
+            # existing order_line_ids are resolved in SQL by copy_frame(), no key scan in Python
+            if replacing:
+                replacing.add(frame)
+            else:
+                load = add_load_stats(
+                    load,
+                    copy_frame(
+                        db, SalesRaw.__tablename__, frame,
+                        on_conflict=on_conflict, conflict_cols=("order_line_id",),
+                        previous=("order_date", "style_key"),
+                    ),
+                )
+            months.update(_month_start_dates_from_series(odt))
+            date_range = _widen_date_range(date_range, odt)
+            rows_kept += int(len(df))
+            if progress:
+                progress(rows_in_file, chunks)
 
-        if not rows:
+        if not rows_kept:
+            db.commit()
             return {"ok": True, "inserted": 0, "workspace_slug": ws_slug, "note": "No valid rows to insert."}
 
-        # Avoid duplicates without relying on ON CONFLICT (safe even if unique index is broken)
-        # We skip any order_line_id already present for this workspace’s fk prefix.
-        existing = set(
-            x[0]
-            for x in db.query(SalesRaw.order_line_id)
-                .filter(SalesRaw.workspace_id == ws_id)
-                .filter(SalesRaw.order_line_id.like(f"fk:{ws_slug}:%"))
-                .all()
-        )
-
-        final_rows = [p for p in rows if p["order_line_id"] not in existing]
-
-        if final_rows:
-            db.bulk_insert_mappings(SalesRaw, final_rows)
-            db.commit()
-            inserted = len(final_rows)
+        if replacing:
+            # the workspace's flipkart sales are swapped out in this transaction
+            load = replacing.swap(on_conflict=on_conflict, conflict_cols=("order_line_id",))
+        else:
+            # updated rows also leave the day / month they were counted in
+            prev_dt = _previous_dates(load)
+            months.update(_month_start_dates_from_series(prev_dt))
+            date_range = _widen_date_range(date_range, prev_dt)
+        facts = refresh_daily_facts(db, ws_id, *date_range, full_refresh=bool(replace), linked_returns=True)
+        db.commit()
+        sm_stats = refresh_style_monthly(db, ws_id, months=sorted(months), full_refresh=bool(replace))
 
-        return {"ok": True, "inserted": inserted, "workspace_slug": ws_slug}
+        return {
+            "ok": True,
+            "rows_in_file": int(rows_in_file),
+            "inserted": load["inserted"],
+            "updated": load["updated"],
+            "skipped": load["skipped"],
+            "on_conflict": on_conflict,
+            "workspace_slug": ws_slug,
+            "chunks": int(chunks),
+            "load": load,
+            "style_monthly": sm_stats,
+            "daily_facts": facts,
+            "date_min": date_range[0],
+            "date_max": date_range[1],
+            "date_errors": date_errors.to_dict(),
+        }
 
     finally:
         db.close()
 
 
-@app.post("/db/ingest/flipkart/returns")
-async def db_ingest_flipkart_returns(
+@app.post("/db/ingest/flipkart/orders")
+async def db_ingest_flipkart_orders(
     file: UploadFile = File(...),
     workspace_slug: str = Query("default"),
     replace: bool = Query(False),
+    stream: bool = Query(True, description="Parse the CSV in memory-bounded chunks (INGEST_MAX_MEMORY_MB)"),
+    on_conflict: str = Query("skip", description=ON_CONFLICT_HELP),
+    force: bool = Query(False, description="Ingest even if this exact file was already loaded"),
+    background: bool = Query(False, description="Opt in: queue the file and return a job id (poll /db/jobs/{id}); needs the ingest worker"),
 ):
+    check_on_conflict(on_conflict)
+    return await run_or_enqueue_ingest(
+        "flipkart-orders", file, background, workspace_slug,
+        replace=replace, stream=stream, on_conflict=on_conflict, force=force,
+    )
+
+
+register_ingest_handler("flipkart-orders", tracked_ingest("flipkart-orders", ingest_flipkart_orders_file))
+
+
+def ingest_flipkart_returns_file(
+    f,
+    filename: str | None,
+    replace: bool,
+    workspace_slug: str,
+    stream: bool = True,
+    progress=None,
+    on_conflict: str = "skip",
+    upload_id=None,
+) -> dict:
     """
     Flipkart Returns CSV -> returns_raw
     - order_line_id: fk:{workspace_slug}:{order_item_id}
@@ -3426,108 +3513,176 @@ async def db_ingest_flipkart_returns(
     - units: quantity
     - return_date: return_approval_date (fallback return_completion_date)
     - return_type: "RTO" if courier_return else "CUSTOMER_RETURN"
-    - replace=true deletes existing flipkart returns for this workspace first
+    - replace=true swaps out the workspace's existing flipkart returns (not on an empty file)
     """
-    db = SessionLocal()
     try:
-        ws_slug = (workspace_slug or "").strip() or "default"
-        ws_id = _get_workspace_id_by_slug(db, ws_slug)
-
-        content = await file.read()
-        if not content:
-            raise HTTPException(status_code=400, detail="Empty file")
+        header = csv_header(f)
+    except pd.errors.EmptyDataError:
+        raise HTTPException(status_code=400, detail="Empty file")
 
-        df = pd.read_csv(io.BytesIO(content), dtype=str, keep_default_na=False)
+    c_order_item_id = _pick_col(header, "order_item_id")
+    c_sku = _pick_col(header, "sku")
+    c_qty = _pick_col(header, "quantity")
 
-        c_order_item_id = _pick_col(df, "order_item_id")
-        c_sku = _pick_col(df, "sku")
-        c_qty = _pick_col(df, "quantity")
+    # THIS IS THE KEY FIX (your file has approval date filled, requested date empty)
+    c_ret_dt = _pick_col(header, "return_approval_date") or _pick_col(header, "return_completion_date")
 
-        # THIS IS THE KEY FIX (your file has approval date filled, requested date empty)
-        c_ret_dt = _pick_col(df, "return_approval_date") or _pick_col(df, "return_completion_date")
+    c_ret_type = _pick_col(header, "return_type")
+    c_status = _pick_col(header, "return_status")
+    c_sub_reason = _pick_col(header, "return_sub_reason")
 
-        c_ret_type = _pick_col(df, "return_type")
-        c_status = _pick_col(df, "return_status")
+    if not c_order_item_id or not c_sku or not c_ret_dt:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Missing required columns. Need order_item_id, sku, return_approval_date/return_completion_date",
+        )
 
-        if not c_order_item_id or not c_sku or not c_ret_dt:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Missing required columns. Need order_item_id, sku, return_approval_date/return_completion_date",
-            )
+    db = SessionLocal()
+    try:
+        ws_slug = (workspace_slug or "").strip() or "default"
+        ws_id = resolve_workspace_id(db, ws_slug)
 
-        if replace:
-            db.query(ReturnsRaw).filter(
-                ReturnsRaw.workspace_id == ws_id,
-                ReturnsRaw.order_line_id.like(f"fk:{ws_slug}:%"),
-            ).delete(synchronize_session=False)
-            db.commit()
+        # replace: the file is staged in full and swapped in just before the commit
+        replacing = (
+            ReplaceLoad(db, ReturnsRaw.__tablename__, {"workspace_id": ws_id, "portal": "flipkart"}) if replace else None
+        )
 
-        rows = []
-        for _, r in df.iterrows():
-            order_item_id = str(r.get(c_order_item_id, "")).strip()
-            if not order_item_id:
-                continue
+        rows_in_file = 0
+        rows_kept = 0
+        chunks = 0
+        load = None
+        months: set[date] = set()
+        date_range = (None, None)
+        date_errors = DateErrors()
+        brands = CatalogBrands.load(db, ws_id)
 
-            # optional: skip cancelled return rows
-            st = str(r.get(c_status, "")).strip().lower() if c_status else ""
-            if st == "cancelled":
-                continue
+        for df in iter_csv_chunks(f, stream=stream):
+            rows_in_file += int(len(df))
+            chunks += 1
 
-            sku = str(r.get(c_sku, "")).strip()
-            if not sku:
-                continue
+            order_item_id = df[c_order_item_id].astype(str).str.strip()
+            sku = df[c_sku].astype(str).str.strip()
+            rdt = parse_dt_series(df[c_ret_dt], "flipkart-returns", c_ret_dt, date_errors)
 
-            rdt = _to_dt(r.get(c_ret_dt))
-            if rdt is None:
+            keep = order_item_id.ne("") & sku.ne("") & rdt.notna()
+            # optional: skip cancelled return rows
+            if c_status:
+                keep &= df[c_status].astype(str).str.strip().str.lower().ne("cancelled")
+
+            df = df[keep]
+            order_item_id, sku, rdt = order_item_id[keep], sku[keep], rdt[keep]
+            if df.empty:
+                if progress:
+                    progress(rows_in_file, chunks)
                 continue
 
-            qty = _to_int(r.get(c_qty), default=1) if c_qty else 1
+            qty = _fk_int_series(df[c_qty], default=1) if c_qty else pd.Series(1, index=df.index)
 
-            rt = str(r.get(c_ret_type, "")).strip().lower() if c_ret_type else ""
             # your file has: customer_return / courier_return
             # dashboard logic looks for "RTO" substring sometimes, so map courier_return -> RTO
-            mapped_type = "RTO" if "courier" in rt else "CUSTOMER_RETURN"
-
-            payload = {
-                "order_line_id": f"fk:{ws_slug}:{order_item_id}",
-                "style_key": f"fk:{sku}",
-                "return_date": rdt,
-                "return_type": mapped_type,
-                "units": qty if qty > 0 else 1,
-                "seller_sku_code": sku,
-                "raw_json": json.dumps({k: str(v) for k, v in r.to_dict().items()}),
-                "workspace_id": ws_id,
-            }
-            rows.append(payload)
+            rt = df[c_ret_type].astype(str).str.strip().str.lower() if c_ret_type else pd.Series("", index=df.index)
+            mapped_type = pd.Series("CUSTOMER_RETURN", index=df.index).mask(rt.str.contains("courier", regex=False), "RTO")
 
-        if not rows:
-            return {"ok": True, "inserted": 0, "workspace_slug": ws_slug, "note": "No valid rows to insert."}
+            frame = pd.DataFrame(
+                {
+                    "order_line_id": f"fk:{ws_slug}:" + order_item_id,
+                    "style_key": "fk:" + sku,
+                    "return_date": rdt,
+                    "return_type": mapped_type,
+                    "units": qty.where(qty > 0, 1),
+                    "seller_sku_code": sku,
+                    "raw_json": raw_json_series(df),
+                    "workspace_id": str(ws_id),
+                    "upload_id": str(upload_id) if upload_id else None,
+                    "portal": "flipkart",
+                },
+                index=df.index,
+            )
+            frame["reason_raw"], frame["reason_bucket"] = reason_columns(
+                df[c_sub_reason] if c_sub_reason else None, mapped_type, "flipkart"
+            )
+            frame["brand_norm"] = resolve_brand_norm(brands, frame["style_key"], sku)
 
-        existing = set(
-            x[0]
-            for x in db.query(ReturnsRaw.order_line_id)
-                .filter(ReturnsRaw.workspace_id == ws_id)
-                .filter(ReturnsRaw.order_line_id.like(f"fk:{ws_slug}:%"))
-                .all()
-        )
-        final_rows = [p for p in rows if p["order_line_id"] not in existing]
+            # existing order_line_ids are resolved in SQL by copy_frame(), no key scan in Python
+            if replacing:
+                replacing.add(frame)
+            else:
+                load = add_load_stats(
+                    load,
+                    copy_frame(
+                        db, ReturnsRaw.__tablename__, frame,
+                        on_conflict=on_conflict, conflict_cols=("order_line_id",),
+                        previous=("return_date", "style_key"),
+                    ),
+                )
+            months.update(_month_start_dates_from_series(rdt))
+            date_range = _widen_date_range(date_range, rdt)
+            rows_kept += int(len(df))
+            if progress:
+                progress(rows_in_file, chunks)
 
-        inserted = 0
-        if final_rows:
-            db.bulk_insert_mappings(ReturnsRaw, final_rows)
+        if not rows_kept:
             db.commit()
-            inserted = len(final_rows)
+            return {"ok": True, "inserted": 0, "workspace_slug": ws_slug, "note": "No valid rows to insert."}
+
+        if replacing:
+            # the workspace's flipkart returns are swapped out in this transaction
+            load = replacing.swap(on_conflict=on_conflict, conflict_cols=("order_line_id",))
+        else:
+            # updated rows also leave the day / month they were counted in
+            prev_dt = _previous_dates(load)
+            months.update(_month_start_dates_from_series(prev_dt))
+            date_range = _widen_date_range(date_range, prev_dt)
+        facts = refresh_daily_facts(db, ws_id, *date_range, full_refresh=bool(replace))
+        db.commit()
+        sm_stats = refresh_style_monthly(db, ws_id, months=sorted(months), full_refresh=bool(replace))
 
-        return {"ok": True, "inserted": inserted, "workspace_slug": ws_slug}
+        return {
+            "ok": True,
+            "rows_in_file": int(rows_in_file),
+            "inserted": load["inserted"],
+            "updated": load["updated"],
+            "skipped": load["skipped"],
+            "on_conflict": on_conflict,
+            "workspace_slug": ws_slug,
+            "chunks": int(chunks),
+            "load": load,
+            "style_monthly": sm_stats,
+            "daily_facts": facts,
+            "date_min": date_range[0],
+            "date_max": date_range[1],
+            "date_errors": date_errors.to_dict(),
+        }
 
     finally:
         db.close()
 
 
+@app.post("/db/ingest/flipkart/returns")
+async def db_ingest_flipkart_returns(
+    file: UploadFile = File(...),
+    workspace_slug: str = Query("default"),
+    replace: bool = Query(False),
+    stream: bool = Query(True, description="Parse the CSV in memory-bounded chunks (INGEST_MAX_MEMORY_MB)"),
+    on_conflict: str = Query("skip", description=ON_CONFLICT_HELP),
+    force: bool = Query(False, description="Ingest even if this exact file was already loaded"),
+    background: bool = Query(False, description="Opt in: queue the file and return a job id (poll /db/jobs/{id}); needs the ingest worker"),
+):
+    check_on_conflict(on_conflict)
+    return await run_or_enqueue_ingest(
+        "flipkart-returns", file, background, workspace_slug,
+        replace=replace, stream=stream, on_conflict=on_conflict, force=force,
+    )
+
+
+register_ingest_handler("flipkart-returns", tracked_ingest("flipkart-returns", ingest_flipkart_returns_file))
+
+
 # -----------------------------------------------------------------------------
 # KPI endpoints (unchanged behavior, just workspace_slug)
 # -----------------------------------------------------------------------------
 @app.get("/db/kpi/summary")
+@cached_by_data_version("/db/kpi/summary")
 def db_kpi_summary(
     start: date = Query(...),
     end: date = Query(...),
@@ -3549,105 +3704,42 @@ def db_kpi_summary(
         if mode not in ("overall", "same_month"):
             mode = "overall"
 
-        # Optional brand filter: restrict to styles from catalog
-        style_key_filter = None
-        if brand:
-            style_key_filter = [
-                (r[0] or "").strip().lower()
-                for r in (
-                    db.query(func.lower(func.trim(CatalogRaw.style_key)))
-                    .filter(CatalogRaw.workspace_id == ws_id)
-                    .filter(func.lower(func.trim(CatalogRaw.brand)) == brand.strip().lower())
-                    .all()
-                )
-                if (r[0] or "").strip()
-            ]
-            if not style_key_filter:
-                return {
-                    "workspace_slug": ws_slug,
-                    "start": str(start),
-                    "end": str(end),
-                    "window": {"start": str(start), "end": str(end)},
-                    "orders": 0,
-                    "returns_total_units": 0,
-                    "return_units": 0,
-                    "rto_units": 0,
-                    "returns": 0,
-                    "rto": 0,
-                    "return_pct": 0.0,
-                    "return_only_pct": 0.0,
-                    "rto_pct": 0.0,
-                    "return_mode": mode,
-                }
-
-        # Orders (sales) in window
-        sales_q = (
-            db.query(func.coalesce(func.sum(SalesRaw.units), 0))
-            .filter(SalesRaw.workspace_id == ws_id)
-            .filter(SalesRaw.order_date >= start_dt)
-            .filter(SalesRaw.order_date < end_dt_excl)
-        )
-        sales_q = _apply_portal_sales(sales_q, ws_slug, portal)
-
-        if style_key_filter is not None:
-            sales_q = sales_q.filter(func.lower(func.trim(SalesRaw.style_key)).in_(style_key_filter))
-
-        orders_units = int(sales_q.scalar() or 0)
-
-        unit_expr = func.coalesce(ReturnsRaw.units, 1)
-        rtype_norm = func.upper(func.trim(func.coalesce(ReturnsRaw.return_type, "")))
+        # Optional brand filter: catalog brand resolved onto the facts (brand_norm)
+        brand_norm = normalize_brand(brand) if brand else None
 
-        # Returns in window
         if mode == "overall":
-            # overall: by return_date only (no sale-date linking)
-
-            returns_total_units_q = (
-                db.query(func.coalesce(func.sum(unit_expr), 0))
-                .filter(ReturnsRaw.workspace_id == ws_id)
-                .filter(ReturnsRaw.return_date >= start_dt)
-                .filter(ReturnsRaw.return_date < end_dt_excl)
-            )
-            returns_total_units_q = _apply_portal_returns(returns_total_units_q, ws_slug, portal)
-
-            if style_key_filter is not None:
-                returns_total_units_q = returns_total_units_q.filter(
-                    func.lower(func.trim(ReturnsRaw.style_key)).in_(style_key_filter)
-                )
-            returns_total_units = int(returns_total_units_q.scalar() or 0)
+            # overall: orders by order_date, returns by return_date (no sale-date linking),
+            # one pass over the daily facts
+            row = facts_window(
+                db, ws_id, start, end,
+                func.coalesce(func.sum(DailySkuFact.units), 0).label("orders"),
+                func.coalesce(func.sum(DailySkuFact.returns_units), 0).label("returns_total_units"),
+                func.coalesce(func.sum(DailySkuFact.rto_units), 0).label("rto_units"),
+                # Customer returns: RETURN (Myntra) + CUSTOMER_RETURN (Flipkart)
+                func.coalesce(func.sum(DailySkuFact.customer_return_units), 0).label("return_units"),
+                portal=_portal_norm(portal),
+                brand_norm=brand_norm,
+            ).one()
+            orders_units = int(row.orders or 0)
+            returns_total_units = int(row.returns_total_units or 0)
+            rto_units = int(row.rto_units or 0)
+            return_units = int(row.return_units or 0)
 
-            rto_units_q = (
-                db.query(func.coalesce(func.sum(case((rtype_norm == "RTO", unit_expr), else_=0)), 0))
-                .filter(ReturnsRaw.workspace_id == ws_id)
-                .filter(ReturnsRaw.return_date >= start_dt)
-                .filter(ReturnsRaw.return_date < end_dt_excl)
-            )
-            rto_units_q = _apply_portal_returns(rto_units_q, ws_slug, portal)
-
-            if style_key_filter is not None:
-                rto_units_q = rto_units_q.filter(func.lower(func.trim(ReturnsRaw.style_key)).in_(style_key_filter))
-            rto_units = int(rto_units_q.scalar() or 0)
-
-            # Customer returns: RETURN (Myntra) + CUSTOMER_RETURN (Flipkart)
-            return_units_q = (
-                db.query(
-                    func.coalesce(
-                        func.sum(case((rtype_norm.in_(["RETURN", "CUSTOMER_RETURN"]), unit_expr), else_=0)),
-                        0,
-                    )
-                )
-                .filter(ReturnsRaw.workspace_id == ws_id)
-                .filter(ReturnsRaw.return_date >= start_dt)
-                .filter(ReturnsRaw.return_date < end_dt_excl)
+        else:
+            orders_units = int(
+                facts_window(
+                    db, ws_id, start, end,
+                    func.coalesce(func.sum(DailySkuFact.units), 0),
+                    portal=_portal_norm(portal),
+                    brand_norm=brand_norm,
+                ).scalar()
+                or 0
             )
-            return_units_q = _apply_portal_returns(return_units_q, ws_slug, portal)
 
-            if style_key_filter is not None:
-                return_units_q = return_units_q.filter(func.lower(func.trim(ReturnsRaw.style_key)).in_(style_key_filter))
-            return_units = int(return_units_q.scalar() or 0)
-
-        else:
             # same_month: only returns where sales month == return month, and both sale+return in window
             # IMPORTANT: Dedup sales by order_line_id to avoid multiple-month matches inflating same_month
+            unit_expr = func.coalesce(ReturnsRaw.units, 1)
+            rtype_norm = func.upper(func.trim(func.coalesce(ReturnsRaw.return_type, "")))
 
             sales_one_q = (
                 db.query(
@@ -3664,8 +3756,8 @@ def db_kpi_summary(
             sales_one_q = _apply_portal_sales(sales_one_q, ws_slug, portal)
 
             # Apply brand/style filter on sales side (if present)
-            if style_key_filter is not None:
-                sales_one_q = sales_one_q.filter(func.lower(func.trim(SalesRaw.style_key)).in_(style_key_filter))
+            if brand_norm is not None:
+                sales_one_q = sales_one_q.filter(SalesRaw.brand_norm == brand_norm)
 
             sales_one = sales_one_q.group_by(SalesRaw.order_line_id).subquery()
 
@@ -3731,6 +3823,7 @@ def db_kpi_summary(
         db.close()
 
 @app.get("/db/kpi/returns-trend")
+@cached_by_data_version("/db/kpi/returns-trend")
 def db_kpi_returns_trend(
     start: date = Query(...),
     end: date = Query(...),
@@ -3752,48 +3845,31 @@ def db_kpi_returns_trend(
         if mode not in ("overall", "same_month"):
             mode = "overall"
 
-        style_key_filter = None
-        if brand:
-            style_key_filter = [
-                (r[0] or "").strip().lower()
-                for r in (
-                    db.query(func.lower(func.trim(CatalogRaw.style_key)))
-                    .filter(CatalogRaw.workspace_id == ws_id)
-                    .filter(func.lower(func.trim(CatalogRaw.brand)) == brand.strip().lower())
-                    .all()
-                )
-                if (r[0] or "").strip()
-            ]
-            if not style_key_filter:
-                return {
-                    "workspace_slug": ws_slug,
-                    "window": {"start": str(start), "end": str(end)},
-                    "series": [],
-                    "return_mode": mode,
-                }
+        # Optional brand filter: catalog brand resolved onto the facts (brand_norm)
+        brand_norm = normalize_brand(brand) if brand else None
 
         unit_expr = func.coalesce(ReturnsRaw.units, 1)
         rtype_norm = func.upper(func.trim(func.coalesce(ReturnsRaw.return_type, "")))
 
         if mode == "overall":
+            # return days from the daily facts; days with sales only carry no returns
             q = (
-                db.query(
-                    func.date(ReturnsRaw.return_date).label("d"),
-                    func.coalesce(func.sum(unit_expr), 0).label("returns_total_units"),
-                    func.coalesce(func.sum(case((rtype_norm == "RETURN", unit_expr), else_=0)), 0).label("return_units"),
-                    func.coalesce(func.sum(case((rtype_norm == "RTO", unit_expr), else_=0)), 0).label("rto_units"),
+                facts_window(
+                    db, ws_id, start, end,
+                    DailySkuFact.day.label("d"),
+                    func.sum(DailySkuFact.returns_units).label("returns_total_units"),
+                    func.sum(DailySkuFact.return_units).label("return_units"),
+                    func.sum(DailySkuFact.rto_units).label("rto_units"),
+                    portal=_portal_norm(portal),
+                    brand_norm=brand_norm,
                 )
-                .filter(ReturnsRaw.workspace_id == ws_id)
-                .filter(ReturnsRaw.return_date >= start_dt)
-                .filter(ReturnsRaw.return_date < end_dt_excl)
+                .filter(DailySkuFact.returns_units > 0)
+                .group_by(DailySkuFact.day)
+                .order_by(DailySkuFact.day)
             )
-            q = _apply_portal_returns(q, ws_slug, portal)
-
-            if style_key_filter is not None:
-                q = q.filter(func.lower(func.trim(ReturnsRaw.style_key)).in_(style_key_filter))
-            q = q.group_by(func.date(ReturnsRaw.return_date)).order_by(func.date(ReturnsRaw.return_date))
 
         else:
+            # return_units: RETURN only, as in the overall mode
             q = (
                 db.query(
                     func.date(ReturnsRaw.return_date).label("d"),
@@ -3814,8 +3890,8 @@ def db_kpi_returns_trend(
             q = _apply_portal_sales(q, ws_slug, portal)
             q = _apply_portal_returns(q, ws_slug, portal)
 
-            if style_key_filter is not None:
-                q = q.filter(func.lower(func.trim(SalesRaw.style_key)).in_(style_key_filter))
+            if brand_norm is not None:
+                q = q.filter(SalesRaw.brand_norm == brand_norm)
 
             q = q.group_by(func.date(ReturnsRaw.return_date)).order_by(func.date(ReturnsRaw.return_date))
 
@@ -3844,6 +3920,7 @@ def db_kpi_returns_trend(
 
 
 @app.get("/db/kpi/top-return-styles")
+@cached_by_data_version("/db/kpi/top-return-styles")
 def db_kpi_top_return_styles(
     start: str = Query(...),
     end: str = Query(...),
@@ -3870,27 +3947,13 @@ def db_kpi_top_return_styles(
     try:
         ws_id = resolve_workspace_id(db, workspace_slug)
 
-        # ---------- Brand -> style_keys filter (prevents join duplication)
-        style_key_filter = None
-        brand_norm = (brand or "").strip().lower() if brand else None
-        if brand_norm:
-            brand_style_keys_sq = (
-                db.query(func.lower(func.trim(CatalogRaw.style_key)).label("style_key"))
-                .filter(
-                    CatalogRaw.workspace_id == ws_id,
-                    CatalogRaw.style_key.isnot(None),
-                    CatalogRaw.brand.isnot(None),
-                    func.lower(func.trim(CatalogRaw.brand)) == brand_norm,
-                )
-                .distinct()
-                .subquery()
-            )
-            style_key_filter = select(brand_style_keys_sq.c.style_key)
+        # ---------- Brand filter: brand_norm on the facts (no catalog join, no duplication)
+        brand_norm = normalize_brand(brand) if brand else None
 
         # ---------- Sales: orders per style (sales window)
         sales_q = (
             db.query(
-                func.lower(func.trim(SalesRaw.style_key)).label("style_key"),
+                norm_key(SalesRaw.style_key).label("style_key"),
                 func.coalesce(func.sum(SalesRaw.units), 0).label("orders"),
                 func.max(SalesRaw.order_date).label("last_order_date"),
             )
@@ -3901,10 +3964,10 @@ def db_kpi_top_return_styles(
         )
         sales_q = _apply_portal_sales(sales_q, workspace_slug, portal)
 
-        if style_key_filter is not None:
-            sales_q = sales_q.filter(func.lower(func.trim(SalesRaw.style_key)).in_(style_key_filter))
+        if brand_norm is not None:
+            sales_q = sales_q.filter(SalesRaw.brand_norm == brand_norm)
 
-        sales_by_style = sales_q.group_by(func.lower(func.trim(SalesRaw.style_key))).subquery()
+        sales_by_style = sales_q.group_by(norm_key(SalesRaw.style_key)).subquery()
 
         # ---------- Returns aggregation
         unit_expr = func.coalesce(ReturnsRaw.units, 1)
@@ -3914,7 +3977,7 @@ def db_kpi_top_return_styles(
             # overall: returns in window grouped by ReturnsRaw.style_key (no sale-linking)
             ret_q = (
                 db.query(
-                    func.lower(func.trim(ReturnsRaw.style_key)).label("style_key"),
+                    norm_key(ReturnsRaw.style_key).label("style_key"),
                     func.coalesce(func.sum(unit_expr), 0).label("returns_units"),
                     func.coalesce(func.sum(case((rtype_norm == "RETURN", unit_expr), else_=0)), 0).label("return_units"),
                     func.coalesce(func.sum(case((rtype_norm == "RTO", unit_expr), else_=0)), 0).label("rto_units"),
@@ -3926,16 +3989,16 @@ def db_kpi_top_return_styles(
             )
             ret_q = _apply_portal_returns(ret_q, workspace_slug, portal)
 
-            if style_key_filter is not None:
-                ret_q = ret_q.filter(func.lower(func.trim(ReturnsRaw.style_key)).in_(style_key_filter))
+            if brand_norm is not None:
+                ret_q = ret_q.filter(ReturnsRaw.brand_norm == brand_norm)
 
-            returns_by_style = ret_q.group_by(func.lower(func.trim(ReturnsRaw.style_key))).subquery()
+            returns_by_style = ret_q.group_by(norm_key(ReturnsRaw.style_key)).subquery()
 
         else:
             # same_month: join by order_line_id, and require sale month == return month
             ret_q = (
                 db.query(
-                    func.lower(func.trim(SalesRaw.style_key)).label("style_key"),
+                    norm_key(SalesRaw.style_key).label("style_key"),
                     func.coalesce(func.sum(unit_expr), 0).label("returns_units"),
                     func.coalesce(func.sum(case((rtype_norm == "RETURN", unit_expr), else_=0)), 0).label("return_units"),
                     func.coalesce(func.sum(case((rtype_norm == "RTO", unit_expr), else_=0)), 0).label("rto_units"),
@@ -3954,21 +4017,21 @@ def db_kpi_top_return_styles(
             ret_q = _apply_portal_sales(ret_q, workspace_slug, portal)
             ret_q = _apply_portal_returns(ret_q, workspace_slug, portal)
 
-            if style_key_filter is not None:
-                ret_q = ret_q.filter(func.lower(func.trim(SalesRaw.style_key)).in_(style_key_filter))
+            if brand_norm is not None:
+                ret_q = ret_q.filter(SalesRaw.brand_norm == brand_norm)
 
-            returns_by_style = ret_q.group_by(func.lower(func.trim(SalesRaw.style_key))).subquery()
+            returns_by_style = ret_q.group_by(norm_key(SalesRaw.style_key)).subquery()
 
         # ---------- Catalog: one row per style
         cat = (
             db.query(
-                func.lower(func.trim(CatalogRaw.style_key)).label("style_key"),
+                norm_key(CatalogRaw.style_key).label("style_key"),
                 func.max(CatalogRaw.brand).label("brand"),
                 func.max(CatalogRaw.product_name).label("product_name"),
             )
             .filter(CatalogRaw.workspace_id == ws_id)
             .filter(CatalogRaw.style_key.isnot(None))
-            .group_by(func.lower(func.trim(CatalogRaw.style_key)))
+            .group_by(norm_key(CatalogRaw.style_key))
             .subquery()
         )
 
@@ -4045,28 +4108,14 @@ def db_kpi_top_return_skus(
     try:
         ws_id = resolve_workspace_id(db, workspace_slug)
 
-        # ---------- Brand -> style_keys filter (prevents join duplication)
-        style_key_filter = None
-        brand_norm = (brand or "").strip().lower() if brand else None
-        if brand_norm:
-            brand_style_keys_sq = (
-                db.query(func.lower(func.trim(CatalogRaw.style_key)).label("style_key"))
-                .filter(
-                    CatalogRaw.workspace_id == ws_id,
-                    CatalogRaw.style_key.isnot(None),
-                    CatalogRaw.brand.isnot(None),
-                    func.lower(func.trim(CatalogRaw.brand)) == brand_norm,
-                )
-                .distinct()
-                .subquery()
-            )
-            style_key_filter = select(brand_style_keys_sq.c.style_key)
+        # ---------- Brand filter: brand_norm on the facts (no catalog join, no duplication)
+        brand_norm = normalize_brand(brand) if brand else None
 
         # ---------- Sales: orders per SKU+style (sales window)
         sales_q = (
             db.query(
-                func.lower(func.trim(SalesRaw.seller_sku_code)).label("seller_sku_code"),
-                func.lower(func.trim(SalesRaw.style_key)).label("style_key"),
+                norm_key(SalesRaw.seller_sku_code).label("seller_sku_code"),
+                norm_key(SalesRaw.style_key).label("style_key"),
                 func.coalesce(func.sum(SalesRaw.units), 0).label("orders"),
                 func.max(SalesRaw.order_date).label("last_order_date"),
             )
@@ -4078,12 +4127,12 @@ def db_kpi_top_return_skus(
         )
         sales_q = _apply_portal_sales(sales_q, workspace_slug, portal)
 
-        if style_key_filter is not None:
-            sales_q = sales_q.filter(func.lower(func.trim(SalesRaw.style_key)).in_(style_key_filter))
+        if brand_norm is not None:
+            sales_q = sales_q.filter(SalesRaw.brand_norm == brand_norm)
 
         sales_by_sku = sales_q.group_by(
-            func.lower(func.trim(SalesRaw.seller_sku_code)),
-            func.lower(func.trim(SalesRaw.style_key)),
+            norm_key(SalesRaw.seller_sku_code),
+            norm_key(SalesRaw.style_key),
         ).subquery()
 
         # ---------- Returns aggregation
@@ -4094,8 +4143,8 @@ def db_kpi_top_return_skus(
             # overall: returns in window grouped by ReturnsRaw.seller_sku_code (and style_key if present)
             ret_q = (
                 db.query(
-                    func.lower(func.trim(ReturnsRaw.seller_sku_code)).label("seller_sku_code"),
-                    func.lower(func.trim(ReturnsRaw.style_key)).label("style_key"),
+                    norm_key(ReturnsRaw.seller_sku_code).label("seller_sku_code"),
+                    norm_key(ReturnsRaw.style_key).label("style_key"),
                     func.coalesce(func.sum(unit_expr), 0).label("returns_units"),
                     func.coalesce(func.sum(case((rtype_norm == "RETURN", unit_expr), else_=0)), 0).label("return_units"),
                     func.coalesce(func.sum(case((rtype_norm == "RTO", unit_expr), else_=0)), 0).label("rto_units"),
@@ -4108,20 +4157,20 @@ def db_kpi_top_return_skus(
             )
             ret_q = _apply_portal_returns(ret_q, workspace_slug, portal)
 
-            if style_key_filter is not None:
-                ret_q = ret_q.filter(func.lower(func.trim(ReturnsRaw.style_key)).in_(style_key_filter))
+            if brand_norm is not None:
+                ret_q = ret_q.filter(ReturnsRaw.brand_norm == brand_norm)
 
             returns_by_sku = ret_q.group_by(
-                func.lower(func.trim(ReturnsRaw.seller_sku_code)),
-                func.lower(func.trim(ReturnsRaw.style_key)),
+                norm_key(ReturnsRaw.seller_sku_code),
+                norm_key(ReturnsRaw.style_key),
             ).subquery()
 
         else:
             # same_month: join by order_line_id, and require sale month == return month
             ret_q = (
                 db.query(
-                    func.lower(func.trim(SalesRaw.seller_sku_code)).label("seller_sku_code"),
-                    func.lower(func.trim(SalesRaw.style_key)).label("style_key"),
+                    norm_key(SalesRaw.seller_sku_code).label("seller_sku_code"),
+                    norm_key(SalesRaw.style_key).label("style_key"),
                     func.coalesce(func.sum(unit_expr), 0).label("returns_units"),
                     func.coalesce(func.sum(case((rtype_norm == "RETURN", unit_expr), else_=0)), 0).label("return_units"),
                     func.coalesce(func.sum(case((rtype_norm == "RTO", unit_expr), else_=0)), 0).label("rto_units"),
@@ -4141,24 +4190,24 @@ def db_kpi_top_return_skus(
             ret_q = _apply_portal_sales(ret_q, workspace_slug, portal)
             ret_q = _apply_portal_returns(ret_q, workspace_slug, portal)
 
-            if style_key_filter is not None:
-                ret_q = ret_q.filter(func.lower(func.trim(SalesRaw.style_key)).in_(style_key_filter))
+            if brand_norm is not None:
+                ret_q = ret_q.filter(SalesRaw.brand_norm == brand_norm)
 
             returns_by_sku = ret_q.group_by(
-                func.lower(func.trim(SalesRaw.seller_sku_code)),
-                func.lower(func.trim(SalesRaw.style_key)),
+                norm_key(SalesRaw.seller_sku_code),
+                norm_key(SalesRaw.style_key),
             ).subquery()
 
         # ---------- Catalog: one row per style (brand/product_name context)
         cat = (
             db.query(
-                func.lower(func.trim(CatalogRaw.style_key)).label("style_key"),
+                norm_key(CatalogRaw.style_key).label("style_key"),
                 func.max(CatalogRaw.brand).label("brand"),
                 func.max(CatalogRaw.product_name).label("product_name"),
             )
             .filter(CatalogRaw.workspace_id == ws_id)
             .filter(CatalogRaw.style_key.isnot(None))
-            .group_by(func.lower(func.trim(CatalogRaw.style_key)))
+            .group_by(norm_key(CatalogRaw.style_key))
             .subquery()
         )
 
@@ -4244,22 +4293,8 @@ def db_kpi_returns_cohort(
     try:
         ws_id = resolve_workspace_id(db, workspace_slug)
 
-        # Brand -> style_keys subquery
-        brand_norm = (brand or "").strip().lower() if brand else None
-        style_key_filter = None
-        if brand_norm:
-            brand_style_keys_sq = (
-                db.query(func.lower(func.trim(CatalogRaw.style_key)).label("style_key"))
-                .filter(
-                    CatalogRaw.workspace_id == ws_id,
-                    CatalogRaw.style_key.isnot(None),
-                    CatalogRaw.brand.isnot(None),
-                    func.lower(func.trim(CatalogRaw.brand)) == brand_norm,
-                )
-                .distinct()
-                .subquery()
-            )
-            style_key_filter = select(brand_style_keys_sq.c.style_key)
+        # Brand filter: catalog brand resolved onto the facts (brand_norm)
+        brand_norm = normalize_brand(brand) if brand else None
 
         sales_dt = SalesRaw.order_date
         ret_dt = ReturnsRaw.return_date
@@ -4308,8 +4343,8 @@ def db_kpi_returns_cohort(
         q = _apply_portal_sales(q, workspace_slug, portal)
         q = _apply_portal_returns(q, workspace_slug, portal)
 
-        if style_key_filter is not None:
-            q = q.filter(func.lower(func.trim(SalesRaw.style_key)).in_(style_key_filter))
+        if brand_norm is not None:
+            q = q.filter(SalesRaw.brand_norm == brand_norm)
 
         rows = (
             q.group_by(sale_month, return_month)
@@ -4505,8 +4540,8 @@ def db_style_monthly(
 ):
     """
     Read monthly totals.
-    - overall: returns counted by return_date month (existing style_monthly behavior)
-    - same_month: returns counted only when sale_month == return_month (computed from raw tables)
+    - overall: returns counted by return_date month (style_monthly)
+    - same_month: returns counted only when sale_month == return_month (sku_monthly.same_month_returns)
     """
     def _parse_month(s: str | None) -> date | None:
         if not s:
@@ -4530,12 +4565,12 @@ def db_style_monthly(
         brand_style_keys_sq = None
         if brand_norm:
             brand_style_keys_sq = (
-                db.query(func.lower(func.trim(CatalogRaw.style_key)).label("style_key"))
+                db.query(norm_key(CatalogRaw.style_key).label("style_key"))
                 .filter(
                     CatalogRaw.workspace_id == ws.id,
                     CatalogRaw.style_key.isnot(None),
                     CatalogRaw.brand.isnot(None),
-                    func.lower(func.trim(CatalogRaw.brand)) == brand_norm,
+                    norm_key(CatalogRaw.brand) == brand_norm,
                 )
                 .distinct()
                 .subquery()
@@ -4556,7 +4591,7 @@ def db_style_monthly(
             q = db.query(StyleMonthly).filter(StyleMonthly.workspace_id == ws.id)
 
             if brand_style_keys_sq is not None:
-                q = q.filter(func.lower(func.trim(StyleMonthly.style_key)).in_(select(brand_style_keys_sq.c.style_key)))
+                q = q.filter(norm_key(StyleMonthly.style_key).in_(select(brand_style_keys_sq.c.style_key)))
 
             if start_d:
                 q = q.filter(StyleMonthly.month_start >= start_d)
@@ -4580,91 +4615,44 @@ def db_style_monthly(
                 totals_rows.append(
                     {
                         "month_start": str(t.month_start),
-                        "orders": orders,
-                        "returns": returns,
-                        "return_pct": (returns / orders * 100.0) if orders > 0 else None,
-                        "return_mode": "overall",
-                    }
-                )
-
-        else:
-            # same_month: compute from raw tables (accurate)
-            # month bucket = sale month
-            sale_month = func.date_trunc("month", SalesRaw.order_date)
-
-            # Orders by sale month
-            orders_q = (
-                db.query(
-                    cast(sale_month, Date).label("month_start"),
-                    func.coalesce(func.sum(SalesRaw.units), 0).label("orders"),
-                )
-                .filter(SalesRaw.workspace_id == ws.id)
-                .filter(SalesRaw.order_date.isnot(None))
-            )
-
-            # Apply month range on sale_month using sale dates
-            if start_d:
-                orders_q = orders_q.filter(SalesRaw.order_date >= datetime.combine(start_d, time.min))
-            if end_d:
-                # end_d is month-start; include that month, so go to next month start exclusive
-                end_next = (end_d.replace(day=1) + timedelta(days=32)).replace(day=1)
-                orders_q = orders_q.filter(SalesRaw.order_date < datetime.combine(end_next, time.min))
-
-            if brand_style_keys_sq is not None:
-                orders_q = orders_q.filter(func.lower(func.trim(SalesRaw.style_key)).in_(select(brand_style_keys_sq.c.style_key)))
-
-            orders_q = orders_q.group_by(cast(sale_month, Date)).subquery()
-
-            # Returns (same_month) by sale month, join by order_line_id
-            units_expr = func.coalesce(ReturnsRaw.units, 1)
-            ret_q = (
-                db.query(
-                    cast(sale_month, Date).label("month_start"),
-                    func.coalesce(func.sum(units_expr), 0).label("returns"),
-                )
-                .select_from(ReturnsRaw)
-                .join(
-                    SalesRaw,
-                    and_(
-                        SalesRaw.workspace_id == ws.id,
-                        ReturnsRaw.workspace_id == ws.id,
-                        SalesRaw.order_line_id == ReturnsRaw.order_line_id,
-                    ),
+                        "orders": orders,
+                        "returns": returns,
+                        "return_pct": (returns / orders * 100.0) if orders > 0 else None,
+                        "return_mode": "overall",
+                    }
                 )
-                .filter(SalesRaw.order_date.isnot(None))
-                .filter(ReturnsRaw.return_date.isnot(None))
-                .filter(func.date_trunc("month", SalesRaw.order_date) == func.date_trunc("month", ReturnsRaw.return_date))
-            )
 
-            if start_d:
-                ret_q = ret_q.filter(SalesRaw.order_date >= datetime.combine(start_d, time.min))
-            if end_d:
-                end_next = (end_d.replace(day=1) + timedelta(days=32)).replace(day=1)
-                ret_q = ret_q.filter(SalesRaw.order_date < datetime.combine(end_next, time.min))
+        else:
+            # same_month: sku_monthly.same_month_returns (returns of order lines sold in the
+            # same month, counted on the sale's month / SKU)
+            q = db.query(SkuMonthly).filter(SkuMonthly.workspace_id == ws.id)
 
-            if brand_style_keys_sq is not None:
-                ret_q = ret_q.filter(func.lower(func.trim(SalesRaw.style_key)).in_(select(brand_style_keys_sq.c.style_key)))
+            if brand_norm:
+                q = q.filter(SkuMonthly.brand_norm == brand_norm)
 
-            ret_q = ret_q.group_by(cast(sale_month, Date)).subquery()
+            if start_d:
+                q = q.filter(SkuMonthly.month_start >= start_d)
+            if end_d:
+                q = q.filter(SkuMonthly.month_start <= end_d)
 
-            # Join orders + returns
-            joined = (
-                db.query(
-                    orders_q.c.month_start,
-                    orders_q.c.orders,
-                    func.coalesce(ret_q.c.returns, 0).label("returns"),
+            totals = (
+                q.with_entities(
+                    SkuMonthly.month_start.label("month_start"),
+                    func.sum(SkuMonthly.orders).label("orders"),
+                    func.sum(SkuMonthly.same_month_returns).label("returns"),
                 )
-                .outerjoin(ret_q, ret_q.c.month_start == orders_q.c.month_start)
-                .order_by(orders_q.c.month_start.desc())
+                .group_by(SkuMonthly.month_start)
+                .having(func.sum(SkuMonthly.orders) > 0)
+                .order_by(SkuMonthly.month_start.desc())
                 .all()
             )
 
-            for r in joined:
-                orders = int(r.orders or 0)
-                returns = int(r.returns or 0)
+            for t in totals:
+                orders = int(t.orders or 0)
+                returns = int(t.returns or 0)
                 totals_rows.append(
                     {
-                        "month_start": str(r.month_start),
+                        "month_start": str(t.month_start),
                         "orders": orders,
                         "returns": returns,
                         "return_pct": (returns / orders * 100.0) if orders > 0 else None,
@@ -4684,7 +4672,7 @@ def db_style_monthly(
             )
 
             if brand_style_keys_sq is not None:
-                q = q.filter(func.lower(func.trim(StyleMonthly.style_key)).in_(select(brand_style_keys_sq.c.style_key)))
+                q = q.filter(norm_key(StyleMonthly.style_key).in_(select(brand_style_keys_sq.c.style_key)))
 
             q = q.order_by(StyleMonthly.orders.desc()).limit(top_n)
 
@@ -4764,7 +4752,7 @@ def db_kpi_zero_sales_since_live(
             b = brand.strip().lower()
             cat_q = cat_q.filter(
                 CatalogRaw.brand.isnot(None),
-                func.lower(func.trim(CatalogRaw.brand)) == b,
+                norm_key(CatalogRaw.brand) == b,
             )
 
         cat = cat_q.group_by(CatalogRaw.style_key).subquery()
@@ -4807,6 +4795,8 @@ def db_kpi_zero_sales_since_live(
             )
 
         return {"result": result}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"zero-sales failed: {e}")
     finally:
@@ -4835,24 +4825,18 @@ def db_action_board(
             raise HTTPException(status_code=404, detail=f"Workspace not found: {workspace_slug}")
 
         # --- normalize portal ---
-        p = (portal or "").strip().lower()
-        if p in ("fk", "flipkart"):
-            p = "flipkart"
-        elif p in ("mn", "myntra"):
-            p = "myntra"
-        else:
-            p = None  # no portal filter
+        p = normalize_portal(portal)  # None = no portal filter
 
         # Flipkart must be SKU-first
         effective_dim = "sku" if p == "flipkart" else (row_dim or "style").strip().lower()
         if effective_dim not in ("style", "sku"):
             effective_dim = "style"
 
-        # helper: next month start
-        def _next_month_start(d: date) -> date:
-            # jump to next month by overshooting end of month
-            tmp = d.replace(day=28) + timedelta(days=4)
-            return tmp.replace(day=1)
+        # SKU mode: the sales portal default (myntra) applies when no portal is given
+        sku_portal = p or _portal_norm(portal)
+
+        def _apply_portal_sku_monthly(q):
+            return filter_portal(q, SkuMonthly.portal, sku_portal)
 
         # choose month_start if missing
         if not month_start:
@@ -4885,14 +4869,18 @@ def db_action_board(
                     }
                 month_start = str(latest)
             else:
-                # SKU mode: derive latest month from sales_raw
-                latest_month_ts_q = db.query(func.max(func.date_trunc("month", SalesRaw.order_date))).filter(
-                    SalesRaw.workspace_id == ws.id
+                # SKU mode: latest month with sales in sku_monthly
+                latest = (
+                    _apply_portal_sku_monthly(
+                        db.query(func.max(SkuMonthly.month_start)).filter(
+                            SkuMonthly.workspace_id == ws.id,
+                            SkuMonthly.orders > 0,
+                        )
+                    )
+                    .scalar()
                 )
-                latest_month_ts_q = _apply_portal_sales(latest_month_ts_q, workspace_slug, portal)
-                latest_month_ts = latest_month_ts_q.scalar()
 
-                if not latest_month_ts:
+                if not latest:
                     return {
                         "workspace_slug": workspace_slug,
                         "month_start": None,
@@ -4911,19 +4899,13 @@ def db_action_board(
                         "scale_now": [],
                         "profit_leak": [],
                         "new_potential": [],
-                        "note": "No sales_raw data yet for this workspace",
+                        "note": "No sku_monthly data yet for this workspace",
                     }
-
-                # latest_month_ts is a datetime-like at first day of month
-                month_start = latest_month_ts.date().isoformat()
+                month_start = str(latest)
 
         # Parse month_start + compute month window
         ms_date = datetime.fromisoformat(month_start).date()
         ms_date = ms_date.replace(day=1)
-        me_date = _next_month_start(ms_date)
-
-        ms_dt = datetime.combine(ms_date, time.min)
-        me_dt_excl = datetime.combine(me_date, time.min)
 
         # ref date for "new_days"
         ref_date = datetime.utcnow().date() if new_ref == "today" else ms_date
@@ -4933,29 +4915,24 @@ def db_action_board(
             new_min_orders = min_orders
 
         # ---------- Brand filter ----------
-        brand_norm = (brand or "").strip().lower() if brand else None
-        brand_style_keys: list[str] | None = None
+        # sku_monthly: brand_norm; style_monthly: catalog style_key subquery
+        brand_norm = normalize_brand(brand) if brand else None
 
         if brand_norm:
             brand_q = (
-                db.query(func.lower(func.trim(cast(CatalogRaw.style_key, String))))
+                db.query(norm_key(CatalogRaw.style_key).label("style_key"))
                 .filter(
                     CatalogRaw.workspace_id == ws.id,
                     CatalogRaw.style_key.isnot(None),
                     CatalogRaw.brand.isnot(None),
-                    func.lower(func.trim(CatalogRaw.brand)) == brand_norm,
+                    norm_key(CatalogRaw.brand) == brand_norm,
                 )
             )
 
-            # portal filter on catalog style_key prefix (fk:)
-            if p == "flipkart":
-                brand_q = brand_q.filter(func.trim(cast(CatalogRaw.style_key, String)).ilike("fk:%"))
-            elif p == "myntra":
-                brand_q = brand_q.filter(sqlalchemy.not_(func.trim(cast(CatalogRaw.style_key, String)).ilike("fk:%")))
-
-            brand_style_keys = [r[0] for r in brand_q.distinct().all() if r and r[0]]
+            if p:
+                brand_q = brand_q.filter(CatalogRaw.portal == p)
 
-            if not brand_style_keys:
+            if brand_q.first() is None:
                 return {
                     "workspace_slug": workspace_slug,
                     "month_start": ms_date.isoformat(),
@@ -4989,14 +4966,14 @@ def db_action_board(
                 )
             )
 
-            # portal filter on style_monthly.style_key
-            if p == "flipkart":
-                base = base.filter(func.trim(cast(StyleMonthly.style_key, String)).ilike("fk:%"))
-            elif p == "myntra":
-                base = base.filter(sqlalchemy.not_(func.trim(cast(StyleMonthly.style_key, String)).ilike("fk:%")))
+            if p:
+                base = base.filter(StyleMonthly.portal == p)
 
-            if brand_style_keys is not None:
-                base = base.filter(func.lower(func.trim(cast(StyleMonthly.style_key, String))).in_(brand_style_keys))
+            if brand_norm:
+                brand_style_keys_sq = brand_q.distinct().subquery()
+                base = base.filter(
+                    norm_key(StyleMonthly.style_key).in_(select(brand_style_keys_sq.c.style_key))
+                )
 
             scale_now_q = (
                 base.filter((StyleMonthly.return_pct.is_(None)) | (StyleMonthly.return_pct <= good_return_pct))
@@ -5032,16 +5009,11 @@ def db_action_board(
             if brand_norm:
                 new_potential_q = new_potential_q.filter(
                     CatalogRaw.brand.isnot(None),
-                    func.lower(func.trim(CatalogRaw.brand)) == brand_norm,
+                    norm_key(CatalogRaw.brand) == brand_norm,
                 )
 
-            # portal filter on catalog in new_potential
-            if p == "flipkart":
-                new_potential_q = new_potential_q.filter(func.trim(cast(CatalogRaw.style_key, String)).ilike("fk:%"))
-            elif p == "myntra":
-                new_potential_q = new_potential_q.filter(
-                    sqlalchemy.not_(func.trim(cast(CatalogRaw.style_key, String)).ilike("fk:%"))
-                )
+            if p:
+                new_potential_q = new_potential_q.filter(CatalogRaw.portal == p)
 
             new_potential_q = new_potential_q.order_by(StyleMonthly.orders.desc()).limit(top_n)
 
@@ -5090,72 +5062,30 @@ def db_action_board(
         # ==========================
         # SKU MODE (Flipkart default)
         # ==========================
-        # local portal filter for returns (avoid depending on external helper)
-        def _apply_portal_returns_local(q):
-            if p == "flipkart":
-                return q.filter(ReturnsRaw.order_line_id.like("fk:%"))
-            if p == "myntra":
-                return q.filter(sqlalchemy.not_(ReturnsRaw.order_line_id.like("fk:%")))
-            return q
-
-        # Sales per SKU (month)
-        sales_q = (
-            db.query(
-                SalesRaw.seller_sku_code.label("seller_sku_code"),
-                func.max(SalesRaw.style_key).label("style_key"),
-                func.coalesce(func.sum(SalesRaw.units), 0).label("orders"),
-                func.max(SalesRaw.order_date).label("last_order_date"),
-            )
-            .filter(
-                SalesRaw.workspace_id == ws.id,
-                SalesRaw.order_date >= ms_dt,
-                SalesRaw.order_date < me_dt_excl,
-                SalesRaw.seller_sku_code.isnot(None),
-                func.trim(SalesRaw.seller_sku_code) != "",
-            )
-        )
-        sales_q = _apply_portal_sales(sales_q, workspace_slug, portal)
-
-        if brand_style_keys is not None:
-            sales_q = sales_q.filter(func.lower(func.trim(SalesRaw.style_key)).in_(brand_style_keys))
-
-        sales_sub = sales_q.group_by(SalesRaw.seller_sku_code).subquery()
-
-        # Returns per SKU (month) by return_date
-        unit_expr = func.coalesce(ReturnsRaw.units, 1)
-        returns_q = (
+        # one row per SKU of the month (sku_monthly rows are per portal x style x SKU)
+        sku_q = (
             db.query(
-                ReturnsRaw.seller_sku_code.label("seller_sku_code"),
-                func.max(ReturnsRaw.style_key).label("style_key"),
-                func.coalesce(func.sum(unit_expr), 0).label("returns"),
+                SkuMonthly.seller_sku_code.label("seller_sku_code"),
+                func.max(SkuMonthly.style_key).label("style_key"),
+                func.sum(SkuMonthly.orders).label("orders"),
+                func.sum(SkuMonthly.returns).label("returns"),
+                func.max(SkuMonthly.last_order_date).label("last_order_date"),
             )
             .filter(
-                ReturnsRaw.workspace_id == ws.id,
-                ReturnsRaw.return_date >= ms_dt,
-                ReturnsRaw.return_date < me_dt_excl,
-                ReturnsRaw.seller_sku_code.isnot(None),
-                func.trim(ReturnsRaw.seller_sku_code) != "",
+                SkuMonthly.workspace_id == ws.id,
+                SkuMonthly.month_start == ms_date,
+                SkuMonthly.seller_sku_code.isnot(None),
+                func.trim(SkuMonthly.seller_sku_code) != "",
             )
         )
-        returns_q = _apply_portal_returns_local(returns_q)
+        sku_q = _apply_portal_sku_monthly(sku_q)
 
-        if brand_style_keys is not None:
-            returns_q = returns_q.filter(func.lower(func.trim(ReturnsRaw.style_key)).in_(brand_style_keys))
+        if brand_norm:
+            sku_q = sku_q.filter(SkuMonthly.brand_norm == brand_norm)
 
-        returns_sub = returns_q.group_by(ReturnsRaw.seller_sku_code).subquery()
+        sku_sub = sku_q.group_by(SkuMonthly.seller_sku_code).subquery()
 
-        # Join sales + returns
-        rows_q = (
-            db.query(
-                sales_sub.c.seller_sku_code,
-                sales_sub.c.style_key,
-                sales_sub.c.orders,
-                func.coalesce(returns_sub.c.returns, 0).label("returns"),
-                sales_sub.c.last_order_date,
-            )
-            .outerjoin(returns_sub, returns_sub.c.seller_sku_code == sales_sub.c.seller_sku_code)
-            .filter(sales_sub.c.orders >= min_orders)
-        )
+        rows_q = db.query(sku_sub).filter(sku_sub.c.orders >= min_orders)
 
         rows = rows_q.all()
 
@@ -5185,23 +5115,22 @@ def db_action_board(
         if new_days >= 0:
             np_q = (
                 db.query(
-                    sales_sub.c.seller_sku_code,
-                    sales_sub.c.style_key,
-                    sales_sub.c.orders,
-                    func.coalesce(returns_sub.c.returns, 0).label("returns"),
-                    sales_sub.c.last_order_date,
+                    sku_sub.c.seller_sku_code,
+                    sku_sub.c.style_key,
+                    sku_sub.c.orders,
+                    sku_sub.c.returns,
+                    sku_sub.c.last_order_date,
                     func.max(CatalogRaw.style_catalogued_date).label("style_catalogued_date"),
                 )
-                .outerjoin(returns_sub, returns_sub.c.seller_sku_code == sales_sub.c.seller_sku_code)
                 .join(
                     CatalogRaw,
                     and_(
                         CatalogRaw.workspace_id == ws.id,
-                        CatalogRaw.style_key == sales_sub.c.style_key,
+                        CatalogRaw.style_key == sku_sub.c.style_key,
                     ),
                 )
                 .filter(
-                    sales_sub.c.orders >= new_min_orders,
+                    sku_sub.c.orders >= new_min_orders,
                     CatalogRaw.style_catalogued_date.isnot(None),
                     CatalogRaw.style_catalogued_date >= live_cutoff,
                 )
@@ -5210,22 +5139,19 @@ def db_action_board(
             if brand_norm:
                 np_q = np_q.filter(
                     CatalogRaw.brand.isnot(None),
-                    func.lower(func.trim(CatalogRaw.brand)) == brand_norm,
+                    norm_key(CatalogRaw.brand) == brand_norm,
                 )
 
-            # portal filter on catalog rows
-            if p == "flipkart":
-                np_q = np_q.filter(func.trim(cast(CatalogRaw.style_key, String)).ilike("fk:%"))
-            elif p == "myntra":
-                np_q = np_q.filter(sqlalchemy.not_(func.trim(cast(CatalogRaw.style_key, String)).ilike("fk:%")))
+            if p:
+                np_q = np_q.filter(CatalogRaw.portal == p)
 
             np_q = np_q.group_by(
-                sales_sub.c.seller_sku_code,
-                sales_sub.c.style_key,
-                sales_sub.c.orders,
-                returns_sub.c.returns,
-                sales_sub.c.last_order_date,
-            ).order_by(sales_sub.c.orders.desc()).limit(top_n)
+                sku_sub.c.seller_sku_code,
+                sku_sub.c.style_key,
+                sku_sub.c.orders,
+                sku_sub.c.returns,
+                sku_sub.c.last_order_date,
+            ).order_by(sku_sub.c.orders.desc()).limit(top_n)
 
             for r in np_q.all():
                 orders = int(r.orders or 0)
@@ -5339,7 +5265,7 @@ def db_ads_recommendations(
         if has_brand:
             cat_q = cat_q.filter(
                 CatalogRaw.brand.isnot(None),
-                func.lower(func.trim(CatalogRaw.brand)) == brand_norm,
+                norm_key(CatalogRaw.brand) == brand_norm,
             )
 
         cat_rows = cat_q.all()
@@ -5466,8 +5392,8 @@ def db_ads_recommendations(
         if p == "flipkart":
             listing_map_q = (
                 db.query(
-                    func.lower(func.trim(CatalogRaw.style_key)).label("listing_norm"),
-                    func.lower(func.trim(CatalogRaw.seller_sku_code)).label("sku_norm"),
+                    norm_key(CatalogRaw.style_key).label("listing_norm"),
+                    norm_key(CatalogRaw.seller_sku_code).label("sku_norm"),
                     func.min(CatalogRaw.style_catalogued_date).label("live_date"),
                 )
                 .filter(CatalogRaw.workspace_id == ws_id)
@@ -5478,13 +5404,13 @@ def db_ads_recommendations(
             if has_brand:
                 listing_map_q = listing_map_q.filter(
                     CatalogRaw.brand.isnot(None),
-                    func.lower(func.trim(CatalogRaw.brand)) == brand_norm,
+                    norm_key(CatalogRaw.brand) == brand_norm,
                 )
 
             listing_subq = (
                 listing_map_q.group_by(
-                    func.lower(func.trim(CatalogRaw.style_key)),
-                    func.lower(func.trim(CatalogRaw.seller_sku_code)),
+                    norm_key(CatalogRaw.style_key),
+                    norm_key(CatalogRaw.seller_sku_code),
                 ).subquery()
             )
 
@@ -5497,7 +5423,7 @@ def db_ads_recommendations(
                 .filter(SalesRaw.order_date.isnot(None))
                 .join(
                     listing_subq,
-                    func.lower(func.trim(SalesRaw.style_key)) == listing_subq.c.listing_norm,
+                    norm_key(SalesRaw.style_key) == listing_subq.c.listing_norm,
                 )
                 .filter(SalesRaw.order_date >= listing_subq.c.live_date)
                 .group_by(listing_subq.c.sku_norm)
@@ -5513,7 +5439,7 @@ def db_ads_recommendations(
         else:
             live_q = (
                 db.query(
-                    func.lower(func.trim(CatalogRaw.style_key)).label("sk_norm"),
+                    norm_key(CatalogRaw.style_key).label("sk_norm"),
                     func.min(CatalogRaw.style_catalogued_date).label("live_date"),
                 )
                 .filter(CatalogRaw.workspace_id == ws_id)
@@ -5523,10 +5449,10 @@ def db_ads_recommendations(
             if has_brand:
                 live_q = live_q.filter(
                     CatalogRaw.brand.isnot(None),
-                    func.lower(func.trim(CatalogRaw.brand)) == brand_norm,
+                    norm_key(CatalogRaw.brand) == brand_norm,
                 )
 
-            live_subq = live_q.group_by(func.lower(func.trim(CatalogRaw.style_key))).subquery()
+            live_subq = live_q.group_by(norm_key(CatalogRaw.style_key)).subquery()
 
             q_cnt = (
                 db.query(
@@ -5537,7 +5463,7 @@ def db_ads_recommendations(
                 .filter(SalesRaw.order_date.isnot(None))
                 .join(
                     live_subq,
-                    func.lower(func.trim(SalesRaw.style_key)) == live_subq.c.sk_norm,
+                    norm_key(SalesRaw.style_key) == live_subq.c.sk_norm,
                 )
                 .filter(SalesRaw.order_date >= live_subq.c.live_date)
                 .group_by(live_subq.c.sk_norm)
@@ -5575,7 +5501,7 @@ def db_ads_recommendations(
             .filter(ReturnsRaw.return_date >= recent_start, ReturnsRaw.return_date < end_excl)
         )
 
-        # IMPORTANT: returns_raw has NO portal column -> do NOT call _apply_portal_returns()
+        returns_30_q = _apply_portal_returns(returns_30_q, workspace_slug, portal)
         returns_30 = returns_30_q.group_by(ret_key_col).all()
 
         returns_map: dict[str, dict] = {}
@@ -5650,7 +5576,7 @@ def db_ads_recommendations(
             # Aggregate traffic over the dashboard date window (start_dt..end_dt)
             traffic_rows = (
                 db.query(
-                    func.lower(func.trim(FlipkartTrafficRaw.seller_sku_code)).label("sku"),
+                    norm_key(FlipkartTrafficRaw.seller_sku_code).label("sku"),
                     func.coalesce(func.sum(FlipkartTrafficRaw.product_views), 0).label("impressions"),
                     func.coalesce(func.sum(FlipkartTrafficRaw.product_clicks), 0).label("clicks"),
                     func.coalesce(func.sum(FlipkartTrafficRaw.sales_qty), 0).label("purchases"),
@@ -5659,7 +5585,7 @@ def db_ads_recommendations(
                 .filter(FlipkartTrafficRaw.impression_date.isnot(None))
                 .filter(FlipkartTrafficRaw.impression_date >= start_dt.date())
                 .filter(FlipkartTrafficRaw.impression_date <= end_dt.date())
-                .group_by(func.lower(func.trim(FlipkartTrafficRaw.seller_sku_code)))
+                .group_by(norm_key(FlipkartTrafficRaw.seller_sku_code))
                 .all()
             )
 
@@ -5977,28 +5903,20 @@ def db_returns_reasons(
         unit_expr = func.coalesce(ReturnsRaw.units, 1)
 
         # -------------------------
-        # Choose reason field by portal
+        # Choose reason field by portal (materialized at ingest, see backend/return_reasons.py)
         # -------------------------
-        raw_json = cast(ReturnsRaw.raw_json, JSONB)
-
         if portal_norm == "flipkart":
-            # Flipkart: use return_sub_reason
-            reason_raw = raw_json["return_sub_reason"].astext
-            reason_norm = func.lower(func.trim(func.coalesce(reason_raw, "")))
-
             # For FK we show raw subreason (no Myntra bucketing)
             reason = case(
                 (rtype_norm == "RTO", "RTO_NO_REASON"),
-                else_=func.coalesce(func.nullif(func.trim(reason_raw), ""), "NO_REASON"),
+                else_=func.coalesce(ReturnsRaw.reason_raw, "NO_REASON"),
             )
         else:
-            # Myntra: use return_reason + bucket mapping
-            reason_raw = raw_json["return_reason"].astext
-            reason_norm = func.lower(func.trim(func.coalesce(reason_raw, "")))
-
+            # Myntra: RETURN_REASON_MAP bucket; blank / unmapped reasons count as GENERIC_OTHER here
             reason = case(
                 (rtype_norm == "RTO", "RTO_NO_REASON"),
-                else_=_reason_bucket_expr(reason_norm),
+                (func.coalesce(ReturnsRaw.reason_bucket, "UNKNOWN").in_(["OTHER", "UNKNOWN"]), "GENERIC_OTHER"),
+                else_=ReturnsRaw.reason_bucket,
             )
 
         # -------------------------
@@ -6032,24 +5950,24 @@ def db_returns_reasons(
         # Optional style_key filter
         if style_key:
             sk = style_key.strip().lower()
-            q = q.filter(func.lower(func.trim(ReturnsRaw.style_key)) == sk)
+            q = q.filter(norm_key(ReturnsRaw.style_key) == sk)
 
         # Optional brand filter via catalog style_key set
         if brand:
             b = brand.strip().lower()
             brand_style_keys_q = (
-                db.query(func.lower(func.trim(CatalogRaw.style_key)))
+                db.query(norm_key(CatalogRaw.style_key))
                 .filter(
                     CatalogRaw.workspace_id == ws_id,
                     CatalogRaw.style_key.isnot(None),
                     CatalogRaw.brand.isnot(None),
-                    func.lower(func.trim(CatalogRaw.brand)) == b,
+                    norm_key(CatalogRaw.brand) == b,
                 )
                 .distinct()
             )
             brand_style_keys_q = _apply_portal_catalog(brand_style_keys_q, portal_norm)
 
-            q = q.filter(func.lower(func.trim(ReturnsRaw.style_key)).in_(brand_style_keys_q))
+            q = q.filter(norm_key(ReturnsRaw.style_key).in_(brand_style_keys_q))
 
         q = (
             q.group_by(reason)
@@ -6110,12 +6028,12 @@ def db_returns_style_wise(
         brand_style_keys_q = None
         if brand_norm:
             brand_style_keys_q = (
-                db.query(func.lower(func.trim(CatalogRaw.style_key)))
+                db.query(norm_key(CatalogRaw.style_key))
                 .filter(
                     CatalogRaw.workspace_id == ws_id,
                     CatalogRaw.style_key.isnot(None),
                     CatalogRaw.brand.isnot(None),
-                    func.lower(func.trim(CatalogRaw.brand)) == brand_norm,
+                    norm_key(CatalogRaw.brand) == brand_norm,
                 )
                 .distinct()
             )
@@ -6140,7 +6058,7 @@ def db_returns_style_wise(
 
         if brand_style_keys_q is not None:
             sales_counts_q = sales_counts_q.filter(
-                func.lower(func.trim(SalesRaw.style_key)).in_(brand_style_keys_q)
+                norm_key(SalesRaw.style_key).in_(brand_style_keys_q)
             )
 
         sales_counts = sales_counts_q.group_by(SalesRaw.style_key).subquery()
@@ -6177,7 +6095,7 @@ def db_returns_style_wise(
 
         if brand_style_keys_q is not None:
             returns_counts_q = returns_counts_q.filter(
-                func.lower(func.trim(ReturnsRaw.style_key)).in_(brand_style_keys_q)
+                norm_key(ReturnsRaw.style_key).in_(brand_style_keys_q)
             )
 
         returns_counts = returns_counts_q.group_by(ReturnsRaw.style_key).subquery()
@@ -6199,7 +6117,7 @@ def db_returns_style_wise(
         if brand_norm:
             cat_q = cat_q.filter(
                 CatalogRaw.brand.isnot(None),
-                func.lower(func.trim(CatalogRaw.brand)) == brand_norm,
+                norm_key(CatalogRaw.brand) == brand_norm,
             )
 
         cat = cat_q.group_by(CatalogRaw.style_key).subquery()
@@ -6264,46 +6182,34 @@ def returns_size_kpi(
     try:
         ws_id = resolve_workspace_id(db, workspace_slug)
 
-        # --- 1) ORDERS by SKU (sales_raw) ---
-        sales_rows = (
-            db.query(
-                SalesRaw.seller_sku_code.label("sku"),
-                func.count().label("orders"),
-            )
-            .filter(SalesRaw.workspace_id == ws_id)
-            .filter(SalesRaw.order_date >= start)
-            .filter(SalesRaw.order_date <= end)
-            .filter(SalesRaw.seller_sku_code.isnot(None))
-            .group_by(SalesRaw.seller_sku_code)
+        try:
+            start_d = date.fromisoformat(str(start).strip()[:10])
+            end_d = date.fromisoformat(str(end).strip()[:10])
+        except ValueError:
+            raise HTTPException(status_code=400, detail="start/end must be YYYY-MM-DD")
+
+        # --- 1) ORDERS + RETURNS by SKU (daily facts, every portal) ---
+        sku_rows = (
+            facts_window(
+                db, ws_id, start_d, end_d,
+                DailySkuFact.seller_sku_code.label("sku"),
+                func.sum(DailySkuFact.orders).label("orders"),
+                func.sum(DailySkuFact.returns_units).label("returns_units"),
+                func.sum(DailySkuFact.rto_units).label("rto_units"),
+                func.sum(DailySkuFact.customer_return_units).label("return_units"),
+            )
+            .filter(DailySkuFact.seller_sku_code.isnot(None))
+            .group_by(DailySkuFact.seller_sku_code)
             .all()
         )
 
         orders_by_size = {}
-        for r in sales_rows:
+        for r in sku_rows:
             size = _extract_size_from_sku(r.sku)
             orders_by_size[size] = orders_by_size.get(size, 0) + int(r.orders or 0)
 
-        # --- 2) RETURNS by SKU (returns_raw) ---
-        returns_rows = (
-            db.query(
-                ReturnsRaw.seller_sku_code.label("sku"),
-                func.coalesce(func.sum(ReturnsRaw.units), 0).label("returns_units"),
-                func.coalesce(
-                    func.sum(case((func.upper(ReturnsRaw.return_type) == "RTO", ReturnsRaw.units), else_=0)),
-                    0,
-                ).label("rto_units"),
-                func.coalesce(
-                    func.sum(case((func.upper(ReturnsRaw.return_type) == "RETURN", ReturnsRaw.units), else_=0)),
-                    0,
-                ).label("return_units"),
-            )
-            .filter(ReturnsRaw.workspace_id == ws_id)
-            .filter(ReturnsRaw.return_date >= start)
-            .filter(ReturnsRaw.return_date <= end)
-            .filter(ReturnsRaw.seller_sku_code.isnot(None))
-            .group_by(ReturnsRaw.seller_sku_code)
-            .all()
-        )
+        # --- 2) RETURNS by SKU ---
+        returns_rows = [r for r in sku_rows if r.returns_units]
 
         returns_by_size = {}
         rto_by_size = {}
@@ -6313,282 +6219,48 @@ def returns_size_kpi(
             size = _extract_size_from_sku(r.sku)
             returns_by_size[size] = returns_by_size.get(size, 0) + int(r.returns_units or 0)
             rto_by_size[size] = rto_by_size.get(size, 0) + int(r.rto_units or 0)
-            ret_by_size[size] = ret_by_size.get(size, 0) + int(r.return_units or 0)
-
-        # --- 3) Build output (union sizes) ---
-        sizes = set(orders_by_size.keys()) | set(returns_by_size.keys())
-
-        size_order = {"XS": 1, "S": 2, "M": 3, "L": 4, "XL": 5, "XXL": 6, "XXXL": 7, "NO_SIZE": 99}
-
-        out = []
-        for size in sizes:
-            orders = int(orders_by_size.get(size, 0))
-            returns_units = int(returns_by_size.get(size, 0))
-            rto_units = int(rto_by_size.get(size, 0))
-            return_units = int(ret_by_size.get(size, 0))
-
-            return_pct = (returns_units / orders * 100.0) if orders > 0 else None
-            rto_pct = (rto_units / orders * 100.0) if orders > 0 else None
-            return_only_pct = (return_units / orders * 100.0) if orders > 0 else None
-
-            out.append(
-                {
-                    "size": size,
-                    "orders": orders,
-                    "returns_units": returns_units,
-                    "rto_units": rto_units,
-                    "return_units": return_units,
-                    "return_pct": return_pct,
-                    "rto_pct": rto_pct,
-                    "return_only_pct": return_only_pct,
-                }
-            )
-
-        out.sort(key=lambda r: size_order.get(r["size"], 50))
-
-        return {
-            "workspace_slug": workspace_slug,
-            "window": {"start": start, "end": end},
-            "rows": out,
-        }
-
-    finally:
-        db.close()
-
-def _json_reason_expr():
-    # returns_raw.raw_json is TEXT, cast to JSONB and extract return_reason
-    return func.jsonb_extract_path_text(cast(ReturnsRaw.raw_json, JSONB), "return_reason")
-
-
-def _build_reason_heatmap(
-    db,
-    ws_id: str,
-    workspace_slug: str,
-    start: str,
-    end: str,
-    row_dim: str,  # "style" or "sku"
-    portal: str | None = None,
-    top_reasons: int = 10,
-    top_rows: int = 30,
-    brand: str | None = None,
-):
-    p = _portal_norm(portal)
-    is_fk = (p == "flipkart")
-
-    reason_expr = (
-        func.jsonb_extract_path_text(cast(ReturnsRaw.raw_json, JSONB), "return_sub_reason")
-        if p == "flipkart"
-        else _json_reason_expr()
-    )
-
-    brand_norm = (brand or "").strip().lower() if brand else None
-
-    # Brand -> style_keys subquery
-    brand_style_keys_q = None
-    if brand_norm:
-        brand_style_keys_q = (
-            db.query(func.lower(func.trim(CatalogRaw.style_key)))
-            .filter(
-                CatalogRaw.workspace_id == ws_id,
-                CatalogRaw.style_key.isnot(None),
-                CatalogRaw.brand.isnot(None),
-                func.lower(func.trim(CatalogRaw.brand)) == brand_norm,
-            )
-            .distinct()
-        )
-
-    if row_dim == "style":
-        row_key_col = ReturnsRaw.style_key
-        row_key_label = "style_key"
-
-        orders_q = (
-            db.query(
-                SalesRaw.style_key.label("row_key"),
-                func.count().label("orders"),
-            )
-            .filter(SalesRaw.workspace_id == ws_id)
-            .filter(SalesRaw.order_date >= start)
-            .filter(SalesRaw.order_date <= end)
-        )
-
-        orders_q = _apply_portal_sales(orders_q, workspace_slug, portal)
-
-
-        if brand_style_keys_q is not None:
-            orders_q = orders_q.filter(
-                SalesRaw.style_key.isnot(None),
-                func.lower(func.trim(SalesRaw.style_key)).in_(brand_style_keys_q),
-            )
-
-        orders_q = orders_q.group_by(SalesRaw.style_key)
-
-    else:
-        row_key_col = ReturnsRaw.seller_sku_code
-        row_key_label = "seller_sku_code"
-
-        orders_q = (
-            db.query(
-                SalesRaw.seller_sku_code.label("row_key"),
-                func.count().label("orders"),
-                func.max(SalesRaw.style_key).label("style_key"),
-            )
-            .filter(SalesRaw.workspace_id == ws_id)
-            .filter(SalesRaw.order_date >= start)
-            .filter(SalesRaw.order_date <= end)
-            .filter(SalesRaw.seller_sku_code.isnot(None))
-        )
-
-        if brand_style_keys_q is not None:
-            orders_q = orders_q.filter(
-                SalesRaw.style_key.isnot(None),
-                func.lower(func.trim(SalesRaw.style_key)).in_(brand_style_keys_q),
-            )
-
-        orders_q = orders_q.group_by(SalesRaw.seller_sku_code)
-
-    orders_rows = orders_q.all()
-    orders_map = {str(r.row_key): int(r.orders or 0) for r in orders_rows if r.row_key is not None}
-
-    sku_style_map = {}
-    if row_dim == "sku":
-        for r in orders_rows:
-            if r.row_key is None:
-                continue
-            sku_style_map[str(r.row_key)] = str(r.style_key) if getattr(r, "style_key", None) is not None else None
-
-    base = (
-        db.query(
-            row_key_col.label("row_key"),
-            reason_expr.label("raw_reason"),
-            ReturnsRaw.return_type.label("return_type"),
-            func.coalesce(func.sum(ReturnsRaw.units), 0).label("units"),
-            func.max(ReturnsRaw.style_key).label("style_key"),
-        )
-        .filter(ReturnsRaw.workspace_id == ws_id)
-        .filter(ReturnsRaw.return_date >= start)
-        .filter(ReturnsRaw.return_date <= end)
-    )
-
-    base = _apply_portal_returns(base, workspace_slug, portal)
-
-    if row_dim == "sku":
-        base = base.filter(ReturnsRaw.seller_sku_code.isnot(None))
-
-    if brand_style_keys_q is not None:
-        base = base.filter(
-            ReturnsRaw.style_key.isnot(None),
-            func.lower(func.trim(ReturnsRaw.style_key)).in_(brand_style_keys_q),
-        )
-
-    agg = base.group_by(row_key_col, reason_expr, ReturnsRaw.return_type).all()
-
-    totals = {}
-    for r in agg:
-        rk = str(r.row_key) if r.row_key is not None else None
-        if not rk:
-            continue
-        clean = heatmap_reason_key(r.raw_reason, r.return_type, portal)
-        totals[clean] = totals.get(clean, 0) + int(r.units or 0)
-
-    top_reason_keys = [k for k, _ in sorted(totals.items(), key=lambda x: x[1], reverse=True)[:top_reasons]]
-
-    row_totals = {}
-    cell_units = {}
-
-    for r in agg:
-        rk = str(r.row_key) if r.row_key is not None else None
-        if not rk:
-            continue
-        clean = heatmap_reason_key(r.raw_reason, r.return_type, portal)
-        if clean not in top_reason_keys:
-            continue
-
-        u = int(r.units or 0)
-        cell_units[(rk, clean)] = cell_units.get((rk, clean), 0) + u
-        row_totals[rk] = row_totals.get(rk, 0) + u
-
-    top_row_keys = [k for k, _ in sorted(row_totals.items(), key=lambda x: x[1], reverse=True)[:top_rows]]
+            ret_by_size[size] = ret_by_size.get(size, 0) + int(r.return_units or 0)
 
-    style_meta = {}
-    if top_row_keys:
-        style_keys = set()
-        if row_dim == "style":
-            style_keys = set(top_row_keys)
-        else:
-            for sku in top_row_keys:
-                st = sku_style_map.get(sku)
-                if st:
-                    style_keys.add(st)
+        # --- 3) Build output (union sizes) ---
+        sizes = set(orders_by_size.keys()) | set(returns_by_size.keys())
 
-        if style_keys:
-            cats_q = (
-                db.query(
-                    CatalogRaw.style_key,
-                    CatalogRaw.brand,
-                    CatalogRaw.product_name,
-                )
-                .filter(CatalogRaw.workspace_id == ws_id)
-                .filter(CatalogRaw.style_key.in_(list(style_keys)))
-            )
+        size_order = {"XS": 1, "S": 2, "M": 3, "L": 4, "XL": 5, "XXL": 6, "XXXL": 7, "NO_SIZE": 99}
 
-            if brand_norm:
-                cats_q = cats_q.filter(
-                    CatalogRaw.brand.isnot(None),
-                    func.lower(func.trim(CatalogRaw.brand)) == brand_norm,
-                )
+        out = []
+        for size in sizes:
+            orders = int(orders_by_size.get(size, 0))
+            returns_units = int(returns_by_size.get(size, 0))
+            rto_units = int(rto_by_size.get(size, 0))
+            return_units = int(ret_by_size.get(size, 0))
 
-            cats = cats_q.all()
+            return_pct = (returns_units / orders * 100.0) if orders > 0 else None
+            rto_pct = (rto_units / orders * 100.0) if orders > 0 else None
+            return_only_pct = (return_units / orders * 100.0) if orders > 0 else None
 
-            for c in cats:
-                style_meta[str(c.style_key)] = {
-                    "brand": c.brand,
-                    "product_name": c.product_name,
+            out.append(
+                {
+                    "size": size,
+                    "orders": orders,
+                    "returns_units": returns_units,
+                    "rto_units": rto_units,
+                    "return_units": return_units,
+                    "return_pct": return_pct,
+                    "rto_pct": rto_pct,
+                    "return_only_pct": return_only_pct,
                 }
+            )
 
-    rows = []
-    for rk in top_row_keys:
-        if row_dim == "style":
-            st = rk
-        else:
-            st = sku_style_map.get(rk)
-
-        meta = style_meta.get(st or "", {}) if st else {}
-        rows.append(
-            {
-                row_key_label: rk,
-                "style_key": st,
-                "brand": meta.get("brand"),
-                "product_name": meta.get("product_name"),
-                "orders": int(orders_map.get(rk, 0)),
-                "returns_units": int(row_totals.get(rk, 0)),
-            }
-        )
+        out.sort(key=lambda r: size_order.get(r["size"], 50))
 
-    cols = [{"reason": r} for r in top_reason_keys]
+        return {
+            "workspace_slug": workspace_slug,
+            "window": {"start": start, "end": end},
+            "rows": out,
+        }
 
-    matrix_units = []
-    matrix_pct = []
-    for rk in top_row_keys:
-        o = int(orders_map.get(rk, 0))
-        urow = []
-        prow = []
-        for reason in top_reason_keys:
-            u = int(cell_units.get((rk, reason), 0))
-            urow.append(u)
-            prow.append((u / o * 100.0) if o > 0 else None)
-        matrix_units.append(urow)
-        matrix_pct.append(prow)
+    finally:
+        db.close()
 
-    return {
-        "row_dim": row_dim,
-        "window": {"start": start, "end": end},
-        "top_reasons": int(top_reasons),
-        "top_rows": int(top_rows),
-        "rows": rows,
-        "cols": cols,
-        "matrix_units": matrix_units,
-        "matrix_pct": matrix_pct,
-    }
 def _build_reason_heatmap(
     db,
     ws_id: str,
@@ -6601,33 +6273,11 @@ def _build_reason_heatmap(
     top_rows: int = 30,
     brand: str | None = None,
 ):
-    p = _portal_norm(portal)
-
-    # Flipkart: use return_sub_reason directly from json
-    # Myntra: use existing reason expr (already supports bucketing via heatmap_reason_key)
-    reason_expr = (
-        func.jsonb_extract_path_text(cast(ReturnsRaw.raw_json, JSONB), "return_sub_reason")
-        if p == "flipkart"
-        else _json_reason_expr()
-    )
-
-    brand_norm = (brand or "").strip().lower() if brand else None
+    # heatmap_reason_key() bucket, materialized at ingest (Flipkart code / Myntra RETURN_REASON_MAP)
+    reason_expr = func.coalesce(ReturnsRaw.reason_bucket, "UNKNOWN")
 
-    # Brand -> style_keys subquery (from catalog)
-    brand_style_keys_q = None
-    if brand_norm:
-        brand_style_keys_q = (
-            db.query(func.lower(func.trim(CatalogRaw.style_key)))
-            .filter(
-                CatalogRaw.workspace_id == ws_id,
-                CatalogRaw.style_key.isnot(None),
-                CatalogRaw.brand.isnot(None),
-                func.lower(func.trim(CatalogRaw.brand)) == brand_norm,
-            )
-            .distinct()
-        )
-        # IMPORTANT: portal-safe catalog filtering
-        brand_style_keys_q = _apply_portal_catalog(brand_style_keys_q, portal)
+    # Brand filter: brand_norm on the facts (no catalog join)
+    brand_norm = normalize_brand(brand) if brand else None
 
     # -------------------------
     # ORDERS MAP (from sales)
@@ -6649,11 +6299,8 @@ def _build_reason_heatmap(
         # IMPORTANT: apply portal filter ONCE
         orders_q = _apply_portal_sales(orders_q, workspace_slug, portal)
 
-        if brand_style_keys_q is not None:
-            orders_q = orders_q.filter(
-                SalesRaw.style_key.isnot(None),
-                func.lower(func.trim(SalesRaw.style_key)).in_(brand_style_keys_q),
-            )
+        if brand_norm is not None:
+            orders_q = orders_q.filter(SalesRaw.brand_norm == brand_norm)
 
         orders_q = orders_q.group_by(SalesRaw.style_key)
 
@@ -6676,11 +6323,8 @@ def _build_reason_heatmap(
         # IMPORTANT: portal-safe sales filtering for SKU path (this was missing)
         orders_q = _apply_portal_sales(orders_q, workspace_slug, portal)
 
-        if brand_style_keys_q is not None:
-            orders_q = orders_q.filter(
-                SalesRaw.style_key.isnot(None),
-                func.lower(func.trim(SalesRaw.style_key)).in_(brand_style_keys_q),
-            )
+        if brand_norm is not None:
+            orders_q = orders_q.filter(SalesRaw.brand_norm == brand_norm)
 
         orders_q = orders_q.group_by(SalesRaw.seller_sku_code)
 
@@ -6700,8 +6344,7 @@ def _build_reason_heatmap(
     base = (
         db.query(
             row_key_col.label("row_key"),
-            reason_expr.label("raw_reason"),
-            ReturnsRaw.return_type.label("return_type"),
+            reason_expr.label("reason"),
             func.coalesce(func.sum(ReturnsRaw.units), 0).label("units"),
             func.max(ReturnsRaw.style_key).label("style_key"),
         )
@@ -6716,13 +6359,10 @@ def _build_reason_heatmap(
     if row_dim == "sku":
         base = base.filter(ReturnsRaw.seller_sku_code.isnot(None))
 
-    if brand_style_keys_q is not None:
-        base = base.filter(
-            ReturnsRaw.style_key.isnot(None),
-            func.lower(func.trim(ReturnsRaw.style_key)).in_(brand_style_keys_q),
-        )
+    if brand_norm is not None:
+        base = base.filter(ReturnsRaw.brand_norm == brand_norm)
 
-    agg = base.group_by(row_key_col, reason_expr, ReturnsRaw.return_type).all()
+    agg = base.group_by(row_key_col, reason_expr).all()
 
     # top reasons
     totals = {}
@@ -6730,7 +6370,7 @@ def _build_reason_heatmap(
         rk = str(r.row_key) if r.row_key is not None else None
         if not rk:
             continue
-        clean = heatmap_reason_key(r.raw_reason, r.return_type, portal)
+        clean = r.reason
         totals[clean] = totals.get(clean, 0) + int(r.units or 0)
 
     top_reason_keys = [k for k, _ in sorted(totals.items(), key=lambda x: x[1], reverse=True)[:top_reasons]]
@@ -6743,7 +6383,7 @@ def _build_reason_heatmap(
         rk = str(r.row_key) if r.row_key is not None else None
         if not rk:
             continue
-        clean = heatmap_reason_key(r.raw_reason, r.return_type, portal)
+        clean = r.reason
         if clean not in top_reason_keys:
             continue
 
@@ -6784,7 +6424,7 @@ def _build_reason_heatmap(
             if brand_norm:
                 cats_q = cats_q.filter(
                     CatalogRaw.brand.isnot(None),
-                    func.lower(func.trim(CatalogRaw.brand)) == brand_norm,
+                    norm_key(CatalogRaw.brand) == brand_norm,
                 )
 
             cats = cats_q.all()
@@ -6906,12 +6546,12 @@ from fastapi import Query
 from sqlalchemy import func, case
 import json
 
-def _json_get(raw_json: str | None, key: str) -> str | None:
+def _json_get(raw_json: dict | str | None, key: str) -> str | None:
     """Safely parse raw_json and fetch key; returns None if missing."""
     if not raw_json:
         return None
     try:
-        obj = json.loads(raw_json)
+        obj = parse_raw_json(raw_json)
         v = obj.get(key)
         if v is None:
             return None
@@ -7104,9 +6744,6 @@ def db_returns_sku_wise(
     try:
         ws_id = resolve_workspace_id(db, workspace_slug)
 
-        start_dt = datetime.combine(start, time.min)
-        end_dt_excl = datetime.combine(end + timedelta(days=1), time.min)
-
         brand_norm = (brand or "").strip().lower() if brand else None
 
         # -------------------------
@@ -7115,78 +6752,38 @@ def db_returns_sku_wise(
         brand_style_keys_q = None
         if brand_norm:
             brand_style_keys_q = (
-                db.query(func.lower(func.trim(CatalogRaw.style_key)))
+                db.query(norm_key(CatalogRaw.style_key))
                 .filter(
                     CatalogRaw.workspace_id == ws_id,
                     CatalogRaw.style_key.isnot(None),
                     CatalogRaw.brand.isnot(None),
-                    func.lower(func.trim(CatalogRaw.brand)) == brand_norm,
+                    norm_key(CatalogRaw.brand) == brand_norm,
                 )
                 .distinct()
             )
             brand_style_keys_q = _apply_portal_catalog(brand_style_keys_q, portal)
 
         # -------------------------
-        # Sales counts per SKU
-        # -------------------------
-        sales_counts_q = (
-            db.query(
-                SalesRaw.seller_sku_code.label("seller_sku_code"),
-                func.max(SalesRaw.style_key).label("style_key"),
-                func.count(SalesRaw.id).label("orders"),
-                func.max(SalesRaw.order_date).label("last_order_date"),
-            )
-            .filter(SalesRaw.workspace_id == ws_id)
-            .filter(SalesRaw.order_date >= start_dt)
-            .filter(SalesRaw.order_date < end_dt_excl)
-        )
-
-        sales_counts_q = _apply_portal_sales(sales_counts_q, workspace_slug, portal)
-
-        if brand_style_keys_q is not None:
-            sales_counts_q = sales_counts_q.filter(
-                func.lower(func.trim(SalesRaw.style_key)).in_(brand_style_keys_q)
-            )
-
-        sales_counts = sales_counts_q.group_by(SalesRaw.seller_sku_code).subquery()
-
-        # -------------------------
-        # Returns counts per SKU
+        # Orders + returns per SKU (daily facts)
         # -------------------------
-        rtype_norm = func.upper(func.trim(ReturnsRaw.return_type))
-
-        returns_counts_q = (
-            db.query(
-                ReturnsRaw.seller_sku_code.label("seller_sku_code"),
-                func.max(ReturnsRaw.style_key).label("style_key"),
-                func.coalesce(func.sum(ReturnsRaw.units), 0).label("returns_units"),
-                func.coalesce(
-                    func.sum(case((rtype_norm == "RTO", ReturnsRaw.units), else_=0)),
-                    0,
-                ).label("rto_units"),
-                func.coalesce(
-                    func.sum(
-                        case(
-                            (rtype_norm.in_(["CUSTOMER_RETURN", "RETURN"]), ReturnsRaw.units),
-                            else_=0,
-                        )
-                    ),
-                    0,
-                ).label("return_units"),
-            )
-            .filter(ReturnsRaw.workspace_id == ws_id)
-            .filter(ReturnsRaw.return_date >= start_dt)
-            .filter(ReturnsRaw.return_date < end_dt_excl)
+        sku_counts_q = facts_window(
+            db, ws_id, start, end,
+            DailySkuFact.seller_sku_code.label("seller_sku_code"),
+            func.max(DailySkuFact.style_key).label("style_key"),
+            func.sum(DailySkuFact.orders).label("orders"),
+            func.max(DailySkuFact.last_order_date).label("last_order_date"),
+            func.sum(DailySkuFact.returns_units).label("returns_units"),
+            func.sum(DailySkuFact.rto_units).label("rto_units"),
+            func.sum(DailySkuFact.customer_return_units).label("return_units"),
+            portal=_portal_norm(portal),
         )
 
-        returns_counts_q = _apply_portal_returns(returns_counts_q, workspace_slug, portal)
-
         if brand_style_keys_q is not None:
-            returns_counts_q = returns_counts_q.filter(
-                func.lower(func.trim(ReturnsRaw.style_key)).in_(brand_style_keys_q)
+            sku_counts_q = sku_counts_q.filter(
+                norm_key(DailySkuFact.style_key).in_(brand_style_keys_q)
             )
 
-        returns_counts = returns_counts_q.group_by(ReturnsRaw.seller_sku_code).subquery()
+        sku_counts = sku_counts_q.group_by(DailySkuFact.seller_sku_code).subquery()
 
         # -------------------------
         # Catalog details (join via style_key)
@@ -7205,7 +6802,7 @@ def db_returns_sku_wise(
         if brand_norm:
             cat_q = cat_q.filter(
                 CatalogRaw.brand.isnot(None),
-                func.lower(func.trim(CatalogRaw.brand)) == brand_norm,
+                norm_key(CatalogRaw.brand) == brand_norm,
             )
 
         cat = cat_q.group_by(CatalogRaw.style_key).subquery()
@@ -7215,19 +6812,20 @@ def db_returns_sku_wise(
         # -------------------------
         q = (
             db.query(
-                sales_counts.c.seller_sku_code,
-                func.coalesce(sales_counts.c.style_key, returns_counts.c.style_key).label("style_key"),
+                sku_counts.c.seller_sku_code,
+                sku_counts.c.style_key,
                 func.coalesce(cat.c.brand, "").label("brand"),
                 func.coalesce(cat.c.product_name, "").label("product_name"),
-                sales_counts.c.orders,
-                func.coalesce(returns_counts.c.returns_units, 0).label("returns_units"),
-                func.coalesce(returns_counts.c.return_units, 0).label("return_units"),
-                func.coalesce(returns_counts.c.rto_units, 0).label("rto_units"),
-                sales_counts.c.last_order_date,
-            )
-            .outerjoin(returns_counts, returns_counts.c.seller_sku_code == sales_counts.c.seller_sku_code)
-            .outerjoin(cat, cat.c.style_key == func.coalesce(sales_counts.c.style_key, returns_counts.c.style_key))
-            .filter(sales_counts.c.orders >= min_orders)
+                sku_counts.c.orders,
+                sku_counts.c.returns_units,
+                sku_counts.c.return_units,
+                sku_counts.c.rto_units,
+                sku_counts.c.last_order_date,
+            )
+            .outerjoin(cat, cat.c.style_key == sku_counts.c.style_key)
+            # SKUs sold in the window
+            .filter(sku_counts.c.orders > 0)
+            .filter(sku_counts.c.orders >= min_orders)
         )
 
         rows = q.all()
@@ -7362,7 +6960,7 @@ def db_style_size_forecast(
         # -----------------------
         # 1) Orders by SKU in range
         # -----------------------
-        sku_norm_sales = func.lower(func.trim(SalesRaw.seller_sku_code))
+        sku_norm_sales = norm_key(SalesRaw.seller_sku_code)
 
         brand_norm = (brand or "").strip().lower() if brand else None
         sales_brand_expr = func.lower(func.trim(cast(SalesRaw.raw_json, JSONB)["brand"].astext))
@@ -7411,7 +7009,7 @@ def db_style_size_forecast(
             unit_expr = func.coalesce(ReturnsRaw.units, 1)
             rto_rows = (
                 db.query(
-                    func.lower(func.trim(ReturnsRaw.seller_sku_code)).label("sku_norm"),
+                    norm_key(ReturnsRaw.seller_sku_code).label("sku_norm"),
                     func.coalesce(func.sum(unit_expr), 0).label("rto_units"),
                 )
                 .filter(
@@ -7423,7 +7021,7 @@ def db_style_size_forecast(
                     ReturnsRaw.seller_sku_code.isnot(None),
                     rtype_norm == "RTO",
                 )
-                .group_by(func.lower(func.trim(ReturnsRaw.seller_sku_code)))
+                .group_by(norm_key(ReturnsRaw.seller_sku_code))
                 .all()
             )
             for rr in rto_rows:
@@ -7473,7 +7071,7 @@ def db_style_size_forecast(
             candidate_skus = cat_skus if cat_skus else list(sku_orders_map.keys())
 
             if candidate_skus:
-                sku_norm_stock = func.lower(func.trim(StockRaw.seller_sku_code))
+                sku_norm_stock = norm_key(StockRaw.seller_sku_code)
                 stock_rows = (
                     db.query(
                         sku_norm_stock.label("sku_norm"),
@@ -7659,7 +7257,7 @@ def db_style_sku_forecast(
         # -----------------------
         # 1) Orders by SKU
         # -----------------------
-        sku_norm_sales = func.lower(func.trim(SalesRaw.seller_sku_code))
+        sku_norm_sales = norm_key(SalesRaw.seller_sku_code)
 
         brand_norm = (brand or "").strip().lower() if brand else None
         sales_brand_expr = func.lower(func.trim(cast(SalesRaw.raw_json, JSONB)["brand"].astext))
@@ -7700,7 +7298,7 @@ def db_style_sku_forecast(
             unit_expr = func.coalesce(ReturnsRaw.units, 1)
             rto_rows = (
                 db.query(
-                    func.lower(func.trim(ReturnsRaw.seller_sku_code)).label("sku_norm"),
+                    norm_key(ReturnsRaw.seller_sku_code).label("sku_norm"),
                     func.coalesce(func.sum(unit_expr), 0).label("rto_units"),
                 )
                 .filter(
@@ -7712,7 +7310,7 @@ def db_style_sku_forecast(
                     ReturnsRaw.seller_sku_code.isnot(None),
                     rtype_norm == "RTO",
                 )
-                .group_by(func.lower(func.trim(ReturnsRaw.seller_sku_code)))
+                .group_by(norm_key(ReturnsRaw.seller_sku_code))
                 .all()
             )
             for rr in rto_rows:
@@ -7757,7 +7355,7 @@ def db_style_sku_forecast(
             candidate_skus.update(cat_skus)
 
             if candidate_skus:
-                sku_norm_stock = func.lower(func.trim(StockRaw.seller_sku_code))
+                sku_norm_stock = norm_key(StockRaw.seller_sku_code)
                 stock_rows = (
                     db.query(
                         sku_norm_stock.label("sku_norm"),
@@ -7975,106 +7573,28 @@ def db_kpi_gmv_asp(
             }
 
         # -----------------------------
-        # Myntra/others: existing SalesRaw logic
-        # (small fix: try sellerprice first)
+        # Myntra/others: sum(gmv) of the daily facts (gmv = seller price x units at ingest)
         # -----------------------------
-        start_dt = datetime.combine(start, time.min)
-        end_dt_excl = datetime.combine(end + timedelta(days=1), time.min)
-
-        # ✅ Try common keys: sellerprice -> seller price -> sellingprice
-        sellerprice_txt = cast(SalesRaw.raw_json, JSONB).op("->>")("sellerprice")
-        seller_price_txt = cast(SalesRaw.raw_json, JSONB).op("->>")("seller price")
-        sellingprice_txt = cast(SalesRaw.raw_json, JSONB).op("->>")("sellingprice")
-
-        seller_price_num = cast(
-            func.nullif(
-                func.trim(
-                    func.replace(
-                        func.coalesce(sellerprice_txt, seller_price_txt, sellingprice_txt),
-                        ",",
-                        "",
-                    )
-                ),
-                "",
-            ),
-            Numeric,
-        )
-
-        # Optional brand filter via catalog -> style_key list
-        style_key_filter = None
-        if brand:
-            style_key_filter = [
-                (r[0] or "").strip().lower()
-                for r in (
-                    db.query(func.lower(func.trim(CatalogRaw.style_key)))
-                    .filter(CatalogRaw.workspace_id == ws_id)
-                    .filter(func.lower(func.trim(CatalogRaw.brand)) == brand.strip().lower())
-                    .all()
-                )
-                if (r[0] or "").strip()
-            ]
-            if not style_key_filter:
-                return {
-                    "gmv": 0.0,
-                    "orders": 0,
-                    "units": 0,
-                    "asp": 0.0,
-                    "prev_gmv": 0.0,
-                    "prev_orders": 0,
-                    "prev_units": 0,
-                    "prev_asp": 0.0,
-                    "gmv_change_pct": None,
-                    "asp_change_pct": None,
-                }
-
-        q = (
-            db.query(
-                func.coalesce(func.sum(seller_price_num * SalesRaw.units), 0).label("gmv"),
-                func.count(SalesRaw.id).label("orders"),
-                func.coalesce(func.sum(SalesRaw.units), 0).label("units"),
-            )
-            .filter(
-                SalesRaw.workspace_id == ws_id,
-                SalesRaw.order_date >= start_dt,
-                SalesRaw.order_date < end_dt_excl,
-                SalesRaw.raw_json.isnot(None),
-                SalesRaw.raw_json.like("{%"),
-            )
-        )
-        q = _apply_portal_sales(q, ws_slug, portal)
-
-        if style_key_filter is not None:
-            q = q.filter(func.lower(func.trim(SalesRaw.style_key)).in_(style_key_filter))
-
-        row = q.one()
+        # Optional brand filter: catalog brand resolved onto the facts (brand_norm)
+        brand_norm = normalize_brand(brand) if brand else None
+
+        def facts_gmv(d1: date, d2: date):
+            return facts_window(
+                db, ws_id, d1, d2,
+                func.coalesce(func.sum(DailySkuFact.gmv), 0).label("gmv"),
+                func.coalesce(func.sum(DailySkuFact.orders), 0).label("orders"),
+                func.coalesce(func.sum(DailySkuFact.units), 0).label("units"),
+                portal=p,
+                brand_norm=brand_norm,
+            ).one()
+
+        row = facts_gmv(start, end)
         gmv = float(row.gmv or 0)
         orders = int(row.orders or 0)
         units = int(row.units or 0)
         asp = float(gmv / units) if units > 0 else 0.0
 
-        prev_start_dt = datetime.combine(prev_start, time.min)
-        prev_end_dt_excl = datetime.combine(prev_end + timedelta(days=1), time.min)
-
-        q2 = (
-            db.query(
-                func.coalesce(func.sum(seller_price_num * SalesRaw.units), 0).label("gmv"),
-                func.count(SalesRaw.id).label("orders"),
-                func.coalesce(func.sum(SalesRaw.units), 0).label("units"),
-            )
-            .filter(
-                SalesRaw.workspace_id == ws_id,
-                SalesRaw.order_date >= prev_start_dt,
-                SalesRaw.order_date < prev_end_dt_excl,
-                SalesRaw.raw_json.isnot(None),
-                SalesRaw.raw_json.like("{%"),
-            )
-        )
-        q2 = _apply_portal_sales(q2, ws_slug, portal)
-
-        if style_key_filter is not None:
-            q2 = q2.filter(func.lower(func.trim(SalesRaw.style_key)).in_(style_key_filter))
-
-        prev = q2.one()
+        prev = facts_gmv(prev_start, prev_end)
         prev_gmv = float(prev.gmv or 0)
         prev_orders = int(prev.orders or 0)
         prev_units = int(prev.units or 0)
@@ -8137,70 +7657,63 @@ def ingest_flipkart_traffic(
     """
     db: Session = SessionLocal()
     try:
-        ws_id = resolve_workspace_id(db, workspace_slug)
+        ws_id = resolve_workspace_id(db, workspace_slug, create=True)
 
-        if not file.filename.lower().endswith((".xlsx", ".xls")):
+        fname = file.filename.lower()
+        if not fname.endswith((".xlsx", ".xls")):
             raise HTTPException(status_code=400, detail="Please upload an Excel (.xlsx/.xls) file")
 
-        df = pd.read_excel(file.file)
+        # .xlsx is streamed (read-only openpyxl, one chunk in memory at a time);
+        # legacy .xls has no streaming reader, it is read in one go
+        if fname.endswith(".xls"):
+            chunks = [pd.read_excel(file.file, dtype=object)]
+        else:
+            chunks = iter_xlsx_chunks(file.file, header=True)
 
         def ckey(x: str) -> str:
             return str(x or "").strip().lower()
 
-        cols = {ckey(c): c for c in df.columns}
-
-        def pick_col(*names: str) -> str | None:
-            for name in names:
-                k = name.strip().lower()
-                if k in cols:
-                    return cols[k]
-            return None
-
-        # Required (based on your file)
-        impression_date_col = pick_col("Impression Date")
-        sku_col = pick_col("SKU Id")
-        views_col = pick_col("Product Views")
-        sales_col = pick_col("Sales")
-        revenue_col = pick_col("Revenue")
-
-        # Optional (present in your file but still guard)
-        listing_col = pick_col("Listing Id")
-        title_col = pick_col("Product Title")
-        clicks_col = pick_col("Product Clicks")
-        ctr_col = pick_col("Click Through Rate", "CTR (%)", "CTR")
-        conv_col = pick_col("Conversion Rate", "Conversion Rate (%)", "Conversion (%)", "CVR")
+        def resolve_cols(columns) -> dict:
+            cols = {ckey(c): c for c in columns}
 
-        missing = []
-        if impression_date_col is None:
-            missing.append("Impression Date")
-        if sku_col is None:
-            missing.append("SKU Id")
-        if views_col is None:
-            missing.append("Product Views")
-        if sales_col is None:
-            missing.append("Sales")
-        if revenue_col is None:
-            missing.append("Revenue")
-        if missing:
-            raise HTTPException(status_code=400, detail=f"Missing column(s): {', '.join(missing)}")
+            def pick_col(*names: str) -> str | None:
+                for name in names:
+                    k = name.strip().lower()
+                    if k in cols:
+                        return cols[k]
+                return None
 
-        # Parse date
-        df[impression_date_col] = pd.to_datetime(df[impression_date_col], errors="coerce").dt.date
-        df = df[df[impression_date_col].notna()]
+            picked = {
+                # Required (based on your file)
+                "impression_date": pick_col("Impression Date"),
+                "sku": pick_col("SKU Id"),
+                "views": pick_col("Product Views"),
+                "sales": pick_col("Sales"),
+                "revenue": pick_col("Revenue"),
+                # Optional (present in your file but still guard)
+                "listing": pick_col("Listing Id"),
+                "title": pick_col("Product Title"),
+                "clicks": pick_col("Product Clicks"),
+                "ctr": pick_col("Click Through Rate", "CTR (%)", "CTR"),
+                "conv": pick_col("Conversion Rate", "Conversion Rate (%)", "Conversion (%)", "CVR"),
+            }
 
-        if replace_history:
-            db.query(FlipkartTrafficRaw).filter(FlipkartTrafficRaw.workspace_id == ws_id).delete()
-            db.commit()
+            required = {
+                "impression_date": "Impression Date",
+                "sku": "SKU Id",
+                "views": "Product Views",
+                "sales": "Sales",
+                "revenue": "Revenue",
+            }
+            missing = [label for k, label in required.items() if picked[k] is None]
+            if missing:
+                raise HTTPException(status_code=400, detail=f"Missing column(s): {', '.join(missing)}")
+            return picked
 
-        def norm_fk_sku(x: object) -> str:
-            s = str(x or "").strip()
-            if not s:
-                return ""
-            s = s.lower()
+        def norm_fk_sku(s: pd.Series) -> pd.Series:
+            v = s.where(s.notna(), "").astype(str).str.strip().str.lower()
             # Ensure consistent Flipkart namespace
-            if not s.startswith("fk:"):
-                s = "fk:" + s
-            return s
+            return v.where(v.eq("") | v.str.startswith("fk:"), "fk:" + v)
 
         def norm_fk_listing_id(x: object) -> str | None:
             """
@@ -8209,7 +7722,9 @@ def ingest_flipkart_traffic(
             Your UI / sales style_key often looks like: fk:ktah6wuwpzah2nuq (derived)
             We'll store a best-effort normalized version for debugging/use later.
             """
-            s = str(x or "").strip()
+            if x is None or (isinstance(x, float) and pd.isna(x)):
+                return None
+            s = str(x).strip()
             if not s:
                 return None
             s_up = s.upper()
@@ -8224,77 +7739,82 @@ def ingest_flipkart_traffic(
                 s = "fk:" + s
             return s
 
-        def to_int(v: object) -> int:
-            if v is None or (isinstance(v, float) and pd.isna(v)):
-                return 0
-            try:
-                return int(float(str(v).replace(",", "").strip()))
-            except Exception:
-                return 0
+        def to_num(s: pd.Series) -> pd.Series:
+            # "1,234" / "17.55%" -> number, anything else -> NaN
+            txt = s.where(s.notna(), "").astype(str).str.strip().str.replace(r"%$", "", regex=True)
+            return pd.to_numeric(txt.str.replace(",", "", regex=False).str.strip(), errors="coerce")
 
-        def to_float(v: object) -> float:
-            if v is None or (isinstance(v, float) and pd.isna(v)):
-                return 0.0
-            try:
-                s = str(v).strip()
-                if s.endswith("%"):
-                    s = s[:-1].strip()
-                return float(s.replace(",", ""))
-            except Exception:
-                return 0.0
+        def to_int(s: pd.Series) -> pd.Series:
+            return to_num(s).fillna(0).apply(int).astype("int64")
 
-        def to_pct_or_none(v: object) -> float | None:
-            if v is None or (isinstance(v, float) and pd.isna(v)):
-                return None
-            try:
-                s = str(v).strip()
-                if not s:
-                    return None
-                if s.endswith("%"):
-                    s = s[:-1].strip()
-                return float(s.replace(",", ""))
-            except Exception:
-                return None
+        def to_text(s: pd.Series) -> pd.Series:
+            v = s.where(s.notna(), "").astype(str).str.strip()
+            return v.where(v.ne(""), None)
 
         now = datetime.utcnow()
-        rows: list[FlipkartTrafficRaw] = []
-
-        for _, r in df.iterrows():
-            sku_norm = norm_fk_sku(r.get(sku_col))
-            if not sku_norm:
+        picked = None
+        load = None
+        date_errors = DateErrors()
+
+        # replace_history: every chunk is staged, the history is swapped just before the commit
+        replacing = ReplaceLoad(db, FlipkartTrafficRaw.__tablename__, {"workspace_id": ws_id}) if replace_history else None
+
+        for chunk in chunks:
+            if picked is None:
+                picked = resolve_cols(chunk.columns)
+
+            c = picked
+            # Parse date
+            dates = parse_date_column(chunk[c["impression_date"]], "flipkart-traffic", c["impression_date"], date_errors)
+            sku_norm = norm_fk_sku(chunk[c["sku"]])
+            keep = dates.notna() & sku_norm.ne("")
+            if not keep.any():
                 continue
+            chunk, dates, sku_norm = chunk[keep], dates[keep], sku_norm[keep]
 
-            rec = FlipkartTrafficRaw(
-                workspace_id=ws_id,
-                impression_date=r[impression_date_col],
-                seller_sku_code=sku_norm,
-                listing_id=None if listing_col is None else norm_fk_listing_id(r.get(listing_col)),
-                product_title=None if title_col is None else (str(r.get(title_col) or "").strip() or None),
-
-                product_views=to_int(r.get(views_col)),
-                product_clicks=0 if clicks_col is None else to_int(r.get(clicks_col)),
-                sales_qty=to_int(r.get(sales_col)),
-                revenue=to_float(r.get(revenue_col)),
-
-                # IMPORTANT: In your file these are already "percent numbers":
-                # CTR example: 17.55 (means 17.55%)
-                # Conversion example: 0.53 (means 0.53%)
-                ctr_pct=to_pct_or_none(None if ctr_col is None else r.get(ctr_col)),
-                conversion_pct=to_pct_or_none(None if conv_col is None else r.get(conv_col)),
+            def opt(key: str) -> pd.Series:
+                return chunk[c[key]] if c[key] is not None else pd.Series(None, index=chunk.index, dtype=object)
 
-                raw_json=json.dumps({k: (None if pd.isna(v) else v) for k, v in r.to_dict().items()}, default=str),
-                ingested_at=now,
+            frame = pd.DataFrame(
+                {
+                    "workspace_id": str(ws_id),
+                    "impression_date": dates.dt.date,
+                    "seller_sku_code": sku_norm,
+                    "listing_id": opt("listing").map(norm_fk_listing_id),
+                    "product_title": to_text(opt("title")),
+                    "product_views": to_int(chunk[c["views"]]),
+                    "product_clicks": to_int(opt("clicks")),
+                    "sales_qty": to_int(chunk[c["sales"]]),
+                    "revenue": to_num(chunk[c["revenue"]]).fillna(0.0),
+                    # IMPORTANT: In your file these are already "percent numbers":
+                    # CTR example: 17.55 (means 17.55%)
+                    # Conversion example: 0.53 (means 0.53%)
+                    "ctr_pct": to_num(opt("ctr")),
+                    "conversion_pct": to_num(opt("conv")),
+                    "raw_json": chunk.to_json(orient="records", lines=True, date_format="iso").splitlines(),
+                    "ingested_at": now,
+                },
+                index=chunk.index,
             )
-            rows.append(rec)
-
-        if not rows:
-            return {"ok": True, "inserted": 0, "workspace_slug": workspace_slug}
+            if replacing:
+                replacing.add(frame)
+            else:
+                load = add_load_stats(load, copy_frame(db, FlipkartTrafficRaw.__tablename__, frame))
 
-        # bulk insert
-        db.bulk_save_objects(rows)
+        if replacing:
+            load = replacing.swap()
+        bump_data_version(db, ws_id)
         db.commit()
 
-        return {"ok": True, "inserted": len(rows), "workspace_slug": workspace_slug}
+        if not load or not load["rows"]:
+            return {"ok": True, "inserted": 0, "workspace_slug": workspace_slug, "date_errors": date_errors.to_dict()}
+        return {
+            "ok": True,
+            "inserted": load["rows"],
+            "workspace_slug": workspace_slug,
+            "load": load,
+            "date_errors": date_errors.to_dict(),
+        }
 
     except HTTPException:
         raise
@@ -8331,7 +7851,7 @@ def ingest_flipkart_gstr_sales(
     db = SessionLocal()
     try:
         ws_slug = (workspace_slug or "default").strip() or "default"
-        ws_id = resolve_workspace_id(db, ws_slug)
+        ws_id = resolve_workspace_id(db, ws_slug, create=True)
 
         content = file.file.read()
         if not content:
@@ -8505,9 +8025,10 @@ def ingest_flipkart_gstr_sales(
                 .filter(FlipkartGstrSalesRaw.order_date <= max_d)
                 .delete(synchronize_session=False)
             )
-            db.commit()
 
+        # delete + insert commit together: readers never see the range empty
         db.bulk_save_objects(out)
+        bump_data_version(db, ws_id)
         db.commit()
 
         return {
@@ -0,0 +1,198 @@
+# backend/migrations/__init__.py
+# Versioned schema migrations. Run them before starting the API / ingest workers:
+#
+#   python -m backend.migrations              # apply pending migrations (+ data sync hooks)
+#   python -m backend.migrations --status     # applied / pending
+#
+# A migration is a module vNNNN_<name>.py in this package with:
+#   DESCRIPTION    one line
+#   TRANSACTIONAL  True (default): upgrade() runs in one transaction with the version row
+#                  False: upgrade() gets an autocommit connection (CREATE INDEX CONCURRENTLY);
+#                         every statement must be idempotent, a failed run is simply re-run
+#   upgrade(conn)
+#
+# Applied versions are recorded in schema_migrations. A Postgres advisory lock keeps two
+# deploys from migrating at the same time. The API only checks that nothing is pending
+# (require_current_schema) and never runs DDL itself.
+
+from __future__ import annotations
+
+import hashlib
+import importlib
+import pkgutil
+import re
+import time
+from dataclasses import dataclass
+from types import ModuleType
+
+from sqlalchemy import text
+
+MIGRATIONS_TABLE = "schema_migrations"
+
+# pg_advisory_lock key ("projm" in ascii)
+_LOCK_KEY = 0x70726F6A6D
+
+_NAME = re.compile(r"^v(\d{4})_(\w+)$")
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    module: ModuleType
+
+    @property
+    def description(self) -> str:
+        return getattr(self.module, "DESCRIPTION", self.name)
+
+    @property
+    def transactional(self) -> bool:
+        return bool(getattr(self.module, "TRANSACTIONAL", True))
+
+
+def discover() -> list[Migration]:
+    out = []
+    for info in pkgutil.iter_modules(__path__):
+        m = _NAME.match(info.name)
+        if not m:
+            continue
+        module = importlib.import_module(f"{__name__}.{info.name}")
+        out.append(Migration(version=int(m.group(1)), name=m.group(2), module=module))
+    out.sort(key=lambda x: x.version)
+    versions = [x.version for x in out]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError(f"Duplicate migration versions: {versions}")
+    return out
+
+
+def _ensure_table(conn) -> None:
+    conn.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} ("
+            "version INTEGER PRIMARY KEY, "
+            "name VARCHAR NOT NULL, "
+            "applied_at TIMESTAMP NOT NULL DEFAULT now(), "
+            "seconds DOUBLE PRECISION)"
+        )
+    )
+
+
+def applied_versions(conn) -> set[int]:
+    exists = conn.execute(text("SELECT to_regclass(:t)"), {"t": MIGRATIONS_TABLE}).scalar()
+    if exists is None:
+        return set()
+    return set(conn.execute(text(f"SELECT version FROM {MIGRATIONS_TABLE}")).scalars().all())
+
+
+def pending(engine) -> list[Migration]:
+    with engine.connect() as conn:
+        done = applied_versions(conn)
+    return [m for m in discover() if m.version not in done]
+
+
+def _record(conn, m: Migration, seconds: float) -> None:
+    conn.execute(
+        text(
+            f"INSERT INTO {MIGRATIONS_TABLE} (version, name, seconds) VALUES (:v, :n, :s) "
+            "ON CONFLICT (version) DO NOTHING"
+        ),
+        {"v": m.version, "n": m.name, "s": round(seconds, 3)},
+    )
+
+
+def upgrade(engine, log=print) -> list[dict]:
+    """Apply every pending migration in version order; returns what ran."""
+    ran = []
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as lock_conn:
+        lock_conn.execute(text("SELECT pg_advisory_lock(:k)"), {"k": _LOCK_KEY})
+        try:
+            _ensure_table(lock_conn)
+            done = applied_versions(lock_conn)
+            for m in discover():
+                if m.version in done:
+                    continue
+                log(f"[migrate] v{m.version:04d} {m.name}: {m.description}")
+                t0 = time.perf_counter()
+                if m.transactional:
+                    with engine.begin() as conn:
+                        m.module.upgrade(conn)
+                        _record(conn, m, time.perf_counter() - t0)
+                else:
+                    m.module.upgrade(lock_conn)
+                    _record(lock_conn, m, time.perf_counter() - t0)
+                ran.append({"version": m.version, "name": m.name, "seconds": round(time.perf_counter() - t0, 3)})
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": _LOCK_KEY})
+    return ran
+
+
+def require_current_schema(engine) -> None:
+    """Raise when migrations are pending (called at API / worker import)."""
+    todo = pending(engine)
+    if todo:
+        names = ", ".join(f"v{m.version:04d}_{m.name}" for m in todo)
+        raise RuntimeError(f"Database schema is behind ({names}); run: python -m backend.migrations")
+
+
+# -----------------------------------------------------------------------------
+# Helpers for migration modules
+# -----------------------------------------------------------------------------
+def create_index_concurrently(conn, name: str, table: str, columns: str, where: str | None = None) -> None:
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS (autocommit connection). An INVALID index left
+    behind by an interrupted concurrent build is dropped and built again.
+
+    Partitioned tables cannot be indexed concurrently: the parent index is created ON ONLY
+    (catalog entry, no data) and each partition's index is built concurrently and attached.
+    """
+    kind = conn.execute(text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:t)"), {"t": table}).scalar()
+    if kind == "p":
+        _create_partitioned_index(conn, name, table, columns, where)
+        return
+
+    valid = conn.execute(
+        text(
+            "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :n AND c.relnamespace = to_regnamespace(current_schema())"
+        ),
+        {"n": name},
+    ).scalar()
+    if valid is False:
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    sql = f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns})"
+    if where:
+        sql += f" WHERE {where}"
+    conn.execute(text(sql))
+
+
+def _create_partitioned_index(conn, name: str, table: str, columns: str, where: str | None) -> None:
+    pred = f" WHERE {where}" if where else ""
+    conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY {table} ({columns}){pred}"))
+    parts = conn.execute(
+        text("SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = to_regclass(:t)"),
+        {"t": table},
+    ).scalars().all()
+    attached = set(
+        conn.execute(
+            text(
+                "SELECT ix.indrelid::regclass::text FROM pg_inherits i JOIN pg_index ix ON ix.indexrelid = i.inhrelid "
+                "WHERE i.inhparent = to_regclass(:n)"
+            ),
+            {"n": name},
+        ).scalars().all()
+    )
+    for part in parts:
+        if part in attached:
+            continue
+        child = _child_index_name(name, part[len(table):] if part.startswith(table) else part)
+        create_index_concurrently(conn, child, part, columns, where=where)
+        # the parent index turns valid once every partition has one attached
+        conn.execute(text(f"ALTER INDEX {name} ATTACH PARTITION {child}"))
+
+
+def _child_index_name(name: str, suffix: str) -> str:
+    out = f"{name}{suffix}"
+    if len(out) <= 63:
+        return out
+    digest = hashlib.sha1(out.encode("utf-8")).hexdigest()[:8]
+    return f"{out[:54]}_{digest}"
@@ -0,0 +1,71 @@
+# backend/migrations/__main__.py
+#   python -m backend.migrations              # apply pending migrations, then the data syncs
+#   python -m backend.migrations --status
+#   python -m backend.migrations --skip-sync  # schema only
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+
+from sqlalchemy import text
+
+from backend.db import engine
+from backend.migrations import MIGRATIONS_TABLE, applied_versions, discover, upgrade
+
+
+def _status() -> list[dict]:
+    with engine.connect() as conn:
+        done = applied_versions(conn)
+        applied_at = {}
+        if done:
+            applied_at = {
+                v: str(at)
+                for v, at in conn.execute(text(f"SELECT version, applied_at FROM {MIGRATIONS_TABLE}")).all()
+            }
+    return [
+        {
+            "version": m.version,
+            "name": m.name,
+            "description": m.description,
+            "applied_at": applied_at.get(m.version),
+        }
+        for m in discover()
+    ]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Apply database schema migrations")
+    ap.add_argument("--status", action="store_true", help="list migrations and exit")
+    ap.add_argument("--skip-sync", action="store_true", help="do not run the reason / brand / daily facts / monthly snapshot backfills")
+    args = ap.parse_args()
+
+    if args.status:
+        rows = _status()
+        for r in rows:
+            print(json.dumps(r), flush=True)
+        sys.exit(1 if any(r["applied_at"] is None for r in rows) else 0)
+
+    ran = upgrade(engine)
+    print(json.dumps({"applied": ran}), flush=True)
+
+    if args.skip_sync:
+        return
+
+    # data follow-ups: cheap no-ops once done (tracked in app_meta)
+    from backend.daily_facts import sync_daily_facts
+    from backend.fact_brands import sync_fact_brands
+    from backend.monthly_snapshots import sync_monthly_snapshots
+    from backend.return_reasons import sync_reason_buckets
+
+    print(json.dumps({"return_reasons": sync_reason_buckets(engine)}), flush=True)
+    print(json.dumps({"fact_brands": sync_fact_brands(engine)}), flush=True)
+    # after the brands: the facts copy brand_norm
+    print(json.dumps({"daily_facts": sync_daily_facts(engine)}), flush=True)
+    # after the facts: the snapshots are rolled up from them
+    print(json.dumps({"monthly_snapshots": sync_monthly_snapshots(engine)}), flush=True)
+
+
+if __name__ == "__main__":
+    main()
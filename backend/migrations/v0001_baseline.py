@@ -0,0 +1,42 @@
+# backend/migrations/v0001_baseline.py
+# Every table as of the first migration (frozen DDL in v0001_baseline.sql, not the live
+# models: later migrations expect this schema), plus the columns older databases got from
+# the ad-hoc ALTER block that used to run at API import.
+
+from pathlib import Path
+
+from sqlalchemy import text
+
+DESCRIPTION = "baseline tables (frozen DDL) + pre-migration ALTERs (uploads lineage, GMV, cost price platform)"
+
+_DDL = Path(__file__).with_suffix(".sql")
+
+
+def _table_blocks() -> list[tuple[str, list[str]]]:
+    """(table, statements) per block of v0001_baseline.sql, in file (foreign key) order."""
+    sql = "\n".join(l for l in _DDL.read_text().splitlines() if not l.startswith("--"))
+    out = []
+    for block in sql.split("\n\n"):
+        stmts = [s.strip() for s in block.split(";") if s.strip()]
+        if stmts:
+            table = stmts[0].split("(", 1)[0].split()[-1]
+            out.append((table, stmts))
+    return out
+
+
+def upgrade(conn) -> None:
+    # existing tables are left as they are (the ALTERs below / later migrations add columns)
+    for table, stmts in _table_blocks():
+        if conn.execute(text("SELECT to_regclass(:t)"), {"t": table}).scalar() is None:
+            for stmt in stmts:
+                conn.execute(text(stmt))
+
+    conn.execute(text("ALTER TABLE sales_raw ADD COLUMN IF NOT EXISTS seller_price DOUBLE PRECISION"))
+    conn.execute(text("ALTER TABLE sales_raw ADD COLUMN IF NOT EXISTS gmv DOUBLE PRECISION"))
+    # uploads registry lineage
+    for t in ("sales_raw", "returns_raw", "catalog_raw", "stock_raw", "myntra_weekly_perf_raw"):
+        conn.execute(text(f"ALTER TABLE {t} ADD COLUMN IF NOT EXISTS upload_id UUID"))
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{t}_upload_id ON {t} (upload_id)"))
+    # was POST /db/recon/cost-price/migrate
+    conn.execute(text("ALTER TABLE sku_cost_price ADD COLUMN IF NOT EXISTS platform VARCHAR"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_sku_cost_price_platform ON sku_cost_price (platform)"))
@@ -0,0 +1,888 @@
+-- backend/migrations/v0001_baseline.sql
+-- Frozen schema of v0001 (the models when versioned migrations were introduced).
+-- One block per table: the table and its indexes, separated by a blank line. v0001 runs a
+-- block only when its table does not exist yet, like create_all() did. Never edit this file:
+-- schema changes go in a new migration.
+
+CREATE TABLE IF NOT EXISTS app_meta (
+    key VARCHAR NOT NULL,
+    value TEXT,
+    updated_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL,
+    PRIMARY KEY (key)
+);
+
+CREATE TABLE IF NOT EXISTS flipkart_gstr_sales_raw (
+    id SERIAL NOT NULL,
+    workspace_id UUID NOT NULL,
+    order_id TEXT,
+    order_item_id TEXT,
+    seller_sku_code TEXT,
+    order_date DATE,
+    buyer_invoice_date DATE,
+    item_quantity INTEGER,
+    buyer_invoice_amount FLOAT,
+    event_type TEXT,
+    event_sub_type TEXT,
+    product_title TEXT,
+    raw_json JSONB,
+    ingested_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE INDEX IF NOT EXISTS ix_flipkart_gstr_sales_raw_buyer_invoice_date ON flipkart_gstr_sales_raw (buyer_invoice_date);
+CREATE INDEX IF NOT EXISTS ix_flipkart_gstr_sales_raw_event_sub_type ON flipkart_gstr_sales_raw (event_sub_type);
+CREATE INDEX IF NOT EXISTS ix_flipkart_gstr_sales_raw_event_type ON flipkart_gstr_sales_raw (event_type);
+CREATE INDEX IF NOT EXISTS ix_flipkart_gstr_sales_raw_id ON flipkart_gstr_sales_raw (id);
+CREATE INDEX IF NOT EXISTS ix_flipkart_gstr_sales_raw_ingested_at ON flipkart_gstr_sales_raw (ingested_at);
+CREATE INDEX IF NOT EXISTS ix_flipkart_gstr_sales_raw_order_date ON flipkart_gstr_sales_raw (order_date);
+CREATE INDEX IF NOT EXISTS ix_flipkart_gstr_sales_raw_order_id ON flipkart_gstr_sales_raw (order_id);
+CREATE INDEX IF NOT EXISTS ix_flipkart_gstr_sales_raw_order_item_id ON flipkart_gstr_sales_raw (order_item_id);
+CREATE INDEX IF NOT EXISTS ix_flipkart_gstr_sales_raw_seller_sku_code ON flipkart_gstr_sales_raw (seller_sku_code);
+CREATE INDEX IF NOT EXISTS ix_flipkart_gstr_sales_raw_workspace_id ON flipkart_gstr_sales_raw (workspace_id);
+
+CREATE TABLE IF NOT EXISTS flipkart_order_pnl (
+    id SERIAL NOT NULL,
+    workspace_id UUID NOT NULL,
+    order_date TIMESTAMP WITHOUT TIME ZONE,
+    order_id VARCHAR,
+    order_item_id VARCHAR,
+    sku_id VARCHAR,
+    fulfilment_type VARCHAR,
+    channel_of_sale VARCHAR,
+    mode_of_payment VARCHAR,
+    shipping_zone VARCHAR,
+    order_status VARCHAR,
+    gross_units INTEGER,
+    returned_cancelled_units INTEGER,
+    rto_units INTEGER,
+    rvp_units INTEGER,
+    cancelled_units INTEGER,
+    net_units INTEGER,
+    sale_amount FLOAT,
+    seller_burn_offer FLOAT,
+    customer_addons_amount FLOAT,
+    estimated_net_sales FLOAT,
+    accounted_net_sales FLOAT,
+    total_expenses FLOAT,
+    commission_fee FLOAT,
+    collection_fee FLOAT,
+    fixed_fee FLOAT,
+    pick_and_pack_fee FLOAT,
+    forward_shipping_fee FLOAT,
+    offer_adjustments FLOAT,
+    reverse_shipping_fee FLOAT,
+    storage_fee FLOAT,
+    recall_fee FLOAT,
+    no_cost_emi_fee FLOAT,
+    product_cancellation_fee FLOAT,
+    taxes_gst FLOAT,
+    taxes_tcs FLOAT,
+    taxes_tds FLOAT,
+    rewards_other_benefits FLOAT,
+    rewards FLOAT,
+    order_spf FLOAT,
+    non_order_spf FLOAT,
+    bank_settlement_projected FLOAT,
+    input_tax_credits FLOAT,
+    net_earnings FLOAT,
+    earnings_per_unit FLOAT,
+    net_margins_pct FLOAT,
+    amount_settled FLOAT,
+    amount_pending FLOAT,
+    raw_json TEXT,
+    ingested_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE INDEX IF NOT EXISTS ix_flipkart_order_pnl_id ON flipkart_order_pnl (id);
+CREATE INDEX IF NOT EXISTS ix_flipkart_order_pnl_ingested_at ON flipkart_order_pnl (ingested_at);
+CREATE INDEX IF NOT EXISTS ix_flipkart_order_pnl_order_date ON flipkart_order_pnl (order_date);
+CREATE INDEX IF NOT EXISTS ix_flipkart_order_pnl_order_id ON flipkart_order_pnl (order_id);
+CREATE INDEX IF NOT EXISTS ix_flipkart_order_pnl_order_item_id ON flipkart_order_pnl (order_item_id);
+CREATE INDEX IF NOT EXISTS ix_flipkart_order_pnl_order_status ON flipkart_order_pnl (order_status);
+CREATE INDEX IF NOT EXISTS ix_flipkart_order_pnl_sku_id ON flipkart_order_pnl (sku_id);
+CREATE INDEX IF NOT EXISTS ix_flipkart_order_pnl_workspace_id ON flipkart_order_pnl (workspace_id);
+
+CREATE TABLE IF NOT EXISTS flipkart_payment_report (
+    id SERIAL NOT NULL,
+    workspace_id UUID NOT NULL,
+    neft_id VARCHAR,
+    neft_type VARCHAR,
+    payment_date TIMESTAMP WITHOUT TIME ZONE,
+    bank_settlement_value FLOAT,
+    input_gst_tcs_credits FLOAT,
+    income_tax_tds_credits FLOAT,
+    order_id VARCHAR,
+    order_item_id VARCHAR,
+    sale_amount FLOAT,
+    total_offer_amount FLOAT,
+    my_share FLOAT,
+    customer_addons_amount FLOAT,
+    marketplace_fee FLOAT,
+    taxes FLOAT,
+    offer_adjustments FLOAT,
+    protection_fund FLOAT,
+    refund FLOAT,
+    tier VARCHAR,
+    commission_rate_pct FLOAT,
+    commission FLOAT,
+    fixed_fee FLOAT,
+    collection_fee FLOAT,
+    pick_and_pack_fee FLOAT,
+    shipping_fee FLOAT,
+    reverse_shipping_fee FLOAT,
+    no_cost_emi_fee FLOAT,
+    product_cancellation_fee FLOAT,
+    tcs FLOAT,
+    tds FLOAT,
+    gst_on_mp_fees FLOAT,
+    shipping_zone VARCHAR,
+    chargeable_wt_slab VARCHAR,
+    order_date TIMESTAMP WITHOUT TIME ZONE,
+    dispatch_date TIMESTAMP WITHOUT TIME ZONE,
+    fulfilment_type VARCHAR,
+    seller_sku VARCHAR,
+    quantity INTEGER,
+    product_sub_category VARCHAR,
+    return_type VARCHAR,
+    item_return_status VARCHAR,
+    raw_json TEXT,
+    ingested_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE INDEX IF NOT EXISTS ix_flipkart_payment_report_id ON flipkart_payment_report (id);
+CREATE INDEX IF NOT EXISTS ix_flipkart_payment_report_ingested_at ON flipkart_payment_report (ingested_at);
+CREATE INDEX IF NOT EXISTS ix_flipkart_payment_report_neft_id ON flipkart_payment_report (neft_id);
+CREATE INDEX IF NOT EXISTS ix_flipkart_payment_report_order_date ON flipkart_payment_report (order_date);
+CREATE INDEX IF NOT EXISTS ix_flipkart_payment_report_order_id ON flipkart_payment_report (order_id);
+CREATE INDEX IF NOT EXISTS ix_flipkart_payment_report_order_item_id ON flipkart_payment_report (order_item_id);
+CREATE INDEX IF NOT EXISTS ix_flipkart_payment_report_payment_date ON flipkart_payment_report (payment_date);
+CREATE INDEX IF NOT EXISTS ix_flipkart_payment_report_seller_sku ON flipkart_payment_report (seller_sku);
+CREATE INDEX IF NOT EXISTS ix_flipkart_payment_report_workspace_id ON flipkart_payment_report (workspace_id);
+
+CREATE TABLE IF NOT EXISTS flipkart_sku_pnl (
+    id SERIAL NOT NULL,
+    workspace_id UUID NOT NULL,
+    sku_id VARCHAR NOT NULL,
+    sku_name VARCHAR,
+    gross_units INTEGER,
+    returned_cancelled_units INTEGER,
+    rto_units INTEGER,
+    rvp_units INTEGER,
+    cancelled_units INTEGER,
+    net_units INTEGER,
+    estimated_net_sales FLOAT,
+    accounted_net_sales FLOAT,
+    total_expenses FLOAT,
+    commission_fee FLOAT,
+    collection_fee FLOAT,
+    fixed_fee FLOAT,
+    pick_and_pack_fee FLOAT,
+    forward_shipping_fee FLOAT,
+    offer_adjustments FLOAT,
+    reverse_shipping_fee FLOAT,
+    storage_fee FLOAT,
+    recall_fee FLOAT,
+    no_cost_emi_fee FLOAT,
+    installation_fee FLOAT,
+    tech_visit_fee FLOAT,
+    uninstallation_fee FLOAT,
+    customer_addons_recovery FLOAT,
+    franchise_fee FLOAT,
+    shopsy_marketing_fee FLOAT,
+    product_cancellation_fee FLOAT,
+    taxes_gst FLOAT,
+    taxes_tcs FLOAT,
+    taxes_tds FLOAT,
+    rewards_other_benefits FLOAT,
+    rewards FLOAT,
+    order_spf FLOAT,
+    non_order_spf FLOAT,
+    bank_settlement_projected FLOAT,
+    input_tax_credits FLOAT,
+    input_tax_gst_tcs FLOAT,
+    input_tax_tds FLOAT,
+    net_earnings FLOAT,
+    earnings_per_unit FLOAT,
+    net_margins_pct FLOAT,
+    amount_settled FLOAT,
+    amount_pending FLOAT,
+    raw_json TEXT,
+    report_month VARCHAR,
+    ingested_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE INDEX IF NOT EXISTS ix_flipkart_sku_pnl_id ON flipkart_sku_pnl (id);
+CREATE INDEX IF NOT EXISTS ix_flipkart_sku_pnl_ingested_at ON flipkart_sku_pnl (ingested_at);
+CREATE INDEX IF NOT EXISTS ix_flipkart_sku_pnl_report_month ON flipkart_sku_pnl (report_month);
+CREATE INDEX IF NOT EXISTS ix_flipkart_sku_pnl_sku_id ON flipkart_sku_pnl (sku_id);
+CREATE INDEX IF NOT EXISTS ix_flipkart_sku_pnl_workspace_id ON flipkart_sku_pnl (workspace_id);
+
+CREATE TABLE IF NOT EXISTS flipkart_traffic_raw (
+    id SERIAL NOT NULL,
+    workspace_id UUID NOT NULL,
+    impression_date DATE NOT NULL,
+    seller_sku_code TEXT,
+    listing_id TEXT,
+    product_title TEXT,
+    product_views INTEGER,
+    product_clicks INTEGER,
+    sales_qty INTEGER,
+    revenue FLOAT,
+    ctr_pct FLOAT,
+    conversion_pct FLOAT,
+    raw_json JSONB,
+    ingested_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE INDEX IF NOT EXISTS ix_flipkart_traffic_raw_id ON flipkart_traffic_raw (id);
+CREATE INDEX IF NOT EXISTS ix_flipkart_traffic_raw_impression_date ON flipkart_traffic_raw (impression_date);
+CREATE INDEX IF NOT EXISTS ix_flipkart_traffic_raw_ingested_at ON flipkart_traffic_raw (ingested_at);
+CREATE INDEX IF NOT EXISTS ix_flipkart_traffic_raw_listing_id ON flipkart_traffic_raw (listing_id);
+CREATE INDEX IF NOT EXISTS ix_flipkart_traffic_raw_seller_sku_code ON flipkart_traffic_raw (seller_sku_code);
+CREATE INDEX IF NOT EXISTS ix_flipkart_traffic_raw_workspace_id ON flipkart_traffic_raw (workspace_id);
+
+CREATE TABLE IF NOT EXISTS ingest_jobs (
+    id UUID NOT NULL,
+    kind VARCHAR NOT NULL,
+    workspace_slug VARCHAR NOT NULL,
+    status VARCHAR NOT NULL,
+    filename VARCHAR,
+    file_path VARCHAR,
+    file_bytes INTEGER,
+    params_json TEXT,
+    rows_done INTEGER NOT NULL,
+    chunks_done INTEGER NOT NULL,
+    result_json TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL,
+    worker_id VARCHAR,
+    created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    started_at TIMESTAMP WITHOUT TIME ZONE,
+    heartbeat_at TIMESTAMP WITHOUT TIME ZONE,
+    finished_at TIMESTAMP WITHOUT TIME ZONE,
+    seconds FLOAT,
+    PRIMARY KEY (id)
+);
+CREATE INDEX IF NOT EXISTS ix_ingest_jobs_created_at ON ingest_jobs (created_at);
+CREATE INDEX IF NOT EXISTS ix_ingest_jobs_kind ON ingest_jobs (kind);
+CREATE INDEX IF NOT EXISTS ix_ingest_jobs_status ON ingest_jobs (status);
+CREATE INDEX IF NOT EXISTS ix_ingest_jobs_status_created ON ingest_jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS ix_ingest_jobs_workspace_slug ON ingest_jobs (workspace_slug);
+
+CREATE TABLE IF NOT EXISTS myntra_non_order_settlement (
+    id SERIAL NOT NULL,
+    workspace_id UUID NOT NULL,
+    seller_name VARCHAR,
+    settlement_amount FLOAT,
+    settlement_type VARCHAR,
+    utr VARCHAR,
+    invoice_ref VARCHAR,
+    settlement_date TIMESTAMP WITHOUT TIME ZONE,
+    settlement_description VARCHAR,
+    raw_json TEXT,
+    ingested_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE INDEX IF NOT EXISTS ix_myntra_non_order_settlement_id ON myntra_non_order_settlement (id);
+CREATE INDEX IF NOT EXISTS ix_myntra_non_order_settlement_ingested_at ON myntra_non_order_settlement (ingested_at);
+CREATE INDEX IF NOT EXISTS ix_myntra_non_order_settlement_invoice_ref ON myntra_non_order_settlement (invoice_ref);
+CREATE INDEX IF NOT EXISTS ix_myntra_non_order_settlement_settlement_type ON myntra_non_order_settlement (settlement_type);
+CREATE INDEX IF NOT EXISTS ix_myntra_non_order_settlement_workspace_id ON myntra_non_order_settlement (workspace_id);
+
+CREATE TABLE IF NOT EXISTS myntra_order_flow (
+    id SERIAL NOT NULL,
+    workspace_id UUID NOT NULL,
+    sale_order_code VARCHAR,
+    order_number VARCHAR,
+    product_sku_code VARCHAR,
+    invoice_number VARCHAR,
+    seller_order_id VARCHAR,
+    packed_id VARCHAR,
+    order_item_status VARCHAR,
+    return_type VARCHAR,
+    order_date TIMESTAMP WITHOUT TIME ZONE,
+    packing_date TIMESTAMP WITHOUT TIME ZONE,
+    promised_delivery_date TIMESTAMP WITHOUT TIME ZONE,
+    actual_delivery_date TIMESTAMP WITHOUT TIME ZONE,
+    return_date TIMESTAMP WITHOUT TIME ZONE,
+    restocked_date TIMESTAMP WITHOUT TIME ZONE,
+    promised_settlement_date TIMESTAMP WITHOUT TIME ZONE,
+    currency VARCHAR,
+    seller_paid_amount FLOAT,
+    postpaid_amount FLOAT,
+    prepaid_amount FLOAT,
+    mrp FLOAT,
+    discount_amount FLOAT,
+    customer_paid_amt_fw FLOAT,
+    customer_paid_amt_rv FLOAT,
+    shipping_case VARCHAR,
+    tax_rate FLOAT,
+    igst_amount FLOAT,
+    cgst_amount FLOAT,
+    sgst_amount FLOAT,
+    tcs_igst_amt FLOAT,
+    tcs_sgst_amt FLOAT,
+    tcs_cgst_amt FLOAT,
+    taxable_amount FLOAT,
+    igst_rate FLOAT,
+    cgst_rate FLOAT,
+    sgst_rate FLOAT,
+    tcs_igst_rate FLOAT,
+    tcs_sgst_rate FLOAT,
+    tcs_cgst_rate FLOAT,
+    minimum_commission FLOAT,
+    commission_pct FLOAT,
+    commission_total_amount FLOAT,
+    commission_base_amount FLOAT,
+    commission_tax_amount FLOAT,
+    total_commission_plus_tcs_deduction_fw FLOAT,
+    logistics_deduction_fw FLOAT,
+    total_settlement_fw FLOAT,
+    amount_pending_settlement_fw FLOAT,
+    prepaid_commission_deduction_fw FLOAT,
+    prepaid_logistics_deduction_fw FLOAT,
+    prepaid_payment_fw FLOAT,
+    postpaid_commission_deduction_fw FLOAT,
+    postpaid_logistics_deduction_fw FLOAT,
+    postpaid_payment_fw FLOAT,
+    settlement_date_prepaid_comm_deduction_fw TIMESTAMP WITHOUT TIME ZONE,
+    settlement_date_prepaid_logistics_deduction_fw TIMESTAMP WITHOUT TIME ZONE,
+    settlement_date_prepaid_payment_fw TIMESTAMP WITHOUT TIME ZONE,
+    settlement_date_postpaid_comm_deduction_fw TIMESTAMP WITHOUT TIME ZONE,
+    settlement_date_postpaid_logistics_deduction_fw TIMESTAMP WITHOUT TIME ZONE,
+    settlement_date_postpaid_payment_fw TIMESTAMP WITHOUT TIME ZONE,
+    bank_utr_no_prepaid_comm_deduction_fw VARCHAR,
+    bank_utr_no_prepaid_logistics_deduction_fw VARCHAR,
+    bank_utr_no_prepaid_payment_fw VARCHAR,
+    bank_utr_no_postpaid_comm_deduction_fw VARCHAR,
+    bank_utr_no_postpaid_logistics_deduction_fw VARCHAR,
+    bank_utr_no_postpaid_payment_fw VARCHAR,
+    total_commission_plus_tcs_deduction_rv FLOAT,
+    logistics_deduction_rv FLOAT,
+    customer_paid_amt_rv_2 FLOAT,
+    total_settlement_rv FLOAT,
+    amount_pending_settlement_rv FLOAT,
+    prepaid_commission_deduction_rv FLOAT,
+    prepaid_logistics_deduction_rv FLOAT,
+    prepaid_payment_rv FLOAT,
+    postpaid_commission_deduction_rv FLOAT,
+    postpaid_logistics_deduction_rv FLOAT,
+    postpaid_payment_rv FLOAT,
+    settlement_date_prepaid_comm_deduction_rv TIMESTAMP WITHOUT TIME ZONE,
+    settlement_date_prepaid_logistics_deduction_rv TIMESTAMP WITHOUT TIME ZONE,
+    settlement_date_prepaid_payment_rv TIMESTAMP WITHOUT TIME ZONE,
+    settlement_date_postpaid_comm_deduction_rv TIMESTAMP WITHOUT TIME ZONE,
+    settlement_date_postpaid_logistics_deduction_rv TIMESTAMP WITHOUT TIME ZONE,
+    settlement_date_postpaid_payment_rv TIMESTAMP WITHOUT TIME ZONE,
+    bank_utr_no_prepaid_comm_deduction_rv VARCHAR,
+    bank_utr_no_prepaid_logistics_deduction_rv VARCHAR,
+    bank_utr_no_prepaid_payment_rv VARCHAR,
+    bank_utr_no_postpaid_comm_deduction_rv VARCHAR,
+    bank_utr_no_postpaid_logistics_deduction_rv VARCHAR,
+    bank_utr_no_postpaid_payment_rv VARCHAR,
+    brand VARCHAR,
+    gender VARCHAR,
+    article_type VARCHAR,
+    supply_type VARCHAR,
+    is_try_and_buy VARCHAR,
+    payment_method VARCHAR,
+    courier_name VARCHAR,
+    tracking_no VARCHAR,
+    hsn VARCHAR,
+    product_tax_category VARCHAR,
+    e_commerce_portal_name VARCHAR,
+    seller_gstn VARCHAR,
+    seller_name VARCHAR,
+    seller_state_code VARCHAR,
+    myntra_gstn VARCHAR,
+    customer_name VARCHAR,
+    customer_pincode VARCHAR,
+    customer_state VARCHAR,
+    additional_amount FLOAT,
+    postpaid_amount_other FLOAT,
+    prepaid_amount_other FLOAT,
+    shipping_amount FLOAT,
+    gift_amount FLOAT,
+    cart_discount FLOAT,
+    coupon_discount FLOAT,
+    total_customer_paid FLOAT,
+    raw_json TEXT,
+    ingested_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE INDEX IF NOT EXISTS ix_myntra_order_flow_brand ON myntra_order_flow (brand);
+CREATE INDEX IF NOT EXISTS ix_myntra_order_flow_id ON myntra_order_flow (id);
+CREATE INDEX IF NOT EXISTS ix_myntra_order_flow_ingested_at ON myntra_order_flow (ingested_at);
+CREATE INDEX IF NOT EXISTS ix_myntra_order_flow_order_date ON myntra_order_flow (order_date);
+CREATE INDEX IF NOT EXISTS ix_myntra_order_flow_order_item_status ON myntra_order_flow (order_item_status);
+CREATE INDEX IF NOT EXISTS ix_myntra_order_flow_order_number ON myntra_order_flow (order_number);
+CREATE INDEX IF NOT EXISTS ix_myntra_order_flow_product_sku_code ON myntra_order_flow (product_sku_code);
+CREATE INDEX IF NOT EXISTS ix_myntra_order_flow_return_type ON myntra_order_flow (return_type);
+CREATE INDEX IF NOT EXISTS ix_myntra_order_flow_sale_order_code ON myntra_order_flow (sale_order_code);
+CREATE INDEX IF NOT EXISTS ix_myntra_order_flow_workspace_id ON myntra_order_flow (workspace_id);
+
+CREATE TABLE IF NOT EXISTS myntra_pg_forward (
+    id SERIAL NOT NULL,
+    workspace_id UUID NOT NULL,
+    settlement_status VARCHAR NOT NULL,
+    order_release_id VARCHAR,
+    order_line_id VARCHAR,
+    sku_code VARCHAR,
+    packet_id VARCHAR,
+    invoice_number VARCHAR,
+    hsn_code VARCHAR,
+    product_tax_category VARCHAR,
+    seller_order_id VARCHAR,
+    packing_date TIMESTAMP WITHOUT TIME ZONE,
+    delivery_date TIMESTAMP WITHOUT TIME ZONE,
+    currency VARCHAR,
+    seller_product_amount FLOAT,
+    postpaid_amount FLOAT,
+    prepaid_amount FLOAT,
+    mrp FLOAT,
+    total_discount_amount FLOAT,
+    customer_paid_amt FLOAT,
+    shipping_case VARCHAR,
+    total_tax_rate FLOAT,
+    igst_amount FLOAT,
+    cgst_amount FLOAT,
+    sgst_amount FLOAT,
+    tcs_amount FLOAT,
+    tds_amount FLOAT,
+    taxable_amount FLOAT,
+    igst_rate FLOAT,
+    cgst_rate FLOAT,
+    sgst_rate FLOAT,
+    cess_amount FLOAT,
+    cess_rate FLOAT,
+    tcs_igst_rate FLOAT,
+    tcs_sgst_rate FLOAT,
+    tcs_cgst_rate FLOAT,
+    tds_rate FLOAT,
+    commission_percentage FLOAT,
+    minimum_commission FLOAT,
+    platform_fees FLOAT,
+    total_commission FLOAT,
+    total_commission_plus_tcs_tds_deduction FLOAT,
+    commission_base_amount FLOAT,
+    commission_tax_amount FLOAT,
+    commission_discount FLOAT,
+    sjit_incentive_amount FLOAT,
+    total_logistics_deduction FLOAT,
+    shipping_fee FLOAT,
+    fixed_fee FLOAT,
+    pick_and_pack_fee FLOAT,
+    payment_gateway_fee FLOAT,
+    total_tax_on_logistics FLOAT,
+    article_level INTEGER,
+    shipment_zone_classification VARCHAR,
+    total_expected_settlement FLOAT,
+    total_actual_settlement FLOAT,
+    amount_pending_settlement FLOAT,
+    prepaid_commission_deduction FLOAT,
+    prepaid_logistics_deduction FLOAT,
+    prepaid_payment FLOAT,
+    settlement_date_prepaid_comm_deduction TIMESTAMP WITHOUT TIME ZONE,
+    settlement_date_prepaid_logistics_deduction TIMESTAMP WITHOUT TIME ZONE,
+    settlement_date_prepaid_payment TIMESTAMP WITHOUT TIME ZONE,
+    bank_utr_no_prepaid_comm_deduction VARCHAR,
+    bank_utr_no_prepaid_logistics_deduction VARCHAR,
+    bank_utr_no_prepaid_payment VARCHAR,
+    postpaid_commission_deduction FLOAT,
+    postpaid_logistics_deduction FLOAT,
+    postpaid_payment FLOAT,
+    settlement_date_postpaid_comm_deduction TIMESTAMP WITHOUT TIME ZONE,
+    settlement_date_postpaid_logistics_deduction TIMESTAMP WITHOUT TIME ZONE,
+    settlement_date_postpaid_payment TIMESTAMP WITHOUT TIME ZONE,
+    bank_utr_no_postpaid_comm_deduction VARCHAR,
+    bank_utr_no_postpaid_logistics_deduction VARCHAR,
+    bank_utr_no_postpaid_payment VARCHAR,
+    prepaid_commission_percentage FLOAT,
+    prepaid_minimum_commission FLOAT,
+    prepaid_platform_fees FLOAT,
+    prepaid_total_commission FLOAT,
+    postpaid_commission_percentage FLOAT,
+    postpaid_minimum_commission FLOAT,
+    postpaid_platform_fees FLOAT,
+    postpaid_total_commission FLOAT,
+    "royaltyCharges_prepaid" FLOAT,
+    "royaltyCharges_postpaid" FLOAT,
+    "royaltyPercent_prepaid" FLOAT,
+    "royaltyPercent_postpaid" FLOAT,
+    "marketingCharges_prepaid" FLOAT,
+    "marketingCharges_postpaid" FLOAT,
+    "marketingPercent_prepaid" FLOAT,
+    "marketingPercent_postpaid" FLOAT,
+    "marketingContribution_prepaid" FLOAT,
+    "marketingContribution_postpaid" FLOAT,
+    "techEnablement_prepaid" FLOAT,
+    "techEnablement_postpaid" FLOAT,
+    "airLogistics_prepaid" FLOAT,
+    "airLogistics_postpaid" FLOAT,
+    "forwardAdditionalCharges_prepaid" FLOAT,
+    "forwardAdditionalCharges_postpaid" FLOAT,
+    brand VARCHAR,
+    gender VARCHAR,
+    brand_type VARCHAR,
+    article_type VARCHAR,
+    supply_type VARCHAR,
+    try_and_buy_purchase VARCHAR,
+    seller_tier VARCHAR,
+    seller_gstn VARCHAR,
+    seller_name VARCHAR,
+    myntra_gstn VARCHAR,
+    shipping_city VARCHAR,
+    shipping_pin_code VARCHAR,
+    shipping_state VARCHAR,
+    shipping_state_code VARCHAR,
+    postpaid_amount_other FLOAT,
+    prepaid_amount_other FLOAT,
+    shipping_amount FLOAT,
+    gift_amount FLOAT,
+    additional_amount FLOAT,
+    raw_json TEXT,
+    ingested_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE INDEX IF NOT EXISTS ix_myntra_pg_forward_brand ON myntra_pg_forward (brand);
+CREATE INDEX IF NOT EXISTS ix_myntra_pg_forward_id ON myntra_pg_forward (id);
+CREATE INDEX IF NOT EXISTS ix_myntra_pg_forward_ingested_at ON myntra_pg_forward (ingested_at);
+CREATE INDEX IF NOT EXISTS ix_myntra_pg_forward_order_line_id ON myntra_pg_forward (order_line_id);
+CREATE INDEX IF NOT EXISTS ix_myntra_pg_forward_order_release_id ON myntra_pg_forward (order_release_id);
+CREATE INDEX IF NOT EXISTS ix_myntra_pg_forward_settlement_status ON myntra_pg_forward (settlement_status);
+CREATE INDEX IF NOT EXISTS ix_myntra_pg_forward_sku_code ON myntra_pg_forward (sku_code);
+CREATE INDEX IF NOT EXISTS ix_myntra_pg_forward_workspace_id ON myntra_pg_forward (workspace_id);
+
+CREATE TABLE IF NOT EXISTS myntra_pg_reverse (
+    id SERIAL NOT NULL,
+    workspace_id UUID NOT NULL,
+    settlement_status VARCHAR NOT NULL,
+    order_release_id VARCHAR,
+    order_line_id VARCHAR,
+    sku_code VARCHAR,
+    packet_id VARCHAR,
+    invoice_number VARCHAR,
+    hsn_code VARCHAR,
+    product_tax_category VARCHAR,
+    seller_order_id VARCHAR,
+    return_id VARCHAR,
+    return_type VARCHAR,
+    return_date TIMESTAMP WITHOUT TIME ZONE,
+    packing_date TIMESTAMP WITHOUT TIME ZONE,
+    delivery_date TIMESTAMP WITHOUT TIME ZONE,
+    currency VARCHAR,
+    seller_product_amount FLOAT,
+    postpaid_amount FLOAT,
+    prepaid_amount FLOAT,
+    mrp FLOAT,
+    total_discount_amount FLOAT,
+    customer_paid_amt FLOAT,
+    shipping_case VARCHAR,
+    total_tax_rate FLOAT,
+    igst_amount FLOAT,
+    cgst_amount FLOAT,
+    sgst_amount FLOAT,
+    tcs_amount FLOAT,
+    tds_amount FLOAT,
+    taxable_amount FLOAT,
+    igst_rate FLOAT,
+    cgst_rate FLOAT,
+    sgst_rate FLOAT,
+    cess_amount FLOAT,
+    cess_rate FLOAT,
+    tcs_igst_rate FLOAT,
+    tcs_sgst_rate FLOAT,
+    tcs_cgst_rate FLOAT,
+    tds_rate FLOAT,
+    commission_percentage FLOAT,
+    minimum_commission FLOAT,
+    platform_fees FLOAT,
+    total_commission FLOAT,
+    total_commission_plus_tcs_tds_deduction FLOAT,
+    commission_base_amount FLOAT,
+    commission_tax_amount FLOAT,
+    commission_discount FLOAT,
+    sjit_incentive_amount FLOAT,
+    total_logistics_deduction FLOAT,
+    shipping_fee FLOAT,
+    fixed_fee FLOAT,
+    pick_and_pack_fee FLOAT,
+    payment_gateway_fee FLOAT,
+    total_tax_on_logistics FLOAT,
+    article_level INTEGER,
+    shipment_zone_classification VARCHAR,
+    total_settlement FLOAT,
+    total_actual_settlement FLOAT,
+    amount_pending_settlement FLOAT,
+    prepaid_commission_deduction FLOAT,
+    prepaid_logistics_deduction FLOAT,
+    prepaid_payment FLOAT,
+    settlement_date_prepaid_comm_deduction TIMESTAMP WITHOUT TIME ZONE,
+    settlement_date_prepaid_logistics_deduction TIMESTAMP WITHOUT TIME ZONE,
+    settlement_date_prepaid_payment TIMESTAMP WITHOUT TIME ZONE,
+    bank_utr_no_prepaid_comm_deduction VARCHAR,
+    bank_utr_no_prepaid_logistics_deduction VARCHAR,
+    bank_utr_no_prepaid_payment VARCHAR,
+    postpaid_commission_deduction FLOAT,
+    postpaid_logistics_deduction FLOAT,
+    postpaid_payment FLOAT,
+    settlement_date_postpaid_comm_deduction TIMESTAMP WITHOUT TIME ZONE,
+    settlement_date_postpaid_logistics_deduction TIMESTAMP WITHOUT TIME ZONE,
+    settlement_date_postpaid_payment TIMESTAMP WITHOUT TIME ZONE,
+    bank_utr_no_postpaid_comm_deduction VARCHAR,
+    bank_utr_no_postpaid_logistics_deduction VARCHAR,
+    bank_utr_no_postpaid_payment VARCHAR,
+    prepaid_commission_percentage FLOAT,
+    prepaid_minimum_commission FLOAT,
+    prepaid_platform_fees FLOAT,
+    prepaid_total_commission FLOAT,
+    postpaid_commission_percentage FLOAT,
+    postpaid_minimum_commission FLOAT,
+    postpaid_platform_fees FLOAT,
+    postpaid_total_commission FLOAT,
+    "royaltyCharges_prepaid" FLOAT,
+    "royaltyCharges_postpaid" FLOAT,
+    "royaltyPercent_prepaid" FLOAT,
+    "royaltyPercent_postpaid" FLOAT,
+    "marketingCharges_prepaid" FLOAT,
+    "marketingCharges_postpaid" FLOAT,
+    "marketingPercent_prepaid" FLOAT,
+    "marketingPercent_postpaid" FLOAT,
+    "marketingContribution_prepaid" FLOAT,
+    "marketingContribution_postpaid" FLOAT,
+    "reverseAdditionalCharges_prepaid" FLOAT,
+    "reverseAdditionalCharges_postpaid" FLOAT,
+    brand VARCHAR,
+    gender VARCHAR,
+    brand_type VARCHAR,
+    article_type VARCHAR,
+    supply_type VARCHAR,
+    try_and_buy_purchase VARCHAR,
+    seller_tier VARCHAR,
+    seller_gstn VARCHAR,
+    seller_name VARCHAR,
+    myntra_gstn VARCHAR,
+    shipping_city VARCHAR,
+    shipping_pin_code VARCHAR,
+    shipping_state VARCHAR,
+    shipping_state_code VARCHAR,
+    postpaid_amount_other FLOAT,
+    prepaid_amount_other FLOAT,
+    shipping_amount FLOAT,
+    gift_amount FLOAT,
+    additional_amount FLOAT,
+    raw_json TEXT,
+    ingested_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE INDEX IF NOT EXISTS ix_myntra_pg_reverse_brand ON myntra_pg_reverse (brand);
+CREATE INDEX IF NOT EXISTS ix_myntra_pg_reverse_id ON myntra_pg_reverse (id);
+CREATE INDEX IF NOT EXISTS ix_myntra_pg_reverse_ingested_at ON myntra_pg_reverse (ingested_at);
+CREATE INDEX IF NOT EXISTS ix_myntra_pg_reverse_order_line_id ON myntra_pg_reverse (order_line_id);
+CREATE INDEX IF NOT EXISTS ix_myntra_pg_reverse_order_release_id ON myntra_pg_reverse (order_release_id);
+CREATE INDEX IF NOT EXISTS ix_myntra_pg_reverse_return_id ON myntra_pg_reverse (return_id);
+CREATE INDEX IF NOT EXISTS ix_myntra_pg_reverse_return_type ON myntra_pg_reverse (return_type);
+CREATE INDEX IF NOT EXISTS ix_myntra_pg_reverse_settlement_status ON myntra_pg_reverse (settlement_status);
+CREATE INDEX IF NOT EXISTS ix_myntra_pg_reverse_sku_code ON myntra_pg_reverse (sku_code);
+CREATE INDEX IF NOT EXISTS ix_myntra_pg_reverse_workspace_id ON myntra_pg_reverse (workspace_id);
+
+CREATE TABLE IF NOT EXISTS myntra_sku_map (
+    id SERIAL NOT NULL,
+    workspace_id UUID NOT NULL,
+    sku_code VARCHAR NOT NULL,
+    sku_id VARCHAR,
+    seller_sku_code VARCHAR,
+    style_id VARCHAR,
+    style_name VARCHAR,
+    brand VARCHAR,
+    article_type VARCHAR,
+    size VARCHAR,
+    mrp FLOAT,
+    ingested_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE INDEX IF NOT EXISTS ix_myntra_sku_map_id ON myntra_sku_map (id);
+CREATE INDEX IF NOT EXISTS ix_myntra_sku_map_seller_sku_code ON myntra_sku_map (seller_sku_code);
+CREATE INDEX IF NOT EXISTS ix_myntra_sku_map_sku_code ON myntra_sku_map (sku_code);
+CREATE INDEX IF NOT EXISTS ix_myntra_sku_map_style_id ON myntra_sku_map (style_id);
+CREATE INDEX IF NOT EXISTS ix_myntra_sku_map_workspace_id ON myntra_sku_map (workspace_id);
+
+CREATE TABLE IF NOT EXISTS sku_cost_price (
+    id SERIAL NOT NULL,
+    workspace_id UUID NOT NULL,
+    seller_sku_code VARCHAR NOT NULL,
+    cost_price FLOAT NOT NULL,
+    platform VARCHAR,
+    sku_name VARCHAR,
+    brand VARCHAR,
+    category VARCHAR,
+    updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE INDEX IF NOT EXISTS ix_sku_cost_price_id ON sku_cost_price (id);
+CREATE INDEX IF NOT EXISTS ix_sku_cost_price_platform ON sku_cost_price (platform);
+CREATE INDEX IF NOT EXISTS ix_sku_cost_price_seller_sku_code ON sku_cost_price (seller_sku_code);
+CREATE INDEX IF NOT EXISTS ix_sku_cost_price_workspace_id ON sku_cost_price (workspace_id);
+
+CREATE TABLE IF NOT EXISTS workspaces (
+    id UUID NOT NULL,
+    slug VARCHAR NOT NULL,
+    name VARCHAR NOT NULL,
+    created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_workspaces_slug ON workspaces (slug);
+
+CREATE TABLE IF NOT EXISTS catalog_raw (
+    style_key VARCHAR NOT NULL,
+    seller_sku_code VARCHAR,
+    brand VARCHAR,
+    product_name VARCHAR,
+    style_catalogued_date TIMESTAMP WITHOUT TIME ZONE,
+    raw_json JSONB,
+    workspace_id UUID NOT NULL,
+    upload_id UUID,
+    PRIMARY KEY (style_key),
+    FOREIGN KEY(workspace_id) REFERENCES workspaces (id)
+);
+CREATE INDEX IF NOT EXISTS ix_catalog_raw_style_key ON catalog_raw (style_key);
+CREATE INDEX IF NOT EXISTS ix_catalog_raw_upload_id ON catalog_raw (upload_id);
+CREATE INDEX IF NOT EXISTS ix_catalog_raw_workspace_id ON catalog_raw (workspace_id);
+
+CREATE TABLE IF NOT EXISTS myntra_weekly_perf_raw (
+    id SERIAL NOT NULL,
+    style_key VARCHAR NOT NULL,
+    seller_id INTEGER,
+    article_type VARCHAR,
+    brand VARCHAR,
+    gender VARCHAR,
+    seller_mrp FLOAT,
+    inventory_age INTEGER,
+    rplc FLOAT,
+    impressions INTEGER,
+    clicks INTEGER,
+    add_to_carts INTEGER,
+    purchases INTEGER,
+    return_pct FLOAT,
+    consideration_pct FLOAT,
+    conversion_pct FLOAT,
+    rating FLOAT,
+    ingested_at TIMESTAMP WITHOUT TIME ZONE,
+    raw_json JSONB,
+    workspace_id UUID NOT NULL,
+    upload_id UUID,
+    PRIMARY KEY (id),
+    FOREIGN KEY(workspace_id) REFERENCES workspaces (id)
+);
+CREATE INDEX IF NOT EXISTS ix_myntra_weekly_perf_raw_id ON myntra_weekly_perf_raw (id);
+CREATE INDEX IF NOT EXISTS ix_myntra_weekly_perf_raw_style_key ON myntra_weekly_perf_raw (style_key);
+CREATE INDEX IF NOT EXISTS ix_myntra_weekly_perf_raw_upload_id ON myntra_weekly_perf_raw (upload_id);
+CREATE INDEX IF NOT EXISTS ix_myntra_weekly_perf_raw_workspace_id ON myntra_weekly_perf_raw (workspace_id);
+
+CREATE TABLE IF NOT EXISTS returns_raw (
+    id SERIAL NOT NULL,
+    order_line_id VARCHAR NOT NULL,
+    style_key VARCHAR,
+    return_date TIMESTAMP WITHOUT TIME ZONE,
+    return_type VARCHAR,
+    units INTEGER,
+    seller_sku_code VARCHAR,
+    raw_json JSONB,
+    reason_raw VARCHAR,
+    reason_bucket VARCHAR,
+    brand_norm VARCHAR,
+    workspace_id UUID NOT NULL,
+    upload_id UUID,
+    PRIMARY KEY (id),
+    FOREIGN KEY(workspace_id) REFERENCES workspaces (id)
+);
+CREATE INDEX IF NOT EXISTS ix_returns_raw_bucket_missing ON returns_raw (id) WHERE reason_bucket IS NULL;
+CREATE INDEX IF NOT EXISTS ix_returns_raw_id ON returns_raw (id);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_returns_raw_order_line_id ON returns_raw (order_line_id);
+CREATE INDEX IF NOT EXISTS ix_returns_raw_style_key ON returns_raw (style_key);
+CREATE INDEX IF NOT EXISTS ix_returns_raw_upload_id ON returns_raw (upload_id);
+CREATE INDEX IF NOT EXISTS ix_returns_raw_workspace_id ON returns_raw (workspace_id);
+CREATE INDEX IF NOT EXISTS ix_returns_raw_ws_brand_date ON returns_raw (workspace_id, brand_norm, return_date);
+CREATE INDEX IF NOT EXISTS ix_returns_raw_ws_date_bucket ON returns_raw (workspace_id, return_date, reason_bucket);
+CREATE INDEX IF NOT EXISTS ix_returns_raw_ws_reason_bucket ON returns_raw (workspace_id, reason_bucket);
+
+CREATE TABLE IF NOT EXISTS sales_raw (
+    id SERIAL NOT NULL,
+    order_line_id VARCHAR NOT NULL,
+    style_key VARCHAR,
+    order_date TIMESTAMP WITHOUT TIME ZONE,
+    seller_sku_code VARCHAR,
+    raw_json JSONB,
+    workspace_id UUID NOT NULL,
+    units INTEGER DEFAULT 1 NOT NULL,
+    seller_price FLOAT,
+    gmv FLOAT,
+    upload_id UUID,
+    brand_norm VARCHAR,
+    PRIMARY KEY (id),
+    FOREIGN KEY(workspace_id) REFERENCES workspaces (id)
+);
+CREATE INDEX IF NOT EXISTS ix_sales_raw_id ON sales_raw (id);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_sales_raw_order_line_id ON sales_raw (order_line_id);
+CREATE INDEX IF NOT EXISTS ix_sales_raw_style_key ON sales_raw (style_key);
+CREATE INDEX IF NOT EXISTS ix_sales_raw_upload_id ON sales_raw (upload_id);
+CREATE INDEX IF NOT EXISTS ix_sales_raw_workspace_id ON sales_raw (workspace_id);
+CREATE INDEX IF NOT EXISTS ix_sales_raw_ws_brand_date ON sales_raw (workspace_id, brand_norm, order_date);
+
+CREATE TABLE IF NOT EXISTS stock_raw (
+    id SERIAL NOT NULL,
+    seller_sku_code VARCHAR NOT NULL,
+    qty INTEGER NOT NULL,
+    ingested_at TIMESTAMP WITHOUT TIME ZONE,
+    raw_json JSONB,
+    workspace_id UUID NOT NULL,
+    upload_id UUID,
+    PRIMARY KEY (id),
+    FOREIGN KEY(workspace_id) REFERENCES workspaces (id)
+);
+CREATE INDEX IF NOT EXISTS ix_stock_raw_id ON stock_raw (id);
+CREATE INDEX IF NOT EXISTS ix_stock_raw_seller_sku_code ON stock_raw (seller_sku_code);
+CREATE INDEX IF NOT EXISTS ix_stock_raw_upload_id ON stock_raw (upload_id);
+CREATE INDEX IF NOT EXISTS ix_stock_raw_workspace_id ON stock_raw (workspace_id);
+
+CREATE TABLE IF NOT EXISTS style_monthly (
+    id SERIAL NOT NULL,
+    month_start DATE NOT NULL,
+    style_key VARCHAR NOT NULL,
+    orders INTEGER DEFAULT 0 NOT NULL,
+    returns INTEGER DEFAULT 0 NOT NULL,
+    revenue FLOAT,
+    last_order_date TIMESTAMP WITHOUT TIME ZONE,
+    return_pct FLOAT,
+    updated_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL,
+    workspace_id UUID NOT NULL,
+    PRIMARY KEY (id),
+    CONSTRAINT uq_style_monthly_ws_month_style UNIQUE (workspace_id, month_start, style_key),
+    FOREIGN KEY(workspace_id) REFERENCES workspaces (id)
+);
+CREATE INDEX IF NOT EXISTS ix_style_monthly_id ON style_monthly (id);
+CREATE INDEX IF NOT EXISTS ix_style_monthly_month_start ON style_monthly (month_start);
+CREATE INDEX IF NOT EXISTS ix_style_monthly_style_key ON style_monthly (style_key);
+CREATE INDEX IF NOT EXISTS ix_style_monthly_workspace_id ON style_monthly (workspace_id);
+
+CREATE TABLE IF NOT EXISTS uploads (
+    id UUID NOT NULL,
+    workspace_id UUID NOT NULL,
+    report_type VARCHAR NOT NULL,
+    sha256 VARCHAR(64) NOT NULL,
+    filename VARCHAR,
+    file_bytes INTEGER,
+    status VARCHAR DEFAULT 'processing' NOT NULL,
+    rows_in_file INTEGER,
+    rows_loaded INTEGER,
+    date_min TIMESTAMP WITHOUT TIME ZONE,
+    date_max TIMESTAMP WITHOUT TIME ZONE,
+    created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL,
+    finished_at TIMESTAMP WITHOUT TIME ZONE,
+    seconds FLOAT,
+    result_json TEXT,
+    error TEXT,
+    PRIMARY KEY (id),
+    FOREIGN KEY(workspace_id) REFERENCES workspaces (id)
+);
+CREATE INDEX IF NOT EXISTS ix_uploads_workspace_id ON uploads (workspace_id);
+CREATE INDEX IF NOT EXISTS ix_uploads_ws_type_sha ON uploads (workspace_id, report_type, sha256);
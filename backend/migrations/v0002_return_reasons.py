@@ -0,0 +1,19 @@
+# backend/migrations/v0002_return_reasons.py
+# returns_raw.reason_raw / reason_bucket (backend/return_reasons.py). The columns are
+# nullable without a default, so ADD COLUMN is catalog-only; the indexes are built
+# concurrently. Rows are backfilled by sync_reason_buckets() after the migrations.
+
+from sqlalchemy import text
+
+from backend.migrations import create_index_concurrently
+
+DESCRIPTION = "returns_raw reason_raw / reason_bucket + indexes"
+TRANSACTIONAL = False
+
+
+def upgrade(conn) -> None:
+    conn.execute(text("ALTER TABLE returns_raw ADD COLUMN IF NOT EXISTS reason_raw VARCHAR"))
+    conn.execute(text("ALTER TABLE returns_raw ADD COLUMN IF NOT EXISTS reason_bucket VARCHAR"))
+    create_index_concurrently(conn, "ix_returns_raw_ws_date_bucket", "returns_raw", "workspace_id, return_date, reason_bucket")
+    create_index_concurrently(conn, "ix_returns_raw_ws_reason_bucket", "returns_raw", "workspace_id, reason_bucket")
+    create_index_concurrently(conn, "ix_returns_raw_bucket_missing", "returns_raw", "id", where="reason_bucket IS NULL")
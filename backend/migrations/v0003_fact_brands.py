@@ -0,0 +1,22 @@
+# backend/migrations/v0003_fact_brands.py
+# brand_norm on sales_raw / returns_raw (backend/fact_brands.py); backfilled by
+# sync_fact_brands() after the migrations.
+
+from sqlalchemy import text
+
+from backend.migrations import create_index_concurrently
+
+DESCRIPTION = "sales_raw / returns_raw brand_norm + (workspace_id, brand_norm, date) indexes"
+TRANSACTIONAL = False
+
+# table -> date column, as of this migration (fact_brands.FACT_TABLES may grow later)
+FACT_TABLES = {
+    "sales_raw": "order_date",
+    "returns_raw": "return_date",
+}
+
+
+def upgrade(conn) -> None:
+    for table, date_col in FACT_TABLES.items():
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS brand_norm VARCHAR"))
+        create_index_concurrently(conn, f"ix_{table}_ws_brand_date", table, f"workspace_id, brand_norm, {date_col}")
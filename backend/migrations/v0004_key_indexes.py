@@ -0,0 +1,26 @@
+# backend/migrations/v0004_key_indexes.py
+# (workspace_id, lower(btrim(key))) expression indexes from backend/key_indexes.py.
+
+from backend.migrations import create_index_concurrently
+
+DESCRIPTION = "lower(trim(key)) expression indexes"
+TRANSACTIONAL = False
+
+# index -> (table, columns), as of this migration; later key indexes get their own migration
+KEY_INDEXES = {
+    "ix_sales_raw_ws_style_norm": ("sales_raw", "workspace_id, lower(btrim(style_key))"),
+    "ix_sales_raw_ws_sku_norm": ("sales_raw", "workspace_id, lower(btrim(seller_sku_code))"),
+    "ix_returns_raw_ws_style_norm": ("returns_raw", "workspace_id, lower(btrim(style_key))"),
+    "ix_returns_raw_ws_sku_norm": ("returns_raw", "workspace_id, lower(btrim(seller_sku_code))"),
+    "ix_catalog_raw_ws_style_norm": ("catalog_raw", "workspace_id, lower(btrim(style_key))"),
+    "ix_catalog_raw_ws_sku_norm": ("catalog_raw", "workspace_id, lower(btrim(seller_sku_code))"),
+    "ix_catalog_raw_ws_brand_norm": ("catalog_raw", "workspace_id, lower(btrim(brand))"),
+    "ix_style_monthly_ws_style_norm": ("style_monthly", "workspace_id, lower(btrim(style_key))"),
+    "ix_stock_raw_ws_sku_norm": ("stock_raw", "workspace_id, lower(btrim(seller_sku_code))"),
+    "ix_flipkart_traffic_raw_ws_sku_norm": ("flipkart_traffic_raw", "workspace_id, lower(btrim(seller_sku_code))"),
+}
+
+
+def upgrade(conn) -> None:
+    for name, (table, cols) in KEY_INDEXES.items():
+        create_index_concurrently(conn, name, table, cols)
@@ -0,0 +1,35 @@
+# backend/migrations/v0005_analytics_indexes.py
+# Composite indexes for the date-window scans of the dashboards and the recon screens.
+# Most of these tables only had single-column indexes, so "workspace X, last 90 days"
+# meant intersecting (or filtering) a workspace_id index with a date index.
+
+from backend.migrations import create_index_concurrently
+
+DESCRIPTION = "composite (workspace_id, date) analytics indexes"
+TRANSACTIONAL = False
+
+# name -> (table, index columns)
+ANALYTICS_INDEXES = {
+    # KPI / trend windows
+    "ix_sales_raw_ws_order_date": ("sales_raw", "workspace_id, order_date"),
+    "ix_sales_raw_ws_sku_order_date": ("sales_raw", "workspace_id, seller_sku_code, order_date"),
+    "ix_returns_raw_ws_return_date": ("returns_raw", "workspace_id, return_date"),
+    "ix_flipkart_traffic_raw_ws_impression_date": ("flipkart_traffic_raw", "workspace_id, impression_date"),
+    # "latest snapshot" lookups: max(ingested_at) per workspace
+    "ix_stock_raw_ws_ingested_at": ("stock_raw", "workspace_id, ingested_at"),
+    "ix_flipkart_traffic_raw_ws_ingested_at": ("flipkart_traffic_raw", "workspace_id, ingested_at"),
+    "ix_myntra_weekly_perf_raw_ws_ingested_at": ("myntra_weekly_perf_raw", "workspace_id, ingested_at"),
+    # reconciliation month filters
+    "ix_myntra_pg_forward_ws_settlement": ("myntra_pg_forward", "workspace_id, settlement_date_prepaid_payment"),
+    "ix_myntra_pg_reverse_ws_settlement": ("myntra_pg_reverse", "workspace_id, settlement_date_prepaid_payment"),
+    "ix_myntra_non_order_settlement_ws_date": ("myntra_non_order_settlement", "workspace_id, settlement_date"),
+    "ix_myntra_order_flow_ws_order_date": ("myntra_order_flow", "workspace_id, order_date"),
+    "ix_flipkart_payment_report_ws_payment_date": ("flipkart_payment_report", "workspace_id, payment_date"),
+    "ix_flipkart_order_pnl_ws_order_date": ("flipkart_order_pnl", "workspace_id, order_date"),
+    "ix_flipkart_sku_pnl_ws_report_month": ("flipkart_sku_pnl", "workspace_id, report_month"),
+}
+
+
+def upgrade(conn) -> None:
+    for name, (table, cols) in ANALYTICS_INDEXES.items():
+        create_index_concurrently(conn, name, table, cols)
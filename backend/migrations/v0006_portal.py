@@ -0,0 +1,73 @@
+# backend/migrations/v0006_portal.py
+# portal enum column on sales_raw / returns_raw / catalog_raw / style_monthly
+# (backend/portals.py): nullable ADD COLUMN (catalog-only), batched backfill with the old
+# "fk:" prefix rule (each batch commits on its own), then the per-portal partial indexes.
+
+from sqlalchemy import text
+
+from backend.migrations import create_index_concurrently
+
+DESCRIPTION = "portal column + backfill + per-portal partial indexes"
+TRANSACTIONAL = False
+
+_BATCH = 50_000
+
+# the prefix tests the portal filters used before this column
+_FACT_RULE = (
+    "CASE WHEN order_line_id LIKE 'fk:%' "
+    "OR lower(btrim(coalesce(style_key, ''))) LIKE 'fk:%' "
+    "OR lower(btrim(coalesce(seller_sku_code, ''))) LIKE 'fk:%' "
+    "THEN 'flipkart' ELSE 'myntra' END"
+)
+_STYLE_RULE = "CASE WHEN lower(btrim(style_key)) LIKE 'fk:%' THEN 'flipkart' ELSE 'myntra' END"
+
+# table -> (backfill rule, batch column or None for one statement)
+_TABLES = {
+    "sales_raw": (_FACT_RULE, "id"),
+    "returns_raw": (_FACT_RULE, "id"),
+    "catalog_raw": (_STYLE_RULE, None),
+    "style_monthly": (_STYLE_RULE, "id"),
+}
+
+# name -> (table, index columns, predicate)
+PORTAL_INDEXES = {
+    "ix_sales_raw_myntra_ws_date": ("sales_raw", "workspace_id, order_date", "portal = 'myntra'"),
+    "ix_sales_raw_flipkart_ws_date": ("sales_raw", "workspace_id, order_date", "portal = 'flipkart'"),
+    "ix_returns_raw_myntra_ws_date": ("returns_raw", "workspace_id, return_date", "portal = 'myntra'"),
+    "ix_returns_raw_flipkart_ws_date": ("returns_raw", "workspace_id, return_date", "portal = 'flipkart'"),
+    "ix_catalog_raw_ws_portal": ("catalog_raw", "workspace_id, portal", None),
+    "ix_style_monthly_myntra_ws_month": ("style_monthly", "workspace_id, month_start", "portal = 'myntra'"),
+    "ix_style_monthly_flipkart_ws_month": ("style_monthly", "workspace_id, month_start", "portal = 'flipkart'"),
+}
+
+
+def _backfill(conn, table: str, rule: str, batch_col: str | None) -> None:
+    update = f"UPDATE {table} SET portal = CAST({rule} AS portal) WHERE portal IS NULL"
+    if batch_col is None:
+        conn.execute(text(update))
+        return
+    lo, hi = conn.execute(text(f"SELECT min({batch_col}), max({batch_col}) FROM {table}")).one()
+    if lo is None:
+        return
+    while lo <= hi:
+        conn.execute(
+            text(f"{update} AND {batch_col} >= :lo AND {batch_col} < :hi"),
+            {"lo": lo, "hi": lo + _BATCH},
+        )
+        lo += _BATCH
+
+
+def upgrade(conn) -> None:
+    conn.execute(
+        text(
+            "DO $$ BEGIN "
+            "IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'portal') THEN "
+            "CREATE TYPE portal AS ENUM ('myntra', 'flipkart'); "
+            "END IF; END $$"
+        )
+    )
+    for table, (rule, batch_col) in _TABLES.items():
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS portal portal"))
+        _backfill(conn, table, rule, batch_col)
+    for name, (table, cols, where) in PORTAL_INDEXES.items():
+        create_index_concurrently(conn, name, table, cols, where=where)
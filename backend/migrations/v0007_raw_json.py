@@ -0,0 +1,163 @@
+# backend/migrations/v0007_raw_json.py
+# raw_json TEXT -> JSONB on the *_raw tables, plus an expression index on the key the API
+# reads (brand). Before the partition rebuild (v0008),
+# which copies the column types.
+#
+# Rows Postgres can't parse (python-repr dicts, NaN tokens) are rewritten as JSON in
+# batches first; ALTER COLUMN TYPE then rewrites each table under an exclusive lock, so
+# plan it like v0008. Tables already JSONB / existing indexes are skipped.
+
+from __future__ import annotations
+
+import ast
+import json
+import math
+import time
+
+from sqlalchemy import text
+
+from backend.migrations import create_index_concurrently
+
+DESCRIPTION = "raw_json TEXT -> JSONB + raw_json expression indexes"
+TRANSACTIONAL = False
+
+RAW_JSON_TABLES = (
+    "sales_raw",
+    "returns_raw",
+    "catalog_raw",
+    "myntra_weekly_perf_raw",
+    "stock_raw",
+    "flipkart_traffic_raw",
+    "flipkart_gstr_sales_raw",
+)
+
+# name -> (table, index columns). Expressions must match the queries exactly:
+#   size forecast brand filter: lower(trim(raw_json ->> 'brand'))
+# (the reason endpoints read returns_raw.reason_bucket, see backend/return_reasons.py, so
+# raw_json ->> 'return_reason' / 'return_sub_reason' get no index)
+RAW_JSON_INDEXES = {
+    "ix_sales_raw_ws_brand_json": (
+        "sales_raw",
+        "workspace_id, lower(trim(raw_json ->> 'brand'))",
+    ),
+}
+
+_FIX_BATCH = 5000
+
+# NULL instead of an error for text that isn't valid JSON (used to find legacy rows)
+_TRY_JSONB_SQL = """
+CREATE OR REPLACE FUNCTION projectm_try_jsonb(t text) RETURNS jsonb
+LANGUAGE plpgsql IMMUTABLE AS $$
+BEGIN
+    RETURN t::jsonb;
+EXCEPTION WHEN others THEN
+    RETURN NULL;
+END
+$$
+"""
+
+
+def _column_type(conn, table: str) -> str | None:
+    return conn.execute(
+        text(
+            "SELECT data_type FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = :t AND column_name = 'raw_json'"
+        ),
+        {"t": table},
+    ).scalar()
+
+
+def _clean(v):
+    # Postgres JSON has no NaN / Infinity (json.dumps writes them)
+    if isinstance(v, float) and not math.isfinite(v):
+        return None
+    if isinstance(v, dict):
+        return {str(k): _clean(x) for k, x in v.items()}
+    if isinstance(v, (list, tuple)):
+        return [_clean(x) for x in v]
+    return v
+
+
+def legacy_to_json(value: str) -> str:
+    """Rewrite a raw_json text Postgres can't parse (python-repr dict, NaN tokens) as JSON."""
+    s = value.strip()
+    try:
+        obj = json.loads(s)
+    except Exception:
+        try:
+            obj = ast.literal_eval(s) if s.startswith("{") else {"_raw": value}
+        except Exception:
+            obj = {"_raw": value}
+    return json.dumps(_clean(obj), default=str)
+
+
+def fix_legacy_rows(engine, table: str) -> int:
+    """Rewrite the rows whose raw_json isn't valid JSON; returns how many were changed."""
+    fixed = 0
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                text(
+                    f"SELECT id, raw_json FROM {table} "
+                    "WHERE id > :last AND raw_json IS NOT NULL AND btrim(raw_json) <> '' "
+                    "AND projectm_try_jsonb(raw_json) IS NULL "
+                    "ORDER BY id LIMIT :n"
+                ),
+                {"last": last_id, "n": _FIX_BATCH},
+            ).all()
+            if not rows:
+                return fixed
+            conn.execute(
+                text(f"UPDATE {table} SET raw_json = :v WHERE id = :id"),
+                [{"id": r.id, "v": legacy_to_json(r.raw_json)} for r in rows],
+            )
+        fixed += len(rows)
+        last_id = rows[-1].id
+
+
+def migrate_table(engine, table: str) -> dict:
+    t0 = time.perf_counter()
+    with engine.begin() as conn:
+        col_type = _column_type(conn, table)
+    if col_type is None:
+        return {"table": table, "status": "missing"}
+    if col_type == "jsonb":
+        return {"table": table, "status": "already jsonb"}
+
+    with engine.begin() as conn:
+        conn.execute(text(_TRY_JSONB_SQL))
+    fixed = fix_legacy_rows(engine, table)
+
+    # every row is valid JSON now: a plain cast, so anything unexpected fails the ALTER
+    # (one transaction, nothing lost) instead of turning into NULL
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                f"ALTER TABLE {table} ALTER COLUMN raw_json TYPE jsonb "
+                "USING NULLIF(btrim(raw_json), '')::jsonb"
+            )
+        )
+    return {
+        "table": table,
+        "status": "migrated",
+        "legacy_rows_rewritten": fixed,
+        "seconds": round(time.perf_counter() - t0, 3),
+    }
+
+
+def create_indexes(conn) -> None:
+    """
+    RAW_JSON_INDEXES on the tables already JSONB (autocommit connection). Concurrent builds
+    through create_index_concurrently(): on a partitioned table, one per partition.
+    """
+    for name, (table, cols) in RAW_JSON_INDEXES.items():
+        if _column_type(conn, table) == "jsonb":
+            create_index_concurrently(conn, name, table, cols)
+    conn.execute(text("ANALYZE " + ", ".join(sorted({t for t, _ in RAW_JSON_INDEXES.values()}))))
+
+
+def upgrade(conn) -> None:
+    for table in RAW_JSON_TABLES:
+        migrate_table(conn.engine, table)
+    create_indexes(conn)
@@ -0,0 +1,136 @@
+# backend/migrations/v0008_partitions.py
+# Monthly range partitions for sales_raw / returns_raw / flipkart_traffic_raw
+# (backend/partitions.py).
+#
+# An existing table is rebuilt, one table per transaction:
+#   LOCK ... IN EXCLUSIVE MODE (dashboards keep reading, ingests wait) -> partitioned copy
+#   with the same columns / defaults / FKs -> month partitions + default -> INSERT ... SELECT
+#   -> the old indexes rebuilt on the copy (unique ones as plain indexes) -> swap names
+#   -> the order line keys (UNIQUE_KEYS: unique, partition column included).
+# Plan a maintenance window on big tables: the copy rewrites every row.
+# On a fresh database the tables v0001 just created are empty, so the rebuild is instant.
+# Tables that are already partitioned only get the default partition and the upcoming months.
+
+import re
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import text
+
+from backend.partitions import (
+    create_default_partition,
+    default_partition,
+    ensure_months_ahead,
+    is_partitioned,
+    partition_name,
+)
+
+DESCRIPTION = "monthly range partitions for sales_raw / returns_raw / flipkart_traffic_raw"
+TRANSACTIONAL = False
+
+MONTHS_AHEAD = 3
+
+# table -> partition column, as of this migration (copied from backend/partitions.py)
+PARTITIONED = {
+    "sales_raw": "order_date",
+    "returns_raw": "return_date",
+    "flipkart_traffic_raw": "impression_date",
+}
+
+# table -> unique key (index name, columns); the partition column comes last
+UNIQUE_KEYS = {
+    "sales_raw": ("uq_sales_raw_ws_order_line", ("workspace_id", "order_line_id", "order_date")),
+    "returns_raw": ("uq_returns_raw_ws_order_line", ("workspace_id", "order_line_id", "return_date")),
+}
+
+# tables whose partition column is NOT NULL keep a primary key (it must include that column)
+_PRIMARY_KEYS = {"flipkart_traffic_raw": "id, impression_date"}
+
+_INDEXDEF = re.compile(r"^CREATE (?:UNIQUE )?INDEX (\S+) ON (?:ONLY )?\S+ (USING .*)$")
+
+
+def _month_bounds(tx, table: str, col: str):
+    lo, hi = tx.execute(text(f"SELECT min({col}), max({col}) FROM {table}")).one()
+    if lo is None:
+        return []
+    m, end = date(lo.year, lo.month, 1), date(hi.year, hi.month, 1)
+    out = []
+    while m <= end:
+        out.append(m)
+        m += relativedelta(months=1)
+    return out
+
+
+def _convert(tx, table: str, col: str) -> None:
+    new = f"{table}__part"
+    tx.execute(text(f"LOCK TABLE {table} IN EXCLUSIVE MODE"))
+
+    tx.execute(
+        text(
+            f"CREATE TABLE {new} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            f"PARTITION BY RANGE ({col})"
+        )
+    )
+    for conname, condef in tx.execute(
+        text("SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = to_regclass(:t) AND contype = 'f'"),
+        {"t": table},
+    ).all():
+        tx.execute(text(f"ALTER TABLE {new} ADD CONSTRAINT {conname} {condef}"))
+    if table in _PRIMARY_KEYS:
+        tx.execute(text(f"ALTER TABLE {new} ADD CONSTRAINT {table}_pkey__p PRIMARY KEY ({_PRIMARY_KEYS[table]})"))
+
+    tx.execute(text(f"CREATE TABLE {default_partition(table)} PARTITION OF {new} DEFAULT"))
+    for m in _month_bounds(tx, table, col):
+        tx.execute(
+            text(
+                f"CREATE TABLE {partition_name(table, m)} PARTITION OF {new} "
+                f"FOR VALUES FROM ('{m}') TO ('{m + relativedelta(months=1)}')"
+            )
+        )
+
+    tx.execute(text(f"INSERT INTO {new} SELECT * FROM {table}"))
+
+    # every secondary index of the old table; order_line_id uniqueness moves to UNIQUE_KEYS
+    renames = []
+    for name, indexdef in tx.execute(
+        text(
+            "SELECT i.indexname, i.indexdef FROM pg_indexes i "
+            "WHERE i.schemaname = current_schema() AND i.tablename = :t "
+            "AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = to_regclass(i.indexname) AND c.contype = 'p')"
+        ),
+        {"t": table},
+    ).all():
+        m = _INDEXDEF.match(indexdef)
+        if not m:
+            raise RuntimeError(f"unexpected index definition: {indexdef}")
+        tx.execute(text(f"CREATE INDEX {name}__p ON {new} {m.group(2)}"))
+        renames.append(name)
+
+    seq = tx.execute(text("SELECT pg_get_serial_sequence(:t, 'id')"), {"t": table}).scalar()
+    if seq:
+        tx.execute(text(f"ALTER SEQUENCE {seq} OWNED BY NONE"))
+    tx.execute(text(f"DROP TABLE {table}"))
+    tx.execute(text(f"ALTER TABLE {new} RENAME TO {table}"))
+    for name in renames:
+        tx.execute(text(f"ALTER INDEX {name}__p RENAME TO {name}"))
+    if table in _PRIMARY_KEYS:
+        tx.execute(text(f"ALTER TABLE {table} RENAME CONSTRAINT {table}_pkey__p TO {table}_pkey"))
+    if seq:
+        tx.execute(text(f"ALTER SEQUENCE {seq} OWNED BY {table}.id"))
+
+
+def upgrade(conn) -> None:
+    for table, col in PARTITIONED.items():
+        with conn.engine.begin() as tx:
+            if not is_partitioned(tx, table):
+                _convert(tx, table, col)
+            create_default_partition(tx, table)
+            if table in UNIQUE_KEYS:
+                # the old order_line_id unique index held, so no duplicates to resolve first
+                name, cols = UNIQUE_KEYS[table]
+                tx.execute(
+                    text(f"CREATE UNIQUE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(cols)}) NULLS NOT DISTINCT")
+                )
+            ensure_months_ahead(tx, table, MONTHS_AHEAD)
+        with conn.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as c:
+            c.execute(text(f"ANALYZE {table}"))
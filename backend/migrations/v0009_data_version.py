@@ -0,0 +1,11 @@
+# backend/migrations/v0009_data_version.py
+# workspaces.data_version: bumped by every ingest / clear, keys the KPI response cache
+# (backend/data_version.py). A constant default: no table rewrite.
+
+from sqlalchemy import text
+
+DESCRIPTION = "workspaces.data_version"
+
+
+def upgrade(conn) -> None:
+    conn.execute(text("ALTER TABLE workspaces ADD COLUMN IF NOT EXISTS data_version BIGINT NOT NULL DEFAULT 0"))
@@ -0,0 +1,43 @@
+# backend/migrations/v0010_daily_sku_facts.py
+# daily_sku_facts (backend/daily_facts.py): the per-day SKU rollup the range KPIs read.
+# Built for every workspace by sync_daily_facts() after the migrations.
+# The DDL is the table as of this migration; later columns / keys come with their own.
+
+from sqlalchemy import text
+
+DESCRIPTION = "daily_sku_facts rollup table"
+
+# IF NOT EXISTS: databases that got it from an earlier create_all() keep theirs
+_DDL = (
+    """
+    CREATE TABLE IF NOT EXISTS daily_sku_facts (
+        id BIGSERIAL PRIMARY KEY,
+        workspace_id UUID NOT NULL REFERENCES workspaces (id),
+        portal portal,
+        day DATE NOT NULL,
+        style_key VARCHAR,
+        seller_sku_code VARCHAR,
+        brand_norm VARCHAR,
+        orders INTEGER NOT NULL DEFAULT 0,
+        units INTEGER NOT NULL DEFAULT 0,
+        gmv DOUBLE PRECISION NOT NULL DEFAULT 0,
+        last_order_date TIMESTAMP WITHOUT TIME ZONE,
+        returns_units INTEGER NOT NULL DEFAULT 0,
+        customer_return_units INTEGER NOT NULL DEFAULT 0,
+        rto_units INTEGER NOT NULL DEFAULT 0,
+        return_amount DOUBLE PRECISION NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now()
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_daily_sku_facts_ws_day ON daily_sku_facts (workspace_id, day)",
+    "CREATE INDEX IF NOT EXISTS ix_daily_sku_facts_ws_brand_day ON daily_sku_facts (workspace_id, brand_norm, day)",
+    "CREATE INDEX IF NOT EXISTS ix_daily_sku_facts_myntra_ws_day ON daily_sku_facts (workspace_id, day) "
+    "WHERE portal = 'myntra'",
+    "CREATE INDEX IF NOT EXISTS ix_daily_sku_facts_flipkart_ws_day ON daily_sku_facts (workspace_id, day) "
+    "WHERE portal = 'flipkart'",
+)
+
+
+def upgrade(conn) -> None:
+    for stmt in _DDL:
+        conn.execute(text(stmt))
@@ -0,0 +1,47 @@
+# backend/migrations/v0011_monthly_snapshots.py
+# style_monthly gains the RTO / customer returns split (revenue is filled from now on) and
+# gets a per-SKU sibling, sku_monthly (backend/monthly_snapshots.py). Both are rebuilt for
+# every workspace by sync_monthly_snapshots() after the migrations.
+# The DDL is the table as of this migration; later columns / keys come with their own.
+
+from sqlalchemy import text
+
+DESCRIPTION = "style_monthly RTO / customer returns + sku_monthly snapshot"
+
+# IF NOT EXISTS: databases that got it from an earlier create_all() keep theirs
+_SKU_MONTHLY_DDL = (
+    """
+    CREATE TABLE IF NOT EXISTS sku_monthly (
+        id BIGSERIAL PRIMARY KEY,
+        workspace_id UUID NOT NULL REFERENCES workspaces (id),
+        month_start DATE NOT NULL,
+        portal portal,
+        style_key VARCHAR,
+        seller_sku_code VARCHAR,
+        brand_norm VARCHAR,
+        orders INTEGER NOT NULL DEFAULT 0,
+        revenue DOUBLE PRECISION NOT NULL DEFAULT 0,
+        last_order_date TIMESTAMP WITHOUT TIME ZONE,
+        returns INTEGER NOT NULL DEFAULT 0,
+        rto_returns INTEGER NOT NULL DEFAULT 0,
+        customer_returns INTEGER NOT NULL DEFAULT 0,
+        same_month_returns INTEGER NOT NULL DEFAULT 0,
+        return_pct DOUBLE PRECISION,
+        updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now()
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_sku_monthly_ws_month ON sku_monthly (workspace_id, month_start)",
+    "CREATE INDEX IF NOT EXISTS ix_sku_monthly_month ON sku_monthly (month_start)",
+    "CREATE INDEX IF NOT EXISTS ix_sku_monthly_myntra_ws_month ON sku_monthly (workspace_id, month_start) "
+    "WHERE portal = 'myntra'",
+    "CREATE INDEX IF NOT EXISTS ix_sku_monthly_flipkart_ws_month ON sku_monthly (workspace_id, month_start) "
+    "WHERE portal = 'flipkart'",
+)
+
+
+def upgrade(conn) -> None:
+    for col in ("rto_returns", "customer_returns"):
+        conn.execute(text(f"ALTER TABLE style_monthly ADD COLUMN IF NOT EXISTS {col} INTEGER NOT NULL DEFAULT 0"))
+
+    for stmt in _SKU_MONTHLY_DDL:
+        conn.execute(text(stmt))
@@ -0,0 +1,27 @@
+# backend/migrations/v0012_fact_keys.py
+# Unique group keys on daily_sku_facts / sku_monthly (NULLS NOT DISTINCT: the keys are
+# nullable). Two overlapping refreshes could insert a group twice before the refreshes took
+# a per-workspace lock; those copies are identical, so all but one are dropped first.
+
+from sqlalchemy import text
+
+DESCRIPTION = "unique group keys on daily_sku_facts / sku_monthly"
+
+# name -> (table, key columns)
+FACT_KEYS = {
+    "uq_daily_sku_facts_ws_day_sku": ("daily_sku_facts", "workspace_id, day, portal, style_key, seller_sku_code"),
+    "uq_sku_monthly_ws_month_sku": ("sku_monthly", "workspace_id, month_start, portal, style_key, seller_sku_code"),
+}
+
+
+def upgrade(conn) -> None:
+    for name, (table, cols) in FACT_KEYS.items():
+        conn.execute(text(f"LOCK TABLE {table} IN SHARE ROW EXCLUSIVE MODE"))
+        conn.execute(
+            text(
+                f"DELETE FROM {table} t USING ("
+                f"  SELECT id, row_number() OVER (PARTITION BY {cols} ORDER BY id DESC) AS n FROM {table}"
+                f") d WHERE t.id = d.id AND d.n > 1"
+            )
+        )
+        conn.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS {name} ON {table} ({cols}) NULLS NOT DISTINCT"))
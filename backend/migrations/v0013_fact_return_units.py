@@ -0,0 +1,21 @@
+# backend/migrations/v0013_fact_return_units.py
+# daily_sku_facts.return_units (RETURN only, the returns trend) and null_unit_returns
+# (return rows without units), carried into sku_monthly, so the trend and style_monthly.returns
+# keep their definitions. The facts and snapshots are rebuilt by their sync hooks after the
+# migrations (their backfill markers are cleared here).
+
+from sqlalchemy import text
+
+DESCRIPTION = "daily_sku_facts return_units / null_unit_returns (+ sku_monthly)"
+
+
+def upgrade(conn) -> None:
+    for table, col in (
+        ("daily_sku_facts", "return_units"),
+        ("daily_sku_facts", "null_unit_returns"),
+        ("sku_monthly", "null_unit_returns"),
+    ):
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {col} INTEGER NOT NULL DEFAULT 0"))
+    conn.execute(
+        text("DELETE FROM app_meta WHERE key IN ('daily_sku_facts_backfill', 'monthly_snapshots_backfill')")
+    )
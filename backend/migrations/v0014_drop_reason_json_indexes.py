@@ -0,0 +1,14 @@
+# backend/migrations/v0014_drop_reason_json_indexes.py
+# v0007 built (workspace_id, raw_json ->> 'return_reason' | 'return_sub_reason') indexes, but
+# the reason endpoints read returns_raw.reason_bucket (backend/return_reasons.py) and nothing
+# filters on those keys: the indexes only cost writes. v0007 no longer creates them.
+
+from sqlalchemy import text
+
+DESCRIPTION = "drop the unused raw_json return_reason / return_sub_reason indexes"
+
+
+def upgrade(conn) -> None:
+    # returns_raw is partitioned: dropping the parent index drops the partitions' too
+    for name in ("ix_returns_raw_ws_return_reason", "ix_returns_raw_ws_return_sub_reason"):
+        conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
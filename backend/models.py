@@ -2,13 +2,15 @@
 
 import uuid
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Text, Date, UniqueConstraint
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, ForeignKey, Float, Text, Date, UniqueConstraint, Index, Sequence
 
 
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import text
 
-from backend.db import Base
+from backend.db import Base, RawJSON
+from backend.portals import PortalType
 
 
 class Workspace(Base):
@@ -22,6 +24,9 @@ class Workspace(Base):
 
     created_at = Column(DateTime, nullable=False)
 
+    # +1 on every change to the workspace's data (backend/data_version.py)
+    data_version = Column(BigInteger, nullable=False, server_default=text("0"))
+
     style_monthly = relationship("StyleMonthly", back_populates="workspace")
     sales = relationship("SalesRaw", back_populates="workspace")
     returns = relationship("ReturnsRaw", back_populates="workspace")
@@ -43,14 +48,20 @@ from sqlalchemy.sql import text
 class SalesRaw(Base):
     __tablename__ = "sales_raw"
 
-    id = Column(Integer, primary_key=True, index=True)
+    # Monthly partitions on order_date (backend/partitions.py). A unique index on a partitioned
+    # table must contain the partition column, so id is the ORM identity only and the key is
+    # (workspace_id, order_line_id, order_date), NULLS NOT DISTINCT (partitions.UNIQUE_KEYS).
+    id = Column(
+        Integer, Sequence("sales_raw_id_seq"),
+        server_default=text("nextval('sales_raw_id_seq')"), nullable=False, index=True,
+    )
 
-    order_line_id = Column(String, unique=True, index=True, nullable=False)
+    order_line_id = Column(String, index=True, nullable=False)
     style_key = Column(String, index=True, nullable=True)
 
     order_date = Column(DateTime, nullable=True)
     seller_sku_code = Column(String, nullable=True)
-    raw_json = Column(Text, nullable=True)
+    raw_json = Column(RawJSON, nullable=True)
 
     workspace_id = Column(UUID(as_uuid=True), ForeignKey("workspaces.id"), nullable=False, index=True)
     workspace = relationship("Workspace", back_populates="sales")
@@ -58,6 +69,34 @@ class SalesRaw(Base):
     # Each row is 1 unit for Myntra sales
     units = Column(Integer, nullable=False, server_default=text("1"))
 
+    # Typed copies filled at ingest so prices / GMV can be summed in SQL:
+    # seller_price = raw "sellerprice" per unit, else sellingprice / unitprice / price
+    # gmv = raw "sellerprice" * units only (0 without a seller price), as the GMV KPIs always were
+    seller_price = Column(Float, nullable=True)
+    gmv = Column(Float, nullable=True)
+
+    # uploads.id of the file that loaded this row
+    upload_id = Column(UUID(as_uuid=True), nullable=True, index=True)
+
+    # lower(trim(catalog brand)) of this style / SKU, resolved at ingest and on catalog upload
+    # (backend/fact_brands.py)
+    brand_norm = Column(String, nullable=True)
+
+    # "myntra" / "flipkart", written by the ingest (backend/portals.py)
+    portal = Column(PortalType, nullable=True)
+
+    __table_args__ = (
+        Index(
+            "uq_sales_raw_ws_order_line", "workspace_id", "order_line_id", "order_date",
+            unique=True, postgresql_nulls_not_distinct=True,
+        ),
+        Index("ix_sales_raw_ws_brand_date", "workspace_id", "brand_norm", "order_date"),
+        # per-portal dashboards only touch their own rows
+        Index("ix_sales_raw_myntra_ws_date", "workspace_id", "order_date", postgresql_where=text("portal = 'myntra'")),
+        Index("ix_sales_raw_flipkart_ws_date", "workspace_id", "order_date", postgresql_where=text("portal = 'flipkart'")),
+        {"postgresql_partition_by": "RANGE (order_date)"},
+    )
+    __mapper_args__ = {"primary_key": [id]}
 
 
 
@@ -65,9 +104,13 @@ class SalesRaw(Base):
 class ReturnsRaw(Base):
     __tablename__ = "returns_raw"
 
-    id = Column(Integer, primary_key=True, index=True)
+    # monthly partitions on return_date, see SalesRaw
+    id = Column(
+        Integer, Sequence("returns_raw_id_seq"),
+        server_default=text("nextval('returns_raw_id_seq')"), nullable=False, index=True,
+    )
 
-    order_line_id = Column(String, unique=True, index=True, nullable=False)
+    order_line_id = Column(String, index=True, nullable=False)
     style_key = Column(String, index=True, nullable=True)
 
     # timestamp without time zone
@@ -76,12 +119,40 @@ class ReturnsRaw(Base):
     return_type = Column(String, nullable=True)
     units = Column(Integer, nullable=True)
     seller_sku_code = Column(String, nullable=True)
-    raw_json = Column(String, nullable=True)
+    raw_json = Column(RawJSON, nullable=True)
+
+    # materialized from raw_json at ingest (backend/return_reasons.py):
+    # report reason text (Myntra return_reason / Flipkart return_sub_reason) and its heatmap bucket
+    reason_raw = Column(String, nullable=True)
+    reason_bucket = Column(String, nullable=True)
+
+    # lower(trim(catalog brand)), see SalesRaw.brand_norm
+    brand_norm = Column(String, nullable=True)
+
+    portal = Column(PortalType, nullable=True)
 
     # DB column is UUID (matches workspaces.id)
     workspace_id = Column(UUID(as_uuid=True), ForeignKey("workspaces.id"), nullable=False, index=True)
     workspace = relationship("Workspace", back_populates="returns")
 
+    upload_id = Column(UUID(as_uuid=True), nullable=True, index=True)
+
+    __table_args__ = (
+        Index(
+            "uq_returns_raw_ws_order_line", "workspace_id", "order_line_id", "return_date",
+            unique=True, postgresql_nulls_not_distinct=True,
+        ),
+        Index("ix_returns_raw_ws_date_bucket", "workspace_id", "return_date", "reason_bucket"),
+        Index("ix_returns_raw_ws_reason_bucket", "workspace_id", "reason_bucket"),
+        Index("ix_returns_raw_ws_brand_date", "workspace_id", "brand_norm", "return_date"),
+        # rows still waiting for the backfill (keeps the post-migration sync cheap)
+        Index("ix_returns_raw_bucket_missing", "id", postgresql_where=text("reason_bucket IS NULL")),
+        Index("ix_returns_raw_myntra_ws_date", "workspace_id", "return_date", postgresql_where=text("portal = 'myntra'")),
+        Index("ix_returns_raw_flipkart_ws_date", "workspace_id", "return_date", postgresql_where=text("portal = 'flipkart'")),
+        {"postgresql_partition_by": "RANGE (return_date)"},
+    )
+    __mapper_args__ = {"primary_key": [id]}
+
 
 class CatalogRaw(Base):
     __tablename__ = "catalog_raw"
@@ -96,12 +167,21 @@ class CatalogRaw(Base):
     # Live Date
     style_catalogued_date = Column(DateTime, nullable=True)
 
-    raw_json = Column(String, nullable=True)
+    raw_json = Column(RawJSON, nullable=True)
 
     # DB column is UUID (matches workspaces.id)
     workspace_id = Column(UUID(as_uuid=True), ForeignKey("workspaces.id"), nullable=False, index=True)
     workspace = relationship("Workspace", back_populates="catalog")
 
+    upload_id = Column(UUID(as_uuid=True), nullable=True, index=True)
+
+    # from the style_key prefix at ingest ("fk:<FSN>" = flipkart)
+    portal = Column(PortalType, nullable=True)
+
+    __table_args__ = (
+        Index("ix_catalog_raw_ws_portal", "workspace_id", "portal"),
+    )
+
 class MyntraWeeklyPerfRaw(Base):
     __tablename__ = "myntra_weekly_perf_raw"
 
@@ -133,9 +213,10 @@ class MyntraWeeklyPerfRaw(Base):
     # when we ingested this file
     ingested_at = Column(DateTime, nullable=True)
 
-    raw_json = Column(String, nullable=True)
+    raw_json = Column(RawJSON, nullable=True)
 
     workspace_id = Column(UUID(as_uuid=True), ForeignKey("workspaces.id"), nullable=False, index=True)
+    upload_id = Column(UUID(as_uuid=True), nullable=True, index=True)
 
 class StockRaw(Base):
     __tablename__ = "stock_raw"
@@ -150,10 +231,58 @@ class StockRaw(Base):
     # snapshot timestamp (each upload creates a new snapshot)
     ingested_at = Column(DateTime, nullable=True)
 
-    raw_json = Column(Text, nullable=True)
+    raw_json = Column(RawJSON, nullable=True)
+
+    workspace_id = Column(UUID(as_uuid=True), ForeignKey("workspaces.id"), nullable=False, index=True)
+    upload_id = Column(UUID(as_uuid=True), nullable=True, index=True)
+
+
+class Upload(Base):
+    """
+    One uploaded report file. sha256 lets an identical re-upload return the earlier
+    result without parsing; rows carry upload_id so a bad file can be deleted on its own.
+    """
+    __tablename__ = "uploads"
 
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     workspace_id = Column(UUID(as_uuid=True), ForeignKey("workspaces.id"), nullable=False, index=True)
 
+    # ingest kind: "sales", "returns", "catalog", "stock", "myntra-weekly-perf", "flipkart-orders", ...
+    report_type = Column(String, nullable=False)
+    sha256 = Column(String(64), nullable=False)
+
+    filename = Column(String, nullable=True)
+    file_bytes = Column(Integer, nullable=True)
+
+    # processing | done | failed | replaced | deleted
+    status = Column(String, nullable=False, server_default=text("'processing'"))
+
+    rows_in_file = Column(Integer, nullable=True)
+    rows_loaded = Column(Integer, nullable=True)
+    date_min = Column(DateTime, nullable=True)
+    date_max = Column(DateTime, nullable=True)
+
+    created_at = Column(DateTime, nullable=False, server_default=text("now()"))
+    finished_at = Column(DateTime, nullable=True)
+    seconds = Column(Float, nullable=True)
+
+    # ingest response (JSON), returned again for duplicate uploads
+    result_json = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+
+    __table_args__ = (
+        Index("ix_uploads_ws_type_sha", "workspace_id", "report_type", "sha256"),
+    )
+
+
+class AppMeta(Base):
+    """Small key/value store for derived-data bookkeeping (e.g. the return reason map fingerprint)."""
+    __tablename__ = "app_meta"
+
+    key = Column(String, primary_key=True)
+    value = Column(Text, nullable=True)
+    updated_at = Column(DateTime, nullable=False, server_default=text("now()"))
+
 
 class StyleMonthly(Base):
     __tablename__ = "style_monthly"
@@ -168,7 +297,11 @@ class StyleMonthly(Base):
     orders = Column(Integer, nullable=False, server_default=text("0"))
     returns = Column(Integer, nullable=False, server_default=text("0"))
 
-    # Optional, can be filled later
+    # returns split by type: RTO / customer (RETURN, CUSTOMER_RETURN); other types only in `returns`
+    rto_returns = Column(Integer, nullable=False, server_default=text("0"))
+    customer_returns = Column(Integer, nullable=False, server_default=text("0"))
+
+    # sum(sales_raw.gmv) of the month
     revenue = Column(Float, nullable=True)
 
     # Optional convenience fields
@@ -182,8 +315,110 @@ class StyleMonthly(Base):
     workspace_id = Column(UUID(as_uuid=True), ForeignKey("workspaces.id"), nullable=False, index=True)
     workspace = relationship("Workspace", back_populates="style_monthly")
 
+    # portal of the style's sales / returns
+    portal = Column(PortalType, nullable=True)
+
     __table_args__ = (
         UniqueConstraint("workspace_id", "month_start", "style_key", name="uq_style_monthly_ws_month_style"),
+        Index("ix_style_monthly_myntra_ws_month", "workspace_id", "month_start", postgresql_where=text("portal = 'myntra'")),
+        Index("ix_style_monthly_flipkart_ws_month", "workspace_id", "month_start", postgresql_where=text("portal = 'flipkart'")),
+    )
+
+
+class SkuMonthly(Base):
+    """
+    Monthly rollup of daily_sku_facts per workspace x portal x style x SKU
+    (backend/monthly_snapshots.py); style_monthly is rolled up from it.
+    """
+    __tablename__ = "sku_monthly"
+
+    id = Column(BigInteger, primary_key=True)
+
+    workspace_id = Column(UUID(as_uuid=True), ForeignKey("workspaces.id"), nullable=False)
+    month_start = Column(Date, nullable=False)
+    portal = Column(PortalType, nullable=True)
+    style_key = Column(String, nullable=True)
+    seller_sku_code = Column(String, nullable=True)
+    brand_norm = Column(String, nullable=True)
+
+    # sales units and sum(gmv)
+    orders = Column(Integer, nullable=False, server_default=text("0"))
+    revenue = Column(Float, nullable=False, server_default=text("0"))
+    last_order_date = Column(DateTime, nullable=True)
+
+    # returns by return month: all / RTO / customer (RETURN, CUSTOMER_RETURN)
+    returns = Column(Integer, nullable=False, server_default=text("0"))
+    rto_returns = Column(Integer, nullable=False, server_default=text("0"))
+    customer_returns = Column(Integer, nullable=False, server_default=text("0"))
+    # returns without units, counted as 1 above (see DailySkuFact.null_unit_returns)
+    null_unit_returns = Column(Integer, nullable=False, server_default=text("0"))
+    # returns of order lines sold in the same month (counted on the sale's row)
+    same_month_returns = Column(Integer, nullable=False, server_default=text("0"))
+
+    return_pct = Column(Float, nullable=True)
+
+    updated_at = Column(DateTime, nullable=False, server_default=text("now()"))
+
+    __table_args__ = (
+        # one row per group; NULL keys are a group of their own
+        Index(
+            "uq_sku_monthly_ws_month_sku", "workspace_id", "month_start", "portal", "style_key", "seller_sku_code",
+            unique=True, postgresql_nulls_not_distinct=True,
+        ),
+        Index("ix_sku_monthly_ws_month", "workspace_id", "month_start"),
+        Index("ix_sku_monthly_month", "month_start"),
+        Index("ix_sku_monthly_myntra_ws_month", "workspace_id", "month_start", postgresql_where=text("portal = 'myntra'")),
+        Index("ix_sku_monthly_flipkart_ws_month", "workspace_id", "month_start", postgresql_where=text("portal = 'flipkart'")),
+    )
+
+
+class DailySkuFact(Base):
+    """
+    sales_raw / returns_raw rolled up per workspace x portal x day x style x SKU
+    (backend/daily_facts.py). Sales land on their order day, returns on their return day.
+    """
+    __tablename__ = "daily_sku_facts"
+
+    id = Column(BigInteger, primary_key=True)
+
+    workspace_id = Column(UUID(as_uuid=True), ForeignKey("workspaces.id"), nullable=False)
+    portal = Column(PortalType, nullable=True)
+    day = Column(Date, nullable=False)
+    style_key = Column(String, nullable=True)
+    seller_sku_code = Column(String, nullable=True)
+
+    # catalog brand of the group (same rule as sales_raw.brand_norm, see fact_brands.py)
+    brand_norm = Column(String, nullable=True)
+
+    # sales: order lines, units, sum(gmv), latest order timestamp
+    orders = Column(Integer, nullable=False, server_default=text("0"))
+    units = Column(Integer, nullable=False, server_default=text("0"))
+    gmv = Column(Float, nullable=False, server_default=text("0"))
+    last_order_date = Column(DateTime, nullable=True)
+
+    # returns (units, NULL units count as 1): all / customer (RETURN, CUSTOMER_RETURN) / RTO
+    returns_units = Column(Integer, nullable=False, server_default=text("0"))
+    customer_return_units = Column(Integer, nullable=False, server_default=text("0"))
+    # RETURN only: the returns trend's return_units
+    return_units = Column(Integer, nullable=False, server_default=text("0"))
+    rto_units = Column(Integer, nullable=False, server_default=text("0"))
+    # return rows without units (counted as 1 above): style_monthly.returns counts them as 0
+    null_unit_returns = Column(Integer, nullable=False, server_default=text("0"))
+    # seller price of the returned order lines x returned units
+    return_amount = Column(Float, nullable=False, server_default=text("0"))
+
+    updated_at = Column(DateTime, nullable=False, server_default=text("now()"))
+
+    __table_args__ = (
+        # one row per group; NULL keys are a group of their own
+        Index(
+            "uq_daily_sku_facts_ws_day_sku", "workspace_id", "day", "portal", "style_key", "seller_sku_code",
+            unique=True, postgresql_nulls_not_distinct=True,
+        ),
+        Index("ix_daily_sku_facts_ws_day", "workspace_id", "day"),
+        Index("ix_daily_sku_facts_ws_brand_day", "workspace_id", "brand_norm", "day"),
+        Index("ix_daily_sku_facts_myntra_ws_day", "workspace_id", "day", postgresql_where=text("portal = 'myntra'")),
+        Index("ix_daily_sku_facts_flipkart_ws_day", "workspace_id", "day", postgresql_where=text("portal = 'flipkart'")),
     )
 
 from sqlalchemy import Column, Integer, Text, Date, DateTime, Float
@@ -192,11 +427,14 @@ from datetime import datetime
 
 class FlipkartTrafficRaw(Base):
     __tablename__ = "flipkart_traffic_raw"
+    # monthly partitions on impression_date (backend/partitions.py); the date is NOT NULL,
+    # so it can be part of the primary key
+    __table_args__ = {"postgresql_partition_by": "RANGE (impression_date)"}
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     workspace_id = Column(UUID(as_uuid=True), nullable=False, index=True)
 
-    impression_date = Column(Date, nullable=False, index=True)
+    impression_date = Column(Date, primary_key=True, nullable=False, index=True)
 
     # keys
     seller_sku_code = Column(Text, nullable=True, index=True)  # your "SKU Id"
@@ -212,7 +450,7 @@ class FlipkartTrafficRaw(Base):
     ctr_pct = Column(Float, nullable=True)
     conversion_pct = Column(Float, nullable=True)
 
-    raw_json = Column(Text, nullable=True)
+    raw_json = Column(RawJSON, nullable=True)
 
     ingested_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
 class FlipkartGstrSalesRaw(Base):
@@ -240,6 +478,6 @@ class FlipkartGstrSalesRaw(Base):
 
     product_title = Column(Text, nullable=True)
 
-    raw_json = Column(Text, nullable=True)
+    raw_json = Column(RawJSON, nullable=True)
 
     ingested_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
\ No newline at end of file
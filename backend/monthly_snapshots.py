@@ -0,0 +1,291 @@
+# backend/monthly_snapshots.py
+# Monthly snapshots the month views read instead of sales_raw / returns_raw:
+#
+#   - sku_monthly:   daily_sku_facts rolled up per workspace x month x portal x style x SKU
+#                    (orders, GMV, all / RTO / customer returns, same-month returns)
+#   - style_monthly: sku_monthly rolled up per workspace x month x style (+ portal)
+#
+#   - ingest / upload delete: refresh_style_monthly() for the months the file touched, after
+#                    the daily facts of those days (backend/daily_facts.py); it commits
+#   - catalog:       sku_monthly.brand_norm is re-resolved with the facts (fact_brands.py)
+#   - migrations:    sync_monthly_snapshots() builds every workspace once
+#
+# Same-month returns (sale month == return month) need the sale behind each return, so that
+# one column is computed from returns_raw JOIN sales_raw, scoped to the refreshed months.
+#
+#   python -m backend.monthly_snapshots                          # rebuild every workspace
+#   python -m backend.monthly_snapshots --workspace-slug acme    # rebuild one workspace
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import text
+
+from backend.data_version import bump_data_version
+
+_BACKFILL_KEY = "monthly_snapshots_backfill"
+
+# facts and same-month returns stacked, then folded onto one row per group
+# (UNION ALL + GROUP BY: the keys are nullable)
+_SKU_MONTHLY_REFRESH_SQL = """
+WITH f AS (
+    SELECT CAST(date_trunc('month', day) AS date) AS month_start, portal, style_key, seller_sku_code,
+           max(brand_norm) AS brand_norm,
+           sum(units) AS orders,
+           sum(gmv) AS revenue,
+           max(last_order_date) AS last_order_date,
+           sum(returns_units) AS returns,
+           sum(rto_units) AS rto_returns,
+           sum(customer_return_units) AS customer_returns,
+           sum(null_unit_returns) AS null_unit_returns,
+           0 AS same_month_returns
+    FROM daily_sku_facts
+    WHERE workspace_id = CAST(:ws AS uuid)
+      {facts_scope}
+    GROUP BY 1, 2, 3, 4
+),
+m AS (
+    SELECT CAST(date_trunc('month', s.order_date) AS date) AS month_start, s.portal, s.style_key, s.seller_sku_code,
+           max(s.brand_norm) AS brand_norm,
+           0 AS orders,
+           CAST(0 AS double precision) AS revenue,
+           CAST(NULL AS timestamp) AS last_order_date,
+           0 AS returns,
+           0 AS rto_returns,
+           0 AS customer_returns,
+           0 AS null_unit_returns,
+           sum(coalesce(r.units, 1)) AS same_month_returns
+    FROM returns_raw r
+    JOIN sales_raw s
+      ON s.workspace_id = r.workspace_id AND s.order_line_id = r.order_line_id
+    WHERE r.workspace_id = CAST(:ws AS uuid)
+      AND r.return_date IS NOT NULL
+      AND s.order_date IS NOT NULL
+      AND date_trunc('month', s.order_date) = date_trunc('month', r.return_date)
+      {returns_scope}
+    GROUP BY 1, 2, 3, 4
+)
+INSERT INTO sku_monthly
+    (workspace_id, month_start, portal, style_key, seller_sku_code, brand_norm,
+     orders, revenue, last_order_date, returns, rto_returns, customer_returns, null_unit_returns,
+     same_month_returns, return_pct, updated_at)
+SELECT CAST(:ws AS uuid), u.month_start, u.portal, u.style_key, u.seller_sku_code, max(u.brand_norm),
+       sum(u.orders), sum(u.revenue), max(u.last_order_date),
+       sum(u.returns), sum(u.rto_returns), sum(u.customer_returns), sum(u.null_unit_returns),
+       sum(u.same_month_returns),
+       CASE WHEN sum(u.orders) > 0 THEN sum(u.returns) * 100.0 / sum(u.orders) END,
+       now()
+FROM (SELECT * FROM f UNION ALL SELECT * FROM m) u
+GROUP BY u.month_start, u.portal, u.style_key, u.seller_sku_code
+"""
+
+# StyleMonthly from sku_monthly, as ONE statement (returns = sum(units): return rows without
+# units count as 0 here, as style_monthly always did; RTO / customer count them as 1):
+#  - INSERT ... SELECT ... ON CONFLICT DO UPDATE
+#  - + delete snapshot rows in scope that no longer have any sales/returns
+# scope = whole workspace or `months`, optionally narrowed to `style_keys`
+# (delta mode: only styles present in the uploaded file)
+_STYLE_MONTHLY_REFRESH_SQL = """
+WITH a AS (
+    SELECT month_start, style_key,
+           sum(orders) AS orders,
+           sum(returns) - sum(null_unit_returns) AS returns,
+           sum(rto_returns) AS rto_returns,
+           sum(customer_returns) AS customer_returns,
+           sum(revenue) AS revenue,
+           max(last_order_date) AS last_order_date,
+           max(CAST(portal AS text)) AS portal
+    FROM sku_monthly
+    WHERE workspace_id = CAST(:ws AS uuid)
+      AND style_key IS NOT NULL
+      {sku_scope}
+    GROUP BY 1, 2
+),
+up AS (
+    INSERT INTO style_monthly
+        (workspace_id, month_start, style_key, orders, returns, rto_returns, customer_returns,
+         revenue, last_order_date, return_pct, portal, updated_at)
+    SELECT CAST(:ws AS uuid), a.month_start, a.style_key, a.orders, a.returns, a.rto_returns, a.customer_returns,
+           a.revenue, a.last_order_date,
+           CASE WHEN a.orders > 0 THEN a.returns * 100.0 / a.orders END,
+           CAST(a.portal AS portal),
+           now()
+    FROM a
+    ON CONFLICT (workspace_id, month_start, style_key) DO UPDATE SET
+        orders = EXCLUDED.orders,
+        portal = EXCLUDED.portal,
+        returns = EXCLUDED.returns,
+        rto_returns = EXCLUDED.rto_returns,
+        customer_returns = EXCLUDED.customer_returns,
+        revenue = EXCLUDED.revenue,
+        last_order_date = EXCLUDED.last_order_date,
+        return_pct = EXCLUDED.return_pct,
+        updated_at = now()
+    RETURNING 1
+),
+del AS (
+    -- rows in scope whose sales/returns are gone (replace upload, deleted style)
+    DELETE FROM style_monthly sm
+    WHERE sm.workspace_id = CAST(:ws AS uuid)
+      {snapshot_scope}
+      AND NOT EXISTS (
+          SELECT 1 FROM a
+          WHERE a.month_start = sm.month_start AND a.style_key = sm.style_key
+      )
+    RETURNING 1
+)
+SELECT (SELECT COUNT(*) FROM up) AS upserted, (SELECT COUNT(*) FROM del) AS deleted
+"""
+
+
+def refresh_sku_monthly(db, ws_id, months: list[date] | None = None, full_refresh: bool = False) -> dict:
+    """
+    Rebuild the workspace's sku_monthly rows for `months` (month starts), or all of them
+    (full_refresh), from daily_sku_facts. Runs in the caller's transaction; the caller commits.
+    Refreshes of one workspace are serialized until that commit (see refresh_daily_facts).
+    """
+    params: dict = {"ws": str(ws_id)}
+    facts_scope = returns_scope = delete_scope = ""
+
+    if not full_refresh:
+        if not months:
+            return {"deleted": 0, "inserted": 0}
+        params["months"] = list(months)
+        params["lo"] = min(months)
+        params["hi"] = max(months) + relativedelta(months=1)
+        # range predicate first so the (workspace_id, day) / return_date indexes can be used
+        facts_scope = "AND day >= :lo AND day < :hi AND CAST(date_trunc('month', day) AS date) = ANY(:months)"
+        returns_scope = (
+            "AND r.return_date >= :lo AND r.return_date < :hi "
+            "AND CAST(date_trunc('month', r.return_date) AS date) = ANY(:months)"
+        )
+        delete_scope = " AND month_start = ANY(:months)"
+
+    db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:n))"), {"n": f"sku_monthly:{ws_id}"})
+    deleted = db.execute(
+        text("DELETE FROM sku_monthly WHERE workspace_id = CAST(:ws AS uuid)" + delete_scope),
+        params,
+    ).rowcount
+    inserted = db.execute(
+        text(_SKU_MONTHLY_REFRESH_SQL.format(facts_scope=facts_scope, returns_scope=returns_scope)),
+        params,
+    ).rowcount
+    return {"deleted": int(deleted or 0), "inserted": int(inserted or 0)}
+
+
+def refresh_style_monthly(
+    db,
+    ws_id,
+    months: list[date] | None = None,
+    full_refresh: bool = False,
+    style_keys: list[str] | None = None,
+) -> dict:
+    """
+    sku_monthly for the months, then style_monthly from it (narrowed to style_keys, if given).
+    Reads the daily facts, so refresh those first (same transaction is fine). Commits:
+    readers never see a half-built month.
+    """
+    params: dict = {"ws": str(ws_id)}
+    sku_scope, snapshot_scope = [], []
+
+    if not full_refresh:
+        if not months:
+            return {"months": 0, "style_keys": None, "upserted": 0, "deleted": 0, "sku_monthly": None}
+        params["months"] = list(months)
+        sku_scope.append("AND month_start = ANY(:months)")
+        snapshot_scope.append("AND sm.month_start = ANY(:months)")
+
+    sku_stats = refresh_sku_monthly(db, ws_id, months=months, full_refresh=full_refresh)
+
+    upserted = deleted = 0
+    if style_keys is None or style_keys:
+        if style_keys is not None:
+            params["style_keys"] = list(style_keys)
+            sku_scope.append("AND style_key = ANY(:style_keys)")
+            snapshot_scope.append("AND sm.style_key = ANY(:style_keys)")
+
+        row = db.execute(
+            text(
+                _STYLE_MONTHLY_REFRESH_SQL.format(
+                    sku_scope=" ".join(sku_scope),
+                    snapshot_scope=" ".join(snapshot_scope),
+                )
+            ),
+            params,
+        ).one()
+        upserted, deleted = row.upserted, row.deleted
+
+    db.commit()
+    return {
+        "months": len(months or []) if not full_refresh else None,
+        "style_keys": len(style_keys) if style_keys is not None else None,
+        "upserted": int(upserted or 0),
+        "deleted": int(deleted or 0),
+        "sku_monthly": sku_stats,
+    }
+
+
+# -----------------------------------------------------------------------------
+# Backfill
+# -----------------------------------------------------------------------------
+def sync_monthly_snapshots(engine, force: bool = False) -> dict | None:
+    """Build the snapshots of every workspace once (tracked in app_meta); one transaction each."""
+    with engine.connect() as conn:
+        done = conn.execute(text("SELECT value FROM app_meta WHERE key = :k"), {"k": _BACKFILL_KEY}).scalar()
+        if done and not force:
+            return None
+        ws_ids = conn.execute(text("SELECT id FROM workspaces")).scalars().all()
+
+    t0 = time.perf_counter()
+    sku_rows = styles = 0
+    for ws_id in ws_ids:
+        with engine.connect() as conn:
+            bump_data_version(conn, ws_id)
+            out = refresh_style_monthly(conn, ws_id, full_refresh=True)  # commits
+        sku_rows += out["sku_monthly"]["inserted"]
+        styles += out["upserted"]
+
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO app_meta (key, value, updated_at) VALUES (:k, 'done', now()) "
+                "ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value, updated_at = now()"
+            ),
+            {"k": _BACKFILL_KEY},
+        )
+    return {
+        "workspaces": len(ws_ids),
+        "sku_rows": sku_rows,
+        "style_rows": styles,
+        "seconds": round(time.perf_counter() - t0, 3),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Rebuild sku_monthly / style_monthly from daily_sku_facts")
+    ap.add_argument("--workspace-slug", default=None)
+    args = ap.parse_args()
+
+    from backend.db import SessionLocal, engine, resolve_workspace_id
+
+    if args.workspace_slug is None:
+        print(json.dumps(sync_monthly_snapshots(engine, force=True)), flush=True)
+        return
+
+    db = SessionLocal()
+    try:
+        ws_id = resolve_workspace_id(db, args.workspace_slug)
+        bump_data_version(db, ws_id)
+        out = refresh_style_monthly(db, ws_id, full_refresh=True)  # commits
+        print(json.dumps(out), flush=True)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
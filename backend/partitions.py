@@ -0,0 +1,189 @@
+# backend/partitions.py
+# Monthly range partitions of the fact tables:
+#
+#   sales_raw             PARTITION BY RANGE (order_date)       sales_raw_p202501, ...
+#   returns_raw           PARTITION BY RANGE (return_date)      returns_raw_p202501, ...
+#   flipkart_traffic_raw  PARTITION BY RANGE (impression_date)  flipkart_traffic_raw_p202501, ...
+#
+# plus {table}_default for rows without a date. Date-window queries prune to their months;
+# an old month is one DETACH away from being archived or dropped.
+#
+#   - ingest:      copy_frame() calls ensure_partitions() for the months in each frame
+#   - migrations:  v0008_partitions converts the existing tables / pre-creates months
+#
+#   python -m backend.partitions --list
+#   python -m backend.partitions --ahead 3                        # create next months now
+#   python -m backend.partitions --detach-before 2023-01          # detach (keeps the tables)
+#   python -m backend.partitions --detach-before 2023-01 --drop
+#
+# A new month is created as a plain table and ATTACHed, not CREATE TABLE ... PARTITION OF:
+# ATTACH only takes SHARE UPDATE EXCLUSIVE on the parent, so dashboards keep reading while an
+# ingest that opened a new month is still running.
+#
+# A unique index on a partitioned table must contain the partition key, so the order line key
+# is (workspace_id, order_line_id, <date>) with NULLS NOT DISTINCT (UNIQUE_KEYS): enforced by
+# Postgres, and the ON CONFLICT target of copy_frame(). The key alone would let an order line
+# be stored twice under two dates, so copy_frame() also matches (workspace_id, order_line_id)
+# across partitions: "update" moves the line to its new date, "skip" leaves it where it is,
+# "error" refuses the load.
+
+from __future__ import annotations
+
+import argparse
+import json
+from datetime import date
+
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import text
+
+# table -> partition column
+PARTITIONED = {
+    "sales_raw": "order_date",
+    "returns_raw": "return_date",
+    "flipkart_traffic_raw": "impression_date",
+}
+
+# table -> unique key (index name, columns); the partition column comes last
+UNIQUE_KEYS = {
+    "sales_raw": ("uq_sales_raw_ws_order_line", ("workspace_id", "order_line_id", "order_date")),
+    "returns_raw": ("uq_returns_raw_ws_order_line", ("workspace_id", "order_line_id", "return_date")),
+}
+
+# partition names known to exist in this process (saves a catalog lookup per chunk)
+_KNOWN: set[str] = set()
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def default_partition(table: str) -> str:
+    return f"{table}_default"
+
+
+def frame_months(values: pd.Series) -> list[date]:
+    """Distinct month starts of a date / datetime column (missing values ignored)."""
+    dt = pd.to_datetime(values, errors="coerce").dropna()
+    if dt.empty:
+        return []
+    return sorted({date(d.year, d.month, 1) for d in dt.dt.to_period("M").dt.start_time})
+
+
+def is_partitioned(conn, table: str) -> bool:
+    kind = conn.execute(
+        text("SELECT c.relkind FROM pg_class c WHERE c.oid = to_regclass(:t)"), {"t": table}
+    ).scalar()
+    return kind == "p"
+
+
+def create_default_partition(conn, table: str) -> None:
+    conn.execute(text(f"CREATE TABLE IF NOT EXISTS {default_partition(table)} PARTITION OF {table} DEFAULT"))
+
+
+def ensure_partitions(conn, table: str, months: list[date]) -> list[str]:
+    """
+    Create the missing month partitions of `table` in the caller's transaction; rows of that
+    month already sitting in the default partition are moved into it. Returns created names.
+    """
+    col = PARTITIONED[table]
+    created = []
+    for m in months:
+        name = partition_name(table, m)
+        if name in _KNOWN:
+            continue
+        # two ingests opening the same month: the second waits, then sees the table
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:n))"), {"n": name})
+        if conn.execute(text("SELECT to_regclass(:n)"), {"n": name}).scalar() is None:
+            lo, hi = m, m + relativedelta(months=1)
+            bounds = {"lo": lo, "hi": hi}
+            conn.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+            conn.execute(
+                text(
+                    f"WITH moved AS (DELETE FROM {default_partition(table)} "
+                    f"WHERE {col} >= :lo AND {col} < :hi RETURNING *) "
+                    f"INSERT INTO {name} SELECT * FROM moved"
+                ),
+                bounds,
+            )
+            conn.execute(
+                text(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM ('{lo}') TO ('{hi}')")
+            )
+            created.append(name)
+        else:
+            # cache only committed partitions (a created one disappears if the ingest rolls back)
+            _KNOWN.add(name)
+    return created
+
+
+def ensure_months_ahead(conn, table: str, ahead: int = 3) -> list[str]:
+    this_month = date.today().replace(day=1)
+    return ensure_partitions(conn, table, [this_month + relativedelta(months=i) for i in range(ahead + 1)])
+
+
+def list_partitions(conn, table: str) -> list[dict]:
+    rows = conn.execute(
+        text(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) AS bound, "
+            "c.reltuples::bigint AS est_rows, pg_total_relation_size(c.oid) AS bytes "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:t) ORDER BY c.relname"
+        ),
+        {"t": table},
+    ).all()
+    return [{"partition": r.relname, "bound": r.bound, "est_rows": int(r.est_rows), "bytes": int(r.bytes)} for r in rows]
+
+
+def detach_before(conn, table: str, before: date, drop: bool = False) -> list[str]:
+    """Detach (and optionally drop) the month partitions that end on or before `before`."""
+    out = []
+    for p in list_partitions(conn, table):
+        name = p["partition"]
+        prefix = f"{table}_p"
+        if not name.startswith(prefix):
+            continue
+        try:
+            month = date(int(name[len(prefix):len(prefix) + 4]), int(name[len(prefix) + 4:]), 1)
+        except ValueError:
+            continue
+        if month >= before:
+            continue
+        conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+        if drop:
+            conn.execute(text(f"DROP TABLE {name}"))
+        _KNOWN.discard(name)
+        out.append(name)
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Monthly partitions of sales_raw / returns_raw / flipkart_traffic_raw")
+    ap.add_argument("--table", choices=sorted(PARTITIONED), action="append", help="default: all")
+    ap.add_argument("--list", action="store_true")
+    ap.add_argument("--ahead", type=int, default=None, help="create partitions for the next N months")
+    ap.add_argument("--detach-before", default=None, help="YYYY-MM: detach months before this one")
+    ap.add_argument("--drop", action="store_true", help="with --detach-before: drop the detached tables")
+    args = ap.parse_args()
+
+    from backend.db import engine
+
+    tables = args.table or list(PARTITIONED)
+    out = {}
+    with engine.begin() as conn:
+        for table in tables:
+            if not is_partitioned(conn, table):
+                raise SystemExit(f"{table} is not partitioned: run python -m backend.migrations")
+            res = {}
+            if args.ahead is not None:
+                res["created"] = ensure_months_ahead(conn, table, args.ahead)
+            if args.detach_before:
+                y, m = args.detach_before.split("-")[:2]
+                res["detached"] = detach_before(conn, table, date(int(y), int(m), 1), drop=args.drop)
+            if args.list or not res:
+                res["partitions"] = list_partitions(conn, table)
+            out[table] = res
+    print(json.dumps(out, indent=2), flush=True)
+
+
+if __name__ == "__main__":
+    main()
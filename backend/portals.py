@@ -0,0 +1,43 @@
+# backend/portals.py
+# portal column on sales_raw / returns_raw / catalog_raw / style_monthly.
+#
+# Portal used to be encoded in the keys ("fk:" prefix on order_line_id / style_key /
+# seller_sku_code) and every portal filter was a LIKE / NOT LIKE over those, which no index
+# can serve for the Myntra side. The ingests now write the portal explicitly and the
+# dashboards filter on `portal = ...`, backed by per-portal partial indexes (see models).
+#
+# Rows loaded before the column existed are backfilled by
+# backend/migrations/v0006_portal.py with the old prefix rule.
+
+from __future__ import annotations
+
+import pandas as pd
+from sqlalchemy import Enum
+
+PORTALS = ("myntra", "flipkart")
+
+# Postgres enum type "portal"
+PortalType = Enum(*PORTALS, name="portal")
+
+
+def normalize_portal(portal: str | None) -> str | None:
+    """'fk' / 'flipkart' -> 'flipkart', 'mn' / 'myntra' -> 'myntra', anything else -> None (all)."""
+    p = (portal or "").strip().lower()
+    if p in ("fk", "flipkart"):
+        return "flipkart"
+    if p in ("mn", "myntra"):
+        return "myntra"
+    return None
+
+
+def filter_portal(q, column, portal: str | None):
+    """q filtered on column == portal for 'myntra' / 'flipkart'; anything else: all portals."""
+    if portal in PORTALS:
+        return q.filter(column == portal)
+    return q
+
+
+def portal_from_style_key(style_key: pd.Series) -> pd.Series:
+    """Catalog rows: Flipkart styles are stored as "fk:<FSN>"."""
+    is_fk = style_key.astype(str).str.strip().str.lower().str.startswith("fk:")
+    return pd.Series("myntra", index=style_key.index, dtype=object).mask(is_fk, "flipkart")
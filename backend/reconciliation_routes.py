@@ -15,6 +15,9 @@ from fastapi import APIRouter, File, HTTPException, Query, UploadFile
 from sqlalchemy import func, case, text, and_, cast, Float, String
 
 from backend.db import SessionLocal, resolve_workspace_id
+from backend.copy_loader import ReplaceLoad, copy_frame
+from backend.data_version import bump_data_version
+from backend.date_parse import DateErrors, parse_date_column
 from backend.reconciliation_models import (
     MyntraPgForward,
     MyntraPgReverse,
@@ -44,33 +47,6 @@ def _to_int(v, default=None):
     return int(f) if f is not None else default
 
 
-def _to_dt(v) -> Optional[datetime]:
-    if v is None or str(v).strip() in ("", "null", "None"):
-        return None
-    s = str(v).strip()
-    # Try common formats
-    for fmt in (
-        "%Y-%m-%d %H:%M:%S",
-        "%Y-%m-%dT%H:%M:%S.%f%z",
-        "%Y-%m-%dT%H:%M:%S.%f",
-        "%Y-%m-%dT%H:%M:%S%z",
-        "%Y-%m-%d",
-    ):
-        try:
-            dt = datetime.strptime(s[:26].replace("+05:30", ""), fmt.replace("%z", ""))
-            return dt
-        except Exception:
-            continue
-    # pandas fallback
-    try:
-        dt = pd.to_datetime(s, errors="coerce", dayfirst=True)
-        if pd.notna(dt):
-            return dt.to_pydatetime().replace(tzinfo=None)
-    except Exception:
-        pass
-    return None
-
-
 def _to_str(v) -> Optional[str]:
     if v is None:
         return None
@@ -108,6 +84,408 @@ def _get(row: dict, *keys, converter=_to_str):
     return None
 
 
+# ---------------------------------------------------------------------------
+# Compiled report schemas (PG forward / reverse / non-order / order flow)
+#   - headers normalized and resolved to a column position ONCE per file
+#   - one converter per target column, applied to the whole column
+#   - result is an insert-ready frame loaded with COPY (backend.copy_loader)
+# Converters keep the semantics of _to_str / _to_float / _to_int; dates go through
+# backend.date_parse (format inferred per report + header, bad cells reported).
+# ---------------------------------------------------------------------------
+
+_NULL_TOKENS = ("", "null", "None")
+
+
+def _col_str(s: pd.Series) -> pd.Series:
+    v = s.str.strip().str.strip('"').str.strip("'")
+    return v.where(v.notna() & ~v.isin(_NULL_TOKENS), None)
+
+
+def _col_float(s: pd.Series) -> pd.Series:
+    num = pd.to_numeric(s.str.replace(",", "", regex=False).str.strip(), errors="coerce")
+    return num.astype(object).where(num.notna(), None)
+
+
+def _col_int(s: pd.Series) -> pd.Series:
+    num = pd.to_numeric(s.str.replace(",", "", regex=False).str.strip(), errors="coerce")
+    out = pd.Series(None, index=s.index, dtype=object)
+    ok = num.notna()
+    out[ok] = num[ok].astype("int64")
+    return out
+
+
+class ReportSchema:
+    """Target columns of one report type, grouped by converter (header name == column name)."""
+
+    def __init__(
+        self,
+        model,
+        str_cols: list[str] = (),
+        float_cols: list[str] = (),
+        int_cols: list[str] = (),
+        dt_cols: list[str] = (),
+        defaults: dict | None = None,
+    ):
+        self.model = model
+        self.fields = (
+            [(c, _col_str) for c in str_cols]
+            + [(c, _col_float) for c in float_cols]
+            + [(c, _col_int) for c in int_cols]
+        )
+        self.dt_cols = list(dt_cols)
+        self.defaults = defaults or {}
+
+    def build(
+        self,
+        headers: list[str],
+        df: pd.DataFrame,
+        constants: dict,
+        date_errors: DateErrors | None = None,
+    ) -> pd.DataFrame:
+        """headers/df from _read_csv_frame -> insert-ready frame (+ raw_json, + constants)."""
+        # last duplicate header wins, like csv.DictReader
+        pos: dict[str, int] = {}
+        for i, h in enumerate(headers):
+            if h:
+                pos[h] = i
+
+        out: dict = {}
+        for col, conv in self.fields:
+            i = pos.get(_norm_col(col))
+            v = conv(df[i]) if i is not None else pd.Series(None, index=df.index, dtype=object)
+            if col in self.defaults:
+                v = v.where(v.notna(), self.defaults[col])
+            out[col] = v
+
+        for col in self.dt_cols:
+            i = pos.get(_norm_col(col))
+            out[col] = (
+                parse_date_column(df[i], self.model.__tablename__, col, date_errors)
+                if i is not None
+                else pd.Series(None, index=df.index, dtype=object)
+            )
+
+        raw = df[list(pos.values())]
+        raw.columns = list(pos.keys())
+        out["raw_json"] = raw.to_json(orient="records", lines=True).splitlines()
+
+        out.update(constants)
+        return pd.DataFrame(out, index=df.index)
+
+
+def _read_csv_frame(content: bytes) -> tuple[list[str], pd.DataFrame]:
+    """CSV -> (normalized headers, dtype=object frame with one column per header position)."""
+    reader = csv.reader(io.StringIO(content.decode("utf-8-sig")))
+    header = next(reader, None)
+    if not header:
+        return [], pd.DataFrame()
+
+    n = len(header)
+    # short rows padded with None, extra cells dropped (csv.DictReader behaviour)
+    rows = [r[:n] if len(r) >= n else r + [None] * (n - len(r)) for r in reader if r]
+    df = pd.DataFrame(rows, columns=range(n), dtype=object)
+    return [_norm_col(h) if h else "" for h in header], df
+
+
+def _load_frame(db, table: str, frame: pd.DataFrame, replace_scope: dict | None) -> dict:
+    """copy_frame(), or with replace_scope: stage -> validate -> swap out the scope's rows (ReplaceLoad)."""
+    if replace_scope is None:
+        return copy_frame(db, table, frame)
+    rl = ReplaceLoad(db, table, replace_scope)
+    rl.add(frame)
+    return rl.swap()
+
+
+_PG_FORWARD_SCHEMA = ReportSchema(
+    MyntraPgForward,
+    str_cols=[
+        "order_release_id",
+        "order_line_id",
+        "sku_code",
+        "packet_id",
+        "invoice_number",
+        "hsn_code",
+        "product_tax_category",
+        "seller_order_id",
+        "currency",
+        "shipping_case",
+        "shipment_zone_classification",
+        "bank_utr_no_prepaid_comm_deduction",
+        "bank_utr_no_prepaid_logistics_deduction",
+        "bank_utr_no_prepaid_payment",
+        "bank_utr_no_postpaid_comm_deduction",
+        "bank_utr_no_postpaid_logistics_deduction",
+        "bank_utr_no_postpaid_payment",
+        "brand",
+        "gender",
+        "brand_type",
+        "article_type",
+        "supply_type",
+        "try_and_buy_purchase",
+        "seller_tier",
+        "seller_gstn",
+        "seller_name",
+        "myntra_gstn",
+        "shipping_city",
+        "shipping_pin_code",
+        "shipping_state",
+        "shipping_state_code",
+    ],
+    float_cols=[
+        "seller_product_amount",
+        "postpaid_amount",
+        "prepaid_amount",
+        "mrp",
+        "total_discount_amount",
+        "customer_paid_amt",
+        "total_tax_rate",
+        "igst_amount",
+        "cgst_amount",
+        "sgst_amount",
+        "tcs_amount",
+        "tds_amount",
+        "taxable_amount",
+        "igst_rate",
+        "cgst_rate",
+        "sgst_rate",
+        "cess_amount",
+        "cess_rate",
+        "tcs_igst_rate",
+        "tcs_sgst_rate",
+        "tcs_cgst_rate",
+        "tds_rate",
+        "commission_percentage",
+        "minimum_commission",
+        "platform_fees",
+        "total_commission",
+        "total_commission_plus_tcs_tds_deduction",
+        "commission_base_amount",
+        "commission_tax_amount",
+        "commission_discount",
+        "sjit_incentive_amount",
+        "total_logistics_deduction",
+        "shipping_fee",
+        "fixed_fee",
+        "pick_and_pack_fee",
+        "payment_gateway_fee",
+        "total_tax_on_logistics",
+        "total_expected_settlement",
+        "total_actual_settlement",
+        "amount_pending_settlement",
+        "prepaid_commission_deduction",
+        "prepaid_logistics_deduction",
+        "prepaid_payment",
+        "postpaid_commission_deduction",
+        "postpaid_logistics_deduction",
+        "postpaid_payment",
+        "postpaid_amount_other",
+        "prepaid_amount_other",
+        "shipping_amount",
+        "gift_amount",
+        "additional_amount",
+    ],
+    int_cols=[
+        "article_level",
+    ],
+    dt_cols=[
+        "packing_date",
+        "delivery_date",
+        "settlement_date_prepaid_comm_deduction",
+        "settlement_date_prepaid_logistics_deduction",
+        "settlement_date_prepaid_payment",
+        "settlement_date_postpaid_comm_deduction",
+        "settlement_date_postpaid_logistics_deduction",
+        "settlement_date_postpaid_payment",
+    ],
+    defaults={"currency": "INR"},
+)
+
+
+_PG_REVERSE_SCHEMA = ReportSchema(
+    MyntraPgReverse,
+    str_cols=[
+        "order_release_id",
+        "order_line_id",
+        "sku_code",
+        "packet_id",
+        "invoice_number",
+        "hsn_code",
+        "product_tax_category",
+        "seller_order_id",
+        "return_id",
+        "return_type",
+        "currency",
+        "shipping_case",
+        "shipment_zone_classification",
+        "bank_utr_no_prepaid_comm_deduction",
+        "bank_utr_no_prepaid_logistics_deduction",
+        "bank_utr_no_prepaid_payment",
+        "bank_utr_no_postpaid_comm_deduction",
+        "bank_utr_no_postpaid_logistics_deduction",
+        "bank_utr_no_postpaid_payment",
+        "brand",
+        "gender",
+        "brand_type",
+        "article_type",
+        "supply_type",
+        "try_and_buy_purchase",
+        "seller_tier",
+        "seller_gstn",
+        "seller_name",
+        "myntra_gstn",
+        "shipping_city",
+        "shipping_pin_code",
+        "shipping_state",
+        "shipping_state_code",
+    ],
+    float_cols=[
+        "seller_product_amount",
+        "postpaid_amount",
+        "prepaid_amount",
+        "mrp",
+        "total_discount_amount",
+        "customer_paid_amt",
+        "total_tax_rate",
+        "igst_amount",
+        "cgst_amount",
+        "sgst_amount",
+        "tcs_amount",
+        "tds_amount",
+        "taxable_amount",
+        "commission_percentage",
+        "minimum_commission",
+        "platform_fees",
+        "total_commission",
+        "total_commission_plus_tcs_tds_deduction",
+        "commission_base_amount",
+        "commission_tax_amount",
+        "commission_discount",
+        "sjit_incentive_amount",
+        "total_logistics_deduction",
+        "shipping_fee",
+        "fixed_fee",
+        "pick_and_pack_fee",
+        "payment_gateway_fee",
+        "total_tax_on_logistics",
+        "total_settlement",
+        "total_actual_settlement",
+        "amount_pending_settlement",
+        "prepaid_commission_deduction",
+        "prepaid_logistics_deduction",
+        "prepaid_payment",
+        "postpaid_commission_deduction",
+        "postpaid_logistics_deduction",
+        "postpaid_payment",
+    ],
+    int_cols=[
+        "article_level",
+    ],
+    dt_cols=[
+        "return_date",
+        "packing_date",
+        "delivery_date",
+        "settlement_date_prepaid_comm_deduction",
+        "settlement_date_prepaid_logistics_deduction",
+        "settlement_date_prepaid_payment",
+        "settlement_date_postpaid_comm_deduction",
+        "settlement_date_postpaid_logistics_deduction",
+        "settlement_date_postpaid_payment",
+    ],
+    defaults={"currency": "INR"},
+)
+
+
+_NON_ORDER_SETTLEMENT_SCHEMA = ReportSchema(
+    MyntraNonOrderSettlement,
+    str_cols=[
+        "seller_name",
+        "settlement_type",
+        "utr",
+        "invoice_ref",
+        "settlement_description",
+    ],
+    float_cols=[
+        "settlement_amount",
+    ],
+    dt_cols=[
+        "settlement_date",
+    ],
+)
+
+
+_ORDER_FLOW_SCHEMA = ReportSchema(
+    MyntraOrderFlow,
+    str_cols=[
+        "sale_order_code",
+        "order_number",
+        "product_sku_code",
+        "invoice_number",
+        "seller_order_id",
+        "packed_id",
+        "order_item_status",
+        "return_type",
+        "currency",
+        "shipping_case",
+        "brand",
+        "gender",
+        "article_type",
+        "supply_type",
+        "is_try_and_buy",
+        "payment_method",
+        "courier_name",
+        "tracking_no",
+        "hsn",
+        "product_tax_category",
+        "e_commerce_portal_name",
+        "seller_gstn",
+        "seller_name",
+        "myntra_gstn",
+        "customer_pincode",
+        "customer_state",
+    ],
+    float_cols=[
+        "seller_paid_amount",
+        "postpaid_amount",
+        "prepaid_amount",
+        "mrp",
+        "discount_amount",
+        "tax_rate",
+        "igst_amount",
+        "cgst_amount",
+        "sgst_amount",
+        "tcs_igst_amt",
+        "tcs_sgst_amt",
+        "tcs_cgst_amt",
+        "taxable_amount",
+        "minimum_commission",
+        "commission_pct",
+        "commission_total_amount",
+        "commission_base_amount",
+        "commission_tax_amount",
+        "total_commission_plus_tcs_deduction_fw",
+        "logistics_deduction_fw",
+        "customer_paid_amt_fw",
+        "total_settlement_fw",
+        "amount_pending_settlement_fw",
+        "total_commission_plus_tcs_deduction_rv",
+        "logistics_deduction_rv",
+        "total_settlement_rv",
+        "amount_pending_settlement_rv",
+        "total_customer_paid",
+    ],
+    dt_cols=[
+        "order_date",
+        "packing_date",
+        "promised_delivery_date",
+        "actual_delivery_date",
+        "return_date",
+        "restocked_date",
+        "promised_settlement_date",
+    ],
+    defaults={"currency": "INR"},
+)
+
+
 # ---------------------------------------------------------------------------
 # Ingest: PG Forward (Settled / Unsettled)
 # ---------------------------------------------------------------------------
@@ -121,129 +499,36 @@ def ingest_pg_forward(
 ):
     db = SessionLocal()
     try:
-        ws_id = resolve_workspace_id(db, workspace_slug)
+        ws_id = resolve_workspace_id(db, workspace_slug, create=True)
         content = file.file.read()
         if not content:
             raise HTTPException(400, "Empty file")
 
-        rows_data = _read_csv(content)
-        if not rows_data:
+        headers, df = _read_csv_frame(content)
+        if df.empty:
             return {"ok": True, "inserted": 0}
 
-        # Delete existing data for this workspace + status if replace
-        if replace:
-            deleted = (
-                db.query(MyntraPgForward)
-                .filter(MyntraPgForward.workspace_id == ws_id)
-                .filter(MyntraPgForward.settlement_status == status)
-                .delete(synchronize_session=False)
-            )
-            db.commit()
-
-        objs = []
-        for r in rows_data:
-            obj = MyntraPgForward(
-                workspace_id=ws_id,
-                settlement_status=status,
-                order_release_id=_get(r, "order_release_id"),
-                order_line_id=_get(r, "order_line_id"),
-                sku_code=_get(r, "sku_code"),
-                packet_id=_get(r, "packet_id"),
-                invoice_number=_get(r, "invoice_number"),
-                hsn_code=_get(r, "hsn_code"),
-                product_tax_category=_get(r, "product_tax_category"),
-                seller_order_id=_get(r, "seller_order_id"),
-                packing_date=_get(r, "packing_date", converter=_to_dt),
-                delivery_date=_get(r, "delivery_date", converter=_to_dt),
-                currency=_get(r, "currency") or "INR",
-                seller_product_amount=_get(r, "seller_product_amount", converter=_to_float),
-                postpaid_amount=_get(r, "postpaid_amount", converter=_to_float),
-                prepaid_amount=_get(r, "prepaid_amount", converter=_to_float),
-                mrp=_get(r, "mrp", converter=_to_float),
-                total_discount_amount=_get(r, "total_discount_amount", converter=_to_float),
-                customer_paid_amt=_get(r, "customer_paid_amt", converter=_to_float),
-                shipping_case=_get(r, "shipping_case"),
-                total_tax_rate=_get(r, "total_tax_rate", converter=_to_float),
-                igst_amount=_get(r, "igst_amount", converter=_to_float),
-                cgst_amount=_get(r, "cgst_amount", converter=_to_float),
-                sgst_amount=_get(r, "sgst_amount", converter=_to_float),
-                tcs_amount=_get(r, "tcs_amount", converter=_to_float),
-                tds_amount=_get(r, "tds_amount", converter=_to_float),
-                taxable_amount=_get(r, "taxable_amount", converter=_to_float),
-                igst_rate=_get(r, "igst_rate", converter=_to_float),
-                cgst_rate=_get(r, "cgst_rate", converter=_to_float),
-                sgst_rate=_get(r, "sgst_rate", converter=_to_float),
-                cess_amount=_get(r, "cess_amount", converter=_to_float),
-                cess_rate=_get(r, "cess_rate", converter=_to_float),
-                tcs_igst_rate=_get(r, "tcs_igst_rate", converter=_to_float),
-                tcs_sgst_rate=_get(r, "tcs_sgst_rate", converter=_to_float),
-                tcs_cgst_rate=_get(r, "tcs_cgst_rate", converter=_to_float),
-                tds_rate=_get(r, "tds_rate", converter=_to_float),
-                commission_percentage=_get(r, "commission_percentage", converter=_to_float),
-                minimum_commission=_get(r, "minimum_commission", converter=_to_float),
-                platform_fees=_get(r, "platform_fees", converter=_to_float),
-                total_commission=_get(r, "total_commission", converter=_to_float),
-                total_commission_plus_tcs_tds_deduction=_get(r, "total_commission_plus_tcs_tds_deduction", converter=_to_float),
-                commission_base_amount=_get(r, "commission_base_amount", converter=_to_float),
-                commission_tax_amount=_get(r, "commission_tax_amount", converter=_to_float),
-                commission_discount=_get(r, "commission_discount", converter=_to_float),
-                sjit_incentive_amount=_get(r, "sjit_incentive_amount", converter=_to_float),
-                total_logistics_deduction=_get(r, "total_logistics_deduction", converter=_to_float),
-                shipping_fee=_get(r, "shipping_fee", converter=_to_float),
-                fixed_fee=_get(r, "fixed_fee", converter=_to_float),
-                pick_and_pack_fee=_get(r, "pick_and_pack_fee", converter=_to_float),
-                payment_gateway_fee=_get(r, "payment_gateway_fee", converter=_to_float),
-                total_tax_on_logistics=_get(r, "total_tax_on_logistics", converter=_to_float),
-                article_level=_get(r, "article_level", converter=_to_int),
-                shipment_zone_classification=_get(r, "shipment_zone_classification"),
-                total_expected_settlement=_get(r, "total_expected_settlement", converter=_to_float),
-                total_actual_settlement=_get(r, "total_actual_settlement", converter=_to_float),
-                amount_pending_settlement=_get(r, "amount_pending_settlement", converter=_to_float),
-                prepaid_commission_deduction=_get(r, "prepaid_commission_deduction", converter=_to_float),
-                prepaid_logistics_deduction=_get(r, "prepaid_logistics_deduction", converter=_to_float),
-                prepaid_payment=_get(r, "prepaid_payment", converter=_to_float),
-                settlement_date_prepaid_comm_deduction=_get(r, "settlement_date_prepaid_comm_deduction", converter=_to_dt),
-                settlement_date_prepaid_logistics_deduction=_get(r, "settlement_date_prepaid_logistics_deduction", converter=_to_dt),
-                settlement_date_prepaid_payment=_get(r, "settlement_date_prepaid_payment", converter=_to_dt),
-                bank_utr_no_prepaid_comm_deduction=_get(r, "bank_utr_no_prepaid_comm_deduction"),
-                bank_utr_no_prepaid_logistics_deduction=_get(r, "bank_utr_no_prepaid_logistics_deduction"),
-                bank_utr_no_prepaid_payment=_get(r, "bank_utr_no_prepaid_payment"),
-                postpaid_commission_deduction=_get(r, "postpaid_commission_deduction", converter=_to_float),
-                postpaid_logistics_deduction=_get(r, "postpaid_logistics_deduction", converter=_to_float),
-                postpaid_payment=_get(r, "postpaid_payment", converter=_to_float),
-                settlement_date_postpaid_comm_deduction=_get(r, "settlement_date_postpaid_comm_deduction", converter=_to_dt),
-                settlement_date_postpaid_logistics_deduction=_get(r, "settlement_date_postpaid_logistics_deduction", converter=_to_dt),
-                settlement_date_postpaid_payment=_get(r, "settlement_date_postpaid_payment", converter=_to_dt),
-                bank_utr_no_postpaid_comm_deduction=_get(r, "bank_utr_no_postpaid_comm_deduction"),
-                bank_utr_no_postpaid_logistics_deduction=_get(r, "bank_utr_no_postpaid_logistics_deduction"),
-                bank_utr_no_postpaid_payment=_get(r, "bank_utr_no_postpaid_payment"),
-                brand=_get(r, "brand"),
-                gender=_get(r, "gender"),
-                brand_type=_get(r, "brand_type"),
-                article_type=_get(r, "article_type"),
-                supply_type=_get(r, "supply_type"),
-                try_and_buy_purchase=_get(r, "try_and_buy_purchase"),
-                seller_tier=_get(r, "seller_tier"),
-                seller_gstn=_get(r, "seller_gstn"),
-                seller_name=_get(r, "seller_name"),
-                myntra_gstn=_get(r, "myntra_gstn"),
-                shipping_city=_get(r, "shipping_city"),
-                shipping_pin_code=_get(r, "shipping_pin_code"),
-                shipping_state=_get(r, "shipping_state"),
-                shipping_state_code=_get(r, "shipping_state_code"),
-                postpaid_amount_other=_get(r, "postpaid_amount_other", converter=_to_float),
-                prepaid_amount_other=_get(r, "prepaid_amount_other", converter=_to_float),
-                shipping_amount=_get(r, "shipping_amount", converter=_to_float),
-                gift_amount=_get(r, "gift_amount", converter=_to_float),
-                additional_amount=_get(r, "additional_amount", converter=_to_float),
-                raw_json=json.dumps(r),
-                ingested_at=datetime.utcnow(),
-            )
-            objs.append(obj)
-
-        db.bulk_save_objects(objs)
+        date_errors = DateErrors()
+        frame = _PG_FORWARD_SCHEMA.build(
+            headers,
+            df,
+            {"workspace_id": str(ws_id), "settlement_status": status, "ingested_at": datetime.utcnow()},
+            date_errors,
+        )
+        load = _load_frame(
+            db, MyntraPgForward.__tablename__, frame,
+            {"workspace_id": ws_id, "settlement_status": status} if replace else None,
+        )
+        bump_data_version(db, ws_id)
         db.commit()
-        return {"ok": True, "inserted": len(objs), "status": status, "workspace_slug": workspace_slug}
+        return {
+            "ok": True,
+            "inserted": load["rows"],
+            "status": status,
+            "workspace_slug": workspace_slug,
+            "load": load,
+            "date_errors": date_errors.to_dict(),
+        }
 
     except HTTPException:
         raise
@@ -267,115 +552,36 @@ def ingest_pg_reverse(
 ):
     db = SessionLocal()
     try:
-        ws_id = resolve_workspace_id(db, workspace_slug)
+        ws_id = resolve_workspace_id(db, workspace_slug, create=True)
         content = file.file.read()
         if not content:
             raise HTTPException(400, "Empty file")
 
-        rows_data = _read_csv(content)
-        if not rows_data:
+        headers, df = _read_csv_frame(content)
+        if df.empty:
             return {"ok": True, "inserted": 0}
 
-        if replace:
-            db.query(MyntraPgReverse).filter(
-                MyntraPgReverse.workspace_id == ws_id,
-                MyntraPgReverse.settlement_status == status,
-            ).delete(synchronize_session=False)
-            db.commit()
-
-        objs = []
-        for r in rows_data:
-            obj = MyntraPgReverse(
-                workspace_id=ws_id,
-                settlement_status=status,
-                order_release_id=_get(r, "order_release_id"),
-                order_line_id=_get(r, "order_line_id"),
-                sku_code=_get(r, "sku_code"),
-                packet_id=_get(r, "packet_id"),
-                invoice_number=_get(r, "invoice_number"),
-                hsn_code=_get(r, "hsn_code"),
-                product_tax_category=_get(r, "product_tax_category"),
-                seller_order_id=_get(r, "seller_order_id"),
-                return_id=_get(r, "return_id"),
-                return_type=_get(r, "return_type"),
-                return_date=_get(r, "return_date", converter=_to_dt),
-                packing_date=_get(r, "packing_date", converter=_to_dt),
-                delivery_date=_get(r, "delivery_date", converter=_to_dt),
-                currency=_get(r, "currency") or "INR",
-                seller_product_amount=_get(r, "seller_product_amount", converter=_to_float),
-                postpaid_amount=_get(r, "postpaid_amount", converter=_to_float),
-                prepaid_amount=_get(r, "prepaid_amount", converter=_to_float),
-                mrp=_get(r, "mrp", converter=_to_float),
-                total_discount_amount=_get(r, "total_discount_amount", converter=_to_float),
-                customer_paid_amt=_get(r, "customer_paid_amt", converter=_to_float),
-                shipping_case=_get(r, "shipping_case"),
-                total_tax_rate=_get(r, "total_tax_rate", converter=_to_float),
-                igst_amount=_get(r, "igst_amount", converter=_to_float),
-                cgst_amount=_get(r, "cgst_amount", converter=_to_float),
-                sgst_amount=_get(r, "sgst_amount", converter=_to_float),
-                tcs_amount=_get(r, "tcs_amount", converter=_to_float),
-                tds_amount=_get(r, "tds_amount", converter=_to_float),
-                taxable_amount=_get(r, "taxable_amount", converter=_to_float),
-                commission_percentage=_get(r, "commission_percentage", converter=_to_float),
-                minimum_commission=_get(r, "minimum_commission", converter=_to_float),
-                platform_fees=_get(r, "platform_fees", converter=_to_float),
-                total_commission=_get(r, "total_commission", converter=_to_float),
-                total_commission_plus_tcs_tds_deduction=_get(r, "total_commission_plus_tcs_tds_deduction", converter=_to_float),
-                commission_base_amount=_get(r, "commission_base_amount", converter=_to_float),
-                commission_tax_amount=_get(r, "commission_tax_amount", converter=_to_float),
-                commission_discount=_get(r, "commission_discount", converter=_to_float),
-                sjit_incentive_amount=_get(r, "sjit_incentive_amount", converter=_to_float),
-                total_logistics_deduction=_get(r, "total_logistics_deduction", converter=_to_float),
-                shipping_fee=_get(r, "shipping_fee", converter=_to_float),
-                fixed_fee=_get(r, "fixed_fee", converter=_to_float),
-                pick_and_pack_fee=_get(r, "pick_and_pack_fee", converter=_to_float),
-                payment_gateway_fee=_get(r, "payment_gateway_fee", converter=_to_float),
-                total_tax_on_logistics=_get(r, "total_tax_on_logistics", converter=_to_float),
-                article_level=_get(r, "article_level", converter=_to_int),
-                shipment_zone_classification=_get(r, "shipment_zone_classification"),
-                total_settlement=_get(r, "total_settlement", converter=_to_float),
-                total_actual_settlement=_get(r, "total_actual_settlement", converter=_to_float),
-                amount_pending_settlement=_get(r, "amount_pending_settlement", converter=_to_float),
-                prepaid_commission_deduction=_get(r, "prepaid_commission_deduction", converter=_to_float),
-                prepaid_logistics_deduction=_get(r, "prepaid_logistics_deduction", converter=_to_float),
-                prepaid_payment=_get(r, "prepaid_payment", converter=_to_float),
-                settlement_date_prepaid_comm_deduction=_get(r, "settlement_date_prepaid_comm_deduction", converter=_to_dt),
-                settlement_date_prepaid_logistics_deduction=_get(r, "settlement_date_prepaid_logistics_deduction", converter=_to_dt),
-                settlement_date_prepaid_payment=_get(r, "settlement_date_prepaid_payment", converter=_to_dt),
-                bank_utr_no_prepaid_comm_deduction=_get(r, "bank_utr_no_prepaid_comm_deduction"),
-                bank_utr_no_prepaid_logistics_deduction=_get(r, "bank_utr_no_prepaid_logistics_deduction"),
-                bank_utr_no_prepaid_payment=_get(r, "bank_utr_no_prepaid_payment"),
-                postpaid_commission_deduction=_get(r, "postpaid_commission_deduction", converter=_to_float),
-                postpaid_logistics_deduction=_get(r, "postpaid_logistics_deduction", converter=_to_float),
-                postpaid_payment=_get(r, "postpaid_payment", converter=_to_float),
-                settlement_date_postpaid_comm_deduction=_get(r, "settlement_date_postpaid_comm_deduction", converter=_to_dt),
-                settlement_date_postpaid_logistics_deduction=_get(r, "settlement_date_postpaid_logistics_deduction", converter=_to_dt),
-                settlement_date_postpaid_payment=_get(r, "settlement_date_postpaid_payment", converter=_to_dt),
-                bank_utr_no_postpaid_comm_deduction=_get(r, "bank_utr_no_postpaid_comm_deduction"),
-                bank_utr_no_postpaid_logistics_deduction=_get(r, "bank_utr_no_postpaid_logistics_deduction"),
-                bank_utr_no_postpaid_payment=_get(r, "bank_utr_no_postpaid_payment"),
-                brand=_get(r, "brand"),
-                gender=_get(r, "gender"),
-                brand_type=_get(r, "brand_type"),
-                article_type=_get(r, "article_type"),
-                supply_type=_get(r, "supply_type"),
-                try_and_buy_purchase=_get(r, "try_and_buy_purchase"),
-                seller_tier=_get(r, "seller_tier"),
-                seller_gstn=_get(r, "seller_gstn"),
-                seller_name=_get(r, "seller_name"),
-                myntra_gstn=_get(r, "myntra_gstn"),
-                shipping_city=_get(r, "shipping_city"),
-                shipping_pin_code=_get(r, "shipping_pin_code"),
-                shipping_state=_get(r, "shipping_state"),
-                shipping_state_code=_get(r, "shipping_state_code"),
-                raw_json=json.dumps(r),
-                ingested_at=datetime.utcnow(),
-            )
-            objs.append(obj)
-
-        db.bulk_save_objects(objs)
+        date_errors = DateErrors()
+        frame = _PG_REVERSE_SCHEMA.build(
+            headers,
+            df,
+            {"workspace_id": str(ws_id), "settlement_status": status, "ingested_at": datetime.utcnow()},
+            date_errors,
+        )
+        load = _load_frame(
+            db, MyntraPgReverse.__tablename__, frame,
+            {"workspace_id": ws_id, "settlement_status": status} if replace else None,
+        )
+        bump_data_version(db, ws_id)
         db.commit()
-        return {"ok": True, "inserted": len(objs), "status": status, "workspace_slug": workspace_slug}
+        return {
+            "ok": True,
+            "inserted": load["rows"],
+            "status": status,
+            "workspace_slug": workspace_slug,
+            "load": load,
+            "date_errors": date_errors.to_dict(),
+        }
 
     except HTTPException:
         raise
@@ -398,40 +604,35 @@ def ingest_non_order_settlement(
 ):
     db = SessionLocal()
     try:
-        ws_id = resolve_workspace_id(db, workspace_slug)
+        ws_id = resolve_workspace_id(db, workspace_slug, create=True)
         content = file.file.read()
         if not content:
             raise HTTPException(400, "Empty file")
 
-        rows_data = _read_csv(content)
-        if not rows_data:
+        headers, df = _read_csv_frame(content)
+        if df.empty:
             return {"ok": True, "inserted": 0}
 
-        if replace:
-            db.query(MyntraNonOrderSettlement).filter(
-                MyntraNonOrderSettlement.workspace_id == ws_id
-            ).delete(synchronize_session=False)
-            db.commit()
-
-        objs = []
-        for r in rows_data:
-            obj = MyntraNonOrderSettlement(
-                workspace_id=ws_id,
-                seller_name=_get(r, "seller_name"),
-                settlement_amount=_get(r, "settlement_amount", converter=_to_float),
-                settlement_type=_get(r, "settlement_type"),
-                utr=_get(r, "utr"),
-                invoice_ref=_get(r, "invoice_ref"),
-                settlement_date=_get(r, "settlement_date", converter=_to_dt),
-                settlement_description=_get(r, "settlement_description"),
-                raw_json=json.dumps(r),
-                ingested_at=datetime.utcnow(),
-            )
-            objs.append(obj)
-
-        db.bulk_save_objects(objs)
+        date_errors = DateErrors()
+        frame = _NON_ORDER_SETTLEMENT_SCHEMA.build(
+            headers,
+            df,
+            {"workspace_id": str(ws_id), "ingested_at": datetime.utcnow()},
+            date_errors,
+        )
+        load = _load_frame(
+            db, MyntraNonOrderSettlement.__tablename__, frame,
+            {"workspace_id": ws_id} if replace else None,
+        )
+        bump_data_version(db, ws_id)
         db.commit()
-        return {"ok": True, "inserted": len(objs), "workspace_slug": workspace_slug}
+        return {
+            "ok": True,
+            "inserted": load["rows"],
+            "workspace_slug": workspace_slug,
+            "load": load,
+            "date_errors": date_errors.to_dict(),
+        }
 
     except HTTPException:
         raise
@@ -454,94 +655,35 @@ def ingest_order_flow(
 ):
     db = SessionLocal()
     try:
-        ws_id = resolve_workspace_id(db, workspace_slug)
+        ws_id = resolve_workspace_id(db, workspace_slug, create=True)
         content = file.file.read()
         if not content:
             raise HTTPException(400, "Empty file")
 
-        rows_data = _read_csv(content)
-        if not rows_data:
+        headers, df = _read_csv_frame(content)
+        if df.empty:
             return {"ok": True, "inserted": 0}
 
-        if replace:
-            db.query(MyntraOrderFlow).filter(
-                MyntraOrderFlow.workspace_id == ws_id
-            ).delete(synchronize_session=False)
-            db.commit()
-
-        objs = []
-        for r in rows_data:
-            obj = MyntraOrderFlow(
-                workspace_id=ws_id,
-                sale_order_code=_get(r, "sale_order_code"),
-                order_number=_get(r, "order_number"),
-                product_sku_code=_get(r, "product_sku_code"),
-                invoice_number=_get(r, "invoice_number"),
-                seller_order_id=_get(r, "seller_order_id"),
-                packed_id=_get(r, "packed_id"),
-                order_item_status=_get(r, "order_item_status"),
-                return_type=_get(r, "return_type"),
-                order_date=_get(r, "order_date", converter=_to_dt),
-                packing_date=_get(r, "packing_date", converter=_to_dt),
-                promised_delivery_date=_get(r, "promised_delivery_date", converter=_to_dt),
-                actual_delivery_date=_get(r, "actual_delivery_date", converter=_to_dt),
-                return_date=_get(r, "return_date", converter=_to_dt),
-                restocked_date=_get(r, "restocked_date", converter=_to_dt),
-                promised_settlement_date=_get(r, "promised_settlement_date", converter=_to_dt),
-                currency=_get(r, "currency") or "INR",
-                seller_paid_amount=_get(r, "seller_paid_amount", converter=_to_float),
-                postpaid_amount=_get(r, "postpaid_amount", converter=_to_float),
-                prepaid_amount=_get(r, "prepaid_amount", converter=_to_float),
-                mrp=_get(r, "mrp", converter=_to_float),
-                discount_amount=_get(r, "discount_amount", converter=_to_float),
-                shipping_case=_get(r, "shipping_case"),
-                tax_rate=_get(r, "tax_rate", converter=_to_float),
-                igst_amount=_get(r, "igst_amount", converter=_to_float),
-                cgst_amount=_get(r, "cgst_amount", converter=_to_float),
-                sgst_amount=_get(r, "sgst_amount", converter=_to_float),
-                tcs_igst_amt=_get(r, "tcs_igst_amt", converter=_to_float),
-                tcs_sgst_amt=_get(r, "tcs_sgst_amt", converter=_to_float),
-                tcs_cgst_amt=_get(r, "tcs_cgst_amt", converter=_to_float),
-                taxable_amount=_get(r, "taxable_amount", converter=_to_float),
-                minimum_commission=_get(r, "minimum_commission", converter=_to_float),
-                commission_pct=_get(r, "commission_pct", converter=_to_float),
-                commission_total_amount=_get(r, "commission_total_amount", converter=_to_float),
-                commission_base_amount=_get(r, "commission_base_amount", converter=_to_float),
-                commission_tax_amount=_get(r, "commission_tax_amount", converter=_to_float),
-                total_commission_plus_tcs_deduction_fw=_get(r, "total_commission_plus_tcs_deduction_fw", converter=_to_float),
-                logistics_deduction_fw=_get(r, "logistics_deduction_fw", converter=_to_float),
-                customer_paid_amt_fw=_get(r, "customer_paid_amt_fw", converter=_to_float),
-                total_settlement_fw=_get(r, "total_settlement_fw", converter=_to_float),
-                amount_pending_settlement_fw=_get(r, "amount_pending_settlement_fw", converter=_to_float),
-                total_commission_plus_tcs_deduction_rv=_get(r, "total_commission_plus_tcs_deduction_rv", converter=_to_float),
-                logistics_deduction_rv=_get(r, "logistics_deduction_rv", converter=_to_float),
-                total_settlement_rv=_get(r, "total_settlement_rv", converter=_to_float),
-                amount_pending_settlement_rv=_get(r, "amount_pending_settlement_rv", converter=_to_float),
-                brand=_get(r, "brand"),
-                gender=_get(r, "gender"),
-                article_type=_get(r, "article_type"),
-                supply_type=_get(r, "supply_type"),
-                is_try_and_buy=_get(r, "is_try_and_buy"),
-                payment_method=_get(r, "payment_method"),
-                courier_name=_get(r, "courier_name"),
-                tracking_no=_get(r, "tracking_no"),
-                hsn=_get(r, "hsn"),
-                product_tax_category=_get(r, "product_tax_category"),
-                e_commerce_portal_name=_get(r, "e_commerce_portal_name"),
-                seller_gstn=_get(r, "seller_gstn"),
-                seller_name=_get(r, "seller_name"),
-                myntra_gstn=_get(r, "myntra_gstn"),
-                customer_pincode=_get(r, "customer_pincode"),
-                customer_state=_get(r, "customer_state"),
-                total_customer_paid=_get(r, "total_customer_paid", converter=_to_float),
-                raw_json=json.dumps(r),
-                ingested_at=datetime.utcnow(),
-            )
-            objs.append(obj)
-
-        db.bulk_save_objects(objs)
+        date_errors = DateErrors()
+        frame = _ORDER_FLOW_SCHEMA.build(
+            headers,
+            df,
+            {"workspace_id": str(ws_id), "ingested_at": datetime.utcnow()},
+            date_errors,
+        )
+        load = _load_frame(
+            db, MyntraOrderFlow.__tablename__, frame,
+            {"workspace_id": ws_id} if replace else None,
+        )
+        bump_data_version(db, ws_id)
         db.commit()
-        return {"ok": True, "inserted": len(objs), "workspace_slug": workspace_slug}
+        return {
+            "ok": True,
+            "inserted": load["rows"],
+            "workspace_slug": workspace_slug,
+            "load": load,
+            "date_errors": date_errors.to_dict(),
+        }
 
     except HTTPException:
         raise
@@ -1049,7 +1191,7 @@ def ingest_sku_map(
     """Ingest Myntra Listings Report to build sku_code -> seller_sku_code mapping."""
     db = SessionLocal()
     try:
-        ws_id = resolve_workspace_id(db, workspace_slug)
+        ws_id = resolve_workspace_id(db, workspace_slug, create=True)
         content = file.file.read()
         if not content:
             raise HTTPException(400, "Empty file")
@@ -1058,33 +1200,37 @@ def ingest_sku_map(
         if not rows_data:
             return {"ok": True, "inserted": 0}
 
-        if replace:
-            db.query(MyntraSkuMap).filter(MyntraSkuMap.workspace_id == ws_id).delete(synchronize_session=False)
-            db.commit()
-
-        objs = []
+        ingested_at = datetime.utcnow()
+        records = []
         for r in rows_data:
             sku_code = _get(r, "sku_code", "skucode", "sku code")
             if not sku_code:
                 continue
-            obj = MyntraSkuMap(
-                workspace_id=ws_id,
-                sku_code=sku_code,
-                sku_id=_get(r, "sku_id", "skuid", "sku id"),
-                seller_sku_code=_get(r, "seller_sku_code", "sellerskucode", "seller sku code"),
-                style_id=_get(r, "style_id", "styleid", "style id"),
-                style_name=_get(r, "style_name", "stylename", "style name"),
-                brand=_get(r, "brand"),
-                article_type=_get(r, "article_type", "articletype", "article type"),
-                size=_get(r, "size"),
-                mrp=_get(r, "mrp", converter=_to_float),
-                ingested_at=datetime.utcnow(),
+            records.append(
+                {
+                    "workspace_id": str(ws_id),
+                    "sku_code": sku_code,
+                    "sku_id": _get(r, "sku_id", "skuid", "sku id"),
+                    "seller_sku_code": _get(r, "seller_sku_code", "sellerskucode", "seller sku code"),
+                    "style_id": _get(r, "style_id", "styleid", "style id"),
+                    "style_name": _get(r, "style_name", "stylename", "style name"),
+                    "brand": _get(r, "brand"),
+                    "article_type": _get(r, "article_type", "articletype", "article type"),
+                    "size": _get(r, "size"),
+                    "mrp": _get(r, "mrp", converter=_to_float),
+                    "ingested_at": ingested_at,
+                }
             )
-            objs.append(obj)
+        if not records:
+            return {"ok": True, "inserted": 0, "workspace_slug": workspace_slug}
 
-        db.bulk_save_objects(objs)
+        load = _load_frame(
+            db, MyntraSkuMap.__tablename__, pd.DataFrame.from_records(records),
+            {"workspace_id": ws_id} if replace else None,
+        )
+        bump_data_version(db, ws_id)
         db.commit()
-        return {"ok": True, "inserted": len(objs), "workspace_slug": workspace_slug}
+        return {"ok": True, "inserted": load["rows"], "workspace_slug": workspace_slug, "load": load}
     except HTTPException:
         raise
     except Exception as e:
@@ -1158,8 +1304,12 @@ def clear_myntra_recon(workspace_slug: str = Query("default")):
         ]:
             c = db.query(model).filter(model.workspace_id == ws_id).delete(synchronize_session=False)
             counts[name] = c
+        bump_data_version(db, ws_id)
         db.commit()
         return {"ok": True, "deleted": counts, "workspace_slug": workspace_slug}
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(500, f"Clear failed: {e}")
@@ -0,0 +1,282 @@
+# backend/return_reasons.py
+# Return reason normalizer + the materialized returns_raw.reason_raw / reason_bucket columns.
+#
+#   reason_raw:    the report's reason text, trimmed (Myntra return_reason, Flipkart return_sub_reason)
+#   reason_bucket: heatmap key (Myntra: RETURN_REASON_MAP bucket, Flipkart: normalized code)
+#
+# Both are written at ingest. sync_reason_buckets() (run after python -m backend.migrations) backfills rows loaded
+# before the columns existed and re-buckets everything when RETURN_REASON_MAP changes.
+#
+#   python -m backend.return_reasons            # backfill + re-bucket if the map changed
+#   python -m backend.return_reasons --force    # re-bucket every row
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import time
+
+import pandas as pd
+from sqlalchemy import text
+
+# =========================
+# Return Reason Normalizer
+# =========================
+
+RETURN_REASON_MAP = {
+    "SIZE_TOO_BIG": [
+        "size too big",
+        "size is too large",
+    ],
+    "SIZE_TOO_SMALL": [
+        "size too small",
+        "size is too small",
+    ],
+    "SIZE_DIFFERENT": [
+        "size is different",
+    ],
+    "FIT_NOT_LIKED": [
+        "i did not like the fit",
+    ],
+    "QUALITY_DEFECT_DAMAGE": [
+        "product was defective",
+        "defective product was delivered",
+        "product was damaged",
+        "received a poor quality product",
+        "product looked old",
+        "product was dirty and had stains",
+    ],
+    "WRONG_PRODUCT_DELIVERED": [
+        "received a completely different product",
+        "received a different product",
+        "different product was delivered",
+    ],
+    "NOT_AS_EXPECTED_COLOR_IMAGE": [
+        "color is different",
+        "product image was better than the actual product",
+    ],
+    "FOUND_BETTER_PRICE": [
+        "found a better price elsewhere",
+        "found a better price on myntra",
+    ],
+    "DELIVERY_DELAYED": [
+        "delivery was delayed",
+    ],
+    "CUSTOMER_CHANGED_MIND": [
+    "i do not need it anymore",
+    "it did not look good on me",
+    ],
+    "GENERIC_OTHER": [
+        "generic return reason",
+    ],
+}
+
+# build reverse lookup once
+_REASON_LOOKUP = {}
+for clean, arr in RETURN_REASON_MAP.items():
+    for raw in arr:
+        _REASON_LOOKUP[raw.strip().lower()] = clean
+
+# cells that mean "no reason" (astype(str) of an empty CSV cell gives "nan")
+_BLANK_REASONS = ("", "nan", "none", "null")
+
+
+def clean_return_reason(raw_reason: str | None, return_type: str | None = None) -> str:
+    s = (raw_reason or "").strip().lower()
+    rt = (return_type or "").strip().upper()
+
+    if not s:
+        # Myntra RTO often has no reason in file
+        if rt == "RTO":
+            return "RTO_NO_REASON"
+        return "UNKNOWN"
+
+    return _REASON_LOOKUP.get(s, "OTHER")
+
+
+def clean_return_reason_series(raw_reason: pd.Series | None, return_type: pd.Series) -> pd.Series:
+    """Vectorized clean_return_reason (same rules, whole column at once)."""
+    rt = return_type.astype(str).str.strip().str.upper()
+    if raw_reason is None:
+        s = pd.Series("", index=rt.index)
+    else:
+        s = raw_reason.fillna("").astype(str).str.strip().str.lower()
+
+    out = s.map(_REASON_LOOKUP).fillna("OTHER")
+    empty = s == ""
+    out = out.mask(empty & (rt == "RTO"), "RTO_NO_REASON")
+    out = out.mask(empty & (rt != "RTO"), "UNKNOWN")
+    return out
+
+
+def heatmap_reason_key(raw_reason: str | None, return_type: str | None = None, portal: str | None = None) -> str:
+    """Heatmap reason label depends on portal.
+
+    - Myntra: use existing clean_return_reason bucketing.
+    - Flipkart: use return_sub_reason/return_reason codes as-is (normalized).
+    """
+    p = (portal or "").strip().lower() or "myntra"
+    rt = (return_type or "").strip().upper()
+    s = (raw_reason or "").strip()
+
+    if p == "flipkart":
+        if not s:
+            return "RTO_NO_REASON" if rt == "RTO" else "UNKNOWN"
+        return re.sub(r"[^A-Za-z0-9]+", "_", s).strip("_").upper()
+
+    return clean_return_reason(raw_reason, return_type)
+
+
+def reason_columns(raw_reason: pd.Series | None, return_type: pd.Series, portal: str) -> tuple[pd.Series, pd.Series]:
+    """(reason_raw, reason_bucket) columns for an ingest frame."""
+    rt = return_type.astype(str)
+    if raw_reason is None:
+        reason_raw = pd.Series(None, index=rt.index, dtype=object)
+    else:
+        s = raw_reason.astype(object).where(raw_reason.notna(), "").astype(str).str.strip()
+        reason_raw = s.where(~s.str.lower().isin(_BLANK_REASONS), None)
+
+    if (portal or "").strip().lower() == "flipkart":
+        # few distinct codes per file: normalize each once
+        bucket = pd.Series(
+            [heatmap_reason_key(r if isinstance(r, str) else None, t, "flipkart") for r, t in zip(reason_raw, rt)],
+            index=rt.index,
+            dtype=object,
+        )
+    else:
+        bucket = clean_return_reason_series(reason_raw, rt)
+    return reason_raw, bucket
+
+
+def reason_map_fingerprint() -> str:
+    """Changes whenever RETURN_REASON_MAP (or the Flipkart code rule) changes."""
+    payload = json.dumps({"map": RETURN_REASON_MAP, "rules": 1}, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+# -----------------------------------------------------------------------------
+# Backfill / re-bucket (returns_raw)
+# -----------------------------------------------------------------------------
+_FINGERPRINT_KEY = "return_reason_map"
+_BACKFILL_BATCH = 50_000
+
+# returns_raw.portal (backend/portals.py); NULL only before the portal migration ran
+_IS_FK_SQL = "(coalesce(CAST(portal AS text), '') = 'flipkart')"
+_RTYPE_SQL = "upper(btrim(coalesce(return_type, '')))"
+
+
+def backfill_reason_raw(conn) -> int:
+    """reason_raw from raw_json for rows that were loaded before the column existed."""
+    done = 0
+    last_id = 0
+    while True:
+        ids = conn.execute(
+            text(
+                "SELECT id FROM returns_raw WHERE id > :last AND reason_bucket IS NULL "
+                "ORDER BY id LIMIT :n"
+            ),
+            {"last": last_id, "n": _BACKFILL_BATCH},
+        ).scalars().all()
+        if not ids:
+            return done
+        conn.execute(
+            text(
+                "UPDATE returns_raw SET reason_raw = NULLIF(btrim("
+                f"CASE WHEN {_IS_FK_SQL} "
+                "THEN CAST(raw_json AS JSONB) ->> 'return_sub_reason' "
+                "ELSE CAST(raw_json AS JSONB) ->> 'return_reason' END), '') "
+                "WHERE id >= :lo AND id <= :hi AND reason_bucket IS NULL"
+            ),
+            {"lo": ids[0], "hi": ids[-1]},
+        )
+        conn.execute(
+            text(
+                "UPDATE returns_raw SET reason_raw = NULL "
+                "WHERE id >= :lo AND id <= :hi AND reason_bucket IS NULL "
+                "AND lower(reason_raw) = ANY(:blank)"
+            ),
+            {"lo": ids[0], "hi": ids[-1], "blank": list(_BLANK_REASONS)},
+        )
+        done += len(ids)
+        last_id = ids[-1]
+
+
+def rebucket(conn, only_missing: bool = False) -> int:
+    """
+    Set reason_bucket from (portal, reason_raw, return_type). Buckets are computed in Python
+    for each distinct combination (a few hundred at most) and written with one UPDATE.
+    Returns the number of rows changed.
+    """
+    where = "WHERE reason_bucket IS NULL" if only_missing else ""
+    combos = conn.execute(
+        text(
+            f"SELECT DISTINCT {_IS_FK_SQL} AS is_fk, reason_raw, {_RTYPE_SQL} AS rtype "
+            f"FROM returns_raw {where}"
+        )
+    ).all()
+    if not combos:
+        return 0
+
+    values, params = [], {}
+    for i, c in enumerate(combos):
+        bucket = heatmap_reason_key(c.reason_raw, c.rtype, "flipkart" if c.is_fk else "myntra")
+        values.append(f"(CAST(:f{i} AS BOOLEAN), CAST(:r{i} AS TEXT), CAST(:t{i} AS TEXT), CAST(:b{i} AS TEXT))")
+        params.update({f"f{i}": bool(c.is_fk), f"r{i}": c.reason_raw, f"t{i}": c.rtype, f"b{i}": bucket})
+
+    res = conn.execute(
+        text(
+            "UPDATE returns_raw SET reason_bucket = v.bucket "
+            f"FROM (VALUES {', '.join(values)}) AS v(is_fk, reason_raw, rtype, bucket) "
+            f"WHERE {_IS_FK_SQL} = v.is_fk "
+            "AND returns_raw.reason_raw IS NOT DISTINCT FROM v.reason_raw "
+            f"AND {_RTYPE_SQL} = v.rtype "
+            "AND returns_raw.reason_bucket IS DISTINCT FROM v.bucket"
+        ),
+        params,
+    )
+    return int(res.rowcount or 0)
+
+
+def sync_reason_buckets(engine, force: bool = False) -> dict:
+    """
+    Backfill rows without a bucket; re-bucket all rows when the stored map fingerprint
+    (app_meta) differs from reason_map_fingerprint(). Cheap no-op when nothing changed.
+    """
+    t0 = time.perf_counter()
+    fp = reason_map_fingerprint()
+    with engine.begin() as conn:
+        stored = conn.execute(
+            text("SELECT value FROM app_meta WHERE key = :k"), {"k": _FINGERPRINT_KEY}
+        ).scalar()
+        backfilled = backfill_reason_raw(conn)
+        remap = force or stored != fp
+        rebucketed = rebucket(conn, only_missing=not remap)
+        conn.execute(
+            text(
+                "INSERT INTO app_meta (key, value, updated_at) VALUES (:k, :v, now()) "
+                "ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value, updated_at = now()"
+            ),
+            {"k": _FINGERPRINT_KEY, "v": fp},
+        )
+    return {
+        "backfilled": backfilled,
+        "rebucketed": rebucketed,
+        "map_changed": stored != fp,
+        "seconds": round(time.perf_counter() - t0, 3),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Backfill / re-bucket returns_raw reason columns")
+    ap.add_argument("--force", action="store_true", help="re-bucket every row")
+    args = ap.parse_args()
+
+    from backend.db import engine
+
+    print(json.dumps(sync_reason_buckets(engine, force=args.force)), flush=True)
+
+
+if __name__ == "__main__":
+    main()
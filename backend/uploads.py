@@ -0,0 +1,199 @@
+# backend/uploads.py
+# Upload registry: sha256 dedupe + per-file lineage (rows carry upload_id)
+
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from datetime import datetime
+from typing import Callable
+
+from fastapi import HTTPException
+
+from backend.data_version import bump_data_version_now
+from backend.db import SessionLocal, lookup_workspace_id, resolve_workspace_id
+from backend.models import Upload
+
+_HASH_BLOCK = 1024 * 1024
+
+
+def file_sha256(f) -> str:
+    """sha256 of a binary file object (read in blocks, position reset)."""
+    h = hashlib.sha256()
+    f.seek(0)
+    for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+        h.update(block)
+    f.seek(0)
+    return h.hexdigest()
+
+
+def upload_to_dict(u: Upload) -> dict:
+    def _iso(v):
+        return v.isoformat() if v else None
+
+    return {
+        "id": str(u.id),
+        "workspace_id": str(u.workspace_id),
+        "report_type": u.report_type,
+        "sha256": u.sha256,
+        "filename": u.filename,
+        "file_bytes": u.file_bytes,
+        "status": u.status,
+        "rows_in_file": u.rows_in_file,
+        "rows_loaded": u.rows_loaded,
+        "date_min": _iso(u.date_min),
+        "date_max": _iso(u.date_max),
+        "created_at": _iso(u.created_at),
+        "finished_at": _iso(u.finished_at),
+        "seconds": u.seconds,
+        "error": u.error,
+    }
+
+
+def find_duplicate_upload(db, ws_id, report_type: str, sha256: str) -> Upload | None:
+    return (
+        db.query(Upload)
+        .filter(
+            Upload.workspace_id == ws_id,
+            Upload.report_type == report_type,
+            Upload.sha256 == sha256,
+            Upload.status == "done",
+        )
+        .order_by(Upload.created_at.desc())
+        .first()
+    )
+
+
+def duplicate_response(u: Upload) -> dict:
+    prev = json.loads(u.result_json) if u.result_json else {}
+    return {
+        **prev,
+        "duplicate": True,
+        "inserted": 0,
+        "updated": 0,
+        "upload_id": str(u.id),
+        "upload": upload_to_dict(u),
+    }
+
+
+def check_duplicate(report_type: str, f, workspace_slug: str) -> dict | None:
+    """Response for an identical, already-loaded file (None if it is new)."""
+    sha = file_sha256(f)
+    db = SessionLocal()
+    try:
+        ws_id = lookup_workspace_id(db, workspace_slug)
+        if ws_id is None:
+            return None  # new workspace: created by the ingest itself
+        dup = find_duplicate_upload(db, ws_id, report_type, sha)
+        return duplicate_response(dup) if dup else None
+    finally:
+        db.close()
+
+
+def tracked_ingest(report_type: str, fn: Callable[..., dict]) -> Callable[..., dict]:
+    """
+    Wrap an ingest function fn(f, filename, replace, workspace_slug, ..., upload_id=...):
+      - identical file already loaded (same workspace + report type) => earlier result, no parsing
+        (skipped for replace=True, or force=True)
+      - otherwise an uploads row is written, its id is stamped on the loaded rows,
+        and row count / date range / timing are recorded when the ingest ends
+      - the workspace's data version is bumped once fn returns (backend/data_version.py)
+    fn's result may carry "date_min" / "date_max".
+    """
+
+    def run(f, filename, replace: bool, workspace_slug: str, force: bool = False, **params) -> dict:
+        t0 = time.perf_counter()
+        sha = file_sha256(f)
+
+        db = SessionLocal()
+        try:
+            ws_id = resolve_workspace_id(db, workspace_slug, create=True)
+
+            if not replace and not force:
+                dup = find_duplicate_upload(db, ws_id, report_type, sha)
+                if dup:
+                    return duplicate_response(dup)
+
+            f.seek(0, 2)
+            size = f.tell()
+            f.seek(0)
+
+            up = Upload(
+                workspace_id=ws_id,
+                report_type=report_type,
+                sha256=sha,
+                filename=filename,
+                file_bytes=int(size),
+                status="processing",
+            )
+            db.add(up)
+            db.commit()
+            upload_id = up.id
+        finally:
+            db.close()
+
+        try:
+            result = fn(f, filename, replace=replace, workspace_slug=workspace_slug, upload_id=upload_id, **params)
+        except Exception as e:
+            _finish(
+                upload_id,
+                status="failed",
+                error=str(e.detail) if isinstance(e, HTTPException) else f"{type(e).__name__}: {e}",
+                seconds=round(time.perf_counter() - t0, 3),
+            )
+            raise
+        finally:
+            # after fn's last commit (ingests commit in steps); a failed load may have committed some
+            bump_data_version_now(ws_id)
+
+        result = {**result, "upload_id": str(upload_id), "duplicate": False}
+        loaded = result.get("inserted", 0)
+        if isinstance(loaded, int) and isinstance(result.get("updated"), int):
+            loaded += result["updated"]
+        _finish(
+            upload_id,
+            status="done",
+            rows_in_file=result.get("rows_in_file"),
+            rows_loaded=loaded,
+            date_min=_as_dt(result.get("date_min")),
+            date_max=_as_dt(result.get("date_max")),
+            seconds=round(time.perf_counter() - t0, 3),
+            result_json=json.dumps(result, default=str),
+            replaced_ws=ws_id if replace else None,
+            report_type=report_type,
+        )
+        return result
+
+    run.__name__ = f"tracked_{getattr(fn, '__name__', report_type)}"
+    return run
+
+
+def _as_dt(v):
+    if v is None or isinstance(v, datetime):
+        return v
+    try:
+        return datetime.fromisoformat(str(v))
+    except Exception:
+        return None
+
+
+def _finish(upload_id, replaced_ws=None, report_type: str | None = None, **values) -> None:
+    db = SessionLocal()
+    try:
+        # replace=True wiped the rows of every earlier upload of this type
+        if replaced_ws is not None:
+            db.query(Upload).filter(
+                Upload.workspace_id == replaced_ws,
+                Upload.report_type == report_type,
+                Upload.status == "done",
+                Upload.id != upload_id,
+            ).update({"status": "replaced"}, synchronize_session=False)
+
+        values["finished_at"] = datetime.utcnow()
+        db.query(Upload).filter(Upload.id == upload_id).update(values, synchronize_session=False)
+        db.commit()
+    except Exception:
+        db.rollback()
+    finally:
+        db.close()
@@ -0,0 +1,109 @@
+# backend/xlsx_stream.py
+# Streaming .xlsx reader: openpyxl read_only + values_only, one sheet, fixed-size DataFrame chunks.
+#
+# pd.read_excel builds the whole workbook (every sheet, every cell object) in memory before
+# we get a frame back; a 50 MB Flipkart P&L workbook needs GBs that way. Here only the rows
+# of the current chunk are alive at any time.
+
+from __future__ import annotations
+
+import io
+from typing import Iterator
+
+import pandas as pd
+from fastapi import HTTPException
+
+# rows per yielded chunk
+XLSX_CHUNK_ROWS = 20_000
+
+
+def open_xlsx_sheet(f, sheet_name: str | None = None):
+    """
+    Open one worksheet read-only. `f` is a binary file object (e.g. UploadFile.file) or bytes.
+    Sheet name match is case-insensitive; None => first sheet.
+    Returns (workbook, worksheet) — caller closes the workbook.
+    """
+    import openpyxl
+
+    if isinstance(f, (bytes, bytearray)):
+        f = io.BytesIO(f)
+    else:
+        f.seek(0)
+
+    try:
+        wb = openpyxl.load_workbook(f, read_only=True, data_only=True)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Unable to read Excel: {e}")
+
+    if sheet_name is None:
+        return wb, wb.worksheets[0]
+
+    want = sheet_name.strip().lower()
+    for sn in wb.sheetnames:
+        if str(sn).strip().lower() == want:
+            return wb, wb[sn]
+
+    sheets = list(wb.sheetnames)
+    wb.close()
+    raise HTTPException(
+        status_code=400,
+        detail=f"Sheet '{sheet_name}' not found. Sheets present: {sheets}",
+    )
+
+
+def iter_xlsx_chunks(
+    f,
+    sheet_name: str | None = None,
+    skip_rows: int = 0,
+    columns: list[str] | None = None,
+    header: bool = False,
+    chunk_rows: int = XLSX_CHUNK_ROWS,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield dtype=object DataFrames of at most `chunk_rows` rows.
+
+    - skip_rows: leading rows to ignore (title / banner rows)
+    - columns:  positional names; rows are padded / cut to this width
+    - header:   take column names from the first row after skip_rows (when columns is None)
+    - completely empty rows are dropped
+
+    Cells keep the types openpyxl gives them (str, int, float, datetime, None), so numbers and
+    dates need no string round-trip. The chunk index continues across chunks.
+    """
+    wb, ws = open_xlsx_sheet(f, sheet_name)
+    try:
+        rows_iter = ws.iter_rows(min_row=skip_rows + 1, values_only=True)
+
+        names = list(columns) if columns is not None else None
+        if names is None and header:
+            first = next(rows_iter, None)
+            if first is None:
+                return
+            names = [str(v).strip() if v is not None else "" for v in first]
+
+        buf: list[tuple] = []
+        start = 0
+        for row in rows_iter:
+            if row is None or all(v is None or (isinstance(v, str) and not v.strip()) for v in row):
+                continue
+            buf.append(row)
+            if len(buf) >= chunk_rows:
+                yield _frame(buf, names, start)
+                start += len(buf)
+                buf = []
+        if buf:
+            yield _frame(buf, names, start)
+    finally:
+        wb.close()
+
+
+def _frame(rows: list[tuple], names: list[str] | None, start: int) -> pd.DataFrame:
+    n = len(names) if names is not None else max(len(r) for r in rows)
+    # read-only sheets don't pad rows to a common width
+    fixed = [r[:n] if len(r) >= n else tuple(r) + (None,) * (n - len(r)) for r in rows]
+    return pd.DataFrame(
+        fixed,
+        columns=names if names is not None else range(n),
+        index=range(start, start + len(fixed)),
+        dtype=object,
+    )
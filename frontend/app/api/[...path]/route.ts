@@ -33,7 +33,8 @@ async function proxy(
   });
 
   const resHeaders = new Headers(upstream.headers);
-  const data = await upstream.arrayBuffer();
+  // 304 (If-None-Match hit) / 204 must not carry a body
+  const data = [204, 304].includes(upstream.status) ? null : await upstream.arrayBuffer();
 
   return new NextResponse(data, {
     status: upstream.status,
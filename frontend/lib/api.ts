@@ -39,15 +39,31 @@ function buildDbUrl(path: string, params?: Record<string, any>) {
 }
 
 /** Fetch JSON with better FastAPI error messages */
+// GET responses by URL with the backend's ETag (data-version based): a revisit sends
+// If-None-Match and a 304 reuses the stored body. Insertion order = LRU order.
+const ETAG_CACHE_MAX = 200;
+const etagCache = new Map<string, { etag: string; body: unknown }>();
+
 async function fetchJson<T>(url: string, init?: RequestInit): Promise<T> {
   const headers = new Headers(init?.headers as any);
   headers.set("Cache-Control", "no-store");
 
+  // browser only: on the Next server the map would be shared by every visitor
+  const useEtag = !isServer() && (init?.method ?? "GET").toUpperCase() === "GET";
+  const cached = useEtag ? etagCache.get(url) : undefined;
+  if (cached) headers.set("If-None-Match", cached.etag);
+
   const res = await fetch(url, {
     ...(init ?? {}),
     headers,
   });
 
+  if (res.status === 304 && cached) {
+    etagCache.delete(url);
+    etagCache.set(url, cached);
+    return cached.body as T;
+  }
+
   const raw = await res.text().catch(() => "");
   let json: any = null;
   try {
@@ -71,7 +87,16 @@ async function fetchJson<T>(url: string, init?: RequestInit): Promise<T> {
     throw new Error(String(msg));
   }
 
-  return (json ?? (raw as any)) as T;
+  const body = (json ?? (raw as any)) as T;
+  const etag = res.headers.get("ETag");
+  if (useEtag && etag) {
+    etagCache.delete(url);
+    etagCache.set(url, { etag, body });
+    if (etagCache.size > ETAG_CACHE_MAX) {
+      etagCache.delete(etagCache.keys().next().value as string);
+    }
+  }
+  return body;
 }
 
 
@@ -494,15 +519,56 @@ export type IngestResult = {
   filename: string;
   rows_in_file: number;
   inserted: number;
+  updated?: number;
+  skipped?: number;
   replace: boolean;
+  // uploads registry: same file already loaded => duplicate=true, nothing re-parsed
+  upload_id?: string;
+  duplicate?: boolean;
   workspace_slug?: string;
   detected?: any;
 };
 
+// what to do with order_line_ids that are already stored (sales/returns uploads)
+export type OnConflict = "error" | "skip" | "update";
+
 type UploadArgs =
-  | { file: File; replace?: boolean; workspace_slug?: string }
+  | { file: File; replace?: boolean; workspace_slug?: string; on_conflict?: OnConflict }
   | File;
 
+// Queued uploads (backend returns { job_id } and a worker ingests the file)
+export type IngestJob = {
+  id: string;
+  kind: string;
+  workspace_slug: string;
+  status: "queued" | "running" | "done" | "failed";
+  filename?: string | null;
+  rows_done: number;
+  chunks_done: number;
+  attempts: number;
+  result?: IngestResult | null;
+  error?: string | null;
+  created_at?: string | null;
+  started_at?: string | null;
+  finished_at?: string | null;
+  seconds?: number | null;
+};
+
+export function getIngestJob(job_id: string) {
+  return fetchJson<IngestJob>(buildDbUrl(`/db/jobs/${encodeURIComponent(job_id)}`));
+}
+
+const JOB_POLL_MS = 1500;
+
+async function waitForIngestJob(job_id: string): Promise<IngestResult> {
+  for (;;) {
+    const job = await getIngestJob(job_id);
+    if (job.status === "done") return job.result as IngestResult;
+    if (job.status === "failed") throw new Error(job.error || "Ingest job failed");
+    await new Promise((r) => setTimeout(r, JOB_POLL_MS));
+  }
+}
+
 async function postFile(
   endpoint: string,
   args: UploadArgs,
@@ -512,6 +578,7 @@ async function postFile(
   let file: File;
   let rep: boolean;
   let ws: string;
+  let onConflict: OnConflict | undefined;
 
   if (args instanceof File) {
     file = args;
@@ -521,6 +588,7 @@ async function postFile(
     file = args.file;
     rep = args.replace ?? true;
     ws = args.workspace_slug ?? DEFAULT_WS;
+    onConflict = args.on_conflict;
   }
 
   const form = new FormData();
@@ -529,9 +597,11 @@ async function postFile(
   // Uploads are client-side → always go through Next proxy
   const url = `/api${endpoint}?replace=${rep ? "true" : "false"}&workspace_slug=${encodeURIComponent(
     ws
-  )}`;
+  )}${onConflict ? `&on_conflict=${onConflict}` : ""}`;
 
-  return fetchJson<IngestResult>(url, { method: "POST", body: form });
+  const res = await fetchJson<any>(url, { method: "POST", body: form });
+  if (res && res.job_id) return waitForIngestJob(String(res.job_id));
+  return res as IngestResult;
 }
 
 export function uploadSales(